@@ -13,20 +13,119 @@ Think of it as the MANAGER'S OFFICE where you control everything!
 
 # Import necessary Django components 📦
 from django.contrib import admin  # The admin framework
-from django.utils.html import format_html  # For HTML formatting in admin
+from django.db import router  # Which database writes go to
+from functools import partial  # Bind the changes to make to a batch function
 from django.urls import reverse  # For generating URLs
 from django.utils import timezone  # For timezone handling
 import logging  # For logging
 
 # Import our models 🗄️
-from .models import UserProfile, BlogPost, Comment, ContactMessage, Category
+from .models import UserProfile, BlogPost, Comment, ContactMessage, Category, Job
+from . import jobs, retention, search
+from .templatetags.thumbnails import picture_html  # Thumbnail <picture> element
+from simple_django_framework.write_queue import write_queue  # Serialized database writes
 
 # Get a logger for this app 📝
 logger = logging.getLogger('main_app')
 
+
+# Rows changed per transaction by the bulk actions below ⚙️
+ACTION_BATCH_SIZE = 500
+
+
+def run_in_batches(queryset, func, batch_size=None):
+    """
+    Run ``func(batch)`` over ``queryset`` in primary-key ranged batches ✍️
+
+    "Select all N items" on a changelist can pick thousands of rows. Each
+    batch (see retention.pk_batches) goes through the write queue in a
+    transaction of its own, so the SQLite write lock is only ever held for
+    one short statement or two, and small writes of other requests get
+    their turn in between.
+
+    Args:
+        queryset: The selected rows
+        func: Function (batch queryset) -> number of rows changed
+        batch_size: Rows per transaction (default ACTION_BATCH_SIZE)
+
+    Returns:
+        int: Total number of rows changed
+    """
+    return sum(
+        write_queue.run(func, batch, batch=False)
+        for batch in retention.pk_batches(queryset, batch_size or ACTION_BATCH_SIZE)
+    )
+
+
+def bulk_update(queryset, **changes):
+    """
+    queryset.update(**changes), one single UPDATE per batch of rows 📝
+
+    Returns:
+        int: Number of rows updated
+    """
+    return run_in_batches(queryset, lambda batch: batch.update(**changes))
+
+
+def update_posts(batch, **changes):
+    """
+    Update a batch of posts the way save() would, in one UPDATE 📝
+
+    queryset.update() skips save() and the signal handlers, so we bump
+    updated_at ourselves (ETags, exports) and recount the categories of
+    the batch's posts afterwards.
+
+    Returns:
+        int: Number of posts updated
+    """
+    category_ids = list(Category.objects.filter(posts__in=batch).values_list('pk', flat=True).distinct())
+    updated = batch.update(updated_at=timezone.now(), **changes)
+    Category.refresh_published_counts(category_ids)
+    return updated
+
+
+def resolve_messages(batch, resolved_at):
+    """
+    Resolve a batch of contact messages and queue the emails to their
+    senders (one background job per batch) 📬
+
+    Messages that were already resolved are left alone, so nobody is told
+    twice.
+
+    Returns:
+        int: Number of messages resolved
+    """
+    ids = list(batch.exclude(status='resolved').values_list('pk', flat=True))
+    if not ids:
+        return 0
+    updated = ContactMessage.objects.filter(pk__in=ids).update(status='resolved', resolved_at=resolved_at)
+    jobs.enqueue(jobs.send_resolved_emails, ids)
+    return updated
+
+
+class BatchedAdmin(admin.ModelAdmin):
+    """
+    ModelAdmin whose bulk delete runs in short batches too 🗑️
+
+    The built-in "Delete selected" action ends in delete_queryset(), which
+    would otherwise delete everything in one long transaction.
+    """
+    
+    def delete_queryset(self, request, queryset):
+        """Delete the selected rows in pk-ranged batches, like the other actions 🔪"""
+        # queryset.db is where it would READ from (maybe the read-only connection)
+        queryset = queryset.using(router.db_for_write(queryset.model))
+        label = queryset.model._meta.label
+        deleted = run_in_batches(queryset, lambda batch: batch.delete()[1].get(label, 0))
+        logger.info(
+            f"Admin {request.user.username} deleted {deleted} "
+            f"{queryset.model._meta.verbose_name_plural} in batches of {ACTION_BATCH_SIZE}"
+        )
+
+
 # Custom admin configuration for UserProfile model 👤
 @admin.register(UserProfile)  # Register this model with the admin
-class UserProfileAdmin(admin.ModelAdmin):
+class UserProfileAdmin(BatchedAdmin):
     """
     Admin interface for User Profiles 👤
     
@@ -43,6 +142,10 @@ class UserProfileAdmin(admin.ModelAdmin):
         'profile_picture_preview',  # Show profile picture thumbnail
     ]
     
+    # Load each profile's user in the same query 🔗
+    # (the 'user' column calls str(user), which would otherwise query per row)
+    list_select_related = ['user']
+    
     # Which fields can be used for filtering 🔍
     list_filter = [
         'created_at',  # Filter by creation date
@@ -104,23 +207,21 @@ class UserProfileAdmin(admin.ModelAdmin):
         """
         Show profile picture thumbnail in admin 🖼️
         
+        Uses the small thumbnails (main_app/thumbnails.py), not the
+        full-size upload, so a list of 100 profiles stays light.
+        
         Args:
             obj: The UserProfile object
             
         Returns:
             str: HTML for image thumbnail
         """
-        if obj.profile_picture:
-            return format_html(
-                '<img src="{}" width="50" height="50" style="border-radius: 50%;" />',
-                obj.profile_picture.url
-            )
-        return 'No picture'
+        return picture_html(obj, 50, style='border-radius: 50%;') or 'No picture'
     profile_picture_preview.short_description = 'Profile Picture'
 
 # Custom admin configuration for BlogPost model 📝
 @admin.register(BlogPost)
-class BlogPostAdmin(admin.ModelAdmin):
+class BlogPostAdmin(BatchedAdmin):
     """
     Admin interface for Blog Posts 📝
     
@@ -138,6 +239,9 @@ class BlogPostAdmin(admin.ModelAdmin):
         'published_at',  # When published
     ]
     
+    # Fetch the author with each post (one JOIN instead of one query per row) 🔗
+    list_select_related = ['author']
+    
     # Add filters in the right sidebar 🔍
     list_filter = [
         'status',  # Filter by status
@@ -148,6 +252,8 @@ class BlogPostAdmin(admin.ModelAdmin):
     ]
     
     # Search functionality 🔎
+    # These fields show the search box; on SQLite the actual search uses the
+    # full-text index instead (see get_search_results below)
     search_fields = [
         'title',  # Search in title
         'content',  # Search in content
@@ -214,6 +320,17 @@ class BlogPostAdmin(admin.ModelAdmin):
         return f"{obj.view_count:,} views"  # Add comma separators
     view_count_display.short_description = 'View Count'
     
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Search posts through the full-text index instead of LIKE '%term%' 🔎
+        
+        Returns:
+            tuple: (filtered queryset, whether duplicates may appear)
+        """
+        if not search.build_match_query(search_term) or not search.is_available(queryset.db):
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(pk__in=search.matching_ids(search_term)), False
+    
     def make_published(self, request, queryset):
         """
         Action to publish selected posts ✅
@@ -222,10 +339,9 @@ class BlogPostAdmin(admin.ModelAdmin):
             request: The admin request
             queryset: Selected posts
         """
-        updated = queryset.update(
-            status='published',
-            published_at=timezone.now()
-        )
+        updated = run_in_batches(queryset, partial(
+            update_posts, status='published', published_at=timezone.now()
+        ))
         # Log the action 📝
         logger.info(f"Admin {request.user.username} published {updated} blog posts")
         # Show success message
@@ -234,14 +350,14 @@ class BlogPostAdmin(admin.ModelAdmin):
     
     def make_draft(self, request, queryset):
         """Action to make posts drafts 📝"""
-        updated = queryset.update(status='draft')
+        updated = run_in_batches(queryset, partial(update_posts, status='draft'))
         logger.info(f"Admin {request.user.username} made {updated} blog posts drafts")
         self.message_user(request, f'{updated} posts were moved to draft status.')
     make_draft.short_description = "Mark selected posts as draft"
     
     def make_featured(self, request, queryset):
         """Action to feature posts 🌟"""
-        updated = queryset.update(is_featured=True)
+        updated = bulk_update(queryset, is_featured=True, updated_at=timezone.now())
         logger.info(f"Admin {request.user.username} featured {updated} blog posts")
         self.message_user(request, f'{updated} posts were marked as featured.')
     make_featured.short_description = "Mark selected posts as featured"
@@ -279,6 +395,24 @@ class CommentInline(admin.TabularInline):
     extra = 0  # Don't show extra empty forms
     readonly_fields = ['created_at', 'updated_at']  # Read-only fields
     fields = ['author', 'content', 'is_approved', 'created_at']  # Fields to show
+    
+    def get_queryset(self, request):
+        """Load comment authors (and the post, for each row's label) with the comments 🔗"""
+        return super().get_queryset(request).select_related('author', 'post')
+    
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        """
+        Load the author choices ONCE for all comment rows 👥
+        
+        Every row of the inline is its own form, and each form's author
+        <select> would run the users query again. Turning the choices into
+        a list here (the formset builds its form class once per page) lets
+        every row reuse them.
+        """
+        field = super().formfield_for_foreignkey(db_field, request, **kwargs)
+        if db_field.name == 'author':
+            field.choices = list(field.choices)
+        return field
 
 # Register the comment inline with BlogPost
 # This is done by modifying the BlogPostAdmin class
@@ -286,7 +420,7 @@ BlogPostAdmin.inlines = (CommentInline,)
 
 # Custom admin for Comment model 💬
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(BatchedAdmin):
     """Admin interface for Comments 💬"""
     
     list_display = [
@@ -297,6 +431,9 @@ class CommentAdmin(admin.ModelAdmin):
         'created_at',  # When posted
     ]
     
+    # str(comment.post) shows the post's author too, so follow both relations 🔗
+    list_select_related = ['post__author', 'author']
+    
     list_filter = [
         'is_approved',  # Filter by approval status
         'created_at',  # Filter by date
@@ -313,6 +450,12 @@ class CommentAdmin(admin.ModelAdmin):
     
     actions = ['approve_comments', 'unapprove_comments']
     
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        """Fetch each post's author with the post choices (str(post) shows it) 🔗"""
+        if db_field.name == 'post':
+            kwargs['queryset'] = BlogPost.objects.select_related('author')
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+    
     def content_preview(self, obj):
         """Show first 50 characters of comment 📝"""
         return obj.content[:50] + '...' if len(obj.content) > 50 else obj.content
@@ -320,21 +463,21 @@ class CommentAdmin(admin.ModelAdmin):
     
     def approve_comments(self, request, queryset):
         """Action to approve selected comments ✅"""
-        updated = queryset.update(is_approved=True)
+        updated = run_in_batches(queryset, lambda batch: batch.set_approved(True))  # Recounts the posts too
         logger.info(f"Admin {request.user.username} approved {updated} comments")
         self.message_user(request, f'{updated} comments were approved.')
     approve_comments.short_description = "Approve selected comments"
     
     def unapprove_comments(self, request, queryset):
         """Action to unapprove selected comments ❌"""
-        updated = queryset.update(is_approved=False)
+        updated = run_in_batches(queryset, lambda batch: batch.set_approved(False))  # Recounts the posts too
         logger.info(f"Admin {request.user.username} unapproved {updated} comments")
         self.message_user(request, f'{updated} comments were unapproved.')
     unapprove_comments.short_description = "Unapprove selected comments"
 
 # Custom admin for ContactMessage model 📬
 @admin.register(ContactMessage)
-class ContactMessageAdmin(admin.ModelAdmin):
+class ContactMessageAdmin(BatchedAdmin):
     """Admin interface for Contact Messages 📬"""
     
     list_display = [
@@ -377,24 +520,22 @@ class ContactMessageAdmin(admin.ModelAdmin):
     
     def mark_resolved(self, request, queryset):
         """Action to mark messages as resolved ✅"""
-        updated = 0
-        for message in queryset:
-            message.mark_resolved()  # Use our custom method
-            updated += 1
+        # Same change as ContactMessage.mark_resolved(), one UPDATE per batch
+        updated = run_in_batches(queryset, partial(resolve_messages, resolved_at=timezone.now()))
         logger.info(f"Admin {request.user.username} resolved {updated} contact messages")
         self.message_user(request, f'{updated} messages were marked as resolved.')
     mark_resolved.short_description = "Mark selected messages as resolved"
     
     def mark_spam(self, request, queryset):
         """Action to mark messages as spam 🚫"""
-        updated = queryset.update(status='spam')
+        updated = bulk_update(queryset, status='spam')
         logger.info(f"Admin {request.user.username} marked {updated} messages as spam")
         self.message_user(request, f'{updated} messages were marked as spam.')
     mark_spam.short_description = "Mark selected messages as spam"
 
 # Custom admin for Category model 🏷️
 @admin.register(Category)
-class CategoryAdmin(admin.ModelAdmin):
+class CategoryAdmin(BatchedAdmin):
     """Admin interface for Categories 🏷️"""
     
     list_display = [
@@ -410,11 +551,59 @@ class CategoryAdmin(admin.ModelAdmin):
     
     readonly_fields = ['created_at', 'post_count']
     
+    def formfield_for_manytomany(self, db_field, request, **kwargs):
+        """Fetch each post's author with the post choices (str(post) shows it) 🔗"""
+        if db_field.name == 'posts':
+            kwargs['queryset'] = BlogPost.objects.select_related('author')
+        return super().formfield_for_manytomany(db_field, request, **kwargs)
+    
     def post_count(self, obj):
-        """Show number of published posts in category 📊"""
+        """
+        Show number of published posts in category 📊
+        
+        This reads the stored published_post_count column, so the changelist
+        needs no extra COUNT query per row.
+        """
         count = obj.get_post_count()  # Use our custom method
         return f"{count} posts"
     post_count.short_description = 'Published Posts'
+    post_count.admin_order_field = 'published_post_count'  # Sortable column
+
+# Custom admin for Job model 🧰
+@admin.register(Job)
+class JobAdmin(BatchedAdmin):
+    """Admin interface for background jobs 🧰"""
+    
+    list_display = [
+        'name',  # Job function
+        'status',  # Queued, running, done or failed
+        'attempts',  # Attempts so far
+        'run_at',  # When it is (or was) due
+        'created_at',  # When queued
+        'finished_at',  # When done or given up
+    ]
+    
+    list_filter = ['status', 'name']
+    
+    search_fields = ['name', 'last_error']
+    
+    # Workers own these rows: look, retry or delete, but don't edit
+    readonly_fields = [
+        'name', 'payload', 'status', 'attempts', 'max_attempts', 'last_error',
+        'run_at', 'locked_by', 'locked_until', 'created_at', 'started_at', 'finished_at',
+    ]
+    
+    actions = ['retry_jobs']
+    
+    def retry_jobs(self, request, queryset):
+        """Action to queue failed jobs again, with fresh attempts 🔁"""
+        updated = bulk_update(
+            queryset.filter(status='failed'),
+            status='queued', attempts=0, run_at=timezone.now(), finished_at=None,
+        )
+        logger.info(f"Admin {request.user.username} queued {updated} failed jobs again")
+        self.message_user(request, f'{updated} failed jobs were queued again.')
+    retry_jobs.short_description = "Retry selected failed jobs"
 
 # Customize the admin site header and title 🎨
 admin.site.site_header = 'Django Simple Framework Admin'  # Header text
@@ -0,0 +1,384 @@
+"""
+Self-hosted Bootstrap and Font Awesome for main_app
+
+What is this file? 📦
+base.html used to load Bootstrap and Font Awesome from two CDNs. Every
+first visit then paid for two extra DNS lookups and TLS handshakes, and
+downloaded ALL of Bootstrap's CSS and ALL of Font Awesome's ~2000 icons to
+show a dozen of them. Without internet access the site fell apart.
+
+`python manage.py vendor_assets` downloads them ONCE into static/vendor/
+and keeps only what we use:
+
+1. SCAN: every word in our templates, our JavaScript and the Python files
+   that write HTML (forms set classes too) is collected - "fas", "fa-rocket", "navbar"...
+   A class built in a template like alert-{{ message.tags }} keeps every
+   alert-* class. settings.VENDOR_ASSETS['SAFELIST'] adds the classes
+   Bootstrap's JavaScript switches on and off (show, collapsing...)
+2. PURGE: CSS rules whose selectors need a class we never use are dropped
+   (a rule for ".a, .b" keeps ".a" if only "a" is used)
+3. SUBSET: the icon fonts keep only the glyphs of the icons that survived,
+   so the font shrinks from ~150 KB to a few KB (needs fontTools and
+   brotli: pip install fonttools brotli - without them the fonts are
+   copied whole)
+
+Bootstrap's JavaScript is copied as it is (it can't be purged safely),
+minus its //# sourceMappingURL comment: the .map file isn't vendored, and
+collectstatic would fail looking for it.
+Templates use {% vendor_url 'bootstrap_css' %} (main_app/templatetags/
+assets.py): the self-hosted copy once it exists, the CDN until then.
+After adding a new class or icon to a template, run the command again.
+"""
+
+# Import necessary components 📦
+import functools  # Remember whether a file is vendored
+import io  # Fonts in memory
+import logging  # For logging
+import posixpath  # Paths inside static/
+import re  # Scanning and CSS parsing
+import urllib.request  # Downloads
+from pathlib import Path, PurePosixPath  # File paths
+from urllib.parse import urljoin, urlparse  # Font URLs are relative to the CSS
+
+from django.conf import settings  # settings.VENDOR_ASSETS
+from django.contrib.staticfiles import finders  # Is a vendored file there?
+
+try:
+    from fontTools import subset as font_subset  # Icon font subsetting
+    from fontTools.ttLib import TTFont
+    import brotli  # noqa: F401 - fontTools needs it to write WOFF2
+except ImportError:  # pragma: no cover
+    font_subset = None
+
+# Get a logger for this app 📝
+logger = logging.getLogger('main_app')
+
+# Default options (settings.VENDOR_ASSETS overrides them) ⚙️
+DEFAULT_OPTIONS = {
+    'ROOT': Path(settings.BASE_DIR) / 'static',  # Where static/vendor/ goes (in STATICFILES_DIRS)
+    'CONTENT': [  # Files scanned for class names (glob patterns relative to BASE_DIR)
+        'main_app/templates/**/*.html',
+        'main_app/static/**/*.js',
+        'main_app/forms.py',  # Forms set classes on their widgets
+        'main_app/templatetags/*.py',
+    ],
+    'SAFELIST': [  # Classes only Bootstrap's JavaScript uses
+        'show', 'showing', 'hiding', 'fade', 'collapse', 'collapsing', 'collapsed', 'active',
+        'disabled', 'dropdown-menu-end', 'dropdown-menu-start', 'was-validated', 'is-valid', 'is-invalid',
+    ],
+}
+
+# {name: (path under static/, CDN URL)} 🌐
+ASSETS = {
+    'bootstrap_css': (
+        'vendor/bootstrap/bootstrap.min.css',
+        'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css',
+    ),
+    'bootstrap_js': (
+        'vendor/bootstrap/bootstrap.bundle.min.js',
+        'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js',
+    ),
+    'fontawesome_css': (
+        'vendor/fontawesome/css/all.min.css',
+        'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css',
+    ),
+}
+
+# Words in templates and code (class names are words) 🔤
+WORD = re.compile(r'[A-Za-z0-9_-]+')
+
+# The start of a class name finished by template code: alert-{{ ... }}, alert-${...}
+PREFIX = re.compile(r'([A-Za-z][\w-]*-)(?:\{\{|\{%|\$\{)')
+
+# CSS comments
+COMMENT = re.compile(r'/\*.*?\*/', re.S)
+
+# A source map comment at the end of a .js file (//# sourceMappingURL=...)
+SOURCE_MAP = re.compile(r'^[ \t]*//[#@] sourceMappingURL=\S*[ \t]*$\n?', re.M)
+
+# A class in a CSS selector (with backslash escapes)
+SELECTOR_CLASS = re.compile(r'\.((?:\\.|[\w-])+)')
+
+# Parts of a selector whose classes don't have to be used: [attr="x.y"], :not(.show)
+SELECTOR_IGNORED = re.compile(r'\[[^\]]*\]|:not\((?:[^()]|\([^()]*\))*\)')
+
+# At-rules holding other rules (purged inside)
+GROUPING_RULES = {'media', 'supports', 'container', 'layer', 'document'}
+
+# Escaped code points in CSS strings: content:"\f135"
+CODEPOINT = re.compile(r'"\\([0-9a-fA-F]{4,6})"')
+
+# url(...) format(...) in an @font-face src
+FONT_SOURCE = re.compile(r'''url\(\s*['"]?([^'")]+)['"]?\s*\)(?:\s*format\(\s*['"]?([\w-]+)['"]?\s*\))?''')
+
+
+def options():
+    """DEFAULT_OPTIONS with settings.VENDOR_ASSETS on top ⚙️"""
+    return {**DEFAULT_OPTIONS, **getattr(settings, 'VENDOR_ASSETS', {})}
+
+
+@functools.lru_cache(maxsize=None)
+def is_vendored(static_name):
+    """Has vendor_assets written this file? (checked once per process) 🔍"""
+    return finders.find(static_name) is not None
+
+
+def fetch(url, source=None):
+    """
+    Download ``url`` - or read it from ``source`` for offline builds 📥
+
+    Args:
+        url: CDN URL
+        source: Folder with the files by their names (e.g. bootstrap.min.css,
+                fa-solid-900.woff2), or None to download
+
+    Returns:
+        bytes: The file's contents
+
+    Raises:
+        OSError: If it can't be downloaded or read
+    """
+    if source:
+        return (Path(source) / PurePosixPath(urlparse(url).path).name).read_bytes()
+    request = urllib.request.Request(url, headers={'User-Agent': 'vendor_assets'})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return response.read()
+
+
+def scan_content(patterns, base_dir=None, exclude=None):
+    """
+    Collect every word in our templates and code 🔎
+
+    Args:
+        patterns: Glob patterns relative to ``base_dir``
+        base_dir: Default settings.BASE_DIR
+        exclude: Folder to skip (the vendored files themselves)
+
+    Returns:
+        tuple: (set of words, set of class prefixes like 'alert-')
+    """
+    base_dir = Path(base_dir or settings.BASE_DIR)
+    words, prefixes = set(), set()
+    for pattern in patterns:
+        for path in base_dir.glob(pattern):
+            if exclude and Path(exclude) in path.parents:
+                continue
+            text = path.read_text(encoding='utf-8', errors='replace')
+            words.update(WORD.findall(text))
+            prefixes.update(PREFIX.findall(text))
+    return words, prefixes
+
+
+def _skip_string(css, i):
+    """Index just past the CSS string starting at ``i`` 🔚"""
+    quote = css[i]
+    i += 1
+    while i < len(css) and css[i] != quote:
+        i += 2 if css[i] == '\\' else 1
+    return i + 1
+
+
+def css_blocks(css):
+    """
+    Split CSS into its top-level parts 🧱
+
+    Yields:
+        tuple: (prelude, body) - body is None for statements like @charset
+               and /*! license comments */
+    """
+    i, start, length = 0, 0, len(css)
+    while i < length:
+        char = css[i]
+        if char in '"\'':
+            i = _skip_string(css, i)
+        elif css.startswith('/*', i):
+            end = css.find('*/', i + 2)
+            end = length if end == -1 else end + 2
+            if css.startswith('/*!', i) and not css[start:i].strip():
+                yield css[i:end], None  # License comments stay
+                start = end
+            i = end
+        elif char == ';':
+            if COMMENT.sub('', css[start:i]).strip():
+                yield COMMENT.sub('', css[start:i]).strip(), None
+            i = start = i + 1
+        elif char == '{':
+            depth, j = 1, i + 1
+            while j < length and depth:
+                if css[j] in '"\'':
+                    j = _skip_string(css, j)
+                    continue
+                depth += {'{': 1, '}': -1}.get(css[j], 0)
+                j += 1
+            yield COMMENT.sub('', css[start:i]).strip(), css[i + 1:j - 1]
+            i = start = j
+        else:
+            i += 1
+
+
+def _statement(prelude):
+    """A statement or license comment back as CSS 📝"""
+    return prelude if prelude.startswith('/*') else f'{prelude};'
+
+
+def split_selectors(prelude):
+    """'.a, .b:is(.c, .d)' -> ['.a', '.b:is(.c, .d)'] ✂️"""
+    parts, depth, start = [], 0, 0
+    for i, char in enumerate(prelude):
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == ',' and not depth:
+            parts.append(prelude[start:i].strip())
+            start = i + 1
+    parts.append(prelude[start:].strip())
+    return [part for part in parts if part]
+
+
+def selector_used(selector, words, prefixes=()):
+    """Is every class the selector needs one we use? ✅"""
+    classes = SELECTOR_CLASS.findall(SELECTOR_IGNORED.sub('', selector))
+    prefixes = tuple(prefixes)
+    return all(
+        name in words or (prefixes and name.startswith(prefixes))
+        for name in (re.sub(r'\\(.)', r'\1', found) for found in classes)
+    )
+
+
+def purge_css(css, words, prefixes=()):
+    """
+    Drop the CSS rules for classes we never use 🧹
+
+    Rules without classes (body, :root, @font-face, @keyframes...) stay.
+
+    Args:
+        css: The stylesheet
+        words: Words used in our templates and code (see scan_content)
+        prefixes: Class prefixes that count as used
+
+    Returns:
+        str: The purged stylesheet
+    """
+    output = []
+    for prelude, body in css_blocks(css):
+        if body is None:
+            output.append(_statement(prelude))
+        elif prelude.startswith('@'):
+            name = re.match(r'@([\w-]+)', prelude).group(1).lower()
+            if name in GROUPING_RULES:
+                inner = purge_css(body, words, prefixes)
+                if inner:
+                    output.append(f'{prelude}{{{inner}}}')
+            else:
+                output.append(f'{prelude}{{{body}}}')
+        else:
+            selectors = [s for s in split_selectors(prelude) if selector_used(s, words, prefixes)]
+            if selectors:
+                output.append(f"{','.join(selectors)}{{{body}}}")
+    return ''.join(output)
+
+
+def used_codepoints(css):
+    """The icon code points a (purged) Font Awesome stylesheet still uses 🔢"""
+    return {int(found, 16) for found in CODEPOINT.findall(css)}
+
+
+def subset_font(data, codepoints):
+    """
+    Keep only the glyphs for ``codepoints`` in a font ✂️
+
+    Returns:
+        bytes: The smaller WOFF2 font, the font unchanged if fontTools
+               isn't installed, or None if the font has none of them
+    """
+    if font_subset is None:
+        return data
+    font = TTFont(io.BytesIO(data))
+    wanted = codepoints & set(font.getBestCmap())
+    if not wanted:
+        return None
+    options = font_subset.Options()
+    options.flavor = 'woff2'
+    subsetter = font_subset.Subsetter(options)
+    subsetter.populate(unicodes=wanted)
+    subsetter.subset(font)
+    output = io.BytesIO()
+    font.flavor = 'woff2'
+    font.save(output)
+    return output.getvalue()
+
+
+def vendor_fonts(css, css_url, static_name, source=None):
+    """
+    Download and subset the fonts of a purged icon stylesheet 🔤
+
+    Only the WOFF2 source of each @font-face is kept (every current browser
+    reads WOFF2); faces with no glyph left are dropped.
+
+    Returns:
+        tuple: (new stylesheet, {path under static/: bytes}, original font bytes)
+    """
+    codepoints = used_codepoints(css)
+    fonts, subsets, original_bytes = {}, {}, 0
+    output = []
+    for prelude, body in css_blocks(css):
+        if body is None:
+            output.append(_statement(prelude))
+            continue
+        if prelude.lower() == '@font-face':
+            woff2 = [url for url, fmt in FONT_SOURCE.findall(body) if fmt == 'woff2' or url.endswith('.woff2')]
+            if not woff2:
+                output.append(f'{prelude}{{{body}}}')
+                continue
+            relative = woff2[0]
+            if relative not in subsets:
+                data = fetch(urljoin(css_url, relative), source)
+                original_bytes += len(data)
+                subsets[relative] = subset_font(data, codepoints)
+            if subsets[relative] is None:
+                continue  # None of our icons is in this font
+            fonts[posixpath.normpath(posixpath.join(posixpath.dirname(static_name), relative))] = subsets[relative]
+            body = re.sub(r'src:[^;}]*', f'src:url({relative}) format("woff2")', body)
+        output.append(f'{prelude}{{{body}}}')
+    return ''.join(output), fonts, original_bytes
+
+
+def vendor_all(source=None):
+    """
+    Build every file of static/vendor/ 🏗️
+
+    Args:
+        source: Folder to read the CDN files from instead of downloading
+
+    Returns:
+        list: (path under static/, bytes before, bytes after) per asset
+    """
+    opts = options()
+    root = Path(opts['ROOT'])
+    words, prefixes = scan_content(opts['CONTENT'], exclude=root / 'vendor')
+    words |= set(opts['SAFELIST'])
+
+    files, report = {}, []
+    for name, (static_name, url) in ASSETS.items():
+        data = fetch(url, source)
+        fonts = None
+        if static_name.endswith('.css'):
+            css = purge_css(data.decode('utf-8'), words, prefixes)
+            if name == 'fontawesome_css':
+                css, fonts, font_bytes = vendor_fonts(css, url, static_name, source)
+            files[static_name] = css.encode('utf-8')
+        else:
+            files[static_name] = SOURCE_MAP.sub('', data.decode('utf-8')).rstrip().encode('utf-8') + b'\n'
+        report.append((static_name, len(data), len(files[static_name])))
+        if fonts is not None:
+            files.update(fonts)
+            report.append((f'{posixpath.dirname(next(iter(fonts), static_name))}/', font_bytes, sum(map(len, fonts.values()))))
+
+    for static_name, content in files.items():
+        path = root / static_name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+    is_vendored.cache_clear()
+    logger.info(f"Vendored {len(files)} asset files into {root / 'vendor'}")
+    return report
@@ -0,0 +1,180 @@
+"""
+Async views for main_app
+
+What is this file? ⚡
+Django can run views as ``async def`` functions when the site is served
+through ASGI (simple_django_framework/asgi.py, e.g. with uvicorn or daphne).
+
+Under ASGI, a normal (sync) view has to be handed to a worker thread for
+every request (sync_to_async) and back again. The views in this file are
+async all the way down instead: they use Django's async ORM (aget, afirst,
+aaggregate, ``async for``) and async cache calls (aget/aset), so requests
+that are waiting on the database or cache don't tie up a thread each.
+
+They return exactly the same pages and JSON as their twins in views.py and
+live under /async/ so both can be compared side by side:
+    python manage.py bench_async
+
+Note: under WSGI (runserver) Django runs these in an event loop per request,
+which works but is slower - use the sync URLs there.
+"""
+
+# Import necessary Django components 📦
+import logging  # For logging
+
+from asgiref.sync import sync_to_async  # For code with no async version yet
+from django.core.cache import cache  # Shared cache (async calls: aget/aset)
+from django.http import Http404, HttpResponseBadRequest, JsonResponse  # Responses
+from django.shortcuts import render  # Templates
+
+from .http_cache import ablog_list_validators, apost_detail_validators, conditional_page
+from .models import BlogPost
+from .pagination import InvalidCursor, akeyset_page, parse_page_size
+from .search import search_posts
+from .views import post_to_dict, published_posts
+
+# Get a logger for this app 📝
+logger = logging.getLogger('main_app')
+
+# How long /async/api/posts/ pages stay in the cache (seconds) ⏱️
+# Keys include the page's ETag, so a cached page is never out of date -
+# this just stops old versions from piling up.
+API_PAGE_CACHE_TIMEOUT = 300
+
+
+async def api_hello(request):
+    """
+    Async twin of views.api_hello 🌐
+
+    Args:
+        request: The HTTP request object
+
+    Returns:
+        JsonResponse: JSON data instead of HTML
+    """
+    user = await request.auser()  # Loads session + user without blocking
+    logger.info(f"Async API hello endpoint called by user: {user}")
+
+    data = {
+        'message': 'Hello from Django API!',
+        'status': 'success',
+        'user': str(user),
+        'timestamp': '2024-01-01',
+    }
+    return JsonResponse(data)
+
+
+@conditional_page(ablog_list_validators)
+async def blog_list(request):
+    """
+    Async twin of views.blog_list 📰
+
+    Args:
+        request: The HTTP request object
+
+    Returns:
+        HttpResponse: The blog index page (400 for a bad cursor)
+    """
+    try:
+        posts, next_cursor = await akeyset_page(published_posts(), request.GET.get('cursor'))
+    except InvalidCursor:
+        return HttpResponseBadRequest("Invalid cursor")
+
+    # Templates read request.user synchronously, so load it the async way first
+    request.user = await request.auser()
+    context = {
+        'page_title': 'Blog',
+        'posts': posts,
+        'next_cursor': next_cursor,
+    }
+    return render(request, 'main_app/blog_list.html', context)
+
+
+@conditional_page(apost_detail_validators)
+async def blog_post_detail(request, slug):
+    """
+    Async twin of views.blog_post_detail 📄
+
+    Args:
+        request: The HTTP request object
+        slug: The post's slug from the URL
+
+    Returns:
+        HttpResponse: The post page (404 if it doesn't exist or isn't published)
+    """
+    try:
+        post = await (
+            BlogPost.objects.select_related('author')
+            .prefetch_related('categories')
+            .aget(slug=slug, status='published')
+        )
+    except BlogPost.DoesNotExist:
+        raise Http404("No published post with that slug")
+    await post.aincrement_view_count()
+
+    request.user = await request.auser()
+    context = {
+        'page_title': post.title,
+        'post': post,
+    }
+    return render(request, 'main_app/blog_detail.html', context)
+
+
+@conditional_page(ablog_list_validators, per_user=False)
+async def api_post_list(request):
+    """
+    Async twin of views.api_post_list, with a cache in front 🌐
+
+    Pages are cached under their ETag: after any change to the published
+    posts the ETag (and so the key) changes, so stale pages are never served.
+
+    Args:
+        request: The HTTP request object
+
+    Returns:
+        JsonResponse: {'results': [...], 'next_cursor': '...' or null}
+    """
+    cache_key = f'async-api-posts:{request.page_etag}'
+    data = await cache.aget(cache_key)
+    if data is None:
+        page_size = parse_page_size(request.GET.get('limit'))
+        try:
+            posts, next_cursor = await akeyset_page(
+                published_posts(), request.GET.get('cursor'), page_size
+            )
+        except InvalidCursor:
+            return JsonResponse({'status': 'error', 'message': 'Invalid cursor'}, status=400)
+        data = {
+            'results': [post_to_dict(post) for post in posts],
+            'next_cursor': next_cursor,
+        }
+        await cache.aset(cache_key, data, API_PAGE_CACHE_TIMEOUT)
+    return JsonResponse(data)
+
+
+async def api_search(request):
+    """
+    Async twin of views.api_search 🔎
+
+    The full-text search uses raw SQL, which has no async version in
+    Django, so that one call runs in a worker thread.
+
+    Args:
+        request: The HTTP request object
+
+    Returns:
+        JsonResponse: {'query': ..., 'results': [...]}
+    """
+    query = request.GET.get('q', '').strip()
+    results = []
+    if query:
+        limit = parse_page_size(request.GET.get('limit'))
+        results = await sync_to_async(search_posts)(query, limit=limit)
+
+    data = []
+    for post in results:
+        item = post_to_dict(post, categories=False)
+        item['rank'] = post.search_rank
+        item['snippet'] = str(post.search_snippet)
+        data.append(item)
+    return JsonResponse({'query': query, 'results': data})
@@ -0,0 +1,273 @@
+"""
+Benchmark helpers for main_app
+
+What is this file? ⏱️
+Small, dependency-free helpers shared by the ``bench*`` management commands:
+1. Statistics: timing samples in, friendly numbers out
+2. Route discovery: every URL in the project that takes no parameters
+3. In-process drivers that call the real WSGI and ASGI application objects
+   (no web server, no network - just Django's own request handling)
+4. A database query counter that works across threads
+"""
+
+import asyncio  # For the ASGI driver
+import io  # Empty request bodies
+import math  # For ceil()
+import sys  # wsgi.errors
+import threading  # Locks
+import time  # High-resolution timers
+from concurrent.futures import ThreadPoolExecutor  # WSGI concurrency
+
+from django.db.backends.signals import connection_created  # New DB connections
+from django.urls import URLPattern, URLResolver, get_resolver  # URL inspection
+
+
+def percentile(sorted_samples, pct):
+    """
+    Nearest-rank percentile of an already sorted list 📊
+
+    Args:
+        sorted_samples: Samples sorted from smallest to largest
+        pct: Percentile between 0 and 100
+
+    Returns:
+        float: The percentile value (0.0 for an empty list)
+    """
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_samples)))
+    return sorted_samples[min(rank, len(sorted_samples)) - 1]
+
+
+def summarize(samples, scale=1.0):
+    """
+    Turn a list of timings into mean/p50/p95/p99/max 📋
+
+    Args:
+        samples: Timings (any unit)
+        scale: Multiply every value by this (e.g. 1e6 for seconds -> microseconds)
+
+    Returns:
+        dict: count, mean, p50, p95, p99 and max (rounded to 3 decimals)
+    """
+    ordered = sorted(samples)
+    count = len(ordered)
+
+    def scaled(value):
+        return round(value * scale, 3)
+
+    return {
+        'count': count,
+        'mean': scaled(sum(ordered) / count) if count else 0.0,
+        'p50': scaled(percentile(ordered, 50)),
+        'p95': scaled(percentile(ordered, 95)),
+        'p99': scaled(percentile(ordered, 99)),
+        'max': scaled(ordered[-1]) if count else 0.0,
+    }
+
+
+def discover_routes(urlconf=None):
+    """
+    List every URL path that needs no parameters 🗺️
+
+    Walks the project URLconf (including everything it include()s) and keeps
+    the plain routes, e.g. '/about/', '/admin/main_app/blogpost/'. Routes
+    with parameters ('<slug:slug>/') or regular expressions are skipped
+    because we can't make up valid values for them.
+
+    Returns:
+        list: Sorted, de-duplicated URL paths
+    """
+    routes = set()
+
+    def walk(patterns, prefix):
+        for pattern in patterns:
+            route = str(pattern.pattern)
+            if '<' in route or any(char in route for char in '^$()[]*+?\\'):
+                continue
+            if isinstance(pattern, URLResolver):
+                walk(pattern.url_patterns, prefix + route)
+            elif isinstance(pattern, URLPattern):
+                routes.add('/' + prefix + route)
+
+    walk(get_resolver(urlconf).url_patterns, '')
+    return sorted(routes)
+
+
+class QueryCounter:
+    """
+    Count database queries on every connection, in every thread 🔢
+
+    Django gives each thread its own connection (and opens a new one per
+    request unless CONN_MAX_AGE is set), so we hook into connection creation
+    and install an execute wrapper on each one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.total = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        with self._lock:
+            self.total += 1
+        return execute(sql, params, many, context)
+
+    def _install(self, sender, connection, **kwargs):
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+    def __enter__(self):
+        from django.db import connections
+
+        connection_created.connect(self._install, weak=False)
+        for connection in connections.all(initialized_only=True):
+            self._install(None, connection)
+        return self
+
+    def __exit__(self, *exc_info):
+        from django.db import connections
+
+        connection_created.disconnect(self._install)
+        for connection in connections.all(initialized_only=True):
+            if self in connection.execute_wrappers:
+                connection.execute_wrappers.remove(self)
+
+
+def wsgi_environ(path, cookie='', remote_addr='127.0.0.1'):
+    """Build a minimal WSGI environ for a GET request (``path`` may include ?query) 📨"""
+    path, _, query = path.partition('?')
+    return {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'SCRIPT_NAME': '',
+        'QUERY_STRING': query,
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'localhost',
+        'HTTP_COOKIE': cookie,
+        'REMOTE_ADDR': remote_addr,
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(b''),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+
+
+def run_wsgi(application, path, requests, concurrency, cookie=''):
+    """
+    Send ``requests`` GETs for ``path`` through a WSGI app 🌐
+
+    Returns:
+        tuple: (latencies in seconds, {status: count}, wall-clock seconds)
+    """
+    statuses = {}
+    lock = threading.Lock()
+
+    def one_request(_):
+        status_holder = []
+
+        def start_response(status, headers, exc_info=None):
+            status_holder.append(int(status.split()[0]))
+
+        start = time.perf_counter()
+        response = application(wsgi_environ(path, cookie), start_response)
+        try:
+            for _chunk in response:
+                pass  # Read the whole body, like a real client would
+        finally:
+            if hasattr(response, 'close'):
+                response.close()  # Fires request_finished
+        elapsed = time.perf_counter() - start
+
+        with lock:
+            statuses[status_holder[0]] = statuses.get(status_holder[0], 0) + 1
+        return elapsed
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(one_request, range(requests)))
+    return latencies, statuses, time.perf_counter() - wall_start
+
+
+def asgi_scope(path, cookie='', client='127.0.0.1'):
+    """Build a minimal ASGI HTTP scope for a GET request (``path`` may include ?query) 📨"""
+    path, _, query = path.partition('?')
+    headers = [(b'host', b'localhost')]
+    if cookie:
+        headers.append((b'cookie', cookie.encode()))
+    return {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'root_path': '',
+        'query_string': query.encode(),
+        'headers': headers,
+        'client': (client, 50000),
+        'server': ('localhost', 80),
+    }
+
+
+async def asgi_request(application, path, cookie=''):
+    """
+    Send one GET through an ASGI app and wait for the full response ⚡
+
+    Returns:
+        int: The HTTP status code
+    """
+    sent_body = False
+    finished = asyncio.Event()
+    status = []
+
+    async def receive():
+        nonlocal sent_body
+        if not sent_body:
+            sent_body = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await finished.wait()  # The client stays connected until the end
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+        elif message['type'] == 'http.response.body' and not message.get('more_body'):
+            finished.set()
+
+    await application(asgi_scope(path, cookie), receive, send)
+    finished.set()
+    return status[0] if status else 0
+
+
+def run_asgi(application, path, requests, concurrency, cookie=''):
+    """
+    Send ``requests`` GETs for ``path`` through an ASGI app, ``concurrency``
+    at a time, on one event loop ⚡
+
+    Returns:
+        tuple: (latencies in seconds, {status: count}, wall-clock seconds)
+    """
+    statuses = {}
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one_request():
+            async with semaphore:
+                start = time.perf_counter()
+                code = await asgi_request(application, path, cookie)
+                elapsed = time.perf_counter() - start
+                statuses[code] = statuses.get(code, 0) + 1
+                return elapsed
+
+        return await asyncio.gather(*(one_request() for _ in range(requests)))
+
+    wall_start = time.perf_counter()
+    latencies = asyncio.run(main())
+    return list(latencies), statuses, time.perf_counter() - wall_start
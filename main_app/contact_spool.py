@@ -0,0 +1,352 @@
+"""
+Contact form spool for main_app
+
+What is this file? 📮
+Storing every contact form submission the moment it arrives means one
+INSERT (and one turn on SQLite's database-wide write lock) per visitor.
+During a traffic spike - or a spam wave - that is exactly when the lock is
+busiest.
+
+Instead, submissions go through a small pipeline, like letters dropped in
+a mailbox that the postman empties every few seconds:
+1. The view validates the form (main_app/forms.py)
+2. submit() drops duplicates: the same message from the same email
+   address within DEDUPE_WINDOW seconds is only stored once (it only
+   counts once it is safely spooled, so a failed write can be retried)
+3. submit() appends the message as one JSON line to this process's SPOOL
+   FILE (and fsyncs it), then returns - no database access at all
+4. A background thread (flush()) picks up spool files and stores their
+   messages with bulk_create(), BATCH_SIZE rows per INSERT, queueing one
+   background job (main_app/jobs.py) per batch to email the managers
+
+Nothing is lost if a process dies before flushing: its spool file stays on
+disk, and the next flush() in ANY process (or `python manage.py
+flush_contact_spool`) stores it. Every message carries a submission_id, so
+a file that was half stored when the process died is simply stored again;
+rows that already exist are skipped (and the managers are not told twice).
+
+Spool file names (in settings.CONTACT_SPOOL['DIR']):
+    <pid>.active               Being appended to by process <pid>
+    <pid>-<time>.ready         Waiting to be stored
+    <...>.ready.flushing-<pid> Being stored by process <pid>
+"""
+
+# Import necessary components 📦
+import atexit  # Flush when the process exits
+import hashlib  # Content hashes for de-duplication
+import json  # One JSON object per spool line
+import logging  # For logging
+import os  # Files, fsync and fork handling
+import threading  # The background flush thread
+import time  # Unique spool file names
+import uuid  # Submission ids
+from datetime import datetime  # Decode spooled timestamps
+from pathlib import Path  # Spool paths
+
+from django.conf import settings  # settings.CONTACT_SPOOL
+from django.core.cache import cache  # Shared between all worker processes
+from django.db import transaction  # Messages and their notification job together
+from django.utils import timezone  # Submission time
+
+from simple_django_framework.write_queue import write_queue  # Serialized database writes
+
+# Get a logger for this app 📝
+logger = logging.getLogger('main_app')
+
+# Default options (settings.CONTACT_SPOOL overrides them) ⚙️
+DEFAULT_OPTIONS = {
+    'DIR': Path(settings.BASE_DIR) / 'cache' / 'contact-spool',
+    'FLUSH_INTERVAL': 2.0,  # Seconds between flushes (0 = store every message straight away)
+    'BATCH_SIZE': 500,  # Rows per INSERT
+    'DEDUPE_WINDOW': 600,  # Seconds a message counts as a duplicate of an earlier one
+    'FSYNC': True,  # Force every spooled message onto the disk
+}
+
+# Seconds a submission that is still being written blocks its duplicates ⏳
+# (it only counts for the whole DEDUPE_WINDOW once it is on the disk)
+CLAIM_TIMEOUT = 30
+
+# Fields copied from the form into the spool and the database 📋
+FIELDS = ('name', 'email', 'subject', 'message')
+
+
+def _pid_alive(pid):
+    """Is there still a process with this id? 🔍"""
+    try:
+        os.kill(pid, 0)  # Signal 0: only checks, sends nothing
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Exists, but belongs to someone else
+    return True
+
+
+def content_hash(email, message):
+    """
+    Fingerprint of "this message from this address" 🔑
+
+    Case and whitespace differences don't make a message new.
+    """
+    text = f"{email.strip().lower()}\n{' '.join(message.split()).lower()}"
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _insert(messages):
+    """Store a batch of messages and queue the email to the managers with it 📬"""
+    from . import jobs  # Imported here: they import the models
+    from .models import ContactMessage
+
+    with transaction.atomic():
+        # Rows stored before a crash are skipped: the managers were told about them then
+        stored = set(
+            ContactMessage.objects.filter(submission_id__in=[message.submission_id for message in messages])
+            .values_list('submission_id', flat=True)
+        )
+        messages = [message for message in messages if message.submission_id not in stored]
+        if not messages:
+            return
+        ContactMessage.objects.bulk_create(messages, ignore_conflicts=True)
+        jobs.enqueue(
+            jobs.notify_managers_of_contact_messages,
+            [message.submission_id.hex for message in messages],
+        )
+
+
+class ContactSpool:
+    """
+    Spool contact form submissions to disk and store them in batches 📮
+
+    Example:
+        contact_spool.submit(form.cleaned_data)  # Cheap: one appended line
+        contact_spool.flush()                    # Stores everything spooled
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()  # Protects the active file
+        self._flush_lock = threading.Lock()  # One flush at a time per process
+        self._fd = None  # Open active spool file (opened lazily)
+        self._thread = None  # Background flush thread (started lazily)
+        self._stop = threading.Event()  # Tells the thread to stop
+
+    @property
+    def options(self):
+        """DEFAULT_OPTIONS with settings.CONTACT_SPOOL on top ⚙️"""
+        return {**DEFAULT_OPTIONS, **getattr(settings, 'CONTACT_SPOOL', {})}
+
+    @property
+    def directory(self):
+        """Where the spool files live 📁"""
+        return Path(self.options['DIR'])
+
+    def submit(self, data):
+        """
+        Accept one validated submission 📨
+
+        Args:
+            data: Cleaned form data with name, email, subject and message
+
+        Returns:
+            bool: False if it was a duplicate (and was dropped), else True
+        """
+        options = self.options
+        key = f"contact-dedupe:{content_hash(data['email'], data['message'])}"
+        # add() only succeeds for the first process to claim the key 🔒
+        if not cache.add(key, 'writing', timeout=CLAIM_TIMEOUT):
+            logger.info(f"Dropped duplicate contact message from {data['email']}")
+            return False
+
+        record = {field: data[field] for field in FIELDS}
+        record['submission_id'] = uuid.uuid4().hex
+        record['created_at'] = timezone.now().isoformat()
+        try:
+            self._append(record, options['FSYNC'])
+        except BaseException:
+            cache.delete(key)  # Not spooled: sending it again must not count as a duplicate
+            raise
+        # Safely on the disk: from now on it IS a duplicate for the whole window
+        cache.set(key, 'spooled', timeout=options['DEDUPE_WINDOW'])
+
+        if options['FLUSH_INTERVAL'] <= 0:
+            self.flush()  # Write-through mode
+        else:
+            self._ensure_thread()
+        return True
+
+    def _append(self, record, fsync):
+        """Append one JSON line to this process's active spool file 💾"""
+        line = (json.dumps(record, separators=(',', ':')) + '\n').encode()
+        with self._lock:
+            if self._fd is None:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                path = self.directory / f'{os.getpid()}.active'
+                self._fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+            os.write(self._fd, line)  # One write per line: lines never interleave
+            if fsync:
+                os.fsync(self._fd)  # On the disk before we say "thank you"
+
+    def _rotate(self):
+        """Close the active file and mark it ready to be stored 🔄"""
+        with self._lock:
+            if self._fd is None:
+                return
+            os.close(self._fd)
+            self._fd = None
+            pid = os.getpid()
+            active = self.directory / f'{pid}.active'
+            if active.exists():
+                active.rename(self.directory / f'{pid}-{time.time_ns()}.ready')
+
+    def _recover_orphans(self):
+        """Mark files left behind by processes that died as ready 🚑"""
+        me = os.getpid()
+        for path in self.directory.glob('*.active'):
+            pid = int(path.stem)
+            if pid != me and not _pid_alive(pid):
+                self._rename(path, self.directory / f'{pid}-{time.time_ns()}.ready')
+        for path in self.directory.glob('*.ready.flushing-*'):
+            pid = int(path.suffix.rsplit('-', 1)[1])
+            if pid != me and not _pid_alive(pid):
+                self._rename(path, path.with_suffix(''))  # Back to .ready
+
+    @staticmethod
+    def _rename(source, target):
+        """Rename, or return False if another process got there first 🏃"""
+        try:
+            source.rename(target)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def flush(self):
+        """
+        Store every spooled message in the database 📬
+
+        Claims each ready file (a rename, so two processes never store the
+        same file at once), stores its messages in BATCH_SIZE chunks and
+        deletes it. A file that fails is put back for the next flush.
+
+        Returns:
+            int: Number of spooled messages handled
+        """
+        if not self.directory.exists():
+            return 0
+        with self._flush_lock:
+            self._rotate()
+            self._recover_orphans()
+            total = 0
+            for path in sorted(self.directory.glob('*.ready')):
+                claimed = path.with_name(f'{path.name}.flushing-{os.getpid()}')
+                if not self._rename(path, claimed):
+                    continue  # Another process is storing it
+                try:
+                    total += self._store(claimed)
+                except Exception:
+                    logger.exception(f"Failed to store spooled contact messages from {path.name}")
+                    self._rename(claimed, path)  # Try again next time 🔁
+                    break
+                claimed.unlink()
+        if total:
+            logger.info(f"Stored {total} spooled contact messages")
+        return total
+
+    def _store(self, path):
+        """bulk_create the messages in one spool file 💾"""
+        from .models import ContactMessage  # Imported here: models import lots
+
+        messages = []
+        with open(path, encoding='utf-8') as spool:
+            for number, line in enumerate(spool, 1):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A line cut short by a crash mid-write was never confirmed
+                    logger.warning(f"Skipping damaged line {number} in {path.name}")
+                    continue
+                messages.append(ContactMessage(
+                    **{field: record[field] for field in FIELDS},
+                    submission_id=uuid.UUID(record['submission_id']),
+                    created_at=datetime.fromisoformat(record['created_at']),
+                ))
+
+        batch_size = self.options['BATCH_SIZE']
+        for start in range(0, len(messages), batch_size):
+            write_queue.run(_insert, messages[start:start + batch_size], batch=False)
+        return len(messages)
+
+    def pending(self):
+        """Number of spooled messages not stored yet (all processes) 📋"""
+        if not self.directory.exists():
+            return 0
+        count = 0
+        for path in self.directory.iterdir():
+            try:
+                with open(path, 'rb') as spool:
+                    count += sum(1 for _ in spool)
+            except FileNotFoundError:
+                continue  # Stored meanwhile
+        return count
+
+    def _ensure_thread(self):
+        """Start the background flush thread if it is not running yet 🧵"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='contact-spool-flush', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        """Background loop: flush every FLUSH_INTERVAL seconds 🔁"""
+        from django.db import connection  # Imported here: each thread has its own
+
+        while not self._stop.wait(max(self.options['FLUSH_INTERVAL'], 0.1)):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Contact spool flush failed")
+            connection.close()  # Don't hold a connection open between flushes
+
+    def stop(self):
+        """Stop the background thread and store what is left 🛑"""
+        if self._fd is None and self._thread is None:
+            return  # Never spooled anything (e.g. a management command)
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self._thread = None
+        self.flush()
+
+    def _reset_after_fork(self):
+        """
+        Start afresh in a forked worker 🍴
+
+        The parent keeps appending to its own file; the child gets its own
+        (named after its pid) on its first submission.
+        """
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._fd = None
+        self._thread = None
+        self._stop = threading.Event()
+
+
+# The spool used by contact_form_view 📮
+contact_spool = ContactSpool()
+
+
+def _flush_on_exit():
+    """Store spooled messages when the process shuts down 🚪"""
+    try:
+        contact_spool.stop()
+    except Exception:
+        # The spool file is still on disk: the next flush stores it
+        logger.exception("Could not store spooled contact messages on shutdown")
+
+
+atexit.register(_flush_on_exit)
+
+# Pre-fork servers (gunicorn --preload) copy memory into workers - reset it there
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=contact_spool._reset_after_fork)
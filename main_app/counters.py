@@ -0,0 +1,239 @@
+"""
+Buffered counters for main_app
+
+What is this file? 🧮
+Counting page views the naive way means one database write per page hit.
+On SQLite every write takes the database-wide write lock, so busy pages end up
+queueing behind each other just to add 1 to a number!
+
+This module keeps increments in memory (per process) and writes them back
+in batches, like a cashier who counts coins into a jar and only walks to the
+bank every few minutes:
+1. add() just bumps a number in a dictionary (no database access)
+2. A background thread calls flush() every few seconds
+3. flush() turns all pending increments into a handful of atomic
+   UPDATE ... SET view_count = view_count + n statements
+4. Whatever is still pending is flushed when the process exits
+
+Because the UPDATE uses F() expressions, the database does the addition
+itself, so concurrent workers never overwrite each other's counts.
+"""
+
+# Import necessary components 📦
+import atexit  # Run code when the process exits
+import logging  # For logging
+import os  # For fork handling
+import threading  # For the background flush thread
+from collections import defaultdict  # Handy dictionary with default values
+
+from asgiref.sync import sync_to_async  # Database writes from async code
+from django.apps import apps  # Look up models lazily (avoids circular imports)
+from django.conf import settings  # Project settings
+from django.db.models import F  # Database-side field references
+
+from simple_django_framework.write_queue import write_queue  # Serialized database writes
+
+# Get a logger for this app 📝
+logger = logging.getLogger('main_app')
+
+# Default number of seconds between background flushes ⏱️
+DEFAULT_FLUSH_INTERVAL = 5.0
+
+# Maximum number of primary keys per UPDATE statement 📏
+# SQLite limits how many parameters one query may have, so big flushes are split
+FLUSH_CHUNK_SIZE = 500
+
+
+class CounterBuffer:
+    """
+    Write-behind buffer for one integer model field 🧮
+
+    Example:
+        view_counter = CounterBuffer('main_app.BlogPost', 'view_count')
+        view_counter.add(post.pk)  # Cheap, in-memory
+        view_counter.flush()       # Writes everything pending to the database
+
+    Settings:
+        The flush interval is read from the setting named by ``interval_setting``
+        (seconds). An interval of 0 disables buffering: every add() is written
+        straight away as a single atomic UPDATE.
+    """
+
+    def __init__(self, model_label, field_name, interval_setting):
+        self.model_label = model_label  # e.g. 'main_app.BlogPost'
+        self.field_name = field_name  # e.g. 'view_count'
+        self.interval_setting = interval_setting  # Name of the setting to read
+        self._lock = threading.Lock()  # Protects _pending
+        self._pending = defaultdict(int)  # {pk: increments not yet written}
+        self._thread = None  # Background flush thread (started lazily)
+        self._stop = threading.Event()  # Tells the thread to stop
+
+    @property
+    def model(self):
+        """The model class whose field we are counting 🗄️"""
+        return apps.get_model(self.model_label)
+
+    @property
+    def flush_interval(self):
+        """Seconds between background flushes (0 means write-through) ⏱️"""
+        return float(getattr(settings, self.interval_setting, DEFAULT_FLUSH_INTERVAL))
+
+    def add(self, pk, amount=1):
+        """
+        Record ``amount`` increments for the row with primary key ``pk`` ➕
+
+        Args:
+            pk: Primary key of the row to increment
+            amount: How much to add (default 1)
+        """
+        if self.flush_interval <= 0:
+            # Buffering disabled - write through immediately (still atomic!)
+            self._write({pk: amount})
+            return
+
+        with self._lock:
+            self._pending[pk] += amount
+        self._ensure_thread()
+
+    async def aadd(self, pk, amount=1):
+        """
+        add() for async code ⚡
+
+        Buffering is pure memory work, so only write-through mode needs to
+        hop to a thread for its database UPDATE.
+        """
+        if self.flush_interval <= 0:
+            await sync_to_async(self.add)(pk, amount)
+        else:
+            self.add(pk, amount)
+
+    def pending(self, pk=None):
+        """
+        Get increments that have not been written yet 📋
+
+        Args:
+            pk: Optional primary key; if given, return just that row's count
+
+        Returns:
+            int or dict: Pending increments
+        """
+        with self._lock:
+            if pk is not None:
+                return self._pending.get(pk, 0)
+            return dict(self._pending)
+
+    def flush(self):
+        """
+        Write all pending increments to the database 💾
+
+        Rows that received the same number of increments are grouped, so a
+        flush costs one UPDATE per distinct increment size (per chunk), not
+        one per row.
+
+        Returns:
+            int: Total number of increments written
+        """
+        with self._lock:
+            batch, self._pending = self._pending, defaultdict(int)
+
+        if not batch:
+            return 0
+
+        try:
+            self._write(batch)
+        except Exception:
+            # Put the counts back so the next flush can retry them 🔁
+            logger.exception(f"Failed to flush {self.model_label}.{self.field_name} counters")
+            with self._lock:
+                for pk, amount in batch.items():
+                    self._pending[pk] += amount
+            return 0
+
+        total = sum(batch.values())
+        logger.debug(
+            f"Flushed {total} {self.field_name} increments for {len(batch)} "
+            f"{self.model_label} rows"
+        )
+        return total
+
+    def _write(self, batch):
+        """Write {pk: amount} through the write queue (one transaction) ✍️"""
+        write_queue.run(self._update, batch)
+
+    def _update(self, batch):
+        """Turn {pk: amount} into grouped F() updates 🔢"""
+        # Group primary keys by how much they need to be incremented
+        by_amount = defaultdict(list)
+        for pk, amount in batch.items():
+            by_amount[amount].append(pk)
+
+        manager = self.model._default_manager
+        for amount, pks in by_amount.items():
+            for start in range(0, len(pks), FLUSH_CHUNK_SIZE):
+                chunk = pks[start:start + FLUSH_CHUNK_SIZE]
+                manager.filter(pk__in=chunk).update(
+                    **{self.field_name: F(self.field_name) + amount}
+                )
+
+    def _ensure_thread(self):
+        """Start the background flush thread if it is not running yet 🧵"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run,
+                name=f'counter-flush-{self.field_name}',
+                daemon=True,  # Never keep the process alive on its own
+            )
+            self._thread.start()
+
+    def _run(self):
+        """Background loop: flush every ``flush_interval`` seconds 🔁"""
+        from django.db import connection  # Imported here: each thread has its own
+
+        while not self._stop.wait(max(self.flush_interval, 0.1)):
+            self.flush()
+            connection.close()  # Don't hold a connection open between flushes
+
+    def stop(self):
+        """Stop the background thread and flush what is left 🛑"""
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self._thread = None
+        self.flush()
+
+    def _reset_after_fork(self):
+        """
+        Forget the parent's state in a freshly forked worker 🍴
+
+        Pending counts belong to the parent process (it will flush them), and
+        the parent's thread does not exist in the child.
+        """
+        self._lock = threading.Lock()
+        self._pending = defaultdict(int)
+        self._thread = None
+        self._stop = threading.Event()
+
+
+# The view counter used by BlogPost.increment_view_count() 👁️
+view_counter = CounterBuffer('main_app.BlogPost', 'view_count', 'VIEW_COUNT_FLUSH_INTERVAL')
+
+
+def _flush_on_exit():
+    """Flush pending view counts when the process shuts down 🚪"""
+    try:
+        view_counter.stop()
+    except Exception:
+        # Never crash interpreter shutdown because of a counter
+        logger.exception("Could not flush view counts on shutdown")
+
+
+atexit.register(_flush_on_exit)
+
+# Pre-fork servers (gunicorn --preload) copy memory into workers - reset it there
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=view_counter._reset_after_fork)
@@ -0,0 +1,40 @@
+"""
+Forms for main_app
+
+What are forms? 📋
+Forms CHECK what visitors type before we trust it. They:
+1. Define which fields a form has and what is allowed in each
+2. Turn the raw POST data into clean Python values (form.cleaned_data)
+3. Collect friendly error messages for anything that is wrong
+
+Think of a form as the RECEPTIONIST who checks your paperwork is complete
+before it goes into the filing cabinet!
+"""
+
+# Import necessary Django components 📦
+from django import forms  # Form classes and fields
+
+from .models import ContactMessage
+
+
+class ContactForm(forms.Form):
+    """
+    The public contact form 📬
+
+    Field limits match ContactMessage, so anything that validates here can
+    be stored later without surprises.
+    """
+
+    name = forms.CharField(max_length=100)
+    email = forms.EmailField()
+    subject = forms.CharField(max_length=200, required=False)  # Optional on the page
+    message = forms.CharField(widget=forms.Textarea, max_length=5000)
+
+    def clean_subject(self):
+        """Use the start of the message when no subject was given ✂️"""
+        subject = self.cleaned_data.get('subject', '').strip()
+        if subject:
+            return subject
+        message = ' '.join(self.data.get('message', '').split())
+        max_length = ContactMessage._meta.get_field('subject').max_length
+        return message[:max_length] or 'Contact form message'
@@ -0,0 +1,197 @@
+"""
+Conditional GET support for main_app
+
+What is this file? 🏷️
+When a browser (or a search engine crawler) has already downloaded a page,
+it can ask "has this changed since last time?" by sending back the page's
+ETag (If-None-Match) or date (If-Modified-Since). If nothing changed we
+answer "304 Not Modified" with an EMPTY body, and the client reuses its
+copy.
+
+The trick is to answer that question CHEAPLY: each page gets a small
+"validators" function that runs one tiny query (usually MAX(updated_at)
+straight from an index) instead of loading posts and rendering templates.
+Only when the page really changed does the full view run.
+"""
+
+# Import necessary components 📦
+import hashlib  # Turn validator values into a short ETag
+from asgiref.sync import iscoroutinefunction  # Async views get an async wrapper
+from functools import wraps  # Keep the view's name and docstring
+
+from django.db.models import Count, Max, Q  # Cheap aggregate queries
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag  # Header formatting
+
+from .models import BlogPost, Category
+
+
+def make_etag(*parts):
+    """
+    Build a weak ETag from any values that describe a page version 🏷️
+
+    Weak (W/"...") because middleware such as GZip may re-encode the body
+    without changing what the page means.
+
+    Returns:
+        str: A quoted weak ETag
+    """
+    digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return 'W/' + quote_etag(digest)
+
+
+def _validator_headers(request, state, user, per_user):
+    """Turn a validators result into (etag, last_modified seconds or None) 🧮"""
+    parts, last_modified = state
+    anonymous = True
+    if per_user:
+        anonymous = not user.is_authenticated
+        parts = (*parts, user.pk)
+    etag = make_etag(request.get_full_path(), *parts)
+    # HTTP dates have whole seconds, so compare in whole seconds too
+    last_modified = int(last_modified.timestamp()) if last_modified and anonymous else None
+    return etag, last_modified, anonymous
+
+
+def _add_validator_headers(response, etag, last_modified, anonymous, per_user):
+    """Put ETag / Last-Modified / Cache-Control on a 200 or 304 response 📎"""
+    if response.status_code in (200, 304):
+        response.headers.setdefault('ETag', etag)
+        if last_modified is not None:
+            response.headers.setdefault('Last-Modified', http_date(last_modified))
+        # Always check back with us, but reuse the copy if we say 304
+        patch_cache_control(response, no_cache=True, private=not anonymous)
+        if per_user:
+            patch_vary_headers(response, ['Cookie'])
+    return response
+
+
+def conditional_page(validators, per_user=True):
+    """
+    Decorator: answer conditional GETs with 304 before the view runs ⚡
+
+    ``validators(request, *args, **kwargs)`` returns ``(parts, last_modified)``
+    where ``parts`` is a tuple of values that change whenever the page does,
+    or ``None`` to just run the view (e.g. so it can return a 404).
+
+    Works for async views too: then ``validators`` must be async as well
+    (see the a* validators below).
+
+    The computed ETag is also stored on ``request.page_etag``: it changes
+    whenever the page does, so it makes a cache key that never goes stale.
+
+    Args:
+        validators: Function computing the page's version cheaply
+        per_user: The page shows who is logged in, so the ETag includes the
+                  user and Last-Modified is only sent to anonymous visitors
+
+    Example:
+        @conditional_page(blog_list_validators)
+        def blog_list(request): ...
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_inner(request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return await view(request, *args, **kwargs)
+
+                state = await validators(request, *args, **kwargs)
+                if state is None:
+                    return await view(request, *args, **kwargs)
+
+                user = await request.auser() if per_user else None
+                etag, last_modified, anonymous = _validator_headers(request, state, user, per_user)
+                request.page_etag = etag  # The view may use it as a cache key
+                response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                return _add_validator_headers(response, etag, last_modified, anonymous, per_user)
+            return async_inner
+
+        @wraps(view)
+        def inner(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+
+            state = validators(request, *args, **kwargs)
+            if state is None:
+                return view(request, *args, **kwargs)
+
+            user = request.user if per_user else None
+            etag, last_modified, anonymous = _validator_headers(request, state, user, per_user)
+            request.page_etag = etag  # The view may use it as a cache key
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            return _add_validator_headers(response, etag, last_modified, anonymous, per_user)
+        return inner
+    return decorator
+
+
+def blog_list_validators(request):
+    """
+    Version of the published post listing (blog index and /api/posts/) 📚
+
+    One aggregate answered from the (status, updated_at) index alone: the
+    newest change plus the number of posts. The count makes the ETag catch
+    deletions and unpublishing, which don't leave a newer updated_at
+    behind - a date can't, so lists send no Last-Modified.
+    """
+    stats = BlogPost.objects.filter(status='published').aggregate(
+        last_modified=Max('updated_at'), total=Count('id')
+    )
+    return (stats['last_modified'], stats['total']), None
+
+
+def post_detail_validators(request, slug):
+    """Version of one published post: its id and updated_at (one row by slug) 📄"""
+    post = (
+        BlogPost.objects.filter(slug=slug, status='published')
+        .values_list('pk', 'updated_at')
+        .first()
+    )
+    if post is None:
+        return None  # Let the view produce the 404
+    return post, post[1]
+
+
+def category_detail_validators(request, slug):
+    """
+    Version of one category page: its stored fields plus the newest change
+    among its published posts 🏷️
+
+    No Last-Modified, like blog_list_validators: a post leaving the
+    category only changes published_post_count, not the newest date.
+    """
+    category = (
+        Category.objects.filter(slug=slug)
+        .annotate(last_post=Max('posts__updated_at', filter=Q(posts__status='published')))
+        .values_list('pk', 'name', 'description', 'published_post_count', 'last_post')
+        .first()
+    )
+    if category is None:
+        return None
+    return category, None
+
+
+# Async versions for main_app/async_views.py ⚡
+
+async def ablog_list_validators(request):
+    """Async blog_list_validators() 📚"""
+    stats = await BlogPost.objects.filter(status='published').aaggregate(
+        last_modified=Max('updated_at'), total=Count('id')
+    )
+    return (stats['last_modified'], stats['total']), None
+
+
+async def apost_detail_validators(request, slug):
+    """Async post_detail_validators() 📄"""
+    post = await (
+        BlogPost.objects.filter(slug=slug, status='published')
+        .values_list('pk', 'updated_at')
+        .afirst()
+    )
+    if post is None:
+        return None
+    return post, post[1]
@@ -0,0 +1,437 @@
+"""
+Background jobs for main_app
+
+What is this file? 🧰
+Some work is SLOW and the visitor doesn't need to wait for it: sending an
+email (talking to a mail server can take seconds), notifying a post's
+author about a comment, resizing an image. Doing it inside the request
+keeps a worker busy and the visitor staring at a spinner.
+
+Instead, the request QUEUES a job - one row in the Job table - and returns
+at once. Worker processes (python manage.py runworker) run the jobs:
+
+1. claim() takes a few due jobs in ONE short transaction: it marks them
+   'running', stamps them with the worker's id and a VISIBILITY TIMEOUT
+   (locked_until). Two workers never get the same job.
+2. The worker runs each job's function in its thread pool
+3. Success marks the job 'done'. An exception puts it back in the queue
+   with a later run_at - each retry waits twice as long as the previous
+   one ("exponential backoff") - until max_attempts is reached, then the
+   job is marked 'failed' with its traceback in last_error.
+4. A worker that dies mid-job leaves it 'running'. Once locked_until has
+   passed, any worker claims it again (that counts as an attempt too).
+
+So a job runs AT LEAST once - maybe twice if a worker is killed at the
+wrong moment. Job functions should be safe to repeat.
+
+Usage:
+    from main_app import jobs
+
+    @jobs.job()
+    def send_welcome_email(user_id):
+        ...
+
+    jobs.enqueue('send_welcome_email', user.pk)         # Returns at once
+    jobs.enqueue(send_welcome_email, user.pk, delay=60)  # In a minute
+
+Arguments must be JSON-serializable: pass ids, not model instances.
+See queue_stats() for queue depth and latency.
+"""
+
+# Import necessary components 📦
+import logging  # For logging
+import os  # Worker ids
+import random  # Jitter for the retry delays
+import socket  # Worker ids
+import threading  # Stop flag for the worker
+import time  # When to log stats next
+import traceback  # Saved in last_error
+import uuid  # Worker ids
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED  # The worker's pool
+from datetime import timedelta  # Delays and timeouts
+
+from django.conf import settings  # settings.JOBS, MANAGERS
+from django.core.mail import mail_managers, send_mail  # What most jobs do
+from django.db import DatabaseError, close_old_connections, transaction  # Short claim transactions
+from django.db.models import F, Min, Q  # Set-based updates
+from django.utils import timezone  # Current time
+
+from simple_django_framework.write_queue import write_queue  # Serialized database writes
+
+from .benchmarks import percentile  # Latency percentiles
+from .models import Comment, ContactMessage, Job, UserProfile
+
+# Get a logger for this app 📝
+logger = logging.getLogger('main_app')
+
+# Default options (settings.JOBS overrides them) ⚙️
+DEFAULT_OPTIONS = {
+    'THREADS': 4,  # Jobs one worker process runs at the same time
+    'POLL_INTERVAL': 1.0,  # Seconds an idle worker waits before looking again
+    'VISIBILITY_TIMEOUT': 300,  # Seconds before a running job may be taken over
+    'MAX_ATTEMPTS': 5,  # Attempts before a job is marked failed
+    'BACKOFF': 10,  # Seconds before the first retry (doubled for each one)
+    'BACKOFF_MAX': 3600,  # Longest wait between retries
+    'STATS_INTERVAL': 60,  # Seconds between queue stats in the worker's log
+}
+
+# Longest traceback kept in last_error ✂️
+MAX_ERROR_LENGTH = 5000
+
+# Registered job functions: {name: function} 📋
+JOBS = {}
+
+
+def options():
+    """DEFAULT_OPTIONS with settings.JOBS on top ⚙️"""
+    return {**DEFAULT_OPTIONS, **getattr(settings, 'JOBS', {})}
+
+
+def job(name=None):
+    """
+    Register a function as a job, so workers can find it by name 🏷️
+
+    Args:
+        name: Name stored in the Job table (default: the function's name)
+    """
+    def decorator(func):
+        func.job_name = name or func.__name__
+        JOBS[func.job_name] = func
+        return func
+    return decorator
+
+
+def enqueue(name, *args, delay=0, max_attempts=None, **kwargs):
+    """
+    Queue ``name(*args, **kwargs)`` to run in a worker 📥
+
+    Inside a transaction the job is only queued if the transaction commits
+    (it's one more row in it).
+
+    Args:
+        name: Registered job name, or the job function itself
+        delay: Seconds to wait before running it
+        max_attempts: Attempts before giving up (default MAX_ATTEMPTS)
+
+    Returns:
+        Job: The queued job
+
+    Raises:
+        KeyError: If no job is registered under that name
+    """
+    name = getattr(name, 'job_name', name)
+    if name not in JOBS:
+        raise KeyError(f"Unknown job {name!r}")
+    now = timezone.now()
+    queued = Job(
+        name=name,
+        payload={'args': list(args), 'kwargs': kwargs},
+        max_attempts=max_attempts or options()['MAX_ATTEMPTS'],
+        run_at=now + timedelta(seconds=delay),
+        created_at=now,
+    )
+    write_queue.run(queued.save)
+    return queued
+
+
+def new_worker_id():
+    """A name for this worker that no other worker has: host:pid:random 🪪"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+def claim(worker_id, limit=1, now=None):
+    """
+    Take up to ``limit`` due jobs for ``worker_id`` 🎣
+
+    Due jobs are queued jobs whose run_at has passed, and running jobs
+    whose visibility timeout has passed (their worker is gone). On SQLite
+    the transaction takes the database write lock as it begins, so the
+    SELECT and the UPDATE can't interleave with another worker's claim; on
+    other databases select_for_update(skip_locked=True) does that job.
+
+    Returns:
+        list: The claimed Job objects (attempts already counted)
+    """
+    return write_queue.run(_claim, worker_id, limit, now, batch=False)
+
+
+def _claim(worker_id, limit, now):
+    now = now or timezone.now()
+    due = Q(status='queued', run_at__lte=now) | Q(status='running', locked_until__lt=now)
+    with transaction.atomic():
+        ids = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(due).order_by('run_at', 'pk').values_list('pk', flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        Job.objects.filter(pk__in=ids).update(
+            status='running',
+            locked_by=worker_id,
+            locked_until=now + timedelta(seconds=options()['VISIBILITY_TIMEOUT']),
+            attempts=F('attempts') + 1,
+            started_at=now,
+        )
+        return list(Job.objects.filter(pk__in=ids).order_by('run_at', 'pk'))
+
+
+def retry_delay(attempts):
+    """
+    Seconds to wait before the next attempt ⏳
+
+    Doubles with every attempt (10s, 20s, 40s...) up to BACKOFF_MAX, then
+    takes a random 50-100% of that, so jobs that failed together (say, the
+    mail server was down) don't all come back at the same moment.
+    """
+    opts = options()
+    delay = min(opts['BACKOFF'] * 2 ** max(attempts - 1, 0), opts['BACKOFF_MAX'])
+    return delay * random.uniform(0.5, 1.0)
+
+
+def execute(claimed, worker_id):
+    """
+    Run one claimed job and record how it went ▶️
+
+    Returns:
+        str: The job's new status ('done', 'queued' for a retry, 'failed')
+    """
+    func = JOBS.get(claimed.name)
+    if claimed.attempts > claimed.max_attempts:
+        # Claimed again after a worker died during its last attempt
+        return _finish(claimed, worker_id, 'failed', "Visibility timeout passed on the last attempt")
+    if func is None:
+        return _finish(claimed, worker_id, 'failed', f"No job registered as {claimed.name!r}")
+
+    try:
+        func(*claimed.payload.get('args', []), **claimed.payload.get('kwargs', {}))
+    except Exception:
+        error = traceback.format_exc()
+        if claimed.attempts >= claimed.max_attempts:
+            logger.error(f"Job {claimed} failed for good after {claimed.attempts} attempts")
+            return _finish(claimed, worker_id, 'failed', error)
+        delay = retry_delay(claimed.attempts)
+        logger.warning(f"Job {claimed} failed (attempt {claimed.attempts}), retrying in {delay:.0f}s")
+        return _finish(claimed, worker_id, 'queued', error, run_at=timezone.now() + timedelta(seconds=delay))
+    return _finish(claimed, worker_id, 'done')
+
+
+def _finish(claimed, worker_id, status, error='', run_at=None):
+    """Store the outcome - unless another worker has taken the job over 🏁"""
+    changes = {'status': status, 'locked_by': '', 'locked_until': None}
+    if error:
+        changes['last_error'] = error[-MAX_ERROR_LENGTH:]
+    if status == 'queued':
+        changes['run_at'] = run_at
+    else:
+        changes['finished_at'] = timezone.now()
+
+    # Only while we still hold it: after the visibility timeout it's not ours 🔒
+    updated = write_queue.run(
+        Job.objects.filter(pk=claimed.pk, status='running', locked_by=worker_id).update, **changes
+    )
+    if not updated:
+        logger.warning(f"Job {claimed} outlived its visibility timeout; another worker took it over")
+    return status
+
+
+def work_off(worker_id=None, limit=None):
+    """
+    Run due jobs one by one in THIS thread until none are left 🏃
+
+    For tests and one-off scripts; real deployments run runworker.
+
+    Returns:
+        dict: Number of jobs per outcome ('done', 'queued', 'failed')
+    """
+    worker_id = worker_id or new_worker_id()
+    outcomes = {'done': 0, 'queued': 0, 'failed': 0}
+    while limit is None or sum(outcomes.values()) < limit:
+        claimed = claim(worker_id)
+        if not claimed:
+            break
+        outcomes[execute(claimed[0], worker_id)] += 1
+    return outcomes
+
+
+class Worker:
+    """
+    Claim due jobs and run them in a thread pool 🧵
+
+    The main thread only claims: it asks for as many jobs as there are idle
+    threads, so jobs never wait in memory while their visibility timeout
+    runs down.
+
+    Args:
+        threads: Jobs run at the same time
+        poll_interval: Seconds to wait when there is nothing to do
+        stats_interval: Seconds between queue stats log lines (0 = never)
+    """
+
+    def __init__(self, threads=None, poll_interval=None, stats_interval=None):
+        opts = options()
+        self.threads = threads or opts['THREADS']
+        self.poll_interval = opts['POLL_INTERVAL'] if poll_interval is None else poll_interval
+        self.stats_interval = opts['STATS_INTERVAL'] if stats_interval is None else stats_interval
+        self.worker_id = new_worker_id()
+        self.outcomes = {'done': 0, 'queued': 0, 'failed': 0}
+        self._stop = threading.Event()
+        self._lock = threading.Lock()  # Protects outcomes
+
+    def stop(self):
+        """Finish the running jobs, claim no more 🛑"""
+        self._stop.set()
+
+    def run(self, burst=False):
+        """
+        Work until stop() is called (or, with ``burst``, until no job is due) 🔁
+
+        Returns:
+            dict: Number of jobs per outcome
+        """
+        logger.info(f"Worker {self.worker_id} started with {self.threads} threads")
+        running = set()
+        next_stats = 0.0  # time.monotonic() of the next stats line
+        with ThreadPoolExecutor(self.threads, thread_name_prefix='job') as pool:
+            while not self._stop.is_set():
+                if self.stats_interval and time.monotonic() >= next_stats:
+                    log_queue_stats()
+                    next_stats = time.monotonic() + self.stats_interval
+
+                free = self.threads - len(running)
+                try:
+                    claimed = claim(self.worker_id, free) if free else []
+                except DatabaseError:
+                    # e.g. "database is locked" for longer than busy_timeout: try again later
+                    logger.exception(f"Worker {self.worker_id} could not claim jobs")
+                    claimed = []
+                running.update(pool.submit(self._execute, job) for job in claimed)
+
+                if running:
+                    # Until a thread is free (or it's time to look for overdue jobs)
+                    running = wait(running, timeout=self.poll_interval, return_when=FIRST_COMPLETED).not_done
+                elif burst:
+                    break
+                else:
+                    self._stop.wait(self.poll_interval)
+            wait(running)
+        logger.info(f"Worker {self.worker_id} stopped: {self.outcomes}")
+        return self.outcomes
+
+    def _execute(self, claimed):
+        """Run one job in a pool thread 🔧"""
+        try:
+            status = execute(claimed, self.worker_id)
+            with self._lock:
+                self.outcomes[status] += 1
+        except Exception:
+            logger.exception(f"Worker {self.worker_id} could not record the outcome of {claimed}")
+        finally:
+            close_old_connections()  # Each pool thread has its own connection
+
+
+def queue_stats(window=3600, now=None):
+    """
+    How the queue is doing 📊
+
+    Args:
+        window: Latency covers jobs finished in the last ``window`` seconds
+
+    Returns:
+        dict:
+            depth: Jobs due now and not claimed yet
+            scheduled: Queued jobs waiting for their run_at (mostly retries)
+            running, failed: Jobs in those states
+            oldest_wait: Seconds the longest-waiting due job has waited
+            finished: Jobs done within the window
+            wait_p50/p95: Seconds from due (run_at) to started
+            run_p50/p95: Seconds from started to done
+            total_p50/p95: Seconds from queued to done
+    """
+    now = now or timezone.now()
+    jobs = Job.objects.order_by()
+    due = jobs.filter(status='queued', run_at__lte=now)
+    oldest = due.aggregate(oldest=Min('run_at'))['oldest']
+    stats = {
+        'depth': due.count(),
+        'scheduled': jobs.filter(status='queued', run_at__gt=now).count(),
+        'running': jobs.filter(status='running').count(),
+        'failed': jobs.filter(status='failed').count(),
+        'oldest_wait': (now - oldest).total_seconds() if oldest else 0.0,
+    }
+
+    finished = list(
+        jobs.filter(status='done', finished_at__gte=now - timedelta(seconds=window))
+        .values_list('created_at', 'run_at', 'started_at', 'finished_at')
+    )
+    stats['finished'] = len(finished)
+    for key, first, last in (('wait', 1, 2), ('run', 2, 3), ('total', 0, 3)):
+        samples = sorted((row[last] - row[first]).total_seconds() for row in finished)
+        stats[f'{key}_p50'] = percentile(samples, 50)
+        stats[f'{key}_p95'] = percentile(samples, 95)
+    return stats
+
+
+def log_queue_stats():
+    """Write queue_stats() to the log 📝"""
+    stats = queue_stats()
+    logger.info(
+        f"Job queue: {stats['depth']} due, {stats['scheduled']} scheduled, {stats['running']} running, "
+        f"{stats['failed']} failed; oldest waiting {stats['oldest_wait']:.1f}s; last hour "
+        f"{stats['finished']} done, wait p95 {stats['wait_p95']:.2f}s, run p95 {stats['run_p95']:.2f}s"
+    )
+    return stats
+
+
+# The jobs main_app queues 📬
+
+@job()
+def notify_managers_of_contact_messages(submission_ids):
+    """Tell settings.MANAGERS about new contact form messages 📬"""
+    messages = list(ContactMessage.objects.filter(submission_id__in=submission_ids).order_by('created_at'))
+    if not messages:
+        return
+    body = '\n\n'.join(
+        f"From: {message.name} <{message.email}>\nSubject: {message.subject}\n\n{message.message}"
+        for message in messages
+    )
+    mail_managers(f"{len(messages)} new contact message(s)", body)
+
+
+@job()
+def send_resolved_emails(message_ids):
+    """Let the senders of resolved contact messages know ✅"""
+    for message in ContactMessage.objects.filter(pk__in=message_ids, status='resolved'):
+        send_mail(
+            f"Re: {message.subject}",
+            f"Hi {message.name},\n\nThanks for getting in touch - your message has been handled.",
+            None,  # settings.DEFAULT_FROM_EMAIL
+            [message.email],
+        )
+
+
+@job()
+def notify_post_author(comment_id):
+    """Email a post's author about a new comment on it 💬"""
+    comment = (
+        Comment.objects.select_related('post__author', 'author')
+        .filter(pk=comment_id, is_approved=True).first()
+    )
+    if comment is None:
+        return  # Deleted or unapproved in the meantime
+    author = comment.post.author
+    if not author.email or author.pk == comment.author_id:
+        return
+    send_mail(
+        f"New comment on \"{comment.post.title}\"",
+        f"{comment.author.username} wrote:\n\n{comment.content}",
+        None,
+        [author.email],
+    )
+
+
+@job()
+def make_profile_thumbnails(profile_id):
+    """Make the thumbnails of a newly uploaded profile picture 🖼️"""
+    profile = UserProfile.objects.filter(pk=profile_id).first()
+    if profile is not None:
+        profile.ensure_thumbnails()
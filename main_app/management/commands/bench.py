@@ -0,0 +1,205 @@
+"""
+End-to-end HTTP benchmark 🏎️
+
+Usage:
+    python manage.py bench
+    python manage.py bench --requests 200 --concurrency 16 --output bench.json
+    python manage.py bench --interface asgi --auth anonymous --routes /about/ /api/
+    python manage.py bench --compare bench-before.json
+
+Every parameter-free route in the project URLconf (main_app.urls, admin,
+accounts, robots.txt, ...) is requested through the REAL WSGI and ASGI
+application objects, in-process, both as an anonymous visitor and as a
+logged-in staff user. For each route we report requests/sec, p50/p95/p99
+latency and database queries per request.
+
+Save results with --output and compare two runs (e.g. before and after a
+commit) with --compare.
+"""
+
+import json  # Results file
+import platform  # Python version for the results file
+import subprocess  # Current git commit
+from datetime import datetime, timezone as dt_timezone  # Timestamps
+
+import django  # Django version
+from django.conf import settings  # Project settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.models import User  # The bench user
+from django.core.management.base import BaseCommand, CommandError  # Base class for commands
+from django.utils.module_loading import import_string  # Load the session engine
+
+from main_app.benchmarks import QueryCounter, discover_routes, run_asgi, run_wsgi, summarize
+
+
+class Command(BaseCommand):
+    help = "Benchmark every route through the in-process WSGI and ASGI applications"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50,
+                            help='Requests per route, interface and user type (default 50)')
+        parser.add_argument('--concurrency', type=int, default=8,
+                            help='Requests in flight at the same time (default 8)')
+        parser.add_argument('--warmup', type=int, default=2,
+                            help='Untimed requests per route before measuring (default 2)')
+        parser.add_argument('--interface', choices=['wsgi', 'asgi', 'both'], default='both')
+        parser.add_argument('--auth', choices=['anonymous', 'user', 'both'], default='both',
+                            help='Run as an anonymous visitor, a logged-in user, or both')
+        parser.add_argument('--routes', nargs='*', default=[],
+                            help='Only benchmark routes containing one of these strings')
+        parser.add_argument('--username', default='bench',
+                            help='Staff user for logged-in runs (created if missing)')
+        parser.add_argument('--output', help='Save the results as JSON to this file')
+        parser.add_argument('--compare', help='Compare against a previously saved JSON file')
+
+    def handle(self, *args, **options):
+        routes = discover_routes()
+        if options['routes']:
+            routes = [r for r in routes if any(f in r for f in options['routes'])]
+        if not routes:
+            raise CommandError("No routes to benchmark")
+
+        applications = self.load_applications(options['interface'])
+        auth_modes = ['anonymous', 'user'] if options['auth'] == 'both' else [options['auth']]
+
+        session = self.login_session(options['username']) if 'user' in auth_modes else None
+        cookies = {'anonymous': ''}
+        if session is not None:
+            cookies['user'] = f'{settings.SESSION_COOKIE_NAME}={session.session_key}'
+
+        results = []
+        try:
+            for interface, application in applications.items():
+                runner = run_wsgi if interface == 'wsgi' else run_asgi
+                for auth in auth_modes:
+                    for route in routes:
+                        results.append(self.bench_route(
+                            runner, application, route, interface, auth, cookies[auth], options
+                        ))
+        finally:
+            if session is not None:
+                session.delete()
+
+        report = {'meta': self.metadata(options), 'results': results}
+        self.print_table(results)
+
+        if options['compare']:
+            self.print_comparison(options['compare'], results)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results saved to {options['output']}"))
+
+    def load_applications(self, interface):
+        """Import the project's real application objects 🔌"""
+        # Every request comes from one "client": measure the views, not the
+        # rate limiter (bench_ratelimit measures that) 🚦
+        settings.RATE_LIMIT_ENABLED = False
+        applications = {}
+        if interface in ('wsgi', 'both'):
+            from simple_django_framework.wsgi import application as wsgi_application
+            applications['wsgi'] = wsgi_application
+        if interface in ('asgi', 'both'):
+            from simple_django_framework.asgi import application as asgi_application
+            applications['asgi'] = asgi_application
+        return applications
+
+    def login_session(self, username):
+        """Create a logged-in session for a staff user (like logging in) 🔐"""
+        user, created = User.objects.get_or_create(
+            username=username,
+            defaults={'is_staff': True, 'is_superuser': True},
+        )
+        if created:
+            user.set_unusable_password()  # Only reachable through this command
+            user.save()
+
+        engine = import_string(settings.SESSION_ENGINE + '.SessionStore')
+        session = engine()
+        session[SESSION_KEY] = user._meta.pk.value_to_string(user)
+        session[BACKEND_SESSION_KEY] = 'django.contrib.auth.backends.ModelBackend'
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.save()
+        return session
+
+    def bench_route(self, runner, application, route, interface, auth, cookie, options):
+        """Warm up, then measure one route 📏"""
+        if options['warmup']:
+            runner(application, route, options['warmup'], 1, cookie)
+
+        with QueryCounter() as counter:
+            latencies, statuses, wall = runner(
+                application, route, options['requests'], options['concurrency'], cookie
+            )
+
+        return {
+            'route': route,
+            'interface': interface,
+            'auth': auth,
+            'requests': len(latencies),
+            'concurrency': options['concurrency'],
+            'requests_per_sec': round(len(latencies) / wall, 2) if wall else 0.0,
+            'latency_ms': summarize(latencies, scale=1000),
+            'queries_per_request': round(counter.total / len(latencies), 2),
+            'status_codes': {str(code): count for code, count in sorted(statuses.items())},
+        }
+
+    def metadata(self, options):
+        """Where and how this run happened 🏷️"""
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+
+        return {
+            'commit': commit,
+            'timestamp': datetime.now(dt_timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'debug': settings.DEBUG,
+            'database': settings.DATABASES['default']['ENGINE'],
+            'requests': options['requests'],
+            'concurrency': options['concurrency'],
+        }
+
+    def print_table(self, results):
+        self.stdout.write(
+            f"{'route':<45} {'if':<5} {'auth':<9} {'req/s':>9} {'p50ms':>8} "
+            f"{'p95ms':>8} {'p99ms':>8} {'q/req':>6}  status"
+        )
+        for row in results:
+            latency = row['latency_ms']
+            statuses = ','.join(f'{code}x{count}' for code, count in row['status_codes'].items())
+            self.stdout.write(
+                f"{row['route']:<45} {row['interface']:<5} {row['auth']:<9} "
+                f"{row['requests_per_sec']:>9.1f} {latency['p50']:>8.2f} {latency['p95']:>8.2f} "
+                f"{latency['p99']:>8.2f} {row['queries_per_request']:>6.1f}  {statuses}"
+            )
+
+    def print_comparison(self, path, results):
+        """Show how req/s, p95 and queries changed since a saved run 📈"""
+        try:
+            with open(path) as handle:
+                previous = json.load(handle)
+        except (OSError, ValueError) as error:
+            raise CommandError(f"Could not read {path}: {error}")
+
+        before = {(r['route'], r['interface'], r['auth']): r for r in previous.get('results', [])}
+        self.stdout.write(f"\nCompared with {path} (commit {previous.get('meta', {}).get('commit')}):")
+        for row in results:
+            old = before.get((row['route'], row['interface'], row['auth']))
+            if old is None:
+                continue
+            rps_change = (
+                (row['requests_per_sec'] - old['requests_per_sec']) / old['requests_per_sec'] * 100
+                if old['requests_per_sec'] else 0.0
+            )
+            self.stdout.write(
+                f"{row['route']:<45} {row['interface']:<5} {row['auth']:<9} "
+                f"req/s {rps_change:+7.1f}%  "
+                f"p95 {old['latency_ms']['p95']:.2f} -> {row['latency_ms']['p95']:.2f} ms  "
+                f"queries {old['queries_per_request']} -> {row['queries_per_request']}"
+            )
@@ -0,0 +1,90 @@
+"""
+Benchmark: sync views vs their async twins under ASGI ⚡
+
+Usage:
+    python manage.py bench_async
+    python manage.py bench_async --requests 500 --concurrency 1 10 50 100
+    python manage.py bench_async --json
+
+Each pair of URLs (e.g. /blog/ and /async/blog/) is requested through the
+project's ASGI application, in-process, with an increasing number of
+connections in flight at once. Both return the same page, so any
+difference in requests/sec and latency comes from how the view runs:
+thread-hopped through sync_to_async, or natively on the event loop.
+"""
+
+import json  # For --json output
+
+from django.conf import settings  # Project settings
+from django.core.management.base import BaseCommand  # Base class for commands
+
+from main_app.benchmarks import run_asgi, summarize
+from main_app.models import BlogPost
+
+# (name, sync URL, async URL) 🔀
+ROUTE_PAIRS = [
+    ('api_hello', '/api/hello/', '/async/api/hello/'),
+    ('blog_list', '/blog/', '/async/blog/'),
+    ('api_post_list', '/api/posts/', '/async/api/posts/'),
+    ('api_search', '/api/search/?q=django', '/async/api/search/?q=django'),
+]
+
+
+class Command(BaseCommand):
+    help = "Compare throughput of sync and async views under ASGI at several concurrency levels"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Requests per route and concurrency level (default 200)')
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 10, 50],
+                            help='Connections in flight at once (default: 1 10 50)')
+        parser.add_argument('--json', action='store_true',
+                            help='Print the results as JSON')
+
+    def handle(self, *args, **options):
+        # Thousands of requests from one "client": measure the views, not
+        # the rate limiter (bench_ratelimit measures that) 🚦
+        settings.RATE_LIMIT_ENABLED = False
+        from simple_django_framework.asgi import application
+
+        pairs = list(ROUTE_PAIRS)
+        post = BlogPost.objects.filter(status='published').only('slug').first()
+        if post is not None:
+            pairs.append(('blog_post_detail', f'/blog/{post.slug}/', f'/async/blog/{post.slug}/'))
+
+        results = []
+        for name, sync_url, async_url in pairs:
+            for concurrency in options['concurrency']:
+                row = {'route': name, 'concurrency': concurrency}
+                for kind, url in (('sync', sync_url), ('async', async_url)):
+                    run_asgi(application, url, 2, 1)  # Warm up
+                    latencies, statuses, wall = run_asgi(
+                        application, url, options['requests'], concurrency
+                    )
+                    row[kind] = {
+                        'url': url,
+                        'requests_per_sec': round(len(latencies) / wall, 2) if wall else 0.0,
+                        'latency_ms': summarize(latencies, scale=1000),
+                        'status_codes': {str(code): count for code, count in sorted(statuses.items())},
+                    }
+                results.append(row)
+
+        if options['json']:
+            self.stdout.write(json.dumps({'debug': settings.DEBUG, 'results': results}, indent=2))
+            return
+
+        self.stdout.write(
+            f"{'route':<18} {'conc':>5} {'sync req/s':>11} {'async req/s':>12} {'change':>8} "
+            f"{'sync p95ms':>11} {'async p95ms':>12}"
+        )
+        for row in results:
+            sync, async_ = row['sync'], row['async']
+            change = (
+                (async_['requests_per_sec'] / sync['requests_per_sec'] - 1) * 100
+                if sync['requests_per_sec'] else 0.0
+            )
+            self.stdout.write(
+                f"{row['route']:<18} {row['concurrency']:>5} {sync['requests_per_sec']:>11.1f} "
+                f"{async_['requests_per_sec']:>12.1f} {change:>+7.1f}% "
+                f"{sync['latency_ms']['p95']:>11.2f} {async_['latency_ms']['p95']:>12.2f}"
+            )
@@ -0,0 +1,116 @@
+"""
+Benchmark: cache operation latency 🗄️
+
+Usage:
+    python manage.py bench_cache
+    python manage.py bench_cache --operations 20000 --processes 4
+    python manage.py bench_cache --alias default --json
+
+Times get (hit and miss), set, add and incr on a configured cache, from one
+or several worker processes at once (like gunicorn workers sharing the
+cache). Uses its own key prefix and removes its keys afterwards.
+"""
+
+import json  # For --json output
+import multiprocessing  # Simulate several workers
+import os  # Process ids
+import time  # High-resolution timers
+
+from django.core.cache import caches  # Configured caches
+from django.core.management.base import BaseCommand  # Base class for commands
+
+from main_app.benchmarks import summarize
+
+OPERATIONS = ('get_hit', 'get_miss', 'set', 'add', 'incr')
+
+
+def measure(alias, operations):
+    """
+    Time each cache operation ``operations`` times in this process ⏱️
+
+    Returns:
+        dict: {operation: [seconds, ...]}
+    """
+    cache = caches[alias]
+    prefix = f'bench-cache-{os.getpid()}'
+    value = {'title': 'A cached page', 'items': list(range(20))}
+    cache.set(f'{prefix}-hit', value)
+    cache.set(f'{prefix}-counter', 0)
+
+    samples = {name: [] for name in OPERATIONS}
+    calls = {
+        'get_hit': lambda i: cache.get(f'{prefix}-hit'),
+        'get_miss': lambda i: cache.get(f'{prefix}-missing'),
+        'set': lambda i: cache.set(f'{prefix}-set-{i % 100}', value),
+        'add': lambda i: cache.add(f'{prefix}-add-{i}', 1),
+        'incr': lambda i: cache.incr(f'{prefix}-counter'),
+    }
+    for name in OPERATIONS:
+        call = calls[name]
+        for i in range(operations):
+            start = time.perf_counter()
+            call(i)
+            samples[name].append(time.perf_counter() - start)
+
+    cache.delete_many(
+        [f'{prefix}-hit', f'{prefix}-counter']
+        + [f'{prefix}-set-{i}' for i in range(100)]
+        + [f'{prefix}-add-{i}' for i in range(operations)]
+    )
+    return samples
+
+
+def _worker(alias, operations, results):
+    results.put(measure(alias, operations))
+
+
+class Command(BaseCommand):
+    help = "Measure get/set/add/incr latency of a cache, from one or more processes"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--alias', default='default', help='Cache alias (default "default")')
+        parser.add_argument('--operations', type=int, default=5000,
+                            help='Calls per operation and process (default 5000)')
+        parser.add_argument('--processes', type=int, default=1,
+                            help='Worker processes running at the same time (default 1)')
+        parser.add_argument('--json', action='store_true', help='Print the results as JSON')
+
+    def handle(self, *args, **options):
+        if options['processes'] == 1:
+            all_samples = [measure(options['alias'], options['operations'])]
+        else:
+            context = multiprocessing.get_context('fork')
+            results = context.Queue()
+            workers = [
+                context.Process(target=_worker, args=(options['alias'], options['operations'], results))
+                for _ in range(options['processes'])
+            ]
+            for worker in workers:
+                worker.start()
+            all_samples = [results.get() for _ in workers]
+            for worker in workers:
+                worker.join()
+
+        report = {
+            'backend': type(caches[options['alias']]).__name__,
+            'processes': options['processes'],
+            'operations': options['operations'],
+            'latency_us': {
+                name: summarize([s for samples in all_samples for s in samples[name]], scale=1e6)
+                for name in OPERATIONS
+            },
+        }
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(
+            f"{report['backend']}: {report['processes']} process(es) x "
+            f"{report['operations']} calls per operation"
+        )
+        for name, stats in report['latency_us'].items():
+            self.stdout.write(
+                f"  {name:<9} p50 {stats['p50']:>8.1f} us  p95 {stats['p95']:>8.1f} us  "
+                f"p99 {stats['p99']:>8.1f} us  max {stats['max']:>9.1f} us"
+            )
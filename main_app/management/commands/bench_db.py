@@ -0,0 +1,161 @@
+"""
+Benchmark: SQLite read/write throughput with concurrent workers 🗃️
+
+Usage:
+    python manage.py bench_db
+    python manage.py bench_db --readers 8 --writers 2 --seconds 5
+    python manage.py bench_db --profile django tuned --json
+
+Runs reader processes (primary key SELECTs) and writer processes (single
+row UPDATEs) against a scratch database file at the same time, once per
+connection profile:
+    django  Django's stock SQLite backend with SQLite's defaults
+    tuned   The project's backend and OPTIONS from settings.DATABASES
+
+Each profile gets a fresh file in a temporary directory, so the real
+database is never touched.
+"""
+
+import json  # For --json output
+import multiprocessing  # Concurrent workers
+import random  # Random rows
+import tempfile  # Scratch database files
+import time  # Timing
+from pathlib import Path  # File paths
+
+from django.conf import settings  # Project settings
+from django.core.management.base import BaseCommand  # Base class for commands
+from django.db import DEFAULT_DB_ALIAS, Error as DatabaseError  # Any database error
+from django.db.utils import ConnectionHandler  # Connections outside settings.DATABASES
+
+from main_app.benchmarks import summarize
+
+
+def profiles():
+    """The connection settings to compare, by name ⚙️"""
+    default = settings.DATABASES['default']
+    return {
+        'django': {'ENGINE': 'django.db.backends.sqlite3', 'OPTIONS': {}},
+        'tuned': {'ENGINE': default['ENGINE'], 'OPTIONS': default.get('OPTIONS', {})},
+    }
+
+
+def connect(profile, path):
+    """Open a connection to ``path`` with a profile's settings 🔌"""
+    # A private handler: its 'default' is the scratch file, not the real database
+    handler = ConnectionHandler({DEFAULT_DB_ALIAS: {**profile, 'NAME': path}})
+    return handler[DEFAULT_DB_ALIAS]
+
+
+def create_database(profile, path, rows):
+    """Create the scratch table with ``rows`` rows 🌱"""
+    connection = connect(profile, path)
+    with connection.cursor() as cursor:
+        cursor.execute('CREATE TABLE bench_item (id INTEGER PRIMARY KEY, counter INTEGER, payload TEXT)')
+        cursor.executemany(
+            'INSERT INTO bench_item (id, counter, payload) VALUES (%s, 0, %s)',
+            [(i, f'payload {i} ' * 10) for i in range(1, rows + 1)],
+        )
+    connection.close()
+
+
+def _worker(role, profile, path, rows, seconds, results):
+    """Runs in a child process: read or write until the time is up 🏃"""
+    connection = connect(profile, path)
+    latencies, errors = [], 0
+    sql = (
+        'SELECT payload FROM bench_item WHERE id = %s' if role == 'read'
+        else 'UPDATE bench_item SET counter = counter + 1 WHERE id = %s'
+    )
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(sql, [random.randint(1, rows)])
+                cursor.fetchall()
+        except DatabaseError:
+            errors += 1  # e.g. "database is locked"
+            continue
+        latencies.append(time.perf_counter() - start)
+    connection.close()
+    results.put((role, latencies, errors))
+
+
+def run_profile(profile, readers, writers, seconds, rows):
+    """
+    Run readers and writers against a fresh database for one profile 🏁
+
+    Returns:
+        dict: Throughput, latency and error counts for reads and writes
+    """
+    context = multiprocessing.get_context('fork')
+    with tempfile.TemporaryDirectory(prefix='bench-db-') as tmpdir:
+        path = str(Path(tmpdir) / 'bench.sqlite3')
+        create_database(profile, path, rows)
+
+        results = context.Queue()
+        workers = [
+            context.Process(target=_worker, args=(role, profile, path, rows, seconds, results))
+            for role in ['read'] * readers + ['write'] * writers
+        ]
+        for worker in workers:
+            worker.start()
+        collected = [results.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+
+    report = {}
+    for role in ('read', 'write'):
+        latencies = [s for r, samples, _ in collected if r == role for s in samples]
+        report[role] = {
+            'per_sec': round(len(latencies) / seconds, 1),
+            'latency_ms': summarize(latencies, scale=1000),
+            'errors': sum(errors for r, _, errors in collected if r == role),
+        }
+    return report
+
+
+class Command(BaseCommand):
+    help = "Measure SQLite read/write throughput with concurrent worker processes"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profile', nargs='+', choices=['django', 'tuned'], default=['django', 'tuned'],
+                            help='Connection profiles to compare (default: both)')
+        parser.add_argument('--readers', type=int, default=4, help='Reader processes (default 4)')
+        parser.add_argument('--writers', type=int, default=2, help='Writer processes (default 2)')
+        parser.add_argument('--seconds', type=float, default=3.0, help='Run time per profile (default 3)')
+        parser.add_argument('--rows', type=int, default=10000, help='Rows in the scratch table (default 10000)')
+        parser.add_argument('--json', action='store_true', help='Print the results as JSON')
+
+    def handle(self, *args, **options):
+        available = profiles()
+        results = {
+            name: run_profile(
+                available[name], options['readers'], options['writers'],
+                options['seconds'], options['rows'],
+            )
+            for name in options['profile']
+        }
+
+        if options['json']:
+            self.stdout.write(json.dumps({
+                'readers': options['readers'], 'writers': options['writers'],
+                'seconds': options['seconds'], 'results': results,
+            }, indent=2))
+            return
+
+        self.stdout.write(
+            f"{options['readers']} readers + {options['writers']} writers, {options['seconds']}s per profile"
+        )
+        self.stdout.write(
+            f"{'profile':<8} {'reads/s':>10} {'read p95ms':>11} {'writes/s':>10} "
+            f"{'write p95ms':>12} {'errors':>7}"
+        )
+        for name, report in results.items():
+            read, write = report['read'], report['write']
+            self.stdout.write(
+                f"{name:<8} {read['per_sec']:>10.1f} {read['latency_ms']['p95']:>11.3f} "
+                f"{write['per_sec']:>10.1f} {write['latency_ms']['p95']:>12.3f} "
+                f"{read['errors'] + write['errors']:>7}"
+            )
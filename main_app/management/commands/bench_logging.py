@@ -0,0 +1,146 @@
+"""
+Benchmark: per-request logging cost, synchronous vs queued 📮
+
+Usage:
+    python manage.py bench_logging
+    python manage.py bench_logging --requests 5000 --io-delay-ms 2
+
+Both runs use the handlers from settings.LOGGING (log files are redirected to
+a temporary directory and the console to /dev/null). ``--io-delay-ms`` adds a
+sleep to every file write to show what a slow disk does to request latency.
+"""
+
+import copy  # Copy settings.LOGGING before changing it
+import json  # For --json output
+import logging  # Python's logging framework
+import logging.config  # dictConfig
+import os  # For os.devnull
+import tempfile  # Scratch directory for the log files
+import time  # High-resolution timers
+from pathlib import Path  # File name handling
+
+from django.conf import settings  # Project settings
+from django.core.management.base import BaseCommand  # Base class for commands
+
+from main_app.benchmarks import summarize
+from simple_django_framework import log_queue
+
+
+class Command(BaseCommand):
+    help = "Measure the per-request cost of logging with and without the queue pipeline"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000,
+                            help='Number of simulated requests per run (default 2000)')
+        parser.add_argument('--messages', type=int, default=3,
+                            help='INFO messages logged per request (default 3)')
+        parser.add_argument('--io-delay-ms', type=float, default=0.0,
+                            help='Extra delay added to every file write, in milliseconds')
+        parser.add_argument('--json', action='store_true',
+                            help='Print the results as JSON')
+
+    def handle(self, *args, **options):
+        # Stop the real pipeline so our runs don't interleave with it 🛑
+        if log_queue.pipeline is not None:
+            log_queue.pipeline.stop()
+            log_queue.pipeline = None
+
+        with tempfile.TemporaryDirectory() as tmpdir, open(os.devnull, 'w') as devnull:
+            config = self.build_config(tmpdir, devnull)
+            results = {
+                'requests': options['requests'],
+                'messages_per_request': options['messages'],
+                'io_delay_ms': options['io_delay_ms'],
+                'sync': self.run_sync(config, options),
+                'queued': self.run_queued(config, options),
+            }
+            logging.shutdown()  # Close the scratch files before the directory goes
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        self.stdout.write(
+            f"{results['requests']} requests x {results['messages_per_request']} messages, "
+            f"io delay {results['io_delay_ms']} ms"
+        )
+        for name in ('sync', 'queued'):
+            stats = results[name]['per_request_us']
+            self.stdout.write(
+                f"  {name:<7} mean {stats['mean']:>10.1f} us  p50 {stats['p50']:>10.1f} us  "
+                f"p99 {stats['p99']:>10.1f} us  max {stats['max']:>10.1f} us"
+            )
+        queued = results['queued']
+        self.stdout.write(
+            f"  queued: drained in {queued['drain_ms']} ms, dropped {queued['dropped']} records"
+        )
+
+    def build_config(self, tmpdir, stream):
+        """Copy settings.LOGGING, pointing files at ``tmpdir`` and console at ``stream`` 📁"""
+        config = copy.deepcopy(settings.LOGGING)
+        for handler in config['handlers'].values():
+            if 'filename' in handler:
+                handler['filename'] = str(Path(tmpdir) / Path(handler['filename']).name)
+            if handler['class'] == 'logging.StreamHandler':
+                handler['stream'] = stream
+        return config
+
+    def slow_down_files(self, delay_ms):
+        """Simulate a slow disk by sleeping in every file handler 🐢"""
+        if delay_ms <= 0:
+            return
+        for logger in log_queue.configured_loggers():
+            for handler in logger.handlers:
+                if isinstance(handler, logging.FileHandler) and not hasattr(handler, 'bench_emit'):
+                    handler.bench_emit = handler.emit
+
+                    def slow_emit(record, emit=handler.bench_emit):
+                        time.sleep(delay_ms / 1000)
+                        emit(record)
+
+                    handler.emit = slow_emit
+
+    def simulate(self, options):
+        """Log like a request would and time each 'request' ⏱️"""
+        logger = logging.getLogger('main_app')
+        samples = []
+        for number in range(options['requests']):
+            start = time.perf_counter()
+            for message in range(options['messages']):
+                logger.info(f"Benchmark request {number} message {message}")
+            samples.append(time.perf_counter() - start)
+        return samples
+
+    def run_sync(self, config, options):
+        logging.config.dictConfig(config)
+        self.slow_down_files(options['io_delay_ms'])
+        samples = self.simulate(options)
+        return {'per_request_us': summarize(samples, scale=1e6)}
+
+    def run_queued(self, config, options):
+        logging.config.dictConfig(config)
+        self.slow_down_files(options['io_delay_ms'])
+
+        queue_options = getattr(settings, 'LOGGING_QUEUE', {})
+        pipeline = log_queue.QueuedLogging(
+            maxsize=queue_options.get('MAXSIZE', log_queue.DEFAULT_MAXSIZE),
+            policy=queue_options.get('POLICY', log_queue.DEFAULT_POLICY),
+            block_timeout=queue_options.get('BLOCK_TIMEOUT', log_queue.DEFAULT_BLOCK_TIMEOUT),
+        )
+        pipeline.install(log_queue.configured_loggers())
+        pipeline.start()
+
+        samples = self.simulate(options)
+
+        # Time how long the writer thread needs to catch up 🏁
+        start = time.perf_counter()
+        dropped = pipeline.total_dropped
+        pipeline.total_dropped = 0  # Reported below instead of on stderr
+        pipeline.stop()
+        drain = time.perf_counter() - start
+
+        return {
+            'per_request_us': summarize(samples, scale=1e6),
+            'drain_ms': round(drain * 1000, 3),
+            'dropped': dropped,
+        }
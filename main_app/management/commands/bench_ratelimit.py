@@ -0,0 +1,90 @@
+"""
+Benchmark: rate limiter overhead per request 🚦
+
+Usage:
+    python manage.py bench_ratelimit
+    python manage.py bench_ratelimit --requests 20000 --alias default --json
+
+Calls RateLimitMiddleware.process_view() directly (no view, no template)
+for three kinds of request, so the numbers are the limiter's own cost:
+    no_policy  a route without a policy: just the dict lookup
+    allowed    a limited route, client under its rate (incr + get)
+    blocked    a limited route, client over its rate (plus the 429 response)
+
+Uses its own key prefix on the chosen cache (the counters expire by
+themselves).
+"""
+
+import json  # For --json output
+import time  # High-resolution timers
+import uuid  # A fresh key prefix per run
+
+from django.contrib.auth.models import AnonymousUser  # Requests need a user
+from django.core.management.base import BaseCommand  # Base class for commands
+from django.test import RequestFactory, override_settings  # Build requests, pick policies
+from django.urls import resolve  # Requests need a resolver_match
+
+from main_app.benchmarks import summarize
+from simple_django_framework.rate_limit import RateLimitMiddleware
+
+# (scenario, path, rate of the policy covering /api/hello/) 🧪
+SCENARIOS = [
+    ('no_policy', '/about/', '1000000/m'),
+    ('allowed', '/api/hello/', '1000000/m'),
+    ('blocked', '/api/hello/', '1/h'),
+]
+
+
+def measure(alias, path, rate, requests):
+    """
+    Time ``requests`` calls of the middleware for one scenario ⏱️
+
+    Returns:
+        list: Seconds per call
+    """
+    policies = {'bench': {'views': ['main_app:api_hello'], 'rate': rate}}
+    with override_settings(RATE_LIMIT_ENABLED=True, RATE_LIMITS=policies, RATE_LIMIT_CACHE=alias):
+        middleware = RateLimitMiddleware(lambda request: None)
+    middleware.limiter.prefix = f'bench-ratelimit-{uuid.uuid4().hex}'
+
+    request = RequestFactory().get(path, REMOTE_ADDR='192.0.2.1')
+    request.resolver_match = resolve(path)
+    request.user = AnonymousUser()
+
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        middleware.process_view(request, None, (), {})
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+class Command(BaseCommand):
+    help = "Measure the per-request cost of the rate limiting middleware"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=5000,
+                            help='Calls per scenario (default 5000)')
+        parser.add_argument('--alias', default='default',
+                            help='Cache holding the counters (default: default)')
+        parser.add_argument('--json', action='store_true', help='Print the results as JSON')
+
+    def handle(self, *args, **options):
+        results = {
+            name: summarize(measure(options['alias'], path, rate, options['requests']), scale=1e6)
+            for name, path, rate in SCENARIOS
+        }
+
+        if options['json']:
+            self.stdout.write(json.dumps({
+                'alias': options['alias'], 'requests': options['requests'], 'results': results,
+            }, indent=2))
+            return
+
+        self.stdout.write(f"{options['requests']} calls per scenario, cache '{options['alias']}' (microseconds)")
+        self.stdout.write(f"{'scenario':<10} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9}")
+        for name, stats in results.items():
+            self.stdout.write(
+                f"{name:<10} {stats['mean']:>9.1f} {stats['p50']:>9.1f} "
+                f"{stats['p95']:>9.1f} {stats['p99']:>9.1f}"
+            )
@@ -0,0 +1,185 @@
+"""
+Benchmark: concurrent database writes, direct vs through the write queue ✍️
+
+Usage:
+    python manage.py bench_writes
+    python manage.py bench_writes --writers 16 64 --writes 200
+    python manage.py bench_writes --processes 4 --json
+
+Each writer (a thread, like a request thread in a threaded server) runs
+small write transactions - one UPDATE each - against a scratch SQLite
+file with the project's connection settings:
+    direct  every writer opens its own transaction and fights for the lock
+    queued  every writer hands its write to the process's WriteQueue
+
+With --processes N the writers are spread over N worker processes; their
+write queues take turns through a lock file, like the real workers do.
+"""
+
+import json  # For --json output
+import multiprocessing  # Several worker processes
+import random  # Random rows
+import tempfile  # Scratch database file
+import threading  # Writer threads
+import time  # Timing
+from pathlib import Path  # File paths
+
+from django.conf import settings  # Project settings
+from django.core.management.base import BaseCommand  # Base class for commands
+from django.db import DEFAULT_DB_ALIAS, Error as DatabaseError, connections, transaction
+
+from main_app.benchmarks import summarize
+from simple_django_framework.write_queue import DEFAULT_BATCH_SIZE, DEFAULT_BATCH_WINDOW, WriteQueue
+
+ALIAS = 'bench_writes'
+ROWS = 1000
+
+
+def add_scratch_database(path):
+    """Register the scratch file as the ALIAS connection 🔌"""
+    configured = connections.configure_settings({
+        DEFAULT_DB_ALIAS: {**settings.DATABASES[DEFAULT_DB_ALIAS]},
+        ALIAS: {**settings.DATABASES[DEFAULT_DB_ALIAS], 'NAME': path, 'CONN_MAX_AGE': None},
+    })
+    connections.settings[ALIAS] = configured[ALIAS]
+    with connections[ALIAS].cursor() as cursor:
+        cursor.execute('CREATE TABLE IF NOT EXISTS bench_item (id INTEGER PRIMARY KEY, counter INTEGER)')
+        cursor.execute('DELETE FROM bench_item')
+        cursor.executemany('INSERT INTO bench_item VALUES (%s, 0)', [(i,) for i in range(1, ROWS + 1)])
+    connections[ALIAS].close()
+
+
+def write_one(pk):
+    """One small write transaction (like saving one model) 💾"""
+    with transaction.atomic(using=ALIAS):
+        with connections[ALIAS].cursor() as cursor:
+            cursor.execute('UPDATE bench_item SET counter = counter + 1 WHERE id = %s', [pk])
+
+
+def run_writers(mode, writers, writes, lock_file=None):
+    """
+    Run ``writers`` threads doing ``writes`` writes each in this process 🧵
+
+    Returns:
+        tuple: (latencies in seconds, errors, transactions committed)
+    """
+    options = getattr(settings, 'WRITE_QUEUE', {})
+    write_queue = WriteQueue(
+        using=ALIAS, lock_file=lock_file,
+        batch_size=options.get('BATCH_SIZE', DEFAULT_BATCH_SIZE),
+        batch_window=options.get('BATCH_WINDOW', DEFAULT_BATCH_WINDOW),
+    ) if mode == 'queued' else None
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def writer():
+        mine, failed = [], 0
+        for _ in range(writes):
+            start = time.perf_counter()
+            try:
+                if write_queue is None:
+                    write_one(random.randint(1, ROWS))
+                else:
+                    write_queue.run(write_one, random.randint(1, ROWS))
+            except DatabaseError:
+                failed += 1  # e.g. "database is locked"
+                continue
+            mine.append(time.perf_counter() - start)
+        connections[ALIAS].close()
+        with lock:
+            latencies.extend(mine)
+            errors.append(failed)
+
+    threads = [threading.Thread(target=writer) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if write_queue is None:
+        return latencies, sum(errors), len(latencies)
+    write_queue.stop()
+    return latencies, sum(errors), write_queue.batches
+
+
+def _process(mode, writers, writes, lock_file, results):
+    results.put(run_writers(mode, writers, writes, lock_file))
+
+
+def run_mode(mode, writers, writes, processes, lock_file):
+    """Run one mode at one concurrency level, over ``processes`` processes 🏁"""
+    start = time.perf_counter()
+    if processes == 1:
+        collected = [run_writers(mode, writers, writes)]
+    else:
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        per_process = [writers // processes + (1 if i < writers % processes else 0) for i in range(processes)]
+        workers = [
+            context.Process(target=_process, args=(mode, count, writes, lock_file, results))
+            for count in per_process if count
+        ]
+        for worker in workers:
+            worker.start()
+        collected = [results.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+    wall = time.perf_counter() - start
+
+    latencies = [sample for samples, _, _ in collected for sample in samples]
+    return {
+        'writes_per_sec': round(len(latencies) / wall, 1) if wall else 0.0,
+        'latency_ms': summarize(latencies, scale=1000),
+        'errors': sum(errors for _, errors, _ in collected),
+        'transactions': sum(batches for _, _, batches in collected),
+    }
+
+
+class Command(BaseCommand):
+    help = "Compare concurrent write throughput with and without the write queue"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, nargs='+', default=[16, 64],
+                            help='Concurrent writers (default: 16 64)')
+        parser.add_argument('--writes', type=int, default=100,
+                            help='Writes per writer (default 100)')
+        parser.add_argument('--processes', type=int, default=1,
+                            help='Spread the writers over this many processes (default 1)')
+        parser.add_argument('--mode', nargs='+', choices=['direct', 'queued'], default=['direct', 'queued'],
+                            help='What to measure (default: both)')
+        parser.add_argument('--json', action='store_true', help='Print the results as JSON')
+
+    def handle(self, *args, **options):
+        results = []
+        with tempfile.TemporaryDirectory(prefix='bench-writes-') as tmpdir:
+            add_scratch_database(str(Path(tmpdir) / 'bench.sqlite3'))
+            lock_file = str(Path(tmpdir) / 'write.lock')
+            try:
+                for writers in options['writers']:
+                    for mode in options['mode']:
+                        row = run_mode(mode, writers, options['writes'], options['processes'], lock_file)
+                        results.append({'writers': writers, 'mode': mode, **row})
+            finally:
+                connections[ALIAS].close()
+                del connections.settings[ALIAS]
+
+        if options['json']:
+            self.stdout.write(json.dumps({
+                'processes': options['processes'], 'writes': options['writes'], 'results': results,
+            }, indent=2))
+            return
+
+        self.stdout.write(
+            f"{options['writes']} writes per writer, {options['processes']} process(es)"
+        )
+        self.stdout.write(
+            f"{'writers':>7} {'mode':<7} {'writes/s':>10} {'p50 ms':>8} {'p95 ms':>8} "
+            f"{'p99 ms':>8} {'txns':>7} {'errors':>7}"
+        )
+        for row in results:
+            latency = row['latency_ms']
+            self.stdout.write(
+                f"{row['writers']:>7} {row['mode']:<7} {row['writes_per_sec']:>10.1f} "
+                f"{latency['p50']:>8.2f} {latency['p95']:>8.2f} {latency['p99']:>8.2f} "
+                f"{row['transactions']:>7} {row['errors']:>7}"
+            )
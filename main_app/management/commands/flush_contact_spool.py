@@ -0,0 +1,32 @@
+"""
+Store spooled contact form messages in the database 📮
+
+Usage:
+    python manage.py flush_contact_spool
+    python manage.py flush_contact_spool --dry-run    # Only count them
+
+The web processes store their spooled messages every few seconds by
+themselves. Run this after a crash or a deploy to store spool files that
+processes which are no longer running left behind (files of processes that
+are still running are left to them).
+"""
+
+from django.core.management.base import BaseCommand  # Base class for commands
+
+from main_app.contact_spool import contact_spool
+
+
+class Command(BaseCommand):
+    help = "Store contact form messages left in spool files"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report how many messages are spooled')
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            self.stdout.write(f"{contact_spool.pending()} messages are spooled (dry run, nothing stored)")
+            return
+
+        stored = contact_spool.flush()
+        self.stdout.write(self.style.SUCCESS(f"Stored {stored} spooled messages"))
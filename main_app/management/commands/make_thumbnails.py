@@ -0,0 +1,106 @@
+"""
+Make thumbnails for existing profile pictures 🖼️
+
+Usage:
+    python manage.py make_thumbnails
+    python manage.py make_thumbnails --processes 8
+    python manage.py make_thumbnails --force        # Make them all again (e.g. new QUALITY)
+    python manage.py make_thumbnails --dry-run      # Only count the pictures
+
+New uploads get their thumbnails from a background job; run this once for
+pictures uploaded before thumbnails existed, or after changing
+settings.THUMBNAILS. Resizing is CPU work, so the pictures are spread over
+a pool of processes (threads would take turns on Python's GIL). The
+processes only touch files; the digests are stored afterwards, in batches,
+by this process.
+"""
+
+import os  # CPU count
+import time  # Timing
+from concurrent.futures import ProcessPoolExecutor, as_completed  # The process pool
+
+import django  # Set up Django in spawned processes
+from django.core.management.base import BaseCommand  # Base class for commands
+from django.db import connections  # Closed before forking
+
+from main_app import thumbnails
+from main_app.models import UserProfile
+from simple_django_framework.write_queue import write_queue  # Serialized database writes
+
+# Digests stored per UPDATE batch ⚙️
+SAVE_BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = "Make the thumbnails of every profile picture, in a process pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=os.cpu_count() or 1,
+                            help='Worker processes (default: one per CPU)')
+        parser.add_argument('--force', action='store_true',
+                            help='Make every thumbnail again, even if it exists')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report how many pictures need thumbnails')
+
+    def handle(self, *args, **options):
+        profiles = self.profiles_to_do(options['force'])
+        if options['dry_run'] or not profiles:
+            self.stdout.write(f"{len(profiles)} profile pictures need thumbnails")
+            return
+
+        start = time.perf_counter()
+        digests, written, failed = self.make_all(profiles, options['processes'], options['force'])
+        changed = [
+            profile for profile in profiles
+            if profile.pk in digests and digests[profile.pk] != profile.picture_digest
+        ]
+        for profile in changed:
+            profile.picture_digest = digests[profile.pk]
+        for batch_start in range(0, len(changed), SAVE_BATCH_SIZE):
+            write_queue.run(
+                UserProfile.objects.bulk_update, changed[batch_start:batch_start + SAVE_BATCH_SIZE],
+                ['picture_digest'], batch=False,
+            )
+
+        seconds = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"Made {written} thumbnails for {len(digests)} pictures with {options['processes']} processes "
+            f"in {seconds:.1f}s ({len(digests) / seconds:.1f} pictures/s), {failed} failed"
+        ))
+
+    def profiles_to_do(self, force):
+        """Profiles with a picture whose thumbnails are missing (all with --force) 🔍"""
+        profiles = (
+            UserProfile.objects.exclude(profile_picture='').exclude(profile_picture__isnull=True)
+            .only('pk', 'profile_picture', 'picture_digest').order_by('pk')
+        )
+        return [
+            profile for profile in profiles
+            if force or not (profile.picture_digest and thumbnails.derivatives_exist(profile.picture_digest))
+        ]
+
+    def make_all(self, profiles, processes, force):
+        """
+        Run thumbnails.make_derivatives() for every picture in the pool 🏭
+
+        Returns:
+            tuple: ({profile pk: digest}, thumbnails written, pictures failed)
+        """
+        connections.close_all()  # Forked processes must not share our database connections
+        digests, written, failed = {}, 0, 0
+        with ProcessPoolExecutor(max_workers=processes, initializer=django.setup) as pool:
+            futures = {
+                pool.submit(thumbnails.make_derivatives, profile.profile_picture.path, force): profile
+                for profile in profiles
+            }
+            for future in as_completed(futures):
+                profile = futures[future]
+                try:
+                    digest, count = future.result()
+                except Exception as error:
+                    failed += 1
+                    self.stderr.write(f"Profile {profile.pk} ({profile.profile_picture.name}): {error}")
+                    continue
+                digests[profile.pk] = digest
+                written += count
+        return digests, written, failed
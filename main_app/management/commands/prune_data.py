@@ -0,0 +1,75 @@
+"""
+Delete data that is past its retention period 🧹
+
+Usage:
+    python manage.py prune_data
+    python manage.py prune_data --dry-run
+    python manage.py prune_data --policy spam_messages --batch-size 200 --pause 0.1
+    python manage.py prune_data --interval 3600     # Keep running, once an hour
+
+Policies (see main_app/retention.py, ages in settings.DATA_RETENTION):
+    expired_sessions   sessions past their expiry date
+    spam_messages      spam contact messages older than 7 days
+    resolved_messages  contact messages resolved more than 180 days ago
+    finished_jobs      background jobs done or failed more than 14 days ago
+    stale_uploads      chunked uploads without a new chunk for a day (and their files)
+
+Rows are deleted in small primary-key batches, each in its own short
+transaction, with a pause in between so the site's own writes never wait
+long for the database lock.
+"""
+
+import time  # Sleeping between runs
+
+from django.core.management.base import BaseCommand  # Base class for commands
+from django.db import DEFAULT_DB_ALIAS  # Default database alias
+
+from main_app import retention
+
+
+class Command(BaseCommand):
+    help = "Delete expired sessions, old spam, long-resolved messages, old jobs and stale uploads in small batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--policy', action='append', dest='policies',
+                            choices=[policy.name for policy in retention.POLICIES],
+                            help='Only run this policy (repeat for several; default: all)')
+        parser.add_argument('--batch-size', type=int, default=retention.DEFAULT_BATCH_SIZE,
+                            help=f'Rows deleted per transaction (default {retention.DEFAULT_BATCH_SIZE})')
+        parser.add_argument('--pause', type=float, default=retention.DEFAULT_PAUSE,
+                            help=f'Seconds to sleep between batches (default {retention.DEFAULT_PAUSE})')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only count the rows that would be deleted')
+        parser.add_argument('--interval', type=float, default=0,
+                            help='Keep running, every INTERVAL seconds (default: run once)')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS,
+                            help='Database alias (default "default")')
+
+    def handle(self, *args, **options):
+        names = options['policies'] or [policy.name for policy in retention.POLICIES]
+        policies = [retention.get_policy(name) for name in names]
+
+        while True:
+            self.run_once(policies, options)
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    def run_once(self, policies, options):
+        using = options['database']
+        for policy in policies:
+            if options['dry_run']:
+                count = policy.queryset(using=using).count()
+                self.stdout.write(f"{policy.name:<18} {count} {policy.description} would be deleted")
+                continue
+
+            stats = retention.apply_policy(
+                policy, batch_size=options['batch_size'], pause=options['pause'], using=using
+            )
+            self.stdout.write(
+                f"{policy.name:<18} deleted {stats['deleted']} rows in {stats['batches']} batches, "
+                f"{stats['seconds']:.2f}s ({stats['rows_per_sec']:.0f} rows/s), "
+                f"lock wait {stats['lock_wait'] * 1000:.1f}ms total / "
+                f"{stats['max_lock_wait'] * 1000:.1f}ms max, "
+                f"longest lock held {stats['max_lock_held'] * 1000:.1f}ms"
+            )
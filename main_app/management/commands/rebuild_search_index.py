@@ -0,0 +1,46 @@
+"""
+Rebuild the blog post full-text search index 🔎
+
+Usage:
+    python manage.py rebuild_search_index
+    python manage.py rebuild_search_index --batch-size 5000
+
+Saving or deleting a post keeps the index up to date automatically, but
+bulk_create(), queryset.update() and raw SQL skip those hooks. Run this
+after such bulk changes (or whenever search results look stale).
+"""
+
+import time  # Timing
+
+from django.core.management.base import BaseCommand, CommandError  # Base class for commands
+from django.db import DEFAULT_DB_ALIAS, transaction  # One transaction for the rebuild
+
+from main_app import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index for blog posts"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Posts copied per INSERT (default 1000)')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS,
+                            help='Database alias (default "default")')
+
+    def handle(self, *args, **options):
+        using = options['database']
+        if not search.is_available(using):
+            raise CommandError(
+                "The search index table doesn't exist on this database "
+                "(full-text search needs SQLite with FTS5 - did you run migrate?)"
+            )
+
+        start = time.perf_counter()
+        # One transaction: searches keep seeing the old index until we're done
+        with transaction.atomic(using=using):
+            indexed = search.rebuild_index(batch_size=options['batch_size'], using=using)
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {indexed} posts in {elapsed:.2f}s"
+        ))
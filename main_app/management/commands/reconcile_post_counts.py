@@ -0,0 +1,77 @@
+"""
+Recompute denormalized post counters 🔄
+
+Usage:
+    python manage.py reconcile_post_counts
+    python manage.py reconcile_post_counts --dry-run
+
+Category.published_post_count and BlogPost.comment_count/last_comment_at
+are kept up to date by signal handlers, but raw SQL, fixtures loaded with
+loaddata --raw, cascading deletes (e.g. of a user) or bugs can make them
+drift. This command recomputes the category counters in bulk (one UPDATE),
+recounts the posts whose comment stats are wrong, and reports both.
+"""
+
+from django.core.management.base import BaseCommand  # Base class for commands
+from django.db.models import Count, Max, Q  # Aggregation helpers
+import logging  # For logging
+
+from main_app.models import BlogPost, Category
+
+# Get a logger for this app 📝
+logger = logging.getLogger('main_app')
+
+
+class Command(BaseCommand):
+    help = "Recompute Category.published_post_count and BlogPost comment stats"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report drift, do not fix it')
+
+    def handle(self, *args, **options):
+        # Find categories whose stored count differs from the real one 🔍
+        drifted = [
+            (category.name, category.published_post_count, category.actual)
+            for category in Category.objects.annotate(
+                actual=Count('posts', filter=Q(posts__status='published'))
+            )
+            if category.published_post_count != category.actual
+        ]
+
+        for name, stored, actual in drifted:
+            self.stdout.write(f"  {name}: stored {stored}, actual {actual}")
+
+        # Posts whose comment stats differ from their approved comments 💬
+        approved = Q(comments__is_approved=True)
+        drifted_posts = [
+            (post.pk, post.title, post.comment_count, post.actual)
+            for post in BlogPost.objects.only('id', 'title', 'comment_count', 'last_comment_at').annotate(
+                actual=Count('comments', filter=approved),
+                newest=Max('comments__created_at', filter=approved),
+            )
+            if (post.comment_count, post.last_comment_at) != (post.actual, post.newest)
+        ]
+
+        for _, title, stored, actual in drifted_posts:
+            self.stdout.write(f"  {title}: {stored} comments stored, actual {actual}")
+
+        if options['dry_run']:
+            self.stdout.write(
+                f"{len(drifted)} categories and {len(drifted_posts)} posts have drifted "
+                f"(dry run, nothing changed)"
+            )
+            return
+
+        updated = Category.refresh_published_counts()
+        # Only the drifted posts: a recount bumps updated_at (pages change)
+        if drifted_posts:
+            BlogPost.refresh_comment_stats([pk for pk, _, _, _ in drifted_posts])
+        logger.info(
+            f"Reconciled post counts for {updated} categories ({len(drifted)} had drifted) "
+            f"and comment stats of {len(drifted_posts)} posts"
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Recomputed {updated} categories, fixed {len(drifted)}; "
+            f"fixed comment stats of {len(drifted_posts)} posts"
+        ))
@@ -0,0 +1,55 @@
+"""
+Refresh the read replica(s) from the primary database 🔁
+
+Usage:
+    python manage.py replicate_db                 # Copy once
+    python manage.py replicate_db --interval 2    # Keep copying every 2 seconds
+    python manage.py replicate_db --replica replica
+
+Each run takes a consistent snapshot of the primary SQLite file (SQLite's
+online backup, the primary keeps working meanwhile) into each replica file
+in settings.DATABASE_REPLICAS, and records when the snapshot was taken so
+the router knows how far behind every replica is.
+
+Keep --interval well below settings.REPLICA_MAX_LAG, otherwise the router
+will regularly fall back to the primary.
+"""
+
+import time  # Timing and sleeping between runs
+
+from django.conf import settings  # DATABASES and DATABASE_REPLICAS
+from django.core.management.base import BaseCommand, CommandError  # Base class for commands
+from django.db import DEFAULT_DB_ALIAS  # The primary's alias
+
+from simple_django_framework import replicas
+
+
+class Command(BaseCommand):
+    help = "Copy the primary database into the read replica file(s)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--replica', action='append', dest='aliases',
+                            help='Only refresh this replica alias (repeat for several; default: all)')
+        parser.add_argument('--interval', type=float, default=0,
+                            help='Keep running, every INTERVAL seconds (default: run once)')
+
+    def handle(self, *args, **options):
+        aliases = options['aliases'] or replicas.replica_aliases()
+        if not aliases:
+            raise CommandError("No replicas configured (settings.DATABASE_REPLICAS is empty)")
+        unknown = set(aliases) - set(replicas.replica_aliases())
+        if unknown:
+            raise CommandError(f"Not a configured replica: {', '.join(sorted(unknown))}")
+
+        source = settings.DATABASES[DEFAULT_DB_ALIAS]['NAME']
+        while True:
+            for alias in aliases:
+                start = time.perf_counter()
+                snapshot_at = replicas.replicate(source, settings.DATABASES[alias]['NAME'])
+                replicas.record_replication(alias, snapshot_at)
+                self.stdout.write(
+                    f"{alias}: copied in {(time.perf_counter() - start) * 1000:.0f}ms"
+                )
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,63 @@
+"""
+Run background jobs 🧰
+
+Usage:
+    python manage.py runworker                  # Run jobs until stopped (Ctrl+C)
+    python manage.py runworker --threads 8      # 8 jobs at a time
+    python manage.py runworker --burst          # Run what is due, then exit
+    python manage.py runworker --stats          # Show queue depth and latency
+
+Jobs are queued by the website (see main_app/jobs.py). Start one or more
+workers next to the web server; they share the queue safely. Stopping a
+worker (Ctrl+C or SIGTERM) lets its running jobs finish first.
+"""
+
+import json  # For --stats --json
+import signal  # Stop cleanly on SIGTERM
+
+from django.core.management.base import BaseCommand  # Base class for commands
+
+from main_app import jobs
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=None,
+                            help='Jobs run at the same time (default settings.JOBS THREADS)')
+        parser.add_argument('--burst', action='store_true',
+                            help='Exit once no job is due')
+        parser.add_argument('--stats', action='store_true',
+                            help='Print queue depth and latency, run nothing')
+        parser.add_argument('--json', action='store_true', help='With --stats: print JSON')
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.print_stats(options['json'])
+            return
+
+        worker = jobs.Worker(threads=options['threads'])
+        # Finish running jobs on Ctrl+C / SIGTERM instead of dying mid-job 🛑
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: worker.stop())
+
+        self.stdout.write(f"Worker {worker.worker_id} running with {worker.threads} threads")
+        outcomes = worker.run(burst=options['burst'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Stopped: {outcomes['done']} done, {outcomes['queued']} to retry, {outcomes['failed']} failed"
+        ))
+
+    def print_stats(self, as_json):
+        stats = jobs.queue_stats()
+        if as_json:
+            self.stdout.write(json.dumps(stats, indent=2))
+            return
+        self.stdout.write(
+            f"Queue depth: {stats['depth']} due (oldest waiting {stats['oldest_wait']:.1f}s), "
+            f"{stats['scheduled']} scheduled, {stats['running']} running, {stats['failed']} failed"
+        )
+        self.stdout.write(f"Finished in the last hour: {stats['finished']}")
+        self.stdout.write(f"{'seconds':<8} {'p50':>8} {'p95':>8}")
+        for key, label in (('wait', 'waiting'), ('run', 'running'), ('total', 'total')):
+            self.stdout.write(f"{label:<8} {stats[key + '_p50']:>8.2f} {stats[key + '_p95']:>8.2f}")
@@ -0,0 +1,50 @@
+"""
+Self-host Bootstrap and Font Awesome, trimmed to what we use 📦
+
+Usage:
+    python manage.py vendor_assets
+    python manage.py vendor_assets --source ~/Downloads/assets   # Offline: files by name
+
+Downloads Bootstrap's CSS and JavaScript and Font Awesome's CSS and fonts
+into static/vendor/, drops the CSS rules for classes our templates never
+use and cuts the icon fonts down to our icons (see main_app/assets.py).
+Run it again after using a new Bootstrap class or icon, then
+collectstatic. Templates switch from the CDN to these files by themselves.
+
+--source is a folder with the CDN files under their own names:
+bootstrap.min.css, bootstrap.bundle.min.js, all.min.css and the fonts
+(fa-solid-900.woff2, fa-regular-400.woff2, fa-brands-400.woff2...).
+"""
+
+import time  # Timing
+
+from django.core.management.base import BaseCommand, CommandError  # Base class for commands
+
+from main_app import assets
+
+
+class Command(BaseCommand):
+    help = "Vendor Bootstrap and Font Awesome into static/, purged and subset to what the templates use"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source',
+                            help='Read the CDN files from this folder instead of downloading them')
+
+    def handle(self, *args, **options):
+        if assets.font_subset is None:
+            self.stderr.write("fontTools/brotli not installed: icon fonts are copied whole "
+                              "(pip install fonttools brotli to subset them)")
+
+        start = time.perf_counter()
+        try:
+            report = assets.vendor_all(options['source'])
+        except OSError as error:
+            raise CommandError(f"Could not get the assets: {error}")
+
+        for name, before, after in report:
+            self.stdout.write(f"{name:<45} {before / 1024:>8.1f} KB -> {after / 1024:>7.1f} KB")
+        before, after = sum(row[1] for row in report), sum(row[2] for row in report)
+        self.stdout.write(self.style.SUCCESS(
+            f"Vendored {before / 1024:.0f} KB as {after / 1024:.0f} KB into "
+            f"{assets.options()['ROOT']} in {time.perf_counter() - start:.1f}s"
+        ))
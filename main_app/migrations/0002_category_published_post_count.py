@@ -0,0 +1,35 @@
+# Generated by Django 5.2.4 on 2026-10-17 01:47
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_published_post_count(apps, schema_editor):
+    """Compute the new counter for existing categories in one UPDATE"""
+    Category = apps.get_model('main_app', 'Category')
+    published = (
+        Category.posts.through.objects
+        .filter(category=OuterRef('pk'), blogpost__status='published')
+        .order_by()
+        .values('category')
+        .annotate(total=Count('*'))
+        .values('total')
+    )
+    Category.objects.update(published_post_count=Coalesce(Subquery(published), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='published_post_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of published posts in this category'),
+        ),
+        migrations.RunPython(fill_published_post_count, migrations.RunPython.noop),
+    ]
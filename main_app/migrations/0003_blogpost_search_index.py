@@ -0,0 +1,41 @@
+# Full-text search index for BlogPost (SQLite FTS5, see main_app/search.py)
+
+from django.db import migrations
+
+FTS_TABLE = 'main_app_blogpost_fts'
+
+
+def create_search_index(apps, schema_editor):
+    """Create the FTS5 table, set the ranking weights and index existing posts"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return  # main_app.search falls back to icontains elsewhere
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        f"title, excerpt, content, author, "
+        f"tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+    # Default ORDER BY rank: title matches weigh most, then excerpt, author, content
+    schema_editor.execute(
+        f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rank) VALUES ('rank', 'bm25(10.0, 5.0, 1.0, 2.0)')"
+    )
+    schema_editor.execute(
+        f"INSERT INTO {FTS_TABLE} (rowid, title, excerpt, content, author) "
+        f"SELECT p.id, p.title, p.excerpt, p.content, u.username "
+        f"FROM main_app_blogpost p JOIN auth_user u ON u.id = p.author_id"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_app', '0002_category_published_post_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
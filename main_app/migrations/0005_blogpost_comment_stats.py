@@ -0,0 +1,37 @@
+# Generated by Django 5.2.4 on 2026-10-17 02:31
+
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_comment_stats(apps, schema_editor):
+    """Compute the new comment stats for existing posts in one UPDATE"""
+    BlogPost = apps.get_model('main_app', 'BlogPost')
+    Comment = apps.get_model('main_app', 'Comment')
+    approved = Comment.objects.filter(post=OuterRef('pk'), is_approved=True).order_by().values('post')
+    BlogPost.objects.update(
+        comment_count=Coalesce(Subquery(approved.annotate(total=Count('*')).values('total')), 0),
+        last_comment_at=Subquery(approved.annotate(newest=Max('created_at')).values('newest')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_app', '0004_export_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of approved comments on this post'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='last_comment_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='When the newest approved comment was posted', null=True),
+        ),
+        migrations.RunPython(fill_comment_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.4 on 2026-10-17 02:43
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_app', '0006_contactmessage_submission_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Name of the registered job function', max_length=100)),
+                ('payload', models.JSONField(blank=True, default=dict, help_text="Arguments for the job function ({'args': [...], 'kwargs': {...}})")),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', help_text='Where this job is in its life', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0, help_text='How many times a worker has started this job')),
+                ('max_attempts', models.PositiveIntegerField(default=5, help_text='Give up after this many attempts')),
+                ('last_error', models.TextField(blank=True, help_text='Traceback of the last failed attempt')),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now, help_text="Don't run before this time (later for retries)")),
+                ('locked_by', models.CharField(blank=True, help_text='Worker running this job', max_length=100)),
+                ('locked_until', models.DateTimeField(blank=True, help_text='Another worker may take the job over after this time', null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, editable=False, help_text='When this job was queued')),
+                ('started_at', models.DateTimeField(blank=True, help_text='When the latest attempt started', null=True)),
+                ('finished_at', models.DateTimeField(blank=True, help_text='When the job finished (or failed for good)', null=True)),
+            ],
+            options={
+                'verbose_name': 'Job',
+                'verbose_name_plural': 'Jobs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'run_at'], name='main_app_jo_status_02ed52_idx'), models.Index(fields=['status', 'finished_at'], name='main_app_jo_status_f622e5_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-17 02:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_app', '0007_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='picture_digest',
+            field=models.CharField(blank=True, editable=False, help_text='Content hash of the profile picture (names its thumbnails)', max_length=64),
+        ),
+    ]
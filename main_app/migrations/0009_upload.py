@@ -0,0 +1,39 @@
+# Generated by Django 5.2.4 on 2026-10-17 02:53
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_app', '0008_userprofile_picture_digest'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Upload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('purpose', models.CharField(choices=[('profile_picture', 'Profile picture'), ('media', 'Media file')], help_text='What the file is for', max_length=20)),
+                ('filename', models.CharField(help_text="Name of the file on the uploader's computer", max_length=255)),
+                ('file', models.FileField(help_text='Where the bytes are written', max_length=255, upload_to='')),
+                ('size', models.PositiveBigIntegerField(help_text='Total size in bytes, announced when the upload starts')),
+                ('offset', models.PositiveBigIntegerField(default=0, help_text='Bytes received and checked so far')),
+                ('sha256', models.CharField(blank=True, help_text='SHA-256 of the whole file (announced, then checked)', max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='When the last chunk arrived')),
+                ('completed_at', models.DateTimeField(blank=True, help_text='When the last byte arrived and the file was checked', null=True)),
+                ('user', models.ForeignKey(help_text='Who is uploading', on_delete=django.db.models.deletion.CASCADE, related_name='uploads', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Upload',
+                'verbose_name_plural': 'Uploads',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['completed_at', 'updated_at'], name='main_app_up_complet_8d77b1_idx')],
+            },
+        ),
+    ]
@@ -11,11 +11,20 @@ Think of models as the FILING CABINET organizer for your website's data!
 """
 
 # Import necessary Django components 📦
-from django.db import models  # The base model class
+from django.db import models, router, transaction  # The base model class, atomic recounts
+from django.db.models import Count, F, Max, OuterRef, Subquery, Value  # For set-based recounts
+from django.db.models.functions import Coalesce, Greatest  # Turn "no rows" into 0, pick the newest
 from django.contrib.auth.models import User  # Built-in user model
 from django.urls import reverse  # For generating URLs
 from django.utils import timezone  # For timezone-aware dates
 import logging  # For logging
+import uuid  # Upload ids
+
+from PIL import Image  # Pillow errors for unreadable pictures
+
+from . import thumbnails  # Profile picture thumbnails
+from .counters import view_counter  # Buffered (write-behind) view counter
+from simple_django_framework.write_queue import write_queue  # Serialized database writes
 
 # Get a logger for this app 📝
 logger = logging.getLogger('main_app')
@@ -63,6 +72,16 @@ class UserProfile(models.Model):
         help_text="Your personal website (optional)"
     )
     
+    # SHA-256 of the profile picture's contents 🔑
+    # Thumbnails are named after it (see main_app/thumbnails.py); empty
+    # until they have been made.
+    picture_digest = models.CharField(
+        max_length=64,
+        blank=True,
+        editable=False,
+        help_text="Content hash of the profile picture (names its thumbnails)"
+    )
+    
     # Timestamps - when was this created/updated? 📅
     created_at = models.DateTimeField(
         auto_now_add=True,  # Automatically set when profile is created
@@ -108,6 +127,58 @@ class UserProfile(models.Model):
         """
         return reverse('profile_detail', kwargs={'pk': self.pk})
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember which picture a profile had when it was loaded 🧠"""
+        instance = super().from_db(db, field_names, values)
+        if 'profile_picture' in field_names:
+            instance._loaded_picture = instance.profile_picture.name
+        return instance
+    
+    def _picture_changed(self):
+        """Is profile_picture different from when the profile was loaded? 🔍"""
+        if self._state.adding:
+            return True
+        if 'profile_picture' in self.get_deferred_fields():
+            return False  # Loaded without it (.only()/.defer()), so not touched
+        return self.profile_picture.name != getattr(self, '_loaded_picture', None)
+    
+    def ensure_thumbnails(self):
+        """
+        Make sure the thumbnails of the profile picture exist 🖼️
+        
+        Makes the missing ones (and stores the picture's digest) if needed:
+        normally a background job has already done that after the upload.
+        
+        Returns:
+            str: The picture's digest, or '' if there is no (readable) picture
+        """
+        if not self.profile_picture:
+            return ''
+        if self.picture_digest and thumbnails.derivatives_exist(self.picture_digest):
+            return self.picture_digest  # The usual case: a few stat() calls
+        try:
+            digest, written = thumbnails.make_derivatives(self.profile_picture.path)
+        except (OSError, Image.DecompressionBombError) as error:
+            logger.warning(f"Could not make thumbnails for {self}: {error}")
+            return ''
+        if written:
+            logger.info(f"Made {written} thumbnails for {self}")
+        if digest != self.picture_digest:
+            self.picture_digest = digest
+            write_queue.run(UserProfile.objects.filter(pk=self.pk).update, picture_digest=digest)
+        return digest
+    
+    def picture_sources(self, display_size=50):
+        """
+        Thumbnail URLs for showing the picture at ``display_size`` pixels 🖼️
+        
+        Returns:
+            list: Dicts with type, src and srcset, one per format ([] if no picture)
+        """
+        digest = self.ensure_thumbnails()
+        return thumbnails.sources(digest, display_size) if digest else []
+    
     def save(self, *args, **kwargs):
         """
         Custom save method 💾
@@ -125,8 +196,20 @@ class UserProfile(models.Model):
         else:  # If this is a new profile (creating)
             logger.info(f"Creating new profile for user: {self.user.username}")
         
+        # A new picture gets new thumbnails (the old ones belong to the old picture) 🖼️
+        new_picture = self._picture_changed()
+        if new_picture:
+            self.picture_digest = ''
+        
         # Call the parent save method to actually save to database 💾
-        super().save(*args, **kwargs)
+        # (through the write queue, so concurrent saves don't fight over the lock)
+        write_queue.run(super().save, *args, **kwargs)
+        self._loaded_picture = self.profile_picture.name
+        
+        if new_picture and self.profile_picture:
+            # Resize in a worker, not while the visitor waits 🧰
+            from .jobs import enqueue, make_profile_thumbnails  # Imported here: jobs imports models
+            enqueue(make_profile_thumbnails, self.pk)
 
 class BlogPost(models.Model):
     """
@@ -213,6 +296,24 @@ class BlogPost(models.Model):
         help_text="When this post was published"
     )
     
+    # Stored comment stats 💬
+    # Kept up to date by the signal handlers in main_app/signals.py (and the
+    # Comment queryset/delete methods below), so listing posts never has to
+    # COUNT comments. Fix drift with:
+    #     python manage.py reconcile_post_counts
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,  # Maintained automatically, not by hand
+        help_text="Number of approved comments on this post"
+    )
+    
+    last_comment_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="When the newest approved comment was posted"
+    )
+    
     class Meta:
         """Metadata for BlogPost model"""
         verbose_name = "Blog Post"
@@ -221,15 +322,30 @@ class BlogPost(models.Model):
         indexes = [
             models.Index(fields=['status', 'created_at']),  # Database index for faster queries
             models.Index(fields=['author', 'status']),      # Another useful index
+            models.Index(fields=['status', 'updated_at']),  # Exports filtered by status
+            models.Index(fields=['updated_at']),            # Exports of every status
         ]
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Remember the status a post had when it was loaded 🧠
+        
+        The signal handlers in main_app/signals.py compare it with the status
+        at save time to spot draft -> published (and back) transitions.
+        """
+        instance = super().from_db(db, field_names, values)
+        if 'status' in field_names:
+            instance._loaded_status = instance.status
+        return instance
+    
     def __str__(self):
         """String representation"""
         return f"{self.title} by {self.author.username}"
     
     def get_absolute_url(self):
         """Get URL for this post"""
-        return reverse('blog_post_detail', kwargs={'slug': self.slug})
+        return reverse('main_app:blog_post_detail', kwargs={'slug': self.slug})
     
     def save(self, *args, **kwargs):
         """Custom save method"""
@@ -252,10 +368,96 @@ class BlogPost(models.Model):
         Increment the view count for this post 👁️
         
         Call this method when someone views the post.
+        
+        The increment is buffered in memory and written later as an atomic
+        ``view_count = view_count + n`` UPDATE (see main_app/counters.py),
+        so a page view never has to wait for a database write.
         """
-        self.view_count += 1  # Add 1 to view count
-        self.save(update_fields=['view_count'])  # Only update view_count field
+        view_counter.add(self.pk)  # Queue the increment for the next flush
+        self.view_count += 1  # Keep this instance in step for display
         logger.debug(f"View count incremented for post: {self.title}")
+    
+    async def aincrement_view_count(self):
+        """Async version of increment_view_count() for async views ⚡"""
+        await view_counter.aadd(self.pk)
+        self.view_count += 1
+    
+    @classmethod
+    def add_comment_stats(cls, post_id, created_at):
+        """
+        Count one more approved comment on a post, posted at ``created_at`` ➕
+        
+        One UPDATE, no COUNT. updated_at is bumped because the post's pages
+        show the count (ETags and exports go by updated_at).
+        """
+        return cls.objects.filter(pk=post_id).update(
+            comment_count=F('comment_count') + 1,
+            last_comment_at=Greatest(Coalesce('last_comment_at', Value(created_at)), Value(created_at)),
+            updated_at=timezone.now(),
+        )
+    
+    @classmethod
+    def refresh_comment_stats(cls, posts=None):
+        """
+        Recompute comment_count and last_comment_at from scratch with ONE UPDATE 🔄
+        
+        Used when a comment is unapproved, moved or deleted (the newest
+        comment may be gone, so we can't just subtract), after bulk changes
+        and by the reconcile_post_counts command.
+        
+        Args:
+            posts: BlogPost ids (list or values queryset) to refresh,
+                   or None to refresh every post
+        
+        Returns:
+            int: Number of posts updated
+        """
+        queryset = cls.objects.all()
+        if posts is not None:
+            queryset = queryset.filter(pk__in=posts)
+        
+        # COUNT and MAX(created_at) of approved comments per post, as
+        # correlated subqueries answered from the (post, created_at) index
+        approved = Comment.objects.filter(post=OuterRef('pk'), is_approved=True).order_by().values('post')
+        return queryset.update(
+            comment_count=Coalesce(Subquery(approved.annotate(total=Count('*')).values('total')), 0),
+            last_comment_at=Subquery(approved.annotate(newest=Max('created_at')).values('newest')),
+            updated_at=timezone.now(),
+        )
+
+class CommentQuerySet(models.QuerySet):
+    """
+    Comment queries that keep BlogPost comment stats correct 💬
+    
+    queryset.update() skips save() and the signal handlers, so bulk changes
+    of approval go through set_approved() instead. (queryset.delete() does
+    send post_delete, see main_app/signals.py.)
+    """
+    
+    def _approved_post_ids(self, approved=True):
+        return list(self.filter(is_approved=approved).order_by().values_list('post_id', flat=True).distinct())
+    
+    def set_approved(self, approved):
+        """
+        Approve (or unapprove) every comment in the queryset ✅
+        
+        Only the posts of comments whose approval really changes are
+        recounted.
+        
+        Args:
+            approved: True to approve, False to unapprove
+        
+        Returns:
+            int: Number of comments updated
+        """
+        # self.db would be the read-only connection: the transaction (and the
+        # reads inside it) must be on the database we write to ✍️
+        with transaction.atomic(using=self._db or router.db_for_write(self.model)):
+            post_ids = self._approved_post_ids(not approved)
+            updated = self.update(is_approved=approved, updated_at=timezone.now())
+            if post_ids:
+                BlogPost.refresh_comment_stats(post_ids)
+        return updated
 
 class Comment(models.Model):
     """
@@ -303,6 +505,8 @@ class Comment(models.Model):
         help_text="When this comment was last edited"
     )
     
+    objects = CommentQuerySet.as_manager()  # Bulk changes keep post stats right
+    
     class Meta:
         """Metadata for Comment model"""
         verbose_name = "Comment"
@@ -310,8 +514,22 @@ class Comment(models.Model):
         ordering = ['created_at']  # Oldest comments first (chronological order)
         indexes = [
             models.Index(fields=['post', 'created_at']),  # For fast comment loading
+            models.Index(fields=['updated_at']),  # For exports (changed since ...)
         ]
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Remember the post and approval a comment had when it was loaded 🧠
+        
+        The signal handlers in main_app/signals.py compare them with the
+        values at save time to adjust the post's comment stats.
+        """
+        instance = super().from_db(db, field_names, values)
+        if 'is_approved' in field_names and 'post_id' in field_names:
+            instance._loaded_state = (instance.post_id, instance.is_approved)
+        return instance
+    
     def __str__(self):
         """String representation"""
         return f"Comment by {self.author.username} on {self.post.title}"
@@ -324,8 +542,14 @@ class Comment(models.Model):
         else:
             logger.info(f"New comment by {self.author.username} on post: {self.post.title}")
         
-        # Call parent save method
-        super().save(*args, **kwargs)
+        # Call parent save method (through the write queue) ✍️
+        write_queue.run(super().save, *args, **kwargs)
+    
+    def delete(self, *args, **kwargs):
+        """Delete the comment (through the write queue) 🗑️"""
+        # The post's stats are recounted by a signal handler (main_app/signals.py),
+        # which also covers comments deleted along with their author
+        return write_queue.run(super().delete, *args, **kwargs)
 
 class ContactMessage(models.Model):
     """
@@ -371,8 +595,12 @@ class ContactMessage(models.Model):
     )
     
     # Timestamps 📅
+    # A default instead of auto_now_add: messages from the contact form are
+    # stored a little later, in batches (see main_app/contact_spool.py), and
+    # keep the time they were actually sent.
     created_at = models.DateTimeField(
-        auto_now_add=True,
+        default=timezone.now,
+        editable=False,
         help_text="When this message was received"
     )
     
@@ -382,6 +610,16 @@ class ContactMessage(models.Model):
         help_text="When this message was resolved"
     )
     
+    # Unique id given to a contact form submission when it is spooled 🆔
+    # Replaying a spool file after a crash skips rows already stored.
+    submission_id = models.UUIDField(
+        null=True,
+        blank=True,
+        unique=True,
+        editable=False,
+        help_text="Id of the contact form submission (if it came from one)"
+    )
+    
     class Meta:
         """Metadata for ContactMessage model"""
         verbose_name = "Contact Message"
@@ -396,11 +634,17 @@ class ContactMessage(models.Model):
         """
         Mark this message as resolved ✅
         
-        Call this method when you've handled the message.
+        Call this method when you've handled the message. The sender is
+        told by email from a background job (main_app/jobs.py), so this
+        returns without waiting for the mail server.
         """
+        from .jobs import enqueue, send_resolved_emails  # Imported here: jobs imports models
+        
         self.status = 'resolved'
         self.resolved_at = timezone.now()
-        self.save()
+        with transaction.atomic():
+            self.save()
+            enqueue(send_resolved_emails, [self.pk])
         logger.info(f"Marked contact message as resolved: {self.subject}")
 
 # Example of a more advanced model with custom methods
@@ -438,6 +682,16 @@ class Category(models.Model):
         help_text="Blog posts in this category"
     )
     
+    # Stored count of published posts 📊
+    # Kept up to date by the signal handlers in main_app/signals.py, so listing
+    # categories never has to COUNT posts. Fix drift with:
+    #     python manage.py reconcile_post_counts
+    published_post_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,  # Maintained automatically, not by hand
+        help_text="Number of published posts in this category"
+    )
+    
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -452,11 +706,242 @@ class Category(models.Model):
         """
         Get the number of published posts in this category 📊
         
+        This reads the stored counter, so it costs no extra query.
+        
         Returns:
             int: Number of published posts
         """
-        return self.posts.filter(status='published').count()
+        return self.published_post_count
+    
+    @classmethod
+    def refresh_published_counts(cls, categories=None):
+        """
+        Recompute published_post_count from scratch with ONE UPDATE 🔄
+        
+        Used after bulk changes that bypass signals (queryset.update()) and
+        by the reconcile_post_counts command.
+        
+        Args:
+            categories: Category ids (list or values queryset) to refresh,
+                        or None to refresh every category
+        
+        Returns:
+            int: Number of categories updated
+        """
+        queryset = cls.objects.all()
+        if categories is not None:
+            queryset = queryset.filter(pk__in=categories)
+        
+        # COUNT of published posts per category, as a correlated subquery
+        published = (
+            cls.posts.through.objects
+            .filter(category=OuterRef('pk'), blogpost__status='published')
+            .order_by()
+            .values('category')
+            .annotate(total=Count('*'))
+            .values('total')
+        )
+        return queryset.update(
+            published_post_count=Coalesce(Subquery(published), 0)
+        )
     
     def get_absolute_url(self):
         """Get URL for this category"""
-        return reverse('category_detail', kwargs={'slug': self.slug})
+        return reverse('main_app:category_detail', kwargs={'slug': self.slug})
+
+class Job(models.Model):
+    """
+    Background job model 🧰
+    
+    One row per piece of slow work (sending an email, resizing an image...)
+    that a request handed over instead of doing it itself. Worker processes
+    (python manage.py runworker) pick the rows up and run them.
+    See main_app/jobs.py for how jobs are queued, claimed and retried.
+    """
+    
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),    # Waiting for a worker (maybe for a retry)
+        ('running', 'Running'),  # Claimed by a worker
+        ('done', 'Done'),        # Finished without errors
+        ('failed', 'Failed'),    # Gave up after max_attempts
+    ]
+    
+    # What to run 🏷️
+    name = models.CharField(
+        max_length=100,
+        help_text="Name of the registered job function"
+    )
+    
+    payload = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Arguments for the job function ({'args': [...], 'kwargs': {...}})"
+    )
+    
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default='queued',
+        help_text="Where this job is in its life"
+    )
+    
+    # Retries 🔁
+    attempts = models.PositiveIntegerField(
+        default=0,
+        help_text="How many times a worker has started this job"
+    )
+    
+    max_attempts = models.PositiveIntegerField(
+        default=5,
+        help_text="Give up after this many attempts"
+    )
+    
+    last_error = models.TextField(
+        blank=True,
+        help_text="Traceback of the last failed attempt"
+    )
+    
+    # Scheduling and claiming ⏰
+    run_at = models.DateTimeField(
+        default=timezone.now,
+        help_text="Don't run before this time (later for retries)"
+    )
+    
+    locked_by = models.CharField(
+        max_length=100,
+        blank=True,
+        help_text="Worker running this job"
+    )
+    
+    # The "visibility timeout": a running job whose worker died becomes
+    # available again once this time has passed 👻
+    locked_until = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Another worker may take the job over after this time"
+    )
+    
+    # Timestamps 📅
+    created_at = models.DateTimeField(
+        default=timezone.now,
+        editable=False,
+        help_text="When this job was queued"
+    )
+    
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the latest attempt started"
+    )
+    
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the job finished (or failed for good)"
+    )
+    
+    class Meta:
+        """Metadata for Job model"""
+        verbose_name = "Job"
+        verbose_name_plural = "Jobs"
+        ordering = ['-created_at']  # Newest jobs first
+        indexes = [
+            models.Index(fields=['status', 'run_at']),  # Workers looking for due jobs
+            models.Index(fields=['status', 'finished_at']),  # Latency stats and pruning
+        ]
+    
+    def __str__(self):
+        """String representation"""
+        return f"{self.name} #{self.pk} ({self.status})"
+
+class Upload(models.Model):
+    """
+    Chunked upload model 📤
+    
+    One row per file being uploaded in pieces through /api/uploads/. The
+    bytes go straight into ``file`` (its final place under MEDIA_ROOT);
+    ``offset`` counts how many of them have arrived and been checked, so an
+    interrupted upload can carry on from there. See main_app/uploads.py.
+    """
+    
+    PURPOSE_CHOICES = [
+        ('profile_picture', 'Profile picture'),  # Becomes the uploader's profile picture
+        ('media', 'Media file'),                 # Any other file
+    ]
+    
+    # Random id: upload URLs can't be guessed 🎲
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False
+    )
+    
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='uploads',
+        help_text="Who is uploading"
+    )
+    
+    purpose = models.CharField(
+        max_length=20,
+        choices=PURPOSE_CHOICES,
+        help_text="What the file is for"
+    )
+    
+    filename = models.CharField(
+        max_length=255,
+        help_text="Name of the file on the uploader's computer"
+    )
+    
+    file = models.FileField(
+        max_length=255,
+        help_text="Where the bytes are written"
+    )
+    
+    size = models.PositiveBigIntegerField(
+        help_text="Total size in bytes, announced when the upload starts"
+    )
+    
+    offset = models.PositiveBigIntegerField(
+        default=0,
+        help_text="Bytes received and checked so far"
+    )
+    
+    sha256 = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="SHA-256 of the whole file (announced, then checked)"
+    )
+    
+    # Timestamps 📅
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        help_text="When the last chunk arrived"
+    )
+    
+    completed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the last byte arrived and the file was checked"
+    )
+    
+    class Meta:
+        """Metadata for Upload model"""
+        verbose_name = "Upload"
+        verbose_name_plural = "Uploads"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['completed_at', 'updated_at']),  # Finding abandoned uploads
+        ]
+    
+    def __str__(self):
+        """String representation"""
+        return f"{self.filename} ({self.offset}/{self.size} bytes)"
+    
+    @property
+    def is_complete(self):
+        """Has the whole file arrived? ✅"""
+        return self.completed_at is not None
@@ -0,0 +1,150 @@
+"""
+Keyset (cursor) pagination for main_app
+
+What is keyset pagination? 📑
+Normal pagination says "skip the first 10000 posts, then give me 10"
+(LIMIT 10 OFFSET 10000). The database still has to walk past those 10000
+rows, so page 1000 is MUCH slower than page 1.
+
+Keyset pagination remembers WHERE the last page ended instead:
+"give me 10 posts older than (created_at, id) of the last post I saw".
+With an index on created_at the database jumps straight there, so every
+page costs the same. New posts showing up at the top don't shift later
+pages around either, because we never count rows.
+
+The position is handed to the client as an opaque, signed CURSOR string,
+so nobody can tamper with it (or depend on what's inside).
+"""
+
+# Import necessary Django components 📦
+from datetime import datetime  # Decode cursor timestamps
+
+from django.core import signing  # Tamper-proof cursor strings
+from django.db.models import Q  # OR conditions
+
+# Page size limits ⚙️
+DEFAULT_PAGE_SIZE = 10  # Items per page when the client doesn't say
+MAX_PAGE_SIZE = 100  # Never return more than this per page
+
+# Salt keeps our cursors from being valid signatures anywhere else 🧂
+CURSOR_SALT = 'main_app.pagination.cursor'
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor string is corrupt, tampered with or malformed 🚫"""
+
+
+def encode_cursor(created_at, pk):
+    """
+    Turn a (created_at, id) position into an opaque cursor string 🔐
+
+    Args:
+        created_at: The created_at of the last item on the page
+        pk: The id of the last item on the page
+
+    Returns:
+        str: URL-safe signed cursor
+    """
+    return signing.dumps([created_at.isoformat(), pk], salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(cursor):
+    """
+    Turn a cursor string back into a (created_at, id) position 🔓
+
+    Args:
+        cursor: A string made by encode_cursor()
+
+    Returns:
+        tuple: (created_at datetime, id)
+
+    Raises:
+        InvalidCursor: If the cursor was not made by us or is malformed
+    """
+    try:
+        created_at, pk = signing.loads(cursor, salt=CURSOR_SALT)
+        return datetime.fromisoformat(created_at), int(pk)
+    except (signing.BadSignature, ValueError, TypeError) as error:
+        raise InvalidCursor("Invalid pagination cursor") from error
+
+
+def parse_page_size(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """
+    Read a ?limit= value, falling back to the default and capping it 📏
+
+    Returns:
+        int: A page size between 1 and ``maximum``
+    """
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(size, maximum))
+
+
+def _page_queryset(queryset, cursor, page_size, oldest_first=False):
+    """Order, seek past ``cursor`` and limit (one row extra) 🔍"""
+    if oldest_first:
+        queryset = queryset.order_by('created_at', 'id')
+    else:
+        queryset = queryset.order_by('-created_at', '-id')
+
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        # "Older (or newer) than the last item we showed" 👇
+        # The extra created_at__lte/__gte is redundant for the result, but it
+        # gives the database a RANGE to seek to in the (status, created_at)
+        # or (post, created_at) index instead of scanning from the first
+        # item every time.
+        if oldest_first:
+            queryset = queryset.filter(
+                Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk),
+                created_at__gte=created_at,
+            )
+        else:
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk),
+                created_at__lte=created_at,
+            )
+
+    # Ask for one extra row to find out whether there is a next page
+    return queryset[:page_size + 1]
+
+
+def _split_page(items, page_size):
+    """Drop the extra row and make the next cursor from the last item ✂️"""
+    if len(items) <= page_size:
+        return items, None
+
+    items = items[:page_size]
+    last = items[-1]
+    return items, encode_cursor(last.created_at, last.pk)
+
+
+def keyset_page(queryset, cursor=None, page_size=DEFAULT_PAGE_SIZE, oldest_first=False):
+    """
+    Fetch one page of ``queryset``, newest first, starting after ``cursor`` 📄
+
+    The queryset is ordered by (-created_at, -id); id breaks ties between
+    items created in the same microsecond so nothing is skipped or repeated.
+
+    Args:
+        queryset: Any queryset of a model with created_at and id
+        cursor: Cursor from the previous page (None for the first page)
+        page_size: Number of items per page
+        oldest_first: Order by (created_at, id) instead, e.g. for comments
+
+    Returns:
+        tuple: (list of items, cursor for the next page or None on the last page)
+
+    Raises:
+        InvalidCursor: If ``cursor`` can't be decoded
+    """
+    items = list(_page_queryset(queryset, cursor, page_size, oldest_first))
+    return _split_page(items, page_size)
+
+
+async def akeyset_page(queryset, cursor=None, page_size=DEFAULT_PAGE_SIZE, oldest_first=False):
+    """Async version of keyset_page() for async views ⚡"""
+    items = [item async for item in _page_queryset(queryset, cursor, page_size, oldest_first)]
+    return _split_page(items, page_size)
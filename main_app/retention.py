@@ -0,0 +1,228 @@
+"""
+Data retention for main_app
+
+What is this file? 🧹
+Some rows are only useful for a while: expired sessions, contact messages
+marked as spam, messages that were resolved months ago, background jobs
+that finished long ago, uploads nobody finished. Nothing deleted them, so those tables kept growing
+forever (and every query on them got slower).
+
+Each RETENTION POLICY says which rows of one model may go, for example
+"spam older than 7 days". delete_in_batches() then removes them in SMALL
+batches of primary keys, each in its own short transaction, and sleeps a
+little in between. SQLite only has one write lock for the whole database,
+so short transactions mean requests that want to write never wait long.
+
+Run it with:  python manage.py prune_data
+The age limits live in settings.DATA_RETENTION.
+"""
+
+# Import necessary components 📦
+import logging  # For logging
+import time  # Timing and sleeping between batches
+from contextlib import contextmanager  # The write transaction helper
+from datetime import timedelta  # Age limits
+
+from django.conf import settings  # settings.DATA_RETENTION
+from django.contrib.sessions.models import Session  # Django's session table
+from django.db import DEFAULT_DB_ALIAS, connections, transaction  # Short transactions
+from django.db.models import Q  # Complex filters
+from django.utils import timezone  # Current time
+
+from .models import ContactMessage, Job, Upload
+
+# Get a logger for this app 📝
+logger = logging.getLogger('main_app')
+
+# Default batch settings ⚙️
+DEFAULT_BATCH_SIZE = 500  # Rows deleted per transaction
+DEFAULT_PAUSE = 0.05  # Seconds to sleep between batches
+
+# Default age limits in days (settings.DATA_RETENTION overrides them) 📅
+DEFAULT_RETENTION_DAYS = {
+    'spam_messages': 7,
+    'resolved_messages': 180,
+    'finished_jobs': 14,
+    'stale_uploads': 1,
+}
+
+
+def retention_days(name):
+    """How many days rows of policy ``name`` are kept 📅"""
+    days = getattr(settings, 'DATA_RETENTION', {})
+    return days.get(name, DEFAULT_RETENTION_DAYS[name])
+
+
+class RetentionPolicy:
+    """
+    Which rows of one model may be deleted 📜
+
+    Args:
+        name: Short name used on the command line
+        model: The model whose rows are removed
+        description: What the policy removes (for reports)
+        condition: Function (now) -> Q object selecting the rows to delete
+    """
+
+    def __init__(self, name, model, description, condition):
+        self.name = name
+        self.model = model
+        self.description = description
+        self.condition = condition
+
+    def queryset(self, now=None, using=DEFAULT_DB_ALIAS):
+        """The rows this policy would delete right now 🔍"""
+        return self.model._default_manager.using(using).filter(self.condition(now or timezone.now()))
+
+    def __repr__(self):
+        return f'<RetentionPolicy {self.name}>'
+
+
+def _expired_sessions(now):
+    return Q(expire_date__lt=now)
+
+
+def _spam_messages(now):
+    return Q(status='spam', created_at__lt=now - timedelta(days=retention_days('spam_messages')))
+
+
+def _resolved_messages(now):
+    cutoff = now - timedelta(days=retention_days('resolved_messages'))
+    # Old rows may have no resolved_at: fall back to when they arrived
+    return Q(status='resolved') & (
+        Q(resolved_at__lt=cutoff) | Q(resolved_at__isnull=True, created_at__lt=cutoff)
+    )
+
+
+def _finished_jobs(now):
+    cutoff = now - timedelta(days=retention_days('finished_jobs'))
+    return Q(status__in=['done', 'failed'], finished_at__lt=cutoff)
+
+
+def _stale_uploads(now):
+    # Unfinished and no chunk for a while: the uploader gave up
+    return Q(completed_at__isnull=True, updated_at__lt=now - timedelta(days=retention_days('stale_uploads')))
+
+
+# All policies, in the order they run 📋
+POLICIES = [
+    RetentionPolicy('expired_sessions', Session, "sessions past their expiry date", _expired_sessions),
+    RetentionPolicy('spam_messages', ContactMessage, "spam contact messages", _spam_messages),
+    RetentionPolicy('resolved_messages', ContactMessage, "long-resolved contact messages", _resolved_messages),
+    RetentionPolicy('finished_jobs', Job, "finished background jobs", _finished_jobs),
+    RetentionPolicy('stale_uploads', Upload, "abandoned chunked uploads", _stale_uploads),
+]
+
+
+def get_policy(name):
+    """Look up a policy by name (KeyError if unknown) 🔎"""
+    for policy in POLICIES:
+        if policy.name == name:
+            return policy
+    raise KeyError(name)
+
+
+@contextmanager
+def _write_transaction(using, table):
+    """
+    A transaction that holds the database write lock from its start ⏳
+
+    Yields how long getting the lock took. With transaction_mode IMMEDIATE
+    (our settings) SQLite takes the lock at BEGIN, so entering the block IS
+    the wait. Otherwise a write statement that matches nothing takes it.
+    Other databases lock row by row, so there is nothing to wait for.
+    """
+    connection = connections[using]
+    options = connection.settings_dict.get('OPTIONS', {})
+    locks_on_begin = (options.get('transaction_mode') or '').upper() in ('IMMEDIATE', 'EXCLUSIVE')
+    start = time.perf_counter()
+    with transaction.atomic(using=using):
+        if connection.vendor == 'sqlite' and not locks_on_begin:
+            with connection.cursor() as cursor:
+                cursor.execute(f'DELETE FROM {connection.ops.quote_name(table)} WHERE 0')
+        yield time.perf_counter() - start
+
+
+def pk_batches(queryset, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Split ``queryset`` into querysets of at most ``batch_size`` rows each,
+    by primary-key range 📦
+
+    Each batch is looked up only after the previous one was handled, so the
+    caller may change or delete the rows of a batch before asking for the
+    next one. The range filter keeps every statement on one short stretch
+    of the primary key (no huge IN (...) lists, no OFFSET).
+
+    Yields:
+        QuerySet: ``queryset`` limited to the next pk range
+    """
+    queryset = queryset.order_by()
+    last_pk = None
+    while True:
+        remaining = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        pks = list(remaining.order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return
+        yield queryset.filter(pk__gte=pks[0], pk__lte=pks[-1])
+        last_pk = pks[-1]
+
+
+def delete_in_batches(queryset, batch_size=DEFAULT_BATCH_SIZE, pause=DEFAULT_PAUSE,
+                      using=DEFAULT_DB_ALIAS):
+    """
+    Delete every row of ``queryset`` in primary-key ranges 🔪
+
+    Each round finds the next ``batch_size`` matching primary keys (a read,
+    no lock), then deletes that pk range in its own transaction and sleeps
+    ``pause`` seconds so other writers get a turn.
+
+    Args:
+        queryset: Rows to delete
+        batch_size: Rows per transaction
+        pause: Seconds to sleep between batches
+        using: Database alias
+
+    Returns:
+        dict: deleted, batches, seconds, rows_per_sec, lock_wait (total
+              seconds), max_lock_wait, max_lock_held (seconds)
+    """
+    queryset = queryset.using(using)
+    table = queryset.model._meta.db_table
+    stats = {'deleted': 0, 'batches': 0, 'lock_wait': 0.0, 'max_lock_wait': 0.0, 'max_lock_held': 0.0}
+    start = time.perf_counter()
+
+    for batch in pk_batches(queryset, batch_size):
+        if stats['batches']:
+            time.sleep(pause)  # Let other writers in between batches 😴
+
+        with _write_transaction(using, table) as waited:
+            locked_at = time.perf_counter()
+            _, per_model = batch.delete()
+        held = time.perf_counter() - locked_at
+
+        stats['deleted'] += per_model.get(queryset.model._meta.label, 0)
+        stats['batches'] += 1
+        stats['lock_wait'] += waited
+        stats['max_lock_wait'] = max(stats['max_lock_wait'], waited)
+        stats['max_lock_held'] = max(stats['max_lock_held'], held)
+
+    stats['seconds'] = time.perf_counter() - start
+    stats['rows_per_sec'] = stats['deleted'] / stats['seconds'] if stats['seconds'] else 0.0
+    return stats
+
+
+def apply_policy(policy, batch_size=DEFAULT_BATCH_SIZE, pause=DEFAULT_PAUSE, using=DEFAULT_DB_ALIAS):
+    """
+    Delete everything ``policy`` selects, in batches 🧹
+
+    Returns:
+        dict: Statistics from delete_in_batches() plus the policy name
+    """
+    stats = delete_in_batches(policy.queryset(using=using), batch_size, pause, using)
+    stats['policy'] = policy.name
+    if stats['deleted']:
+        logger.info(
+            f"Retention: deleted {stats['deleted']} {policy.description} "
+            f"in {stats['batches']} batches ({stats['rows_per_sec']:.0f} rows/s)"
+        )
+    return stats
@@ -0,0 +1,292 @@
+"""
+Full-text search for blog posts
+
+What is this file? 🔎
+Searching with ``title__icontains='django'`` becomes ``LIKE '%django%'``,
+and the database has to read EVERY post to answer it. Fine for 100 posts,
+painful for a million.
+
+SQLite ships with FTS5, a full-text search engine. We keep a search index
+(a "virtual table" called main_app_blogpost_fts) next to the blog post
+table. It works like the index at the back of a book: every word points to
+the posts that contain it, so a search only looks at matching posts.
+
+- main_app/signals.py keeps the index in sync when posts are saved/deleted
+- ``python manage.py rebuild_search_index`` rebuilds it from scratch
+  (needed after bulk_create() / queryset.update(), which skip signals)
+- search_posts() runs ranked searches (best match first) with snippets
+
+On databases other than SQLite we fall back to a simple icontains search.
+"""
+
+# Import necessary Django components 📦
+import re  # Split search text into words
+
+from django.contrib.auth.models import User  # Post authors
+from django.db import DEFAULT_DB_ALIAS, connections  # Raw SQL access
+from django.db.models import Q  # Fallback search
+from django.db.models.expressions import RawSQL  # Use the index inside ORM queries
+from django.utils.html import escape  # Make snippets safe for HTML
+from django.utils.safestring import mark_safe  # Snippets contain <mark> tags
+
+from .models import BlogPost
+
+# Name of the FTS5 table (created by migration 0003) 🗂️
+FTS_TABLE = 'main_app_blogpost_fts'
+
+# Markers SQLite puts around matched words in snippets. They are control
+# characters nobody types, so we can HTML-escape the snippet first and turn
+# the markers into <mark> tags afterwards.
+MATCH_START = '\x02'
+MATCH_END = '\x03'
+
+MAX_TERMS = 10  # Ignore words after the 10th
+SNIPPET_TOKENS = 16  # Words per snippet
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+# Databases (alias, name) known to have the search table ✅
+_available = set()
+
+
+def is_available(using=DEFAULT_DB_ALIAS):
+    """
+    Can this database use the FTS5 index? 🤔
+
+    Returns:
+        bool: True on SQLite when the search table exists
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return False
+    key = (using, connection.settings_dict['NAME'])
+    if key in _available:
+        return True
+    with connection.cursor() as cursor:
+        found = FTS_TABLE in connection.introspection.table_names(cursor)
+    if found:
+        _available.add(key)  # Only remember "yes": a later migrate can still add it
+    return found
+
+
+def build_match_query(text):
+    """
+    Turn what a user typed into a safe FTS5 query 🛡️
+
+    Every word must appear; the LAST word is a PREFIX search (the user may
+    still be typing it), so "django tut" finds posts containing "django"
+    AND a word starting with "tut". Earlier words are matched exactly:
+    a short prefix like "a*" can match most of the index, so we only pay
+    for that where it's useful. Quoting means FTS5 operators (AND, OR,
+    NEAR, *, ^, ...) typed by users are treated as plain words and can never
+    cause a syntax error.
+
+    Args:
+        text: The raw search text
+
+    Returns:
+        str: An FTS5 MATCH expression, or '' if there is nothing to search for
+    """
+    terms = [f'"{term}"' for term in _WORD.findall(text or '')[:MAX_TERMS]]
+    if terms:
+        terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def _index_sql():
+    """The INSERT that copies posts (plus author names) into the index 📝"""
+    post_table = BlogPost._meta.db_table
+    user_table = User._meta.db_table
+    return (
+        f'INSERT OR REPLACE INTO {FTS_TABLE} (rowid, title, excerpt, content, author) '
+        f'SELECT p.id, p.title, p.excerpt, p.content, u.username '
+        f'FROM {post_table} p JOIN {user_table} u ON u.id = p.author_id '
+    )
+
+
+def index_posts(post_ids, using=DEFAULT_DB_ALIAS):
+    """
+    Add or refresh posts in the search index (one statement) 📥
+
+    Args:
+        post_ids: Iterable of BlogPost ids
+        using: Database alias
+    """
+    post_ids = list(post_ids)
+    if not post_ids or not is_available(using):
+        return
+    placeholders = ', '.join(['%s'] * len(post_ids))
+    with connections[using].cursor() as cursor:
+        cursor.execute(_index_sql() + f'WHERE p.id IN ({placeholders})', post_ids)
+
+
+def remove_posts(post_ids, using=DEFAULT_DB_ALIAS):
+    """
+    Remove posts from the search index 🗑️
+
+    Args:
+        post_ids: Iterable of BlogPost ids
+        using: Database alias
+    """
+    post_ids = list(post_ids)
+    if not post_ids or not is_available(using):
+        return
+    placeholders = ', '.join(['%s'] * len(post_ids))
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})', post_ids)
+
+
+def rename_author(user_id, username, using=DEFAULT_DB_ALIAS):
+    """
+    Update the author name of every indexed post by one user ✏️
+
+    Args:
+        user_id: The author's id
+        username: The new username
+        using: Database alias
+    """
+    if not is_available(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {FTS_TABLE} SET author = %s WHERE rowid IN '
+            f'(SELECT id FROM {BlogPost._meta.db_table} WHERE author_id = %s) AND author != %s',
+            [username, user_id, username],
+        )
+
+
+def rebuild_index(batch_size=1000, using=DEFAULT_DB_ALIAS):
+    """
+    Rebuild the whole search index from the blog post table 🔄
+
+    Posts are copied in id ranges of ``batch_size`` so no single statement
+    has to hold a million rows in memory at once.
+
+    Args:
+        batch_size: Posts per INSERT
+        using: Database alias
+
+    Returns:
+        int: Number of posts indexed
+    """
+    if not is_available(using):
+        return 0
+
+    indexed = 0
+    last_id = 0
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        while True:
+            cursor.execute(
+                f'SELECT MAX(id), COUNT(*) FROM (SELECT id FROM {BlogPost._meta.db_table} '
+                f'WHERE id > %s ORDER BY id LIMIT %s)',
+                [last_id, batch_size],
+            )
+            upper_id, count = cursor.fetchone()
+            if not count:
+                break
+            cursor.execute(_index_sql() + 'WHERE p.id > %s AND p.id <= %s', [last_id, upper_id])
+            indexed += count
+            last_id = upper_id
+        # Merge the index into as few pieces as possible for fast searches 🧹
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+    return indexed
+
+
+def matching_ids(text):
+    """
+    A subquery of the ids of posts matching ``text`` (any status) 🧩
+
+    Use it inside ordinary ORM queries, e.g. for the admin search box:
+        BlogPost.objects.filter(pk__in=matching_ids('django'))
+
+    Args:
+        text: What the user typed
+
+    Returns:
+        RawSQL: ``SELECT rowid FROM main_app_blogpost_fts WHERE ... MATCH ...``
+    """
+    return RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+        [build_match_query(text)],
+    )
+
+
+def _highlight(snippet):
+    """Escape a snippet for HTML and turn the match markers into <mark> tags ✨"""
+    html = escape(snippet).replace(MATCH_START, '<mark>').replace(MATCH_END, '</mark>')
+    return mark_safe(html)
+
+
+def search_posts(text, limit=20, published_only=True, using=DEFAULT_DB_ALIAS):
+    """
+    Search blog posts, best matches first 🏆
+
+    Ranking uses BM25 (the classic search engine formula), with a match in
+    the title counting more than one in the excerpt, author or content.
+    Each returned post gets two extra attributes:
+        search_rank: Lower is better (BM25 scores are negative in SQLite)
+        search_snippet: HTML-safe text around the matches, matches in <mark>
+
+    Costs two queries: one ranked search, one to load the posts + authors.
+
+    Args:
+        text: What the user typed
+        limit: Maximum number of results
+        published_only: Only return published posts
+        using: Database alias
+
+    Returns:
+        list: BlogPost objects
+    """
+    match = build_match_query(text)
+    if not match:
+        return []
+
+    if not is_available(using):
+        return _fallback_search(text, limit, published_only, using)
+
+    status_filter = "AND p.status = 'published' " if published_only else ''
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f'SELECT {FTS_TABLE}.rowid, {FTS_TABLE}.rank, '
+            f"snippet({FTS_TABLE}, -1, %s, %s, '…', %s) "
+            f'FROM {FTS_TABLE} JOIN {BlogPost._meta.db_table} p ON p.id = {FTS_TABLE}.rowid '
+            f'WHERE {FTS_TABLE} MATCH %s {status_filter}'
+            f'ORDER BY {FTS_TABLE}.rank LIMIT %s',
+            [MATCH_START, MATCH_END, SNIPPET_TOKENS, match, limit],
+        )
+        rows = cursor.fetchall()
+
+    posts = (
+        BlogPost.objects.using(using)
+        .select_related('author')
+        .defer('content')
+        .in_bulk([row[0] for row in rows])
+    )
+    results = []
+    for post_id, rank, snippet in rows:
+        post = posts.get(post_id)
+        if post is None:
+            continue  # Deleted since the search ran
+        post.search_rank = rank
+        post.search_snippet = _highlight(snippet)
+        results.append(post)
+    return results
+
+
+def _fallback_search(text, limit, published_only, using):
+    """Plain icontains search for databases without FTS5 🐢"""
+    queryset = BlogPost.objects.using(using).select_related('author').defer('content')
+    if published_only:
+        queryset = queryset.filter(status='published')
+    for term in _WORD.findall(text)[:MAX_TERMS]:
+        queryset = queryset.filter(
+            Q(title__icontains=term) | Q(excerpt__icontains=term)
+            | Q(content__icontains=term) | Q(author__username__icontains=term)
+        )
+    results = list(queryset[:limit])
+    for post in results:
+        post.search_rank = None
+        post.search_snippet = escape(post.excerpt)
+    return results
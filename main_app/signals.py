@@ -0,0 +1,263 @@
+"""
+Signal handlers for main_app
+
+What are signals? 📡
+Signals are like NOTIFICATIONS that Django sends when something happens:
+"a post was saved", "a post was added to a category", "a post is about to
+be deleted"... Functions in this file LISTEN for them and react.
+
+We use them to keep denormalized counters (numbers we store so we don't have
+to COUNT rows every time) correct:
+- Category.published_post_count
+- BlogPost.comment_count and BlogPost.last_comment_at
+
+...and to keep the search index up to date and queue background jobs.
+"""
+
+# Import necessary Django components 📦
+from django.db.models import F  # Database-side arithmetic
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver  # Decorator to connect handlers
+from django.utils import timezone  # For timestamps
+import logging  # For logging
+
+# Import our models 🗄️
+from django.contrib.auth.models import User
+from .models import BlogPost, Category, Comment, Upload
+from . import jobs, search, uploads
+
+# Get a logger for this app 📝
+logger = logging.getLogger('main_app')
+
+
+@receiver(post_save, sender=BlogPost)
+def track_post_status_change(sender, instance, created, **kwargs):
+    """
+    Adjust category counts when a post is published or unpublished 📊
+
+    A brand new post has no categories yet (they are added after saving),
+    so only status transitions on existing posts matter here.
+    """
+    old_status = getattr(instance, '_loaded_status', None)
+    instance._loaded_status = instance.status  # Next save compares against this
+
+    if created:
+        return
+
+    if old_status is None:
+        # We don't know the old status (e.g. loaded with .only()) - recount
+        Category.refresh_published_counts(instance.categories.values('pk'))
+        return
+
+    was_published = old_status == 'published'
+    is_published = instance.status == 'published'
+    if was_published == is_published:
+        return
+
+    delta = 1 if is_published else -1
+    Category.objects.filter(posts=instance).update(
+        published_post_count=F('published_post_count') + delta
+    )
+    logger.debug(f"Adjusted category post counts by {delta} for post: {instance.title}")
+
+
+@receiver(m2m_changed, sender=Category.posts.through)
+def track_category_membership(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Keep counts correct when posts are added to / removed from categories 🏷️
+
+    Works from both sides:
+    - category.posts.add(post)    (reverse=False, instance is a Category)
+    - post.categories.add(cat)    (reverse=True, instance is a BlogPost)
+    """
+    if action == 'pre_clear':
+        if reverse:
+            # After the clear we can no longer see which categories the post had
+            instance._cleared_category_ids = list(instance.categories.values_list('pk', flat=True))
+        else:
+            instance._cleared_post_ids = list(instance.posts.values_list('pk', flat=True))
+        return
+
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        touch_posts(instance, action, reverse, pk_set)
+
+    if action == 'post_add' and pk_set:
+        # Django only reports rows that were really added, so we can add 🔢
+        if reverse:
+            if instance.status == 'published':
+                Category.objects.filter(pk__in=pk_set).update(
+                    published_post_count=F('published_post_count') + 1
+                )
+        else:
+            added = BlogPost.objects.filter(pk__in=pk_set, status='published').count()
+            if added:
+                Category.objects.filter(pk=instance.pk).update(
+                    published_post_count=F('published_post_count') + added
+                )
+        return
+
+    if action == 'post_remove' and pk_set:
+        # pk_set may name rows that weren't linked, so recount instead 🔄
+        Category.refresh_published_counts(pk_set if reverse else [instance.pk])
+    elif action == 'post_clear':
+        if reverse:
+            Category.refresh_published_counts(getattr(instance, '_cleared_category_ids', []))
+        else:
+            Category.refresh_published_counts([instance.pk])
+
+
+def touch_posts(instance, action, reverse, pk_set):
+    """
+    Bump updated_at of posts whose categories changed ⏰
+
+    A post's page shows its categories, so for ETags and exports (which go
+    by updated_at) a category change is a change to the post.
+    """
+    if reverse:
+        post_ids = [instance.pk]
+    elif action == 'post_clear':
+        post_ids = getattr(instance, '_cleared_post_ids', [])
+    else:
+        post_ids = pk_set
+    if post_ids:
+        BlogPost.objects.filter(pk__in=post_ids).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Category)
+def touch_posts_on_rename(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    """
+    Bump updated_at of a renamed category's posts ✏️
+
+    Their pages show the category's name and link to its slug, so (like in
+    touch_posts) the ETags that go by updated_at must change too.
+    """
+    if created or raw:
+        return  # A new category has no posts yet
+    if update_fields is not None and not {'name', 'slug'} & set(update_fields):
+        return  # Nothing the post pages show
+    BlogPost.objects.filter(categories=instance).update(updated_at=timezone.now())
+
+
+@receiver(pre_delete, sender=Category)
+def touch_posts_on_category_delete(sender, instance, **kwargs):
+    """Bump updated_at of the posts losing a deleted category 🗑️"""
+    # Deleting a category removes its links without an m2m_changed signal
+    BlogPost.objects.filter(categories=instance).update(updated_at=timezone.now())
+
+
+@receiver(pre_delete, sender=BlogPost)
+def remember_post_categories(sender, instance, **kwargs):
+    """Note which categories a published post is in before it is deleted 🗑️"""
+    if instance.status == 'published':
+        instance._deleted_category_ids = list(instance.categories.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=BlogPost)
+def update_counts_after_delete(sender, instance, **kwargs):
+    """Recount the categories a deleted post belonged to 🔄"""
+    category_ids = getattr(instance, '_deleted_category_ids', None)
+    if category_ids:
+        Category.refresh_published_counts(category_ids)
+
+
+@receiver(post_save, sender=Comment)
+def track_comment_stats(sender, instance, created, raw=False, **kwargs):
+    """
+    Adjust the post's comment stats when a comment is added, approved,
+    unapproved or moved to another post 💬
+
+    Adding an approved comment is one cheap UPDATE. Taking one away may
+    remove the newest comment, so those posts are recounted.
+    """
+    if raw:
+        return  # Fixtures: reconcile_post_counts covers them
+    old_post_id, was_approved = getattr(instance, '_loaded_state', (None, None))
+    instance._loaded_state = (instance.post_id, instance.is_approved)  # Next save compares against this
+
+    if created:
+        if instance.is_approved:
+            BlogPost.add_comment_stats(instance.post_id, instance.created_at)
+        return
+
+    if was_approved is None:
+        # We don't know what it was before (e.g. loaded with .only()) - recount
+        BlogPost.refresh_comment_stats([instance.post_id])
+        return
+
+    if old_post_id != instance.post_id:
+        BlogPost.refresh_comment_stats([old_post_id, instance.post_id])
+    elif instance.is_approved and not was_approved:
+        BlogPost.add_comment_stats(instance.post_id, instance.created_at)
+    elif was_approved and not instance.is_approved:
+        BlogPost.refresh_comment_stats([instance.post_id])
+
+
+@receiver(post_delete, sender=Comment)
+def update_comment_stats_after_delete(sender, instance, origin=None, **kwargs):
+    """
+    Recount the post of a deleted approved comment 🔄
+
+    Covers every way a comment goes: comment.delete(), a comment queryset's
+    delete() and cascades (deleting a user deletes their comments). Django
+    deletes all the rows first and then sends post_delete for each, so one
+    recount per post is enough: ``origin`` (what was deleted) remembers them.
+    """
+    if not instance.is_approved:
+        return
+    if isinstance(origin, BlogPost) or getattr(origin, 'model', None) is BlogPost:
+        return  # The post is being deleted too
+
+    recounted = getattr(origin, '_recounted_post_ids', None)
+    if recounted is None:
+        recounted = set()
+        if origin is not None:
+            origin._recounted_post_ids = recounted
+    if instance.post_id not in recounted:
+        recounted.add(instance.post_id)
+        BlogPost.refresh_comment_stats([instance.post_id])
+
+
+@receiver(post_save, sender=Comment)
+def queue_comment_notification(sender, instance, created, raw=False, **kwargs):
+    """
+    Queue an email to the post's author about a new comment 📬
+
+    The email is sent by a background job (main_app/jobs.py), so posting a
+    comment never waits for the mail server.
+    """
+    if created and instance.is_approved and not raw:
+        jobs.enqueue(jobs.notify_post_author, instance.pk)
+
+
+@receiver(post_save, sender=BlogPost)
+def index_post(sender, instance, raw=False, using='default', **kwargs):
+    """Add or refresh a saved post in the search index 🔎"""
+    if not raw:  # Fixtures are loaded raw; rebuild_search_index covers them
+        search.index_posts([instance.pk], using=using)
+
+
+@receiver(post_delete, sender=BlogPost)
+def unindex_post(sender, instance, using='default', **kwargs):
+    """Remove a deleted post from the search index 🗑️"""
+    search.remove_posts([instance.pk], using=using)
+
+
+@receiver(post_save, sender=User)
+def reindex_author_name(sender, instance, created, update_fields=None, raw=False, using='default', **kwargs):
+    """
+    Keep author names in the search index up to date ✏️
+
+    Logging in saves the user with update_fields=['last_login'], so we only
+    do the work when the username may have changed.
+    """
+    if created or raw:
+        return
+    if update_fields is not None and 'username' not in update_fields:
+        return
+    search.rename_author(instance.pk, instance.username, using=using)
+
+
+@receiver(post_delete, sender=Upload)
+def remove_upload_file(sender, instance, **kwargs):
+    """Delete the file of a cancelled or abandoned upload 🗑️"""
+    uploads.remove_file(instance)
@@ -0,0 +1,100 @@
+/*
+ * Common JavaScript for all pages ⚡
+ *
+ * Loaded by main_app/templates/main_app/base.html. Write it readable:
+ * collectstatic minifies it and gives it a content-hashed name
+ * (see simple_django_framework/static_files.py).
+ */
+
+// JavaScript with detailed comments for beginners
+
+/**
+ * Document ready function - runs when page is fully loaded
+ * This is like waiting for all ingredients before cooking!
+ */
+document.addEventListener('DOMContentLoaded', function() {
+    console.log('🚀 Django Simple Framework loaded successfully!');
+
+    // Auto-hide alerts after 5 seconds
+    setTimeout(function() {
+        var alerts = document.querySelectorAll('.alert');
+        alerts.forEach(function(alert) {
+            // Fade out the alert
+            alert.style.transition = 'opacity 0.5s';
+            alert.style.opacity = '0';
+
+            // Remove from DOM after fade animation
+            setTimeout(function() {
+                if (alert.parentNode) {
+                    alert.parentNode.removeChild(alert);
+                }
+            }, 500);
+        });
+    }, 5000);
+
+    // Add smooth scrolling to anchor links
+    var links = document.querySelectorAll('a[href^="#"]');
+    links.forEach(function(link) {
+        link.addEventListener('click', function(e) {
+            e.preventDefault();
+            var target = document.querySelector(this.getAttribute('href'));
+            if (target) {
+                target.scrollIntoView({
+                    behavior: 'smooth',
+                    block: 'start'
+                });
+            }
+        });
+    });
+
+    // Log user activity for analytics (in a real app, send to server)
+    console.log('📊 Page viewed:', window.location.pathname);
+});
+
+/**
+ * Function to show loading spinner
+ * Call this before AJAX requests or form submissions
+ */
+function showLoading(buttonId) {
+    var button = document.getElementById(buttonId);
+    if (button) {
+        button.innerHTML = '<span class="loading"></span> Loading...';
+        button.disabled = true;
+    }
+}
+
+/**
+ * Function to hide loading spinner
+ * Call this after AJAX requests complete
+ */
+function hideLoading(buttonId, originalText) {
+    var button = document.getElementById(buttonId);
+    if (button) {
+        button.innerHTML = originalText;
+        button.disabled = false;
+    }
+}
+
+/**
+ * Function to display toast notifications
+ * Useful for showing success/error messages
+ */
+function showToast(message, type = 'info') {
+    // Create toast element
+    var toast = document.createElement('div');
+    toast.className = `alert alert-${type} position-fixed`;
+    toast.style.top = '20px';
+    toast.style.right = '20px';
+    toast.style.zIndex = '9999';
+    toast.innerHTML = message;
+
+    // Add to page
+    document.body.appendChild(toast);
+
+    // Remove after 3 seconds
+    setTimeout(function() {
+        if (toast.parentNode) {
+            toast.parentNode.removeChild(toast);
+        }
+    }, 3000);
+}
@@ -0,0 +1,25 @@
+"""
+Template tags for Bootstrap and Font Awesome 📦
+
+Usage:
+    {% load assets %}
+    <link rel="stylesheet" href="{% vendor_url 'bootstrap_css' %}">
+
+Gives the self-hosted, trimmed copy written by `python manage.py
+vendor_assets` (through {% static %}, so it gets its hashed name), or the
+CDN URL while there is no copy yet. See main_app/assets.py.
+"""
+
+from django import template  # Tag registration
+from django.templatetags.static import static  # Static file URLs
+
+from main_app import assets
+
+register = template.Library()
+
+
+@register.simple_tag
+def vendor_url(name):
+    """{% vendor_url 'bootstrap_css' %} - self-hosted if vendored, else the CDN 🏷️"""
+    static_name, cdn_url = assets.ASSETS[name]
+    return static(static_name) if assets.is_vendored(static_name) else cdn_url
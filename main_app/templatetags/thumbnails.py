@@ -0,0 +1,46 @@
+"""
+Template tags for profile picture thumbnails 🖼️
+
+Usage:
+    {% load thumbnails %}
+    {% profile_picture profile 50 %}
+    {% profile_picture profile 100 css_class="avatar" %}
+
+Renders a <picture> with one <source> per thumbnail format (WebP first)
+and a srcset, so the browser downloads ONE small file in the best format
+it supports and the right size for its screen. See main_app/thumbnails.py.
+"""
+
+from django import template  # Tag registration
+from django.utils.html import format_html, format_html_join  # Safe HTML
+
+register = template.Library()
+
+
+def picture_html(profile, size=50, css_class='', alt='', style=''):
+    """
+    The <picture> element for a profile's picture ('' if it has none) 🖼️
+
+    Args:
+        profile: A UserProfile
+        size: Display size in CSS pixels (the thumbnails are square)
+        css_class: class attribute of the <img>
+        alt: Alternative text (default: the username)
+        style: style attribute of the <img>
+    """
+    sources = profile.picture_sources(size) if profile is not None else []
+    if not sources:
+        return ''
+    *extra, fallback = sources  # The last format is the one every browser has
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" width="{}" height="{}" alt="{}" class="{}" '
+        'style="{}" loading="lazy" decoding="async"></picture>',
+        format_html_join('', '<source type="{}" srcset="{}">', ((s['type'], s['srcset']) for s in extra)),
+        fallback['src'], fallback['srcset'], size, size, alt or profile.user.username, css_class, style,
+    )
+
+
+@register.simple_tag
+def profile_picture(profile, size=50, css_class='', alt=''):
+    """{% profile_picture profile 50 %} - see picture_html() 🏷️"""
+    return picture_html(profile, int(size), css_class, alt)
@@ -1,3 +1,2255 @@
-from django.test import TestCase
+"""
+Tests for main_app
 
-# Create your tests here.
+Run them with:
+    python manage.py test main_app
+"""
+
+import io
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core import mail
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError, IntegrityError, OperationalError, connection, connections, transaction
+from django.db.utils import ConnectionHandler
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.test import (
+    AsyncClient, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from simple_django_framework import replicas, session_store, static_files
+from simple_django_framework.db_routers import ReadConnectionRouter, ReplicaRouter
+from simple_django_framework.log_queue import QueuedLogging
+from simple_django_framework.rate_limit import RateLimiter, parse_rate
+from simple_django_framework.sqlite_cache import SQLiteCache
+from simple_django_framework.write_queue import WriteQueue
+
+from . import assets, jobs, retention, thumbnails, uploads
+from .contact_spool import contact_spool
+from .counters import CounterBuffer, view_counter
+from .pagination import InvalidCursor, decode_cursor, encode_cursor
+from .search import build_match_query, search_posts
+from .exports import comment_export_rows, post_export_rows
+from .http_cache import blog_list_validators
+from .models import BlogPost, Category, Comment, ContactMessage, Job, Upload, UserProfile
+
+
+def make_post(author, index=0, **fields):
+    """Create a blog post with sensible defaults for tests 📝"""
+    defaults = {
+        'title': f'Post {index}',
+        'slug': f'post-{index}',
+        'content': f'Content for post {index}',
+        'status': 'published',
+    }
+    defaults.update(fields)
+    return BlogPost.objects.create(author=author, **defaults)
+
+
+class ViewCounterTests(TestCase):
+    """Buffered BlogPost.view_count increments 👁️"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('writer', password='pw')
+        cls.posts = [make_post(cls.author, i) for i in range(3)]
+
+    def setUp(self):
+        self.counter = CounterBuffer('main_app.BlogPost', 'view_count', 'TEST_VIEW_COUNT_INTERVAL')
+
+    def view_counts(self):
+        return dict(BlogPost.objects.values_list('pk', 'view_count'))
+
+    @override_settings(TEST_VIEW_COUNT_INTERVAL=3600)
+    def test_increments_are_buffered_until_flush(self):
+        for _ in range(4):
+            self.counter.add(self.posts[0].pk)
+        self.counter.add(self.posts[1].pk)
+
+        self.assertEqual(self.counter.pending(self.posts[0].pk), 4)
+        self.assertEqual(self.view_counts()[self.posts[0].pk], 0)
+
+        self.assertEqual(self.counter.flush(), 5)
+        counts = self.view_counts()
+        self.assertEqual(counts[self.posts[0].pk], 4)
+        self.assertEqual(counts[self.posts[1].pk], 1)
+        self.assertEqual(self.counter.pending(), {})
+        self.counter.stop()
+
+    @override_settings(TEST_VIEW_COUNT_INTERVAL=3600)
+    def test_flush_groups_rows_by_increment_size(self):
+        for post in self.posts:
+            self.counter.add(post.pk, 2)
+        # Three rows with the same increment -> a single UPDATE
+        with self.assertNumQueries(1):
+            self.counter.flush()
+        self.counter.stop()
+
+    @override_settings(TEST_VIEW_COUNT_INTERVAL=3600)
+    def test_concurrent_adds_match_naive_totals(self):
+        def worker():
+            for post in self.posts:
+                for _ in range(50):
+                    self.counter.add(post.pk)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.counter.flush()
+
+        self.assertEqual(set(self.view_counts().values()), {8 * 50})
+        self.counter.stop()
+
+    @override_settings(TEST_VIEW_COUNT_INTERVAL=0)
+    def test_zero_interval_writes_through(self):
+        self.counter.add(self.posts[2].pk)
+        self.assertEqual(self.view_counts()[self.posts[2].pk], 1)
+        self.assertEqual(self.counter.pending(), {})
+
+    @override_settings(VIEW_COUNT_FLUSH_INTERVAL=3600)
+    def test_increment_view_count_updates_instance_and_buffer(self):
+        post = self.posts[0]
+        post.increment_view_count()
+        post.increment_view_count()
+
+        self.assertEqual(post.view_count, 2)
+        view_counter.flush()
+        post.refresh_from_db()
+        self.assertEqual(post.view_count, 2)
+        view_counter.stop()
+
+
+class ListHandler(logging.Handler):
+    """Logging handler that keeps records in a list 📋"""
+
+    def __init__(self, level=logging.NOTSET):
+        super().__init__(level)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class QueuedLoggingTests(SimpleTestCase):
+    """The QueueHandler/QueueListener logging pipeline 📮"""
+
+    def make_logger(self, name, *handlers):
+        logger = logging.getLogger(f'main_app.tests.{name}')
+        logger.handlers = list(handlers)
+        logger.setLevel(logging.DEBUG)
+        logger.propagate = False
+        self.addCleanup(setattr, logger, 'handlers', [])
+        return logger
+
+    def test_records_keep_their_routing_and_levels(self):
+        shared = ListHandler(logging.INFO)
+        errors_only = ListHandler(logging.ERROR)
+        app = self.make_logger('app', shared)
+        requests = self.make_logger('requests', errors_only, shared)
+
+        pipeline = QueuedLogging(maxsize=100)
+        pipeline.install([app, requests])
+        pipeline.start()
+        app.debug('too quiet')
+        app.info('app info')
+        requests.error('request failed')
+        pipeline.stop()
+
+        self.assertEqual([r.getMessage() for r in shared.records], ['app info', 'request failed'])
+        self.assertEqual([r.getMessage() for r in errors_only.records], ['request failed'])
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        target = ListHandler()
+        logger = self.make_logger('full', target)
+        pipeline = QueuedLogging(maxsize=1, policy='drop')
+        pipeline.install([logger])
+
+        # Writer not started yet, so the queue fills up after one record
+        for number in range(3):
+            logger.info(f'message {number}')
+        self.assertEqual(pipeline.total_dropped, 2)
+
+        pipeline.total_dropped = 0  # Don't report to stderr during tests
+        pipeline.start()
+        pipeline.stop()
+        self.assertEqual([r.getMessage() for r in target.records], ['message 0'])
+
+    def test_unknown_policy_is_rejected(self):
+        with self.assertRaises(ValueError):
+            QueuedLogging(policy='explode')
+
+
+class CategoryPostCountTests(TestCase):
+    """Denormalized Category.published_post_count 📊"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('writer', password='pw')
+
+    def setUp(self):
+        self.tech = Category.objects.create(name='Tech', slug='tech')
+        self.food = Category.objects.create(name='Food', slug='food')
+
+    def counts(self):
+        return dict(Category.objects.values_list('slug', 'published_post_count'))
+
+    def test_adding_and_removing_posts_from_either_side(self):
+        published = make_post(self.author, 1)
+        draft = make_post(self.author, 2, status='draft')
+
+        self.tech.posts.add(published, draft)
+        published.categories.add(self.food)
+        self.assertEqual(self.counts(), {'tech': 1, 'food': 1})
+
+        self.tech.posts.remove(published)
+        published.categories.clear()
+        self.assertEqual(self.counts(), {'tech': 0, 'food': 0})
+
+    def test_status_transitions_adjust_counts(self):
+        post = make_post(self.author, 1, status='draft')
+        post.categories.add(self.tech, self.food)
+        self.assertEqual(self.counts(), {'tech': 0, 'food': 0})
+
+        post.status = 'published'
+        post.save()
+        self.assertEqual(self.counts(), {'tech': 1, 'food': 1})
+
+        post = BlogPost.objects.get(pk=post.pk)
+        post.status = 'archived'
+        post.save()
+        self.assertEqual(self.counts(), {'tech': 0, 'food': 0})
+
+    def test_deleting_a_published_post(self):
+        post = make_post(self.author, 1)
+        post.categories.add(self.tech)
+        post.delete()
+        self.assertEqual(self.counts()['tech'], 0)
+
+    def test_reconcile_command_fixes_drift(self):
+        post = make_post(self.author, 1)
+        post.categories.add(self.tech)
+        Category.objects.update(published_post_count=42)
+
+        call_command('reconcile_post_counts', stdout=io.StringIO())
+        self.assertEqual(self.counts(), {'tech': 1, 'food': 0})
+
+
+@override_settings(VIEW_COUNT_FLUSH_INTERVAL=0)  # Write views through, no flusher thread
+class CommentStatsTests(TestCase):
+    """Denormalized BlogPost.comment_count / last_comment_at 💬"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('writer', password='pw')
+
+    def setUp(self):
+        self.post = make_post(self.author, 1)
+
+    def stats(self, post=None):
+        return BlogPost.objects.values_list('comment_count', 'last_comment_at').get(pk=(post or self.post).pk)
+
+    def comment(self, post=None, **fields):
+        return Comment.objects.create(post=post or self.post, author=self.author, content='Hi', **fields)
+
+    def test_creating_approving_and_unapproving(self):
+        first = self.comment()
+        second = self.comment()
+        self.comment(is_approved=False)
+        self.assertEqual(self.stats(), (2, second.created_at))
+
+        second = Comment.objects.get(pk=second.pk)
+        second.is_approved = False
+        second.save()
+        self.assertEqual(self.stats(), (1, first.created_at))
+
+        second.is_approved = True
+        second.save()
+        self.assertEqual(self.stats(), (2, second.created_at))
+
+    def test_deleting_and_moving_comments(self):
+        other = make_post(self.author, 2)
+        first = self.comment()
+        second = self.comment()
+
+        second.post = other
+        second.save()
+        self.assertEqual(self.stats(), (1, first.created_at))
+        self.assertEqual(self.stats(other), (1, second.created_at))
+
+        first.delete()
+        Comment.objects.filter(post=other).delete()
+        self.assertEqual(self.stats(), (0, None))
+        self.assertEqual(self.stats(other), (0, None))
+
+    def test_cascade_deletes_recount_once_per_post(self):
+        reader = User.objects.create_user('reader', password='pw')
+        first = self.comment()
+        for _ in range(3):
+            Comment.objects.create(post=self.post, author=reader, content='Hi')
+        self.assertEqual(self.stats()[0], 4)
+
+        with CaptureQueriesContext(connection) as queries:
+            reader.delete()  # Their comments go with them
+        self.assertEqual(self.stats(), (1, first.created_at))
+        recounts = [q for q in queries if q['sql'].startswith('UPDATE "main_app_blogpost"')]
+        self.assertEqual(len(recounts), 1)
+
+        self.post.delete()  # Nothing left to recount
+        self.assertFalse(Comment.objects.exists())
+
+    def test_admin_bulk_actions_recount(self):
+        comments = [self.comment(is_approved=False) for _ in range(3)]
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        url = reverse('admin:main_app_comment_changelist')
+
+        self.client.post(url, {'action': 'approve_comments', '_selected_action': [c.pk for c in comments]})
+        self.assertEqual(self.stats(), (3, comments[-1].created_at))
+
+        self.client.post(url, {'action': 'unapprove_comments', '_selected_action': [comments[-1].pk]})
+        self.assertEqual(self.stats(), (2, comments[1].created_at))
+
+    def test_stats_change_the_post_etag(self):
+        etag = self.client.get(self.post.get_absolute_url())['ETag']
+        self.comment()
+        response = self.client.get(self.post.get_absolute_url(), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '1 comment')
+
+    def test_reconcile_command_fixes_drift(self):
+        comment = self.comment()
+        BlogPost.objects.update(comment_count=42, last_comment_at=None)
+
+        call_command('reconcile_post_counts', stdout=io.StringIO())
+        self.assertEqual(self.stats(), (1, comment.created_at))
+
+
+class PostCommentsApiTests(TestCase):
+    """/api/posts/<slug>/comments/ pages approved comments by cursor 💬"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('writer', password='pw')
+        cls.post = make_post(cls.author, 1)
+        cls.comments = Comment.objects.bulk_create(
+            Comment(post=cls.post, author=cls.author, content=f'Comment {i}', is_approved=i % 5 != 0)
+            for i in range(30)
+        )
+        BlogPost.refresh_comment_stats([cls.post.pk])
+        cls.url = reverse('main_app:api_post_comments', args=[cls.post.slug])
+
+    def test_pages_cover_every_approved_comment_once_oldest_first(self):
+        pages, cursor, counts = [], None, []
+        while True:
+            with CaptureQueriesContext(connection) as queries:
+                page = self.client.get(self.url, {'limit': 10, **({'cursor': cursor} if cursor else {})}).json()
+            counts.append(len(queries))
+            pages.append(page['results'])
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+
+        self.assertEqual([len(page) for page in pages], [10, 10, 4])
+        self.assertEqual(counts, [2, 2, 2])  # The post, comments + authors
+        expected = [c.pk for c in self.comments if c.is_approved]
+        self.assertEqual([c['id'] for page in pages for c in page], expected)
+        self.assertEqual(page['comment_count'], 24)
+        self.assertEqual(pages[0][0]['author'], 'writer')
+        self.assertNotIn('OFFSET', ' '.join(q['sql'] for q in queries.captured_queries))
+
+    def test_bad_cursor_and_unpublished_posts(self):
+        self.assertEqual(self.client.get(self.url, {'cursor': 'nonsense'}).status_code, 400)
+        draft = make_post(self.author, 2, status='draft')
+        url = reverse('main_app:api_post_comments', args=[draft.slug])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+def seed_content(count, prefix='seed'):
+    """
+    Bulk-create ``count`` users, profiles, posts, comments, categories and
+    contact messages 🌱
+
+    Returns:
+        list: The created blog posts
+    """
+    password = make_password('pw')
+    users = User.objects.bulk_create(
+        User(username=f'{prefix}-user-{i}', password=password) for i in range(count)
+    )
+    UserProfile.objects.bulk_create(UserProfile(user=user, bio='Hello!') for user in users)
+    posts = BlogPost.objects.bulk_create(
+        BlogPost(
+            author=user,
+            title=f'{prefix} post {i}',
+            slug=f'{prefix}-post-{i}',
+            content='Lorem ipsum ' * 20,
+            status='published' if i % 3 else 'draft',
+        )
+        for i, user in enumerate(users)
+    )
+    Comment.objects.bulk_create(
+        Comment(post=post, author=users[(i + 1) % count], content=f'Comment {i}')
+        for i, post in enumerate(posts)
+        for _ in range(3)
+    )
+    BlogPost.refresh_comment_stats([post.pk for post in posts])  # bulk_create skips the signals
+    categories = Category.objects.bulk_create(
+        Category(name=f'{prefix} category {i}', slug=f'{prefix}-category-{i}') for i in range(count)
+    )
+    for category in categories:
+        category.posts.add(*posts[:5])
+    ContactMessage.objects.bulk_create(
+        ContactMessage(name=f'Sender {i}', email=f'sender{i}@example.com',
+                       subject=f'Subject {i}', message='Hi there')
+        for i in range(count)
+    )
+    return posts
+
+
+@override_settings(VIEW_COUNT_FLUSH_INTERVAL=0)  # Write views through, no flusher thread
+class KeysetPaginationTests(TestCase):
+    """Blog index and /api/posts/ page by cursor, not OFFSET 📑"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('writer', password='pw')
+        cls.category = Category.objects.create(name='News', slug='news')
+        cls.posts = [make_post(cls.author, i) for i in range(25)]
+        cls.category.posts.add(*cls.posts)
+        make_post(cls.author, 99, status='draft')
+
+    def fetch(self, cursor=None, limit=10):
+        params = {'limit': limit}
+        if cursor:
+            params['cursor'] = cursor
+        response = self.client.get(reverse('main_app:api_post_list'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def walk(self, limit=10):
+        """Follow next_cursor until the end, returning every page 🚶"""
+        pages, cursor = [], None
+        while True:
+            page = self.fetch(cursor, limit)
+            pages.append(page['results'])
+            cursor = page['next_cursor']
+            if cursor is None:
+                return pages
+
+    def test_pages_cover_every_published_post_once(self):
+        pages = self.walk(limit=10)
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        ids = [post['id'] for page in pages for post in page]
+        expected = [p.pk for p in sorted(self.posts, key=lambda p: (p.created_at, p.pk), reverse=True)]
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages[0][0]['categories'], [{'name': 'News', 'slug': 'news'}])
+
+    def test_ties_on_created_at_are_broken_by_id(self):
+        BlogPost.objects.filter(pk__in=[p.pk for p in self.posts]).update(
+            created_at=self.posts[0].created_at
+        )
+        ids = [post['id'] for page in self.walk(limit=7) for post in page]
+        self.assertEqual(ids, sorted((p.pk for p in self.posts), reverse=True))
+
+    def test_cursor_is_stable_when_new_posts_arrive(self):
+        first = self.fetch(limit=10)
+        make_post(self.author, 100)  # Newer than everything
+        second = self.fetch(first['next_cursor'], limit=10)
+        ids = {post['id'] for post in first['results']}
+        self.assertFalse(ids & {post['id'] for post in second['results']})
+        self.assertEqual(len(second['results']), 10)
+
+    def test_deep_pages_cost_the_same_as_page_one(self):
+        counts = []
+        cursor = None
+        for _ in range(3):
+            with CaptureQueriesContext(connection) as queries:
+                page = self.fetch(cursor, limit=10)
+            counts.append(len(queries))
+            cursor = page['next_cursor']
+        self.assertEqual(counts, [3, 3, 3])  # Validators, posts + authors, categories
+        self.assertNotIn('OFFSET', ' '.join(q['sql'] for q in queries.captured_queries))
+
+    def test_bad_cursor_is_rejected(self):
+        response = self.client.get(reverse('main_app:api_post_list'), {'cursor': 'nonsense'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse('main_app:blog_list'), {'cursor': 'nonsense'})
+        self.assertEqual(response.status_code, 400)
+        with self.assertRaises(InvalidCursor):
+            decode_cursor(encode_cursor(self.posts[0].created_at, 1)[:-2] + 'xx')
+
+    def test_limit_is_capped(self):
+        self.assertEqual(len(self.fetch(limit=1000)['results']), 25)
+        self.assertEqual(len(self.fetch(limit='abc')['results']), 10)
+
+    def test_blog_pages_render(self):
+        response = self.client.get(reverse('main_app:blog_list'))
+        self.assertContains(response, self.posts[-1].title)
+        self.assertContains(response, 'Older posts')
+        response = self.client.get(self.posts[0].get_absolute_url())
+        self.assertContains(response, self.posts[0].content)
+        draft = BlogPost.objects.get(status='draft')
+        self.assertEqual(self.client.get(reverse('main_app:blog_post_detail', args=[draft.slug])).status_code, 404)
+
+
+class SearchTests(TestCase):
+    """Full-text search through the FTS5 index 🔎"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('writer', password='pw')
+        cls.title_hit = make_post(cls.author, 1, title='Django tutorial', content='Intro text')
+        cls.body_hit = make_post(cls.author, 2, title='Misc notes',
+                                 content='Some words about <b>Django</b> in passing and more words')
+        cls.draft = make_post(cls.author, 3, title='Django draft', status='draft')
+        cls.other = make_post(cls.author, 4, title='Flask tips', content='Nothing to see')
+
+    def titles(self, text, **kwargs):
+        return [post.title for post in search_posts(text, **kwargs)]
+
+    def test_ranks_title_matches_first_and_hides_drafts(self):
+        self.assertEqual(self.titles('django'), ['Django tutorial', 'Misc notes'])
+        self.assertIn('Django draft', self.titles('django', published_only=False))
+
+    def test_prefix_queries_and_author_names(self):
+        self.assertEqual(self.titles('django tut'), ['Django tutorial'])
+        self.assertEqual(self.titles('djan tutorial'), [])  # Only the last word is a prefix
+        self.assertEqual(len(self.titles('writer')), 3)
+
+    def test_user_input_cannot_break_the_query(self):
+        self.assertEqual(build_match_query('AND "OR* ^NEAR('), '"AND" "OR" "NEAR"*')
+        self.assertEqual(self.titles('django" OR "flask'), [])
+        self.assertEqual(self.titles('   '), [])
+
+    def test_snippets_are_escaped_and_highlighted(self):
+        post = next(p for p in search_posts('django') if p.pk == self.body_hit.pk)
+        self.assertIn('&lt;b&gt;<mark>Django</mark>&lt;/b&gt;', post.search_snippet)
+
+    def test_index_follows_saves_deletes_and_renames(self):
+        self.other.title = 'Django and Flask'
+        self.other.save()
+        self.assertIn('Django and Flask', self.titles('django'))
+        self.other.delete()
+        self.assertNotIn('Django and Flask', self.titles('django'))
+        self.author.username = 'novelist'
+        self.author.save()
+        self.assertEqual(len(self.titles('novelist')), 2)
+
+    def test_search_costs_two_queries(self):
+        search_posts('django')  # Warm up the table check
+        with self.assertNumQueries(2):
+            search_posts('django')
+
+    def test_rebuild_picks_up_bulk_created_posts(self):
+        BlogPost.objects.bulk_create([
+            BlogPost(author=self.author, title='Bulk zebra', slug='bulk-zebra',
+                     content='x', status='published'),
+        ])
+        self.assertEqual(self.titles('zebra'), [])
+        call_command('rebuild_search_index', batch_size=2, stdout=io.StringIO())
+        self.assertEqual(self.titles('zebra'), ['Bulk zebra'])
+        self.assertEqual(len(self.titles('django', published_only=False)), 3)
+
+    def test_search_pages(self):
+        response = self.client.get(reverse('main_app:search'), {'q': 'django'})
+        self.assertContains(response, '<mark>Django</mark>', html=False)
+        response = self.client.get(reverse('main_app:api_search'), {'q': 'django', 'limit': 1})
+        self.assertEqual([r['title'] for r in response.json()['results']], ['Django tutorial'])
+
+    def test_admin_search_uses_the_index(self):
+        admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'pw')
+        self.client.force_login(admin_user)
+        url = reverse('admin:main_app_blogpost_changelist')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'q': 'django'})
+        self.assertEqual(
+            {post.pk for post in response.context['cl'].result_list},
+            {self.title_hit.pk, self.body_hit.pk, self.draft.pk},
+        )
+        self.assertFalse(any('LIKE' in q['sql'] for q in queries.captured_queries))
+
+
+class ExportTests(TestCase):
+    """Streaming NDJSON exports of posts and comments 📤"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('staff', password='pw', is_staff=True)
+        cls.posts = seed_content(6, prefix='export')  # 4 published, 2 drafts, 18 comments
+
+    def setUp(self):
+        self.client.force_login(self.staff)
+
+    def export(self, name, **params):
+        response = self.client.get(reverse(f'main_app:api_export_{name}'), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        body = b''.join(response.streaming_content).decode()
+        return response, body
+
+    def test_posts_stream_as_ndjson(self):
+        response, body = self.export('posts')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(set(rows[0]), {
+            'id', 'title', 'slug', 'author_id', 'excerpt', 'content', 'status',
+            'view_count', 'comment_count', 'last_comment_at', 'is_featured',
+            'created_at', 'updated_at', 'published_at',
+        })
+        _, body = self.export('posts', status='draft')
+        self.assertEqual({json.loads(line)['status'] for line in body.splitlines()}, {'draft'})
+
+    def test_updated_range_and_json_format(self):
+        post = self.posts[0]
+        BlogPost.objects.filter(pk=post.pk).update(updated_at='2030-01-01T00:00:00Z')
+        _, body = self.export('posts', updated_after='2029-12-31T00:00:00')
+        self.assertEqual([json.loads(line)['id'] for line in body.splitlines()], [post.pk])
+        _, body = self.export('posts', updated_before='2029-12-31T00:00:00Z', format='json')
+        self.assertEqual(len(json.loads(body)), 5)
+        _, body = self.export('comments')
+        self.assertEqual(len(body.splitlines()), 18)
+
+    def test_filters_and_order_use_indexes(self):
+        plan = post_export_rows({'status': 'published'}).explain()
+        self.assertIn('main_app_bl_status_87d8fa_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+        plan = comment_export_rows({'updated_after': '2020-01-01T00:00:00Z'}).explain()
+        self.assertIn('main_app_co_updated_553be9_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_staff_only_and_bad_parameters(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('main_app:api_export_posts')).status_code, 403)
+        self.client.force_login(self.staff)
+        for params in ({'status': 'nope'}, {'updated_after': 'yesterday'}, {'format': 'xml'}):
+            with self.subTest(params=params):
+                response = self.client.get(reverse('main_app:api_export_posts'), params)
+                self.assertEqual(response.status_code, 400)
+
+    async def test_asgi_streams_asynchronously(self):
+        client = AsyncClient()
+        await client.aforce_login(self.staff)
+        response = await client.get(reverse('main_app:api_export_comments'))
+        self.assertEqual(response.status_code, 200)
+        lines = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(len(lines), 18)
+
+
+@override_settings(VIEW_COUNT_FLUSH_INTERVAL=0)
+class ConditionalGetTests(TestCase):
+    """ETag / Last-Modified validators and 304 answers 🏷️"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('writer', password='pw')
+        cls.category = Category.objects.create(name='News', slug='news')
+        cls.posts = [make_post(cls.author, i) for i in range(3)]
+        cls.category.posts.add(*cls.posts)
+
+    def revalidate(self, url, **headers):
+        """First GET, then a conditional GET with the validators it returned"""
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get(url, headers={'if-none-match': first['ETag'], **headers})
+        return first, second, len(queries)
+
+    def test_unchanged_pages_answer_304_with_one_query(self):
+        urls = [
+            reverse('main_app:blog_list'),
+            reverse('main_app:api_post_list'),
+            self.posts[0].get_absolute_url(),
+            self.category.get_absolute_url(),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                first, second, queries = self.revalidate(url)
+                self.assertEqual(second.status_code, 304)
+                self.assertEqual(second.content, b'')
+                self.assertEqual(queries, 1)
+                self.assertIn('no-cache', first['Cache-Control'])
+
+    def test_if_modified_since_for_anonymous_visitors(self):
+        url = self.posts[0].get_absolute_url()
+        first = self.client.get(url)
+        response = self.client.get(url, headers={'if-modified-since': first['Last-Modified']})
+        self.assertEqual(response.status_code, 304)
+
+    def test_lists_have_no_last_modified(self):
+        # Unpublishing an older post leaves the newest date alone, so a date
+        # would keep answering 304 for a list that still shows that post
+        url = reverse('main_app:blog_list')
+        post = self.client.get(self.posts[-1].get_absolute_url())
+        for list_url in (url, self.category.get_absolute_url()):
+            self.assertNotIn('Last-Modified', self.client.get(list_url))
+        BlogPost.objects.filter(pk=self.posts[0].pk).update(status='draft')
+        response = self.client.get(url, headers={'if-modified-since': post['Last-Modified']})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, self.posts[0].title)
+
+    def test_changes_invalidate(self):
+        url = reverse('main_app:blog_list')
+        etag = self.client.get(url)['ETag']
+        post = self.posts[1]
+        post.title = 'Edited'
+        post.save()
+        self.assertEqual(self.client.get(url, headers={'if-none-match': etag}).status_code, 200)
+
+        etag = self.client.get(url)['ETag']
+        post.status = 'draft'
+        post.save()
+        self.assertEqual(self.client.get(url, headers={'if-none-match': etag}).status_code, 200)
+
+        url = self.posts[0].get_absolute_url()
+        etag = self.client.get(url)['ETag']
+        other = Category.objects.create(name='Other', slug='other')
+        other.posts.add(self.posts[0])  # The page lists its categories
+        self.assertEqual(self.client.get(url, headers={'if-none-match': etag}).status_code, 200)
+
+        url = self.category.get_absolute_url()
+        etag = self.client.get(url)['ETag']
+        Category.objects.filter(pk=self.category.pk).update(description='Fresh')
+        self.assertEqual(self.client.get(url, headers={'if-none-match': etag}).status_code, 200)
+
+    def test_renaming_or_deleting_a_category_invalidates_its_posts_pages(self):
+        other = Category.objects.create(name='Other', slug='other')
+        other.posts.add(self.posts[0])
+        urls = [reverse('main_app:blog_list'), self.posts[0].get_absolute_url()]
+
+        etags = {url: self.client.get(url)['ETag'] for url in urls}
+        other.name = 'Renamed'  # Shown next to the post on both pages
+        other.save()
+        for url in urls:
+            with self.subTest(url=url, change='rename'):
+                response = self.client.get(url, headers={'if-none-match': etags[url]})
+                self.assertContains(response, 'Renamed')
+
+        etags = {url: self.client.get(url)['ETag'] for url in urls}
+        other.delete()
+        for url in urls:
+            with self.subTest(url=url, change='delete'):
+                response = self.client.get(url, headers={'if-none-match': etags[url]})
+                self.assertEqual(response.status_code, 200)
+                self.assertNotContains(response, 'Renamed')
+
+    def test_pages_vary_by_user(self):
+        url = reverse('main_app:blog_list')
+        anonymous = self.client.get(url)
+        self.client.force_login(self.author)
+        response = self.client.get(url, headers={'if-none-match': anonymous['ETag']})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Last-Modified', response)
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_missing_pages_still_404(self):
+        self.assertEqual(self.client.get(reverse('main_app:blog_post_detail', args=['nope'])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('main_app:category_detail', args=['nope'])).status_code, 404)
+
+    def test_list_validators_are_index_only(self):
+        with CaptureQueriesContext(connection) as queries:
+            blog_list_validators(None)
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + queries.captured_queries[0]['sql'])
+            plan = str(cursor.fetchall())
+        self.assertIn('COVERING INDEX main_app_bl_status_87d8fa_idx', plan)
+
+@override_settings(VIEW_COUNT_FLUSH_INTERVAL=0)
+class AsyncViewTests(TestCase):
+    """The /async/ twins answer exactly like the sync views ⚡"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('writer', password='pw')
+        cls.category = Category.objects.create(name='News', slug='news')
+        cls.posts = [make_post(cls.author, i, title=f'Django post {i}') for i in range(12)]
+        cls.category.posts.add(*cls.posts)
+
+    def setUp(self):
+        cache.clear()
+        self.async_client = AsyncClient()
+
+    async def test_json_matches_sync_views(self):
+        for sync_name, async_name, params in [
+            ('main_app:api_hello', 'main_app:async_api_hello', {}),
+            ('main_app:api_post_list', 'main_app:async_api_post_list', {'limit': 5}),
+            ('main_app:api_search', 'main_app:async_api_search', {'q': 'django'}),
+        ]:
+            with self.subTest(url=async_name):
+                expected = await self.async_client.get(reverse(sync_name), params)
+                response = await self.async_client.get(reverse(async_name), params)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json(), expected.json())
+
+    async def test_cursor_pages_and_cache(self):
+        url = reverse('main_app:async_api_post_list')
+        first = (await self.async_client.get(url, {'limit': 10})).json()
+        second = (await self.async_client.get(url, {'limit': 10, 'cursor': first['next_cursor']})).json()
+        self.assertEqual(len(first['results']) + len(second['results']), 12)
+        self.assertIsNone(second['next_cursor'])
+
+        await BlogPost.objects.filter(pk=self.posts[-1].pk).aupdate(title='Renamed')
+        post = await BlogPost.objects.aget(pk=self.posts[-1].pk)
+        await sync_to_async(post.save)()  # Bumps updated_at -> new ETag -> new cache key
+        fresh = (await self.async_client.get(url, {'limit': 10})).json()
+        self.assertEqual(fresh['results'][0]['title'], 'Renamed')
+
+    async def test_pages_render_and_revalidate(self):
+        response = await self.async_client.get(reverse('main_app:async_blog_list'))
+        self.assertContains(response, 'Django post 11')
+        response = await self.async_client.get(
+            reverse('main_app:async_blog_list'), headers={'if-none-match': response['ETag']}
+        )
+        self.assertEqual(response.status_code, 304)
+
+        missing = await self.async_client.get(reverse('main_app:async_blog_post_detail', args=['nope']))
+        self.assertEqual(missing.status_code, 404)
+
+        await self.async_client.aforce_login(self.author)
+        url = reverse('main_app:async_blog_post_detail', args=[self.posts[0].slug])
+        response = await self.async_client.get(url)
+        self.assertContains(response, 'writer')  # Logged-in user in the navbar
+        self.assertEqual((await BlogPost.objects.aget(pk=self.posts[0].pk)).view_count, 1)
+
+
+def _cache_worker(path, results):
+    """Runs in a child process: race to add() and incr() shared keys 🏁"""
+    worker_cache = SQLiteCache(path, {})
+    results.put(worker_cache.add('winner', os.getpid()))
+    for _ in range(50):
+        worker_cache.incr('hits')
+
+
+class SQLiteCacheTests(SimpleTestCase):
+    """The shared SQLite cache backend 🗄️"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'cache.sqlite3')
+        self.cache = SQLiteCache(self.path, {'OPTIONS': {'MAX_ENTRIES': 30, 'CULL_FREQUENCY': 3}})
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_basic_operations(self):
+        cache = self.cache
+        cache.set('text', 'hello')
+        cache.set('flag', True)
+        cache.set('data', {'a': [1, 2]})
+        self.assertEqual(cache.get('text'), 'hello')
+        self.assertIs(cache.get('flag'), True)
+        self.assertEqual(cache.get('data'), {'a': [1, 2]})
+        self.assertEqual(cache.get('missing', 'default'), 'default')
+        cache.set_many({'x': 1, 'y': 2})
+        self.assertEqual(cache.get_many(['x', 'y', 'z']), {'x': 1, 'y': 2})
+        cache.delete_many(['x', 'y'])
+        self.assertFalse(cache.has_key('x'))
+        self.assertTrue(cache.delete('text'))
+        self.assertFalse(cache.delete('text'))
+        cache.clear()
+        self.assertIsNone(cache.get('data'))
+
+    def test_timeouts(self):
+        cache = self.cache
+        cache.set('short', 1, timeout=0.05)
+        cache.set('forever', 1, timeout=None)
+        cache.set('gone', 1, timeout=0)
+        self.assertIsNone(cache.get('gone'))
+        time.sleep(0.1)
+        self.assertIsNone(cache.get('short'))
+        self.assertTrue(cache.add('short', 2))  # Expired entries can be added again
+        self.assertEqual(cache.get('forever'), 1)
+        self.assertTrue(cache.touch('forever', 0.05))
+        time.sleep(0.1)
+        self.assertFalse(cache.has_key('forever'))
+
+    def test_add_and_incr(self):
+        cache = self.cache
+        self.assertTrue(cache.add('key', 1))
+        self.assertFalse(cache.add('key', 2))
+        self.assertEqual(cache.incr('key', 5), 6)
+        self.assertEqual(cache.decr('key'), 5)
+        cache.set('big', 2**70)
+        self.assertEqual(cache.incr('big'), 2**70 + 1)
+        with self.assertRaises(ValueError):
+            cache.incr('missing')
+
+    def test_entries_are_shared_between_processes(self):
+        self.cache.set('hits', 0)
+        results = multiprocessing.get_context('fork').Queue()
+        workers = [
+            multiprocessing.get_context('fork').Process(target=_cache_worker, args=(self.path, results))
+            for _ in range(4)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        added = [results.get(timeout=5) for _ in workers]
+        self.assertEqual(added.count(True), 1)  # Exactly one worker won add()
+        self.assertEqual(self.cache.get('hits'), 200)  # No lost increments
+        self.assertIn(self.cache.get('winner'), [w.pid for w in workers])
+
+    def test_least_recently_used_entries_are_culled(self):
+        cache = SQLiteCache(self.path, {'OPTIONS': {
+            'MAX_ENTRIES': 30, 'CULL_FREQUENCY': 3, 'TOUCH_INTERVAL': 0,
+        }})
+        for i in range(30):
+            cache.set(f'key-{i}', i)
+        cache.get('key-0')  # Recently used: survives the cull
+        cache.set('one-more', 1)
+        kept = cache.get_many([f'key-{i}' for i in range(30)])
+        self.assertIn('key-0', kept)
+        self.assertNotIn('key-1', kept)
+        self.assertLessEqual(len(kept) + 1, 30)
+
+
+class SQLiteBackendTests(SimpleTestCase):
+    """The tuned SQLite backend and the read-only connection router 🗃️"""
+
+    databases = {'default'}  # Opens its own connections to scratch files
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'db.sqlite3')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def connect(self, **options):
+        handler = ConnectionHandler({'default': {
+            'ENGINE': 'simple_django_framework.sqlite_backend', 'NAME': self.path, 'OPTIONS': options,
+        }})
+        return handler['default']
+
+    def pragma(self, connection, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_are_applied(self):
+        connection = self.connect(pragmas={'cache_size': -1000})
+        self.assertEqual(self.pragma(connection, 'journal_mode'), 'wal')
+        self.assertEqual(self.pragma(connection, 'synchronous'), 1)  # NORMAL
+        self.assertEqual(self.pragma(connection, 'cache_size'), -1000)
+        self.assertEqual(self.pragma(connection, 'temp_store'), 2)  # MEMORY
+        connection.close()
+
+    def test_read_only_connection(self):
+        writer = self.connect()
+        with writer.cursor() as cursor:
+            cursor.execute('CREATE TABLE item (id INTEGER PRIMARY KEY)')
+            cursor.execute('INSERT INTO item VALUES (1)')
+        reader = self.connect(read_only=True)
+        with reader.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM item')
+            self.assertEqual(cursor.fetchone()[0], 1)
+            with self.assertRaises(DatabaseError):
+                cursor.execute('INSERT INTO item VALUES (2)')
+        reader.close()
+        writer.close()
+
+    def test_health_check_notices_a_replaced_file(self):
+        connection = self.connect()
+        connection.ensure_connection()
+        self.assertTrue(connection.is_usable())
+        restored = os.path.join(self.tmpdir.name, 'restored.sqlite3')
+        sqlite3.connect(restored).close()
+        os.replace(restored, self.path)  # e.g. a backup was restored
+        self.assertFalse(connection.is_usable())
+        connection.close()
+
+    def test_router_sends_reads_to_the_read_only_connection(self):
+        router = ReadConnectionRouter()
+        self.assertIsNone(router.db_for_read(BlogPost))  # No 'readonly' alias in tests
+        with mock.patch.dict(connections.settings, {'readonly': {}}):
+            self.assertEqual(router.db_for_read(BlogPost), 'readonly')
+            with mock.patch.object(connections['default'], 'in_atomic_block', True):
+                self.assertEqual(router.db_for_read(BlogPost), 'default')
+        self.assertEqual(router.db_for_write(BlogPost), 'default')
+        self.assertFalse(router.allow_migrate('readonly', 'main_app'))
+
+
+class ReadConnectionTestCase(TransactionTestCase):
+    """
+    Base class for tests that run with the 'readonly' alias switched on 🔀
+
+    The suite normally runs without it (settings.SQLITE_READ_CONNECTION), so
+    a write sent to the read-only connection would go unnoticed. Here it
+    fails like in production: "attempt to write a readonly database".
+
+    TransactionTestCase because reads only go to 'readonly' outside a
+    transaction (see ReadConnectionRouter).
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        # Added here, not in settings: the test runner would try to create
+        # it. Same (in-memory) database, opened read-only
+        default = connections['default'].settings_dict
+        connections.settings['readonly'] = {
+            **default,
+            'OPTIONS': {'read_only': True},
+            'TEST': {**default['TEST'], 'MIRROR': 'default'},  # Nothing of its own to flush
+        }
+        cls.databases = {'default', 'readonly'}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['readonly'].close()
+        del connections['readonly']
+        del connections.settings['readonly']
+
+    def tearDown(self):
+        # Don't leave a read open: the in-memory test database locks whole tables
+        connections['readonly'].close()
+        super().tearDown()
+
+
+class ReadConnectionRoutingTests(ReadConnectionTestCase):
+    """Reads use the read-only connection, writes the default one 🔀"""
+
+    def test_reads_and_writes_are_routed(self):
+        Category.objects.create(name='News', slug='news')
+        category = Category.objects.get(slug='news')
+        self.assertEqual(category._state.db, 'readonly')
+        category.name = 'Updates'
+        category.save()  # Written through 'default' even though it was read elsewhere
+        self.assertEqual(Category.objects.get().name, 'Updates')
+        self.assertEqual(self.client.get(reverse('main_app:blog_list')).status_code, 200)
+
+    def test_the_read_connection_refuses_writes(self):
+        with self.assertRaisesMessage(OperationalError, 'readonly'):
+            Category.objects.using('readonly').create(name='News', slug='news')
+
+
+@override_settings(VIEW_COUNT_FLUSH_INTERVAL=0)
+class CommentWritesWithReadConnectionTests(ReadConnectionTestCase):
+    """Comment stat changes run on the write connection, start to finish 💬"""
+
+    def setUp(self):
+        self.author = User.objects.create_user('writer', password='pw')
+        self.post = make_post(self.author, 1)
+        self.comments = [
+            Comment.objects.create(post=self.post, author=self.author, content='Hi') for _ in range(3)
+        ]
+
+    def test_set_approved_and_delete(self):
+        with CaptureQueriesContext(connections['readonly']) as reads:
+            Comment.objects.filter(post=self.post).set_approved(False)
+        self.assertEqual(reads.captured_queries, [])
+        self.assertEqual(BlogPost.objects.get().comment_count, 0)
+
+        Comment.objects.filter(post=self.post).set_approved(True)
+        comment = Comment.objects.get(pk=self.comments[0].pk)
+        self.assertEqual(comment._state.db, 'readonly')
+        with CaptureQueriesContext(connections['readonly']) as reads:
+            comment.delete()
+        self.assertEqual(reads.captured_queries, [])
+        self.assertEqual(BlogPost.objects.get().comment_count, 2)
+
+
+class AdminWithReadConnectionTests(ReadConnectionTestCase):
+    """Admin bulk actions write through the write connection 🧺"""
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        ContactMessage.objects.bulk_create(
+            ContactMessage(name=f'Sender {i}', email='sender@example.com', subject='Hi', message='Hi')
+            for i in range(25)
+        )
+
+    @mock.patch('main_app.admin.ACTION_BATCH_SIZE', 10)
+    def test_delete_selected(self):
+        url = reverse('admin:main_app_contactmessage_changelist')
+        pks = list(ContactMessage.objects.values_list('pk', flat=True))
+        response = self.client.post(url, {'action': 'delete_selected', '_selected_action': pks, 'post': 'yes'})
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(ContactMessage.objects.exists())
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], REPLICA_MAX_LAG=10, REPLICA_PIN_SECONDS=15)
+class ReplicaRoutingTests(SimpleTestCase):
+    """Replica reads with lag fallback and read-your-writes pinning 🪞"""
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+        replicas.record_replication('replica', time.time())
+        self.addCleanup(cache.delete, 'replica-snapshot:replica')
+
+    def route(self, *steps, cookies=None):
+        """Run ``steps`` ('read' / 'write') inside a request, return (routes, response)"""
+        routes = []
+
+        def view(request):
+            for step in steps:
+                if step == 'read':
+                    routes.append(self.router.db_for_read(BlogPost))
+                else:
+                    routes.append(self.router.db_for_write(BlogPost))
+            return HttpResponse()
+
+        request = self.factory.get('/')
+        request.COOKIES.update(cookies or {})
+        response = replicas.ReplicaPinMiddleware(view)(request)
+        return routes, response
+
+    def test_reads_use_a_fresh_replica(self):
+        routes, response = self.route('read', 'read')
+        self.assertEqual(routes, ['replica', 'replica'])
+        self.assertNotIn(replicas.PIN_COOKIE_NAME, response.cookies)
+        self.assertIsNone(self.router.db_for_read(User))  # Not a replicated model
+
+    def test_lagging_or_unknown_replica_falls_back_to_primary(self):
+        replicas.record_replication('replica', time.time() - 60)
+        self.assertEqual(self.route('read')[0], [None])
+        cache.delete('replica-snapshot:replica')
+        replicas._state_cache.clear()
+        self.assertEqual(self.route('read')[0], [None])
+
+    def test_writes_pin_the_request_and_the_visitor(self):
+        routes, response = self.route('read', 'write', 'read')
+        self.assertEqual(routes, ['replica', 'default', None])
+        cookie = response.cookies[replicas.PIN_COOKIE_NAME]
+        self.assertEqual(cookie['max-age'], 15)
+
+        routes, _ = self.route('read', cookies={replicas.PIN_COOKIE_NAME: cookie.value})
+        self.assertEqual(routes, [None])  # Still pinned on the next request
+        routes, _ = self.route('read', cookies={replicas.PIN_COOKIE_NAME: str(int(time.time()) - 1)})
+        self.assertEqual(routes, ['replica'])  # Pin expired
+
+    def test_outside_requests_read_primary(self):
+        self.assertIsNone(self.router.db_for_read(BlogPost))
+        self.assertFalse(self.router.allow_migrate('replica', 'main_app'))
+
+    def test_replicate_copies_a_consistent_snapshot(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source = os.path.join(tmpdir, 'primary.sqlite3')
+            target = os.path.join(tmpdir, 'replica', 'replica.sqlite3')
+            primary = sqlite3.connect(source)
+            primary.execute('CREATE TABLE item (id INTEGER PRIMARY KEY)')
+            primary.executemany('INSERT INTO item VALUES (?)', [(i,) for i in range(100)])
+            primary.commit()
+            before = time.time()
+            snapshot_at = replicas.replicate(source, target)
+            primary.execute('INSERT INTO item VALUES (100)')
+            primary.commit()
+            primary.close()
+            replica = sqlite3.connect(target)
+            self.assertEqual(replica.execute('SELECT COUNT(*) FROM item').fetchone()[0], 100)
+            replica.close()
+            self.assertGreaterEqual(snapshot_at, before)
+
+
+class RetentionTests(TestCase):
+    """prune_data deletes old rows in small batches and keeps the rest 🧹"""
+
+    def message(self, status, age_days, resolved_days=None):
+        message = ContactMessage.objects.create(
+            name='Sender', email='sender@example.com', subject=status, message='Hi', status=status,
+        )
+        now = timezone.now()
+        ContactMessage.objects.filter(pk=message.pk).update(
+            created_at=now - timedelta(days=age_days),
+            resolved_at=now - timedelta(days=resolved_days) if resolved_days is not None else None,
+        )
+        return message.pk
+
+    def test_policies_delete_only_expired_rows(self):
+        old_spam = [self.message('spam', 10) for _ in range(5)]
+        new_spam = self.message('spam', 1)
+        old_resolved = self.message('resolved', 400, resolved_days=200)
+        recently_resolved = self.message('resolved', 400, resolved_days=10)
+        old_new = self.message('new', 400)
+        Session.objects.create(session_key='old', session_data='', expire_date=timezone.now() - timedelta(days=1))
+        Session.objects.create(session_key='live', session_data='', expire_date=timezone.now() + timedelta(days=1))
+
+        out = io.StringIO()
+        call_command('prune_data', dry_run=True, stdout=out)
+        self.assertIn('5 spam contact messages would be deleted', out.getvalue())
+        self.assertEqual(ContactMessage.objects.count(), 9)
+
+        out = io.StringIO()
+        call_command('prune_data', batch_size=2, pause=0, stdout=out)
+        self.assertIn('spam_messages      deleted 5 rows in 3 batches', out.getvalue())
+        self.assertIn('rows/s', out.getvalue())
+        self.assertCountEqual(
+            ContactMessage.objects.values_list('pk', flat=True),
+            [new_spam, recently_resolved, old_new],
+        )
+        self.assertFalse(set(old_spam + [old_resolved]) & set(ContactMessage.objects.values_list('pk', flat=True)))
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), ['live'])
+
+    @override_settings(DATA_RETENTION={'spam_messages': 30})
+    def test_age_limits_come_from_settings(self):
+        kept = self.message('spam', 10)
+        self.assertEqual(retention.get_policy('spam_messages').queryset().count(), 0)
+        stats = retention.apply_policy(retention.get_policy('spam_messages'), pause=0)
+        self.assertEqual(stats['deleted'], 0)
+        self.assertTrue(ContactMessage.objects.filter(pk=kept).exists())
+
+
+class RetentionLockWaitTests(SimpleTestCase):
+    """lock_wait is the time spent waiting for another writer ⏳"""
+
+    @classmethod
+    def setUpClass(cls):
+        # A database file of its own, so a second connection can lock it.
+        # Added here, not in settings: the test runner would try to create it
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmpdir.name, 'db.sqlite3')
+        connections.settings['scratch'] = {
+            **connections['default'].settings_dict,
+            'NAME': cls.path,
+            'OPTIONS': {'transaction_mode': 'IMMEDIATE', 'pragmas': {'journal_mode': 'WAL', 'busy_timeout': 5000}},
+        }
+        cls.databases = {'scratch'}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['scratch'].close()
+        del connections['scratch']
+        del connections.settings['scratch']
+        cls.tmpdir.cleanup()
+
+    def test_lock_wait_with_begin_immediate(self):
+        with connections['scratch'].schema_editor() as editor:
+            editor.create_model(ContactMessage)
+        ContactMessage.objects.using('scratch').bulk_create(
+            ContactMessage(name='Sender', email='sender@example.com', subject='Hi', message='Hi') for _ in range(5)
+        )
+
+        other_writer = sqlite3.connect(self.path, check_same_thread=False)
+        other_writer.execute('BEGIN IMMEDIATE')  # Hold the write lock for a moment
+        threading.Timer(0.3, other_writer.commit).start()
+        stats = retention.delete_in_batches(
+            ContactMessage.objects.all(), batch_size=10, pause=0, using='scratch'
+        )
+        other_writer.close()
+        connections['scratch'].close()
+
+        self.assertEqual(stats['deleted'], 5)
+        self.assertGreaterEqual(stats['max_lock_wait'], 0.2)  # BEGIN IMMEDIATE waited for it
+        self.assertLess(stats['max_lock_held'], 0.2)
+
+
+class ContactSpoolTests(TestCase):
+    """Contact form messages are spooled to disk and stored in batches 📮"""
+
+    def setUp(self):
+        cache.clear()  # Forget de-duplication keys
+        spool_dir = tempfile.mkdtemp(prefix='spool-test-')
+        self.spool_settings = {**settings.CONTACT_SPOOL, 'DIR': spool_dir}
+        self.spool_dir = spool_dir
+        patcher = override_settings(CONTACT_SPOOL=self.spool_settings)
+        patcher.enable()
+        self.addCleanup(patcher.disable)
+
+    def post(self, **data):
+        fields = {'name': 'Ada', 'email': 'ada@example.com', 'message': 'Hello there', **data}
+        return self.client.post(reverse('main_app:contact_form'), fields)
+
+    def test_valid_messages_are_stored_and_invalid_ones_rejected(self):
+        response = self.post()
+        self.assertContains(response, 'Thank you Ada!')
+        message = ContactMessage.objects.get()
+        self.assertEqual((message.email, message.subject), ('ada@example.com', 'Hello there'))
+        self.assertIsNotNone(message.submission_id)
+
+        response = self.post(email='not-an-email', message='Something else')
+        self.assertEqual(response.status_code, 400)
+        self.assertContains(response, 'Enter a valid email address', status_code=400)
+        self.assertEqual(ContactMessage.objects.count(), 1)
+
+    def test_duplicates_within_the_window_are_dropped(self):
+        self.post()
+        self.assertContains(self.post(email='ADA@example.com', message='  hello   THERE '), 'Thank you')
+        self.post(message='Something else')
+        self.assertEqual(ContactMessage.objects.count(), 2)
+
+    def test_a_message_that_failed_to_spool_can_be_sent_again(self):
+        data = {'name': 'Ada', 'email': 'ada@example.com', 'subject': '', 'message': 'Hello there'}
+        with mock.patch.object(contact_spool, '_append', side_effect=OSError('No space left on device')):
+            with self.assertRaises(OSError):
+                contact_spool.submit(data)
+        self.assertTrue(contact_spool.submit(data))  # Not dropped as a duplicate
+        self.assertFalse(contact_spool.submit(data))  # But now it is one
+        self.assertEqual(ContactMessage.objects.count(), 1)
+
+    def test_messages_are_spooled_then_stored_in_one_insert(self):
+        self.spool_settings['FLUSH_INTERVAL'] = 3600
+        for i in range(3):
+            self.post(message=f'Message {i}')
+        self.addCleanup(contact_spool.stop)
+        self.assertFalse(ContactMessage.objects.exists())
+        self.assertEqual(contact_spool.pending(), 3)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(contact_spool.flush(), 3)
+        inserts = [  # The messages (the job emailing the managers is one more INSERT)
+            q for q in queries.captured_queries
+            if q['sql'].startswith('INSERT') and '"main_app_contactmessage"' in q['sql']
+        ]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(ContactMessage.objects.count(), 3)
+        self.assertEqual(os.listdir(self.spool_dir), [])
+
+    def test_files_of_crashed_processes_are_recovered(self):
+        stored = ContactMessage.objects.create(
+            name='Ada', email='ada@example.com', subject='Hi', message='Hi',
+            submission_id='00000000-0000-0000-0000-000000000001',
+        )
+        records = [
+            {'name': 'Ada', 'email': 'ada@example.com', 'subject': 'Hi', 'message': 'Hi',
+             'submission_id': '00000000000000000000000000000001', 'created_at': '2026-01-01T00:00:00+00:00'},
+            {'name': 'Bob', 'email': 'bob@example.com', 'subject': 'Yo', 'message': 'Yo',
+             'submission_id': '00000000000000000000000000000002', 'created_at': '2026-01-01T00:00:01+00:00'},
+        ]
+        child = multiprocessing.get_context('fork').Process(target=lambda: None)
+        child.start()
+        child.join()  # A pid that is certainly gone now
+        with open(os.path.join(self.spool_dir, f'{child.pid}.active'), 'w') as spool:
+            spool.writelines(json.dumps(record) + '\n' for record in records)
+            spool.write('{"name": "Cut sh')  # Crashed mid-write
+
+        out = io.StringIO()
+        call_command('flush_contact_spool', stdout=out)
+        self.assertIn('Stored 2 spooled messages', out.getvalue())
+        self.assertEqual(
+            list(ContactMessage.objects.order_by('name').values_list('name', flat=True)), ['Ada', 'Bob']
+        )
+        bob = ContactMessage.objects.get(name='Bob')
+        self.assertEqual(bob.created_at.isoformat(), '2026-01-01T00:00:01+00:00')
+        self.assertEqual(os.listdir(self.spool_dir), [])
+        # The managers are only told about Bob: they heard about Ada's message before the crash
+        self.assertEqual(
+            [job.payload['args'] for job in Job.objects.filter(name__endswith='notify_managers_of_contact_messages')],
+            [[[records[1]['submission_id']]]],
+        )
+
+
+# Jobs the job queue tests run 🧪
+JOB_CALLS = []
+
+
+@jobs.job('tests.record')
+def record_job(value):
+    JOB_CALLS.append(value)
+
+
+@jobs.job('tests.fail')
+def failing_job():
+    raise RuntimeError('Mail server down')
+
+
+class JobQueueTests(TestCase):
+    """Background jobs are claimed once, retried with backoff and timed 🧰"""
+
+    def setUp(self):
+        JOB_CALLS.clear()
+
+    def test_jobs_run_once_and_are_marked_done(self):
+        for value in range(3):
+            jobs.enqueue('tests.record', value)
+        self.assertEqual(jobs.queue_stats()['depth'], 3)
+
+        self.assertEqual(jobs.work_off(), {'done': 3, 'queued': 0, 'failed': 0})
+        self.assertEqual(JOB_CALLS, [0, 1, 2])
+        self.assertEqual(Job.objects.filter(status='done', attempts=1, locked_by='').count(), 3)
+        self.assertEqual(jobs.work_off(), {'done': 0, 'queued': 0, 'failed': 0})
+
+        stats = jobs.queue_stats()
+        self.assertEqual((stats['depth'], stats['running'], stats['finished']), (0, 0, 3))
+        self.assertGreaterEqual(stats['total_p95'], stats['run_p95'])
+
+        with self.assertRaises(KeyError):
+            jobs.enqueue('tests.unknown')
+
+    def test_claims_never_overlap(self):
+        for value in range(5):
+            jobs.enqueue(record_job, value)
+        first = jobs.claim('worker-1', limit=3)
+        second = jobs.claim('worker-2', limit=3)
+        self.assertEqual((len(first), len(second)), (3, 2))
+        self.assertFalse({job.pk for job in first} & {job.pk for job in second})
+        self.assertEqual(jobs.claim('worker-3', limit=3), [])
+
+    @override_settings(JOBS={'BACKOFF': 10, 'BACKOFF_MAX': 30})
+    def test_failures_are_retried_with_backoff_then_given_up(self):
+        job = jobs.enqueue('tests.fail', max_attempts=3)
+        self.assertEqual(jobs.work_off(), {'done': 0, 'queued': 1, 'failed': 0})
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('queued', 1))
+        self.assertIn('Mail server down', job.last_error)
+        delay = (job.run_at - timezone.now()).total_seconds()
+        self.assertTrue(3 < delay <= 10, delay)  # 50-100% of BACKOFF
+        self.assertEqual(jobs.work_off(), {'done': 0, 'queued': 0, 'failed': 0})  # Not due yet
+
+        for attempt in (2, 3):
+            [claimed] = jobs.claim('worker', now=job.run_at)
+            self.assertEqual(claimed.attempts, attempt)
+            jobs.execute(claimed, 'worker')
+            job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(jobs.queue_stats()['failed'], 1)
+        self.assertTrue(5 <= jobs.retry_delay(10) <= 30)  # Capped at BACKOFF_MAX
+
+    @override_settings(JOBS={'VISIBILITY_TIMEOUT': 60})
+    def test_jobs_of_dead_workers_are_taken_over_after_the_visibility_timeout(self):
+        jobs.enqueue('tests.record', 'late')
+        [lost] = jobs.claim('dead-worker')
+        self.assertEqual(jobs.claim('worker'), [])  # Still invisible
+        [taken] = jobs.claim('worker', now=timezone.now() + timedelta(seconds=61))
+        self.assertEqual((taken.pk, taken.attempts), (lost.pk, 2))
+
+        self.assertEqual(jobs.execute(taken, 'worker'), 'done')
+        # The first worker waking up later must not overwrite the outcome
+        jobs.execute(lost, 'dead-worker')
+        self.assertEqual(Job.objects.get().locked_by, '')
+        self.assertEqual(JOB_CALLS, ['late', 'late'])  # At least once, here twice
+
+    @override_settings(MANAGERS=[('Team', 'team@example.com')])
+    def test_side_effects_are_emailed_by_jobs_not_requests(self):
+        cache.clear()  # Forget contact form de-duplication keys
+        author = User.objects.create_user('author', email='author@example.com', password='pw')
+        reader = User.objects.create_user('reader', password='pw')
+        post = make_post(author)
+        Comment.objects.create(post=post, author=reader, content='Nice post')
+        self.client.post(reverse('main_app:contact_form'), {
+            'name': 'Ada', 'email': 'ada@example.com', 'message': 'Hello there',
+        })
+        ContactMessage.objects.get().mark_resolved()
+        self.assertEqual(mail.outbox, [])  # Nothing sent while handling requests
+        self.assertEqual(
+            sorted(Job.objects.values_list('name', flat=True)),
+            ['notify_managers_of_contact_messages', 'notify_post_author', 'send_resolved_emails'],
+        )
+
+        self.assertEqual(jobs.work_off()['done'], 3)
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            ['ada@example.com', 'author@example.com', 'team@example.com'],
+        )
+
+
+def image_upload(name='me.png', size=(640, 480), color=(200, 30, 30, 255)):
+    """A real PNG file, as if uploaded 📷"""
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new('RGBA', size, color).save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+class ThumbnailTests(TestCase):
+    """Profile pictures get small content-addressed thumbnails 🖼️"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp(prefix='media-test-')
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        patcher = override_settings(MEDIA_ROOT=media_root)
+        patcher.enable()
+        self.addCleanup(patcher.disable)
+        self.media_root = media_root
+
+    def make_profile(self, username, **kwargs):
+        user = User.objects.create_user(username, password='pw')
+        return UserProfile.objects.create(user=user, profile_picture=image_upload(**kwargs))
+
+    def thumbnail_files(self):
+        return sorted(
+            os.path.relpath(os.path.join(folder, name), self.media_root)
+            for folder, _, names in os.walk(os.path.join(self.media_root, 'thumbs')) for name in names
+        )
+
+    def test_uploads_are_resized_by_a_job_and_shared_by_content(self):
+        from PIL import Image
+
+        profile = self.make_profile('ada')
+        self.assertEqual(profile.picture_digest, '')
+        self.assertEqual(list(Job.objects.values_list('name', flat=True)), ['make_profile_thumbnails'])
+
+        jobs.work_off()
+        profile.refresh_from_db()
+        digest = profile.picture_digest
+        self.assertEqual(len(digest), 64)
+        files = self.thumbnail_files()
+        self.assertEqual(len(files), 6)  # 3 sizes x 2 formats
+        self.assertIn(f'thumbs/{digest[:2]}/{digest[:20]}-100.webp', files)
+        with Image.open(os.path.join(self.media_root, files[0])) as thumb:
+            self.assertEqual(thumb.size[0], thumb.size[1])
+
+        # The same picture uploaded again: same names, nothing new to make
+        twin = self.make_profile('bob')
+        self.assertEqual(twin.ensure_thumbnails(), digest)
+        self.assertEqual(self.thumbnail_files(), files)
+
+        # A different picture replaces the digest
+        profile.profile_picture = image_upload(color=(0, 0, 255, 255))
+        profile.save()
+        self.assertEqual(profile.picture_digest, '')
+        self.assertNotEqual(profile.ensure_thumbnails(), digest)
+
+    def test_template_tag_serves_thumbnails_with_srcset(self):
+        profile = self.make_profile('ada')  # No job run: made on first use
+        html = Template('{% load thumbnails %}{% profile_picture profile 50 %}').render(
+            Context({'profile': profile})
+        )
+        name = profile.picture_digest[:20]
+        self.assertIn(
+            f'<source type="image/webp" srcset="/media/thumbs/{name[:2]}/{name}-50.webp 1x, '
+            f'/media/thumbs/{name[:2]}/{name}-100.webp 2x, /media/thumbs/{name[:2]}/{name}-200.webp 4x">',
+            html,
+        )
+        self.assertIn(f'src="/media/thumbs/{name[:2]}/{name}-50.jpg"', html)
+        self.assertNotIn(profile.profile_picture.url, html)  # Never the full-size original
+
+        no_picture = UserProfile.objects.create(user=User.objects.create_user('bob'))
+        self.assertEqual(Template('{% load thumbnails %}{% profile_picture p %}').render(
+            Context({'p': no_picture})
+        ), '')
+
+    def test_backfill_command_uses_a_process_pool(self):
+        profiles = [self.make_profile(f'user{i}', color=(i * 40, 0, 0, 255)) for i in range(3)]
+        out = io.StringIO()
+        call_command('make_thumbnails', '--dry-run', stdout=out)
+        self.assertIn('3 profile pictures need thumbnails', out.getvalue())
+
+        out = io.StringIO()
+        call_command('make_thumbnails', '--processes', '2', stdout=out)
+        self.assertIn('Made 18 thumbnails for 3 pictures with 2 processes', out.getvalue())
+        for profile in profiles:
+            profile.refresh_from_db()
+            self.assertTrue(thumbnails.derivatives_exist(profile.picture_digest))
+
+        out = io.StringIO()
+        call_command('make_thumbnails', stdout=out)
+        self.assertIn('0 profile pictures need thumbnails', out.getvalue())
+
+
+class ChunkedUploadTests(TestCase):
+    """Files arrive in checked, resumable chunks, straight to MEDIA_ROOT 📤"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp(prefix='media-test-')
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        patcher = override_settings(MEDIA_ROOT=media_root)
+        patcher.enable()
+        self.addCleanup(patcher.disable)
+        self.media_root = media_root
+        self.user = User.objects.create_user('ada', password='pw')
+        self.client.force_login(self.user)
+
+    def start(self, content, **fields):
+        data = {'filename': 'me.png', 'size': len(content), 'purpose': 'profile_picture', **fields}
+        return self.client.post(reverse('main_app:api_uploads'), data, content_type='application/json')
+
+    def send(self, url, offset, chunk, checksum=None):
+        headers = {'Upload-Offset': str(offset)}
+        if checksum is not None:
+            headers['Upload-Checksum'] = f'sha256 {checksum}'
+        return self.client.patch(url, chunk, content_type='application/offset+octet-stream', headers=headers)
+
+    def test_picture_is_uploaded_in_chunks_resumed_and_used(self):
+        import hashlib
+
+        content = image_upload().read()
+        response = self.start(content, sha256=hashlib.sha256(content).hexdigest())
+        self.assertEqual(response.status_code, 201)
+        url = response.json()['url']
+        upload = Upload.objects.get()
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, upload.file.name)))
+
+        first, rest = content[:1000], content[1000:]
+        self.assertEqual(self.send(url, 0, first, hashlib.sha256(first).hexdigest()).json()['offset'], 1000)
+
+        # A damaged chunk is refused and cut off again
+        response = self.send(url, 1000, b'x' * len(rest), hashlib.sha256(rest).hexdigest())
+        self.assertEqual(response.status_code, 400)
+        # Sending from the wrong place says where to carry on
+        response = self.send(url, 0, first)
+        self.assertEqual((response.status_code, response['Upload-Offset']), (409, '1000'))
+        # "How far did I get?" after a broken connection
+        self.assertEqual(self.client.head(url)['Upload-Offset'], '1000')
+
+        response = self.send(url, 1000, rest, hashlib.sha256(rest).hexdigest())
+        self.assertTrue(response.json()['complete'])
+        profile = UserProfile.objects.get(user=self.user)
+        self.assertEqual(profile.profile_picture.name, Upload.objects.get().file.name)
+        with open(profile.profile_picture.path, 'rb') as stored:
+            self.assertEqual(stored.read(), content)
+        self.assertTrue(Job.objects.filter(name='make_profile_thumbnails').exists())
+        self.assertEqual(self.send(url, len(content), b'more').status_code, 409)
+
+    @override_settings(UPLOADS={'MAX_SIZE': {'profile_picture': 1000, 'media': 5000}, 'MAX_CHUNK_SIZE': 100})
+    def test_limits_are_checked_before_reading_the_body(self):
+        self.assertEqual(self.start(b'x' * 1001).status_code, 413)
+        self.assertEqual(self.start(b'x', filename='me.exe').status_code, 400)
+        upload = uploads.start_upload(self.user, 'clip.bin', 500)
+
+        class Unreadable:
+            def read(self, size):
+                raise AssertionError('The body must not be read')
+
+        for length in (101, 600):  # Bigger than a chunk / than the announced file
+            with self.assertRaises(uploads.UploadError) as raised:
+                uploads.write_chunk(upload, 0, length, Unreadable())
+            self.assertEqual(raised.exception.status, 413)
+        with self.assertRaises(uploads.UploadError) as raised:
+            uploads.write_chunk(upload, None, 10, Unreadable())
+        self.assertEqual(raised.exception.status, 400)
+
+    def test_bad_files_and_cancelled_uploads_leave_nothing_behind(self):
+        content = b'not really a picture'
+        url = self.start(content).json()['url']
+        self.assertEqual(self.send(url, 0, content).status_code, 400)  # Pillow can't read it
+        self.assertFalse(Upload.objects.exists())
+
+        url = self.start(b'12345', filename='notes.txt', purpose='media').json()['url']
+        path = os.path.join(self.media_root, Upload.objects.get().file.name)
+        other = User.objects.create_user('bob', password='pw')
+        self.client.force_login(other)
+        self.assertEqual(self.client.head(url).status_code, 404)  # Not yours
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertFalse(os.path.exists(path))
+
+        # Abandoned uploads are pruned with their files
+        uploads.start_upload(self.user, 'old.bin', 10)
+        path = os.path.join(self.media_root, Upload.objects.get().file.name)
+        Upload.objects.update(updated_at=timezone.now() - timedelta(days=2))
+        retention.apply_policy(retention.get_policy('stale_uploads'), pause=0)
+        self.assertFalse(Upload.objects.exists())
+        self.assertFalse(os.path.exists(path))
+
+
+class StaticBuildTests(SimpleTestCase):
+    """Our CSS/JS are minified, hashed and gzipped by collectstatic 🏗️"""
+
+    def test_minifiers_keep_strings_and_meaning(self):
+        css = "a > b {\n  color: red; /* note */\n  content: ' ; } ';\n  width: calc(100% - 2px);\n}\n"
+        self.assertEqual(static_files.minify_css(css), "a>b{color:red;content:' ; } ';width:calc(100% - 2px)}")
+        js = "// hi\nvar a = b / c;  /* x */\nvar r = /\\/[/]/g;\nx = a - -b\nreturn `${a}  b`\n"
+        self.assertEqual(static_files.minify_js(js), "var a=b/c;var r=/\\/[/]/g;x=a- -b\nreturn `${a}  b`")
+
+    def test_collectstatic_writes_minified_hashed_files(self):
+        static_root = tempfile.mkdtemp(prefix='static-test-')
+        self.addCleanup(shutil.rmtree, static_root, ignore_errors=True)
+        storages = {**settings.STORAGES, 'staticfiles': {
+            'BACKEND': 'simple_django_framework.static_files.MinifiedManifestStaticFilesStorage',
+        }}
+        with override_settings(STATIC_ROOT=static_root, STATICFILES_DIRS=[], STORAGES=storages, DEBUG=False):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            html = Template("{% load static %}{% static 'main_app/css/home.css' %}").render(Context())
+
+            self.assertRegex(html, r'^/static/main_app/css/home\.[0-9a-f]{12}\.css$')
+            hashed = html.removeprefix(settings.STATIC_URL)
+            with open(os.path.join(static_root, hashed)) as built:
+                css = built.read()
+            self.assertNotIn('/*', css)
+            self.assertNotIn('\n', css)
+            self.assertTrue(os.path.exists(os.path.join(static_root, hashed + '.gz')))
+
+            response = static_files.serve(RequestFactory().get(html), hashed, document_root=static_root)
+            self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+            response = static_files.serve(RequestFactory().get('/'), 'main_app/css/home.css', document_root=static_root)
+            self.assertEqual(response['Cache-Control'], 'no-cache')
+
+    def test_pages_link_static_files_instead_of_inline_code(self):
+        html = self.client.get(reverse('main_app:home')).content.decode()
+        self.assertIn('/static/main_app/css/home.css', html)
+        self.assertIn('/static/main_app/js/base.js', html)
+        self.assertNotIn('<style>', html)
+
+
+class VendorAssetsTests(SimpleTestCase):
+    """vendor_assets self-hosts Bootstrap/Font Awesome with only what we use 📦"""
+
+    BOOTSTRAP_CSS = (
+        '/*! Bootstrap */:root{--bs-blue:#0d6efd}body{margin:0}.navbar,.carousel{display:flex}'
+        '.collapse:not(.show){display:none}.alert-success{color:green}.carousel-item{float:left}'
+        '@media (min-width:992px){.navbar-expand-lg .navbar-nav{flex-direction:row}.carousel{x:y}}'
+    )
+    FONTAWESOME_CSS = (
+        '.fas{font-weight:900}.fa-rocket:before{content:"\\f135"}.fa-anchor:before{content:"\\f13d"}'
+        '@font-face{font-family:"Font Awesome 6 Free";src:url(../webfonts/fa-solid-900.woff2) format("woff2"),'
+        'url(../webfonts/fa-solid-900.ttf) format("truetype")}'
+    )
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix='vendor-test-')
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        os.makedirs(os.path.join(self.root, 'source'))
+        os.makedirs(os.path.join(self.root, 'templates'))
+        files = {
+            'source/bootstrap.min.css': self.BOOTSTRAP_CSS, 'source/all.min.css': self.FONTAWESOME_CSS,
+            'source/bootstrap.bundle.min.js': '/*! Bootstrap JS */\n//# sourceMappingURL=bootstrap.bundle.min.js.map',
+            'source/fa-solid-900.woff2': 'font',
+            'templates/page.html': '<nav class="navbar navbar-expand-lg"><ul class="navbar-nav">'
+                                   '<i class="fas fa-rocket"></i><div class="alert-{{ tag }}">',
+        }
+        for name, content in files.items():
+            with open(os.path.join(self.root, name), 'w') as output:
+                output.write(content)
+        self.addCleanup(assets.is_vendored.cache_clear)
+
+    def read(self, name):
+        with open(os.path.join(self.root, 'static', name)) as built:
+            return built.read()
+
+    def test_purge_keeps_only_rules_for_used_classes(self):
+        css = assets.purge_css(self.BOOTSTRAP_CSS, {'navbar', 'navbar-expand-lg', 'navbar-nav', 'collapse'}, ['alert-'])
+        self.assertEqual(css, (
+            '/*! Bootstrap */:root{--bs-blue:#0d6efd}body{margin:0}.navbar{display:flex}'
+            '.collapse:not(.show){display:none}.alert-success{color:green}'
+            '@media (min-width:992px){.navbar-expand-lg .navbar-nav{flex-direction:row}}'
+        ))
+
+    def test_command_vendors_purged_assets_and_templates_use_them(self):
+        self.assertTrue(Template("{% load assets %}{% vendor_url 'bootstrap_css' %}").render(Context()).startswith('https://'))
+
+        options = {'ROOT': os.path.join(self.root, 'static'), 'CONTENT': ['templates/*.html'], 'SAFELIST': ['show']}
+        with override_settings(VENDOR_ASSETS=options, BASE_DIR=self.root,
+                               STATICFILES_DIRS=[os.path.join(self.root, 'static')]):
+            call_command('vendor_assets', source=os.path.join(self.root, 'source'), stdout=io.StringIO(),
+                         stderr=io.StringIO())
+            url = Template("{% load assets %}{% vendor_url 'bootstrap_css' %}").render(Context())
+
+        self.assertEqual(url, '/static/vendor/bootstrap/bootstrap.min.css')
+        bootstrap = self.read('vendor/bootstrap/bootstrap.min.css')
+        self.assertIn('.navbar-expand-lg .navbar-nav', bootstrap)
+        self.assertIn('.alert-success', bootstrap)
+        self.assertNotIn('carousel', bootstrap)
+        fontawesome = self.read('vendor/fontawesome/css/all.min.css')
+        self.assertIn('.fa-rocket', fontawesome)
+        self.assertNotIn('.fa-anchor', fontawesome)
+        self.assertNotIn('.ttf', fontawesome)  # Only the WOFF2 font is vendored
+        self.assertTrue(os.path.exists(os.path.join(self.root, 'static/vendor/fontawesome/webfonts/fa-solid-900.woff2')))
+        # No reference to the (not vendored) source map: collectstatic would look for it
+        self.assertEqual(self.read('vendor/bootstrap/bootstrap.bundle.min.js'), '/*! Bootstrap JS */\n')
+        storages = {**settings.STORAGES, 'staticfiles': {
+            'BACKEND': 'simple_django_framework.static_files.MinifiedManifestStaticFilesStorage',
+        }}
+        with override_settings(STATIC_ROOT=os.path.join(self.root, 'collected'), STORAGES=storages,
+                               STATICFILES_DIRS=[os.path.join(self.root, 'static')]):
+            call_command('collectstatic', interactive=False, verbosity=0)
+        self.assertTrue(os.listdir(os.path.join(self.root, 'collected', 'vendor', 'bootstrap')))
+
+
+@override_settings(RATE_LIMIT_ENABLED=True, RATE_LIMITS={
+    'contact_form': {'views': ['main_app:contact_form'], 'methods': ['POST'], 'rate': '3/m'},
+    'api': {'views': ['main_app:api_hello'], 'rate': '2/m', 'key': 'user', 'json': True},
+})
+class RateLimitTests(TestCase):
+    """RateLimitMiddleware answers 429 once a client goes over its rate 🚦"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_contact_form_posts_are_limited_per_ip(self):
+        url = reverse('main_app:contact_form')
+        for i in range(3):
+            data = {'name': 'Ada', 'email': 'ada@example.com', 'message': f'Message {i}'}
+            self.assertEqual(self.client.post(url, data).status_code, 200)
+
+        response = self.client.post(url, {'name': 'Ada', 'email': 'ada@example.com', 'message': 'More'})
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+        self.assertEqual(self.client.get(url).status_code, 200)  # Only POSTs count
+        other = self.client.post(url, {'name': 'Bob', 'email': 'bob@example.com', 'message': 'Hi'},
+                                 REMOTE_ADDR='192.0.2.7')
+        self.assertEqual(other.status_code, 200)
+
+    def test_api_is_limited_per_user_with_a_json_answer(self):
+        url = reverse('main_app:api_hello')
+        for _ in range(2):
+            self.assertEqual(self.client.get(url).status_code, 200)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.json()['status'], 'error')
+
+        # A logged-in user has a budget of their own
+        self.client.force_login(User.objects.create_user('reader', password='pw'))
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_previous_window_fades_out(self):
+        limiter = RateLimiter()
+        for _ in range(10):
+            self.assertEqual(limiter.hit('test', 10, 60, now=5), (True, 0))
+        # 11th in the same window: wait for the next window, then for 11 to fade to 10
+        self.assertEqual(limiter.hit('test', 10, 60, now=5), (False, 61))
+        # Just after the turn of the window the previous 11 still count almost fully
+        self.assertFalse(limiter.hit('test', 10, 60, now=61)[0])  # 11 * 0.98 + 1
+        # Halfway through the next window they count as 5.5
+        self.assertEqual(limiter.hit('test', 10, 60, now=90), (True, 0))  # 5.5 + 2
+
+    def test_bad_rates_are_rejected(self):
+        self.assertEqual(parse_rate('100/10m'), (100, 600))
+        with self.assertRaises(ImproperlyConfigured):
+            parse_rate('lots')
+
+
+@override_settings(VIEW_COUNT_FLUSH_INTERVAL=0)  # Write views through, no flusher thread
+class AdminBulkActionTests(TestCase):
+    """Admin actions run as one UPDATE per pk-ranged batch 🧺"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'pw')
+        ContactMessage.objects.bulk_create(
+            ContactMessage(name=f'Sender {i}', email='sender@example.com', subject='Hi', message='Hi')
+            for i in range(25)
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def run_action(self, model, action, **data):
+        url = reverse(f'admin:main_app_{model._meta.model_name}_changelist')
+        return self.client.post(url, {'action': action, **data}, follow=True)
+
+    @mock.patch('main_app.admin.ACTION_BATCH_SIZE', 10)
+    def test_select_across_resolves_in_batches(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.run_action(
+                ContactMessage, 'mark_resolved', select_across=1,
+                _selected_action=ContactMessage.objects.values_list('pk', flat=True)[:1],
+            )
+        self.assertContains(response, '25 messages were marked as resolved.')
+        updates = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE "main_app_contactmessage"')]
+        self.assertEqual(len(updates), 3)  # 10 + 10 + 5 rows
+        self.assertFalse(ContactMessage.objects.exclude(status='resolved').exists())
+        self.assertFalse(ContactMessage.objects.filter(resolved_at__isnull=True).exists())
+
+    def test_post_actions_recount_categories_and_touch_posts(self):
+        posts = [make_post(self.admin, i, status='draft') for i in range(3)]
+        category = Category.objects.create(name='News', slug='news')
+        category.posts.add(*posts)
+        before = BlogPost.objects.get(pk=posts[0].pk).updated_at
+
+        self.run_action(BlogPost, 'make_published', _selected_action=[p.pk for p in posts])
+        category.refresh_from_db()
+        self.assertEqual(category.published_post_count, 3)
+        self.assertGreater(BlogPost.objects.get(pk=posts[0].pk).updated_at, before)
+
+        self.run_action(BlogPost, 'make_draft', _selected_action=[posts[0].pk])
+        category.refresh_from_db()
+        self.assertEqual(category.published_post_count, 2)
+
+    @mock.patch('main_app.admin.ACTION_BATCH_SIZE', 10)
+    def test_delete_selected_runs_in_batches(self):
+        pks = list(ContactMessage.objects.values_list('pk', flat=True))
+        with CaptureQueriesContext(connection) as queries:
+            self.run_action(ContactMessage, 'delete_selected', _selected_action=pks, post='yes')
+        self.assertFalse(ContactMessage.objects.exists())
+        deletes = [q['sql'] for q in queries.captured_queries
+                   if q['sql'].startswith('DELETE FROM "main_app_contactmessage" WHERE')]
+        self.assertEqual(len(deletes), 3)
+
+
+class LazySessionTests(TestCase):
+    """Sessions are only written when they change or are close to expiring 🍪"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('visitor', password='pw')
+
+    def setUp(self):
+        cache.clear()
+
+    def get_with_session_writes(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        writes = [
+            q['sql'] for q in queries
+            if 'django_session' in q['sql'] and not q['sql'].startswith('SELECT')
+        ]
+        return response, writes
+
+    def test_read_only_requests_do_not_write(self):
+        self.client.force_login(self.user)
+        for _ in range(3):
+            response, writes = self.get_with_session_writes(reverse('main_app:protected'))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(writes, [])
+            self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+
+    def test_database_is_the_fallback_when_the_cache_is_empty(self):
+        self.client.force_login(self.user)
+        cache.clear()
+        response, writes = self.get_with_session_writes(reverse('main_app:protected'))
+        self.assertEqual(response.status_code, 200)  # Still logged in
+        self.assertEqual(writes, [])
+
+    def test_changed_sessions_are_saved(self):
+        store = session_store.SessionStore()
+        store['cart'] = [1, 2]
+        store.save()
+        self.assertEqual(Session.objects.get(pk=store.session_key).get_decoded()['cart'], [1, 2])
+        loaded = session_store.SessionStore(store.session_key)
+        self.assertEqual(loaded['cart'], [1, 2])
+        self.assertFalse(loaded.modified)  # Fresh session: nothing to write back
+
+    def test_sessions_close_to_expiry_are_refreshed(self):
+        with mock.patch.object(session_store, 'time') as fake_time:
+            fake_time.time.return_value = int(time.time()) - 20 * 3600  # 4 hours left
+            self.client.force_login(self.user)
+
+        response, writes = self.get_with_session_writes(reverse('main_app:protected'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(writes)
+        self.assertIn(settings.SESSION_COOKIE_NAME, response.cookies)  # Cookie pushed forward
+
+        response, writes = self.get_with_session_writes(reverse('main_app:protected'))
+        self.assertEqual(writes, [])  # Refreshed: quiet again
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Every page must render in a FIXED number of queries 🎯
+
+    Each URL is requested, more rows are seeded, and the URL is requested
+    again: if the query count grows with the number of rows (an N+1 query),
+    or exceeds the budget, the test fails.
+    """
+
+    SEED_COUNT = 20  # Rows per model before growing
+    GROW_COUNT = 20  # Rows per model added between the two requests
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'pw')
+        cls.posts = seed_content(cls.SEED_COUNT)
+
+    def count_queries(self, url, method='get', **request):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, **request)
+            if response.streaming:
+                b''.join(response.streaming_content)  # Streamed rows are read as they're sent
+        self.assertIn(response.status_code, (200, 201, 302), f"{url} returned {response.status_code}")
+        return len(queries)
+
+    def assertQueryBudget(self, url, budget, grow=None, **request):
+        """
+        ``grow(posts)`` links the newly seeded posts to what the URL shows;
+        ``request`` is passed on to count_queries (method, data, ...)
+        """
+        self.count_queries(url, **request)  # Warm up one-off caches (content types, ...)
+        before = self.count_queries(url, **request)
+        posts = seed_content(self.GROW_COUNT, prefix=f'grow{self._grown}')
+        if grow:
+            grow(posts)
+        self._grown += 1
+        after = self.count_queries(url, **request)
+        self.assertEqual(
+            before, after,
+            f"{url} ran {before} queries, then {after} after adding rows (N+1 query?)"
+        )
+        self.assertLessEqual(after, budget, f"{url} ran {after} queries, budget is {budget}")
+
+    def setUp(self):
+        self._grown = 0
+
+    def test_public_pages(self):
+        budgets = {
+            'main_app:home': 0,
+            'main_app:about': 0,
+            'main_app:contact': 0,
+            'main_app:contact_form': 0,
+            'main_app:api_hello': 0,
+            'main_app:error_test': 0,
+            'main_app:privacy': 0,
+            'main_app:terms': 0,
+            'main_app:help': 0,
+            'main_app:protected': 0,  # Redirects to login
+            'main_app:blog_list': 3,  # Validators, posts + authors, categories
+            'main_app:api_post_list': 3,
+        }
+        for url in (reverse('main_app:search') + '?q=seed', reverse('main_app:api_search') + '?q=seed'):
+            with self.subTest(url=url):
+                self.assertQueryBudget(url, 2)  # Ranked search, then posts + authors
+        for name, budget in budgets.items():
+            with self.subTest(url=name):
+                self.assertQueryBudget(reverse(name), budget)
+
+    def test_logged_in_pages(self):
+        self.client.force_login(self.admin)
+        # User load only: the session comes from the cache and isn't saved
+        for name in ('main_app:home', 'main_app:protected', 'main_app:api_hello'):
+            with self.subTest(url=name):
+                self.assertQueryBudget(reverse(name), 1)
+
+    @override_settings(VIEW_COUNT_FLUSH_INTERVAL=0)  # Write views through, no flusher thread
+    def test_blog_post_detail(self):
+        # Validators, post + author, its categories, view count (written through)
+        self.assertQueryBudget(reverse('main_app:blog_post_detail', args=[self.posts[1].slug]), 4)
+
+    def test_post_comments_api(self):
+        post = self.posts[1]
+        self.assertQueryBudget(
+            reverse('main_app:api_post_comments', args=[post.slug]), 2,  # Post, comments + authors
+            grow=lambda posts: Comment.objects.bulk_create(
+                Comment(post=post, author=grown.author, content='More') for grown in posts
+            ),
+        )
+
+    @override_settings(VIEW_COUNT_FLUSH_INTERVAL=0)
+    def test_async_twins(self):
+        budgets = {
+            reverse('main_app:async_api_hello'): 0,
+            reverse('main_app:async_blog_list'): 3,
+            reverse('main_app:async_blog_post_detail', args=[self.posts[1].slug]): 4,
+            reverse('main_app:async_api_search') + '?q=seed': 2,
+        }
+        for url, budget in budgets.items():
+            with self.subTest(url=url):
+                self.assertQueryBudget(url, budget)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+    def test_async_api_post_list_cache_miss(self):
+        # Pages are cached by ETag: what counts is the request that fills the cache
+        self.assertQueryBudget(reverse('main_app:async_api_post_list'), 3)
+
+    def test_category_detail(self):
+        # Validators, category, its posts + authors, their categories
+        category = Category.objects.get(slug='seed-category-1')
+        self.assertQueryBudget(
+            category.get_absolute_url(), 4, grow=lambda posts: category.posts.add(*posts)
+        )
+
+    def test_exports(self):
+        self.client.force_login(self.admin)
+        # User load, then one query the rows are streamed from
+        for name in ('main_app:api_export_posts', 'main_app:api_export_comments'):
+            with self.subTest(url=name):
+                self.assertQueryBudget(reverse(name), 2)
+
+    def test_upload_endpoints(self):
+        media_root = tempfile.mkdtemp(prefix='media-test-')
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        self.client.force_login(self.admin)
+
+        def grow(posts):
+            Upload.objects.bulk_create(Upload(user=post.author, filename='other.png', size=40) for post in posts)
+
+        with self.settings(MEDIA_ROOT=media_root):
+            # User load, pending uploads count, insert
+            self.assertQueryBudget(
+                reverse('main_app:api_uploads'), 3, grow=grow, method='post',
+                data={'filename': 'me.png', 'size': 40}, content_type='application/json',
+            )
+            upload = Upload.objects.filter(user=self.admin).first()
+            url = reverse('main_app:api_upload', args=[upload.pk])
+            for method in ('head', 'get'):
+                with self.subTest(method=method):
+                    self.assertQueryBudget(url, 2, grow=grow, method=method)  # User, upload
+
+            # Chunks continue where the last one ended, so they're counted one by one
+            def send_chunk():
+                upload.refresh_from_db()
+                return self.count_queries(
+                    url, method='patch', data=b'0123456789', content_type='application/offset+octet-stream',
+                    headers={'Upload-Offset': str(upload.offset)},
+                )
+
+            send_chunk()
+            before = send_chunk()
+            grow(seed_content(self.GROW_COUNT, prefix='grow-chunks'))
+            self.assertEqual(send_chunk(), before, "A chunk ran more queries after adding rows")
+            self.assertLessEqual(before, 3)  # User, upload, offset update
+
+    def test_admin_changelists(self):
+        self.client.force_login(self.admin)
+        budgets = {
+            UserProfile: 9,
+            BlogPost: 12,
+            Comment: 12,
+            ContactMessage: 10,
+            Category: 9,
+        }
+        for model, budget in budgets.items():
+            url = reverse(f'admin:main_app_{model._meta.model_name}_changelist')
+            with self.subTest(url=url):
+                self.assertQueryBudget(url, budget)
+
+    def test_admin_change_pages(self):
+        self.client.force_login(self.admin)
+        post = self.posts[1]
+        budgets = {
+            UserProfile: (UserProfile.objects.first().pk, 8),
+            BlogPost: (post.pk, 12),
+            Comment: (Comment.objects.first().pk, 11),
+            ContactMessage: (ContactMessage.objects.first().pk, 7),
+            Category: (Category.objects.first().pk, 7),
+        }
+        for model, (pk, budget) in budgets.items():
+            url = reverse(f'admin:main_app_{model._meta.model_name}_change', args=[pk])
+            with self.subTest(url=url):
+                self.assertQueryBudget(url, budget)
+
+    def test_comment_inline_keeps_its_widgets_without_a_query_per_row(self):
+        self.client.force_login(self.admin)
+        post = self.posts[1]
+        url = reverse('admin:main_app_blogpost_change', args=[post.pk])
+        self.count_queries(url)
+        before = self.count_queries(url)
+        Comment.objects.bulk_create(
+            Comment(post=post, author=self.admin, content=f'More {i}') for i in range(10)
+        )
+        response = self.client.get(url)
+        self.assertEqual(self.count_queries(url), before, "Each inline comment row ran its own query")
+        html = response.content.decode()
+        self.assertIn(f'<select name="comments-{post.comments.count() - 1}-author"', html)  # Editable author
+        self.assertIn('comments-__prefix__-author', html)  # Comments can be added inline
+
+        # Posts are picked from a list (with their authors in the same query), not typed in by id
+        comment_page = self.client.get(reverse('admin:main_app_comment_change', args=[Comment.objects.first().pk]))
+        self.assertContains(comment_page, '<select name="post"')
+        category_page = self.client.get(reverse('admin:main_app_category_change', args=[Category.objects.first().pk]))
+        self.assertContains(category_page, '<select name="posts"')
+
+
+class WriteQueueTests(TransactionTestCase):
+    """
+    The single-writer queue 🧵
+
+    TransactionTestCase because the writes run on the writer thread, which
+    can't see data inside a TestCase transaction.
+    """
+
+    def setUp(self):
+        self.queue = WriteQueue(batch_window=0.05)
+        self.addCleanup(self.queue.stop)
+
+    def test_writes_are_batched_and_resolve_futures(self):
+        gate = threading.Event()
+        blocker = self.queue.submit(gate.wait)  # Hold the writer while the others queue up
+        futures = [
+            self.queue.submit(Category.objects.create, name=f'Topic {i}', slug=f'topic-{i}')
+            for i in range(20)
+        ]
+        gate.set()
+        categories = [future.result(timeout=5) for future in futures]
+        self.assertTrue(blocker.result(timeout=5))
+        self.assertEqual([c.slug for c in categories], [f'topic-{i}' for i in range(20)])
+        self.assertEqual(Category.objects.count(), 20)
+        self.assertEqual(self.queue.operations, 21)
+        self.assertLessEqual(self.queue.batches, 3)  # Not one transaction per write
+
+    def test_a_failing_write_only_undoes_itself(self):
+        gate = threading.Event()
+        self.queue.submit(gate.wait)
+        first = self.queue.submit(Category.objects.create, name='One', slug='same')
+        duplicate = self.queue.submit(Category.objects.create, name='Two', slug='same')
+        last = self.queue.submit(Category.objects.create, name='Three', slug='three')
+        gate.set()
+        first.result(timeout=5)
+        last.result(timeout=5)
+        with self.assertRaises(IntegrityError):
+            duplicate.result(timeout=5)
+        self.assertEqual(sorted(Category.objects.values_list('name', flat=True)), ['One', 'Three'])
+
+    def test_big_writes_get_a_transaction_of_their_own(self):
+        Category.objects.create(name='News', slug='news')
+        updated = self.queue.run(Category.objects.update, batch=False, description='Bulk')
+        self.assertEqual(updated, 1)
+        self.assertEqual(Category.objects.get().description, 'Bulk')
+
+    def test_inline_inside_a_transaction(self):
+        with transaction.atomic():
+            future = self.queue.submit(threading.current_thread)
+            self.assertTrue(future.done())
+            self.assertIs(future.result(), threading.current_thread())
+        self.assertIsNot(self.queue.run(threading.current_thread), threading.current_thread())
+
+
+@override_settings(ALLOWED_HOSTS=['localhost'])  # The drivers send Host: localhost
+class BenchCommandTests(TransactionTestCase):
+    """
+    Smoke test for manage.py bench 🏎️
+
+    TransactionTestCase because the ASGI driver runs views in other threads,
+    which can't see data inside a TestCase transaction.
+    """
+
+    def test_bench_writes_results(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output = os.path.join(tmpdir, 'bench.json')
+            call_command(
+                'bench', requests=2, concurrency=1, warmup=0,  # In-memory SQLite locks whole tables
+                routes=['/about/', '/admin/main_app/blogpost/'],
+                output=output, stdout=io.StringIO(),
+            )
+            with open(output) as handle:
+                report = json.load(handle)
+
+        self.assertIn('commit', report['meta'])
+        rows = {(r['route'], r['interface'], r['auth']): r for r in report['results']}
+        # '/admin/main_app/blogpost/' also matches its add/ page: 3 routes x 2 x 2
+        self.assertEqual(len(rows), 12)
+        for interface in ('wsgi', 'asgi'):
+            self.assertEqual(rows[('/about/', interface, 'anonymous')]['status_codes'], {'200': 2})
+            self.assertEqual(rows[('/about/', interface, 'anonymous')]['queries_per_request'], 0)
+            self.assertEqual(
+                rows[('/admin/main_app/blogpost/', interface, 'user')]['status_codes'], {'200': 2}
+            )
+            self.assertEqual(
+                rows[('/admin/main_app/blogpost/', interface, 'anonymous')]['status_codes'], {'302': 2}
+            )
+        self.assertFalse(User.objects.get(username='bench').has_usable_password())
+
+
+class RunWorkerCommandTests(TransactionTestCase):
+    """
+    manage.py runworker runs due jobs in its thread pool 🧵
+
+    TransactionTestCase because the pool threads can't see data inside a
+    TestCase transaction.
+    """
+
+    def test_burst_runs_every_due_job(self):
+        JOB_CALLS.clear()
+        for value in range(6):
+            jobs.enqueue('tests.record', value)
+        jobs.enqueue('tests.record', 'later', delay=3600)
+
+        out = io.StringIO()
+        # One thread: in-memory SQLite locks whole tables, so claiming while
+        # another thread stores an outcome would fail here
+        call_command('runworker', '--burst', '--threads', '1', stdout=out)
+        self.assertIn('Stopped: 6 done, 0 to retry, 0 failed', out.getvalue())
+        self.assertEqual(sorted(JOB_CALLS), list(range(6)))
+
+        out = io.StringIO()
+        call_command('runworker', '--stats', stdout=out)
+        self.assertIn('Queue depth: 0 due', out.getvalue())
+        self.assertIn('1 scheduled', out.getvalue())
@@ -0,0 +1,168 @@
+"""
+Thumbnails for main_app
+
+What is this file? 🖼️
+People upload profile pictures straight from their phones: several
+megabytes, thousands of pixels wide. Showing one as a 50x50 avatar with
+<img width="50"> still makes the browser download ALL of it - on an admin
+list of 100 profiles that's hundreds of megabytes.
+
+So we make small copies ("derivatives") once, with Pillow:
+1. Each picture is cropped to a square and shrunk to every size in
+   settings.THUMBNAILS['SIZES'], in every format in FORMATS (WebP is much
+   smaller; JPEG is for the few browsers without WebP)
+2. Files are CONTENT-ADDRESSED: named after a hash of the original's bytes,
+   e.g. thumbs/3f/3f2a...-100.webp. The same picture always gets the same
+   name, so a file that exists is always right - nothing to invalidate,
+   and the browser can cache it forever.
+3. They are made in a background job when a picture is uploaded, or on
+   the first request that needs them (whichever comes first), and for
+   existing pictures by `python manage.py make_thumbnails`
+
+Templates show them with {% profile_picture profile 50 %} (see
+main_app/templatetags/thumbnails.py), which adds a srcset so sharp
+screens get the 2x size.
+"""
+
+# Import necessary components 📦
+import hashlib  # Content addresses
+import logging  # For logging
+import os  # Atomic renames
+import tempfile  # Write next to the target, then rename
+from pathlib import Path  # File paths
+
+from django.conf import settings  # settings.THUMBNAILS, MEDIA_ROOT, MEDIA_URL
+from PIL import Image, ImageOps  # Pillow: the actual image work
+
+# Get a logger for this app 📝
+logger = logging.getLogger('main_app')
+
+# Default options (settings.THUMBNAILS overrides them) ⚙️
+DEFAULT_OPTIONS = {
+    'SIZES': [50, 100, 200],  # Square sizes in pixels
+    'FORMATS': ['webp', 'jpeg'],  # First one the browser supports wins
+    'QUALITY': 80,  # Lossy quality (0-100)
+    'DIR': 'thumbs',  # Folder under MEDIA_ROOT
+}
+
+# Pillow's names and the file extensions we use 🏷️
+PILLOW_FORMATS = {'webp': 'WEBP', 'jpeg': 'JPEG', 'png': 'PNG'}
+EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg', 'png': 'png'}
+MIME_TYPES = {'webp': 'image/webp', 'jpeg': 'image/jpeg', 'png': 'image/png'}
+
+# Characters of the SHA-256 used in file names (80 bits: no collisions in practice)
+DIGEST_LENGTH = 20
+
+
+def options():
+    """DEFAULT_OPTIONS with settings.THUMBNAILS on top ⚙️"""
+    return {**DEFAULT_OPTIONS, **getattr(settings, 'THUMBNAILS', {})}
+
+
+def file_digest(path):
+    """
+    SHA-256 of a file's contents, read in chunks 🔑
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for chunk in iter(lambda: source.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def relative_path(digest, size, fmt):
+    """Where one derivative lives, relative to MEDIA_ROOT 📁"""
+    name = digest[:DIGEST_LENGTH]
+    return f"{options()['DIR']}/{name[:2]}/{name}-{size}.{EXTENSIONS[fmt]}"
+
+
+def url(digest, size, fmt):
+    """The derivative's URL 🔗"""
+    return f"{settings.MEDIA_URL}{relative_path(digest, size, fmt)}"
+
+
+def _render(image, size, fmt, quality, target):
+    """Crop ``image`` to a square of ``size`` pixels and save it atomically 💾"""
+    thumb = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+    if fmt == 'jpeg' and thumb.mode != 'RGB':
+        # JPEG has no transparency: put the picture on white
+        background = Image.new('RGB', thumb.size, 'white')
+        background.paste(thumb, mask=thumb.getchannel('A') if 'A' in thumb.getbands() else None)
+        thumb = background
+    target.parent.mkdir(parents=True, exist_ok=True)
+    # Write a temporary file and rename it: nobody ever sees half an image
+    handle, temporary = tempfile.mkstemp(dir=target.parent, suffix='.tmp')
+    try:
+        with os.fdopen(handle, 'wb') as output:
+            thumb.save(output, PILLOW_FORMATS[fmt], quality=quality, optimize=fmt == 'jpeg')
+        os.replace(temporary, target)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def make_derivatives(source, force=False):
+    """
+    Make every size and format of one picture (the missing ones) 🏭
+
+    Plain paths in, digest out - no database - so it can run in a process
+    pool (see the make_thumbnails command).
+
+    Args:
+        source: Path of the original picture
+        force: Make them again even if they exist (e.g. after changing QUALITY)
+
+    Returns:
+        tuple: (digest, number of files written)
+    """
+    opts = options()
+    digest = file_digest(source)
+    media_root = Path(settings.MEDIA_ROOT)
+    missing = [
+        (size, fmt) for size in opts['SIZES'] for fmt in opts['FORMATS']
+        if force or not (media_root / relative_path(digest, size, fmt)).exists()
+    ]
+    if missing:
+        with Image.open(source) as original:
+            image = ImageOps.exif_transpose(original)  # Phones store "rotate me" in EXIF
+            image.load()
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info or 'A' in image.getbands() else 'RGB')
+        for size, fmt in missing:
+            _render(image, size, fmt, opts['QUALITY'], media_root / relative_path(digest, size, fmt))
+    return digest, len(missing)
+
+
+def derivatives_exist(digest):
+    """Are all sizes and formats of this picture on disk? 🔍"""
+    opts = options()
+    media_root = Path(settings.MEDIA_ROOT)
+    return all(
+        (media_root / relative_path(digest, size, fmt)).exists()
+        for size in opts['SIZES'] for fmt in opts['FORMATS']
+    )
+
+
+def sources(digest, display_size):
+    """
+    <source>/<img> attributes for showing a picture at ``display_size`` px 🖼️
+
+    Uses the smallest size that covers the display size as src, and lists
+    every size at least that big in srcset as 1x, 2x... (sharp screens).
+
+    Returns:
+        list: One dict per format (type, src, srcset), in FORMATS order
+    """
+    opts = options()
+    sizes = sorted(opts['SIZES'])
+    usable = [size for size in sizes if size >= display_size] or sizes[-1:]
+    result = []
+    for fmt in opts['FORMATS']:
+        srcset = ', '.join(
+            f"{url(digest, size, fmt)} {size / display_size:g}x" for size in usable
+        )
+        result.append({'type': MIME_TYPES[fmt], 'src': url(digest, usable[0], fmt), 'srcset': srcset})
+    return result
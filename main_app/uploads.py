@@ -0,0 +1,310 @@
+"""
+Resumable chunked uploads for main_app
+
+What is this file? 📤
+A normal form upload sends the whole file in ONE request. Django collects
+it in memory (small files) or a temporary file (big ones) before the view
+even runs, then the view copies it to MEDIA_ROOT. If the connection drops
+at 95%, the visitor starts again from zero.
+
+Chunked uploads send the file in PIECES, each in its own request:
+
+1. POST /api/uploads/ announces the file:
+       {"filename": "me.jpg", "size": 3145728, "purpose": "profile_picture",
+        "sha256": "<optional hex digest of the whole file>"}
+   The size is checked against the limit right here, before any bytes
+   arrive, and an empty file is created at its FINAL place under
+   MEDIA_ROOT. The answer has the upload's url and a suggested chunk_size.
+2. PATCH <url> sends the next chunk as the raw request body, with headers
+       Upload-Offset: <where this chunk starts>
+       Content-Length: <chunk size>
+       Upload-Checksum: sha256 <hex digest of this chunk>   (optional)
+   The headers are checked BEFORE the body is read (too big: 413). The body
+   is then streamed from the socket into the file 64 KB at a time, so a
+   worker's memory never holds more than that, however big the file. A
+   chunk whose checksum doesn't match is cut off again (400).
+3. HEAD <url> answers with Upload-Offset: how much has safely arrived. An
+   interrupted upload asks for it and carries on from there.
+4. After the last chunk the whole file's SHA-256 is computed (streamed
+   from disk) and compared with the announced one, and pictures are
+   checked with Pillow. A profile picture then becomes the uploader's
+   profile picture - its thumbnails are made by a background job.
+
+DELETE <url> cancels an upload. Uploads nobody finished are removed by
+`python manage.py prune_data` (policy stale_uploads).
+"""
+
+# Import necessary components 📦
+import hashlib  # Chunk checksums
+import logging  # For logging
+import os  # Files and fsync
+from pathlib import PurePath  # File extensions
+
+try:
+    import fcntl  # One writer per upload (not on Windows)
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+from django.conf import settings  # settings.UPLOADS
+from django.core.files.storage import default_storage  # Paths under MEDIA_ROOT
+from django.db import transaction  # Finishing is all or nothing
+from django.urls import reverse  # The upload's URL
+from django.utils import timezone  # Timestamps
+from django.utils.text import get_valid_filename  # Safe file names
+from PIL import Image, UnidentifiedImageError  # Checking pictures
+
+from simple_django_framework.write_queue import write_queue  # Serialized database writes
+
+from .models import Upload, UserProfile
+from .thumbnails import file_digest  # SHA-256 of a file, streamed
+
+# Get a logger for this app 📝
+logger = logging.getLogger('main_app')
+
+# Default options (settings.UPLOADS overrides them) ⚙️
+DEFAULT_OPTIONS = {
+    'CHUNK_SIZE': 1024 * 1024,  # Suggested to clients: 1 MB per request
+    'MAX_CHUNK_SIZE': 8 * 1024 * 1024,  # Largest chunk accepted in one request
+    'MAX_SIZE': {  # Largest file per purpose, in bytes
+        'profile_picture': 10 * 1024 * 1024,
+        'media': 200 * 1024 * 1024,
+    },
+    'MAX_PENDING': 5,  # Unfinished uploads one user may have at a time
+}
+
+# Bytes read from the request per write (all the memory a chunk needs) 🥄
+READ_SIZE = 64 * 1024
+
+# File types a profile picture may have 🖼️
+PICTURE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp'}
+
+
+class UploadError(Exception):
+    """
+    Something the client must fix (becomes a JSON error response) 🚫
+
+    Args:
+        status: HTTP status code
+        message: What went wrong
+        **details: Extra fields for the response (e.g. the current offset)
+    """
+
+    def __init__(self, status, message, **details):
+        super().__init__(message)
+        self.status = status
+        self.details = details
+
+
+def options():
+    """DEFAULT_OPTIONS with settings.UPLOADS on top ⚙️"""
+    return {**DEFAULT_OPTIONS, **getattr(settings, 'UPLOADS', {})}
+
+
+def _storage_name(upload_id, user, purpose, filename):
+    """Where an upload's bytes go, relative to MEDIA_ROOT 📁"""
+    extension = PurePath(get_valid_filename(filename)).suffix.lower()
+    if purpose == 'profile_picture':
+        folder = UserProfile._meta.get_field('profile_picture').upload_to.rstrip('/')
+    else:
+        folder = f'uploads/{user.pk}'
+    return f'{folder}/{upload_id.hex}{extension}'
+
+
+def start_upload(user, filename, size, purpose='media', sha256=''):
+    """
+    Check an announced upload and create its (empty) file 🆕
+
+    Returns:
+        Upload: The new upload
+
+    Raises:
+        UploadError: If the file is too big, of the wrong type, etc.
+    """
+    opts = options()
+    if purpose not in opts['MAX_SIZE']:
+        raise UploadError(400, f"purpose must be one of: {', '.join(opts['MAX_SIZE'])}")
+    if not isinstance(filename, str) or not filename.strip():
+        raise UploadError(400, "filename is required")
+    if not isinstance(size, int) or isinstance(size, bool) or size <= 0:
+        raise UploadError(400, "size must be a positive number of bytes")
+    if size > opts['MAX_SIZE'][purpose]:
+        raise UploadError(413, f"Files for {purpose} may be at most {opts['MAX_SIZE'][purpose]} bytes")
+    sha256 = (sha256 or '').lower()
+    if sha256 and (len(sha256) != 64 or any(c not in '0123456789abcdef' for c in sha256)):
+        raise UploadError(400, "sha256 must be 64 hex digits")
+    if purpose == 'profile_picture' and PurePath(filename).suffix.lower() not in PICTURE_EXTENSIONS:
+        raise UploadError(400, f"Profile pictures must be one of: {', '.join(sorted(PICTURE_EXTENSIONS))}")
+    if Upload.objects.filter(user=user, completed_at__isnull=True).count() >= opts['MAX_PENDING']:
+        raise UploadError(429, "Too many unfinished uploads; finish or cancel one first")
+
+    upload = Upload(user=user, purpose=purpose, filename=filename[:255], size=size, sha256=sha256)
+    upload.file.name = _storage_name(upload.id, user, purpose, filename)
+    path = default_storage.path(upload.file.name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, 'xb').close()  # Claim the name (the id is random, so it's free)
+    try:
+        write_queue.run(upload.save)
+    except Exception:
+        os.unlink(path)
+        raise
+    logger.info(f"Upload {upload.id} of {filename} ({size} bytes) started by {user}")
+    return upload
+
+
+def _parse_checksum(header):
+    """'sha256 <hex>' -> hex digest (None if there is no header) 🔑"""
+    if not header:
+        return None
+    algorithm, _, value = header.strip().partition(' ')
+    if algorithm.lower() != 'sha256' or not value:
+        raise UploadError(400, "Upload-Checksum must look like 'sha256 <hex digest>'")
+    return value.strip().lower()
+
+
+def write_chunk(upload, offset, length, stream, checksum_header=None):
+    """
+    Append one chunk, read from ``stream``, to the upload's file 🧩
+
+    Everything that can be checked without the body is checked first, so a
+    chunk that is too big is refused before a single byte is read.
+
+    Args:
+        upload: The Upload
+        offset: Where the client says the chunk starts (Upload-Offset)
+        length: Chunk size in bytes (Content-Length)
+        stream: File-like object with the chunk (the request)
+        checksum_header: Upload-Checksum header, if sent
+
+    Returns:
+        Upload: The upload, with its new offset (and finished if complete)
+
+    Raises:
+        UploadError: Wrong offset (409), too big (413), bad checksum (400)...
+    """
+    if upload.is_complete:
+        raise UploadError(409, "This upload is already complete", offset=upload.offset)
+    if offset is None:
+        raise UploadError(400, "Upload-Offset header is required", offset=upload.offset)
+    if offset != upload.offset:
+        raise UploadError(409, f"Expected a chunk at offset {upload.offset}", offset=upload.offset)
+    if length is None:
+        raise UploadError(411, "Content-Length header is required")
+    if length <= 0:
+        raise UploadError(400, "Empty chunk")
+    if length > options()['MAX_CHUNK_SIZE']:
+        raise UploadError(413, f"Chunks may be at most {options()['MAX_CHUNK_SIZE']} bytes")
+    if offset + length > upload.size:
+        raise UploadError(413, f"The upload was announced as {upload.size} bytes")
+    expected = _parse_checksum(checksum_header)
+
+    with open(default_storage.path(upload.file.name), 'r+b') as output:
+        if fcntl:
+            try:
+                fcntl.flock(output, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise UploadError(409, "Another chunk of this upload is being written", offset=offset)
+        # Anything past the confirmed offset is left over from a broken request
+        output.seek(offset)
+        output.truncate()
+        digest = hashlib.sha256()
+        remaining = length
+        while remaining:
+            piece = stream.read(min(READ_SIZE, remaining))
+            if not piece:
+                break  # The client went away mid-chunk
+            output.write(piece)
+            digest.update(piece)
+            remaining -= len(piece)
+        if remaining:
+            output.truncate(offset)
+            raise UploadError(400, "The chunk was shorter than its Content-Length", offset=offset)
+        if expected is not None and digest.hexdigest() != expected:
+            output.truncate(offset)
+            raise UploadError(400, "Chunk checksum mismatch; send it again", offset=offset)
+        output.flush()
+        os.fsync(output.fileno())  # On disk before we confirm the new offset
+
+    # Only move the offset on if nobody else did meanwhile 🔒
+    updated = write_queue.run(
+        Upload.objects.filter(pk=upload.pk, offset=offset, completed_at__isnull=True).update,
+        offset=offset + length, updated_at=timezone.now(),
+    )
+    if not updated:
+        upload.refresh_from_db()
+        raise UploadError(409, "The upload changed while this chunk was written", offset=upload.offset)
+    upload.offset = offset + length
+    if upload.offset == upload.size:
+        finish_upload(upload)
+    return upload
+
+
+def finish_upload(upload):
+    """
+    Check the complete file and put it to use ✅
+
+    Raises:
+        UploadError: If the file doesn't match its announced SHA-256 or a
+                     picture isn't one (the upload is then removed)
+    """
+    path = default_storage.path(upload.file.name)
+    digest = file_digest(path)  # Streams the file: constant memory
+    try:
+        if upload.sha256 and digest != upload.sha256:
+            raise UploadError(400, "The file's SHA-256 doesn't match the announced one")
+        if upload.purpose == 'profile_picture':
+            _check_picture(path)
+    except UploadError:
+        write_queue.run(upload.delete)  # Removes the file too (see signals)
+        raise
+
+    upload.sha256 = digest
+    upload.completed_at = timezone.now()
+    write_queue.run(_complete, upload)
+    logger.info(f"Upload {upload.id} of {upload.filename} complete ({upload.size} bytes)")
+
+
+def _check_picture(path):
+    """Raise UploadError unless Pillow can read the picture 🖼️"""
+    try:
+        with Image.open(path) as picture:
+            picture.verify()
+    except (UnidentifiedImageError, OSError, SyntaxError, Image.DecompressionBombError):
+        raise UploadError(400, "The file is not a picture we can read")
+
+
+def _complete(upload):
+    """Mark the upload complete and hand the file over, in one transaction 🤝"""
+    with transaction.atomic():
+        upload.save(update_fields=['sha256', 'completed_at', 'updated_at'])
+        if upload.purpose == 'profile_picture':
+            profile, _ = UserProfile.objects.get_or_create(user=upload.user)
+            profile.profile_picture.name = upload.file.name
+            profile.save()  # Queues the thumbnail job
+
+
+def remove_file(upload):
+    """
+    Delete an upload's file, unless it's in use as a profile picture 🗑️
+
+    Called when an Upload row is deleted (see main_app/signals.py).
+    """
+    if upload.purpose == 'profile_picture' and upload.is_complete:
+        return  # The profile points at it now
+    if upload.file.name:
+        default_storage.delete(upload.file.name)
+
+
+def upload_to_dict(request, upload):
+    """An upload as JSON for the API 📋"""
+    return {
+        'id': str(upload.id),
+        'url': request.build_absolute_uri(reverse('main_app:api_upload', args=[upload.id])),
+        'filename': upload.filename,
+        'purpose': upload.purpose,
+        'size': upload.size,
+        'offset': upload.offset,
+        'complete': upload.is_complete,
+        'chunk_size': options()['CHUNK_SIZE'],
+        'file_url': default_storage.url(upload.file.name) if upload.is_complete else None,
+        'sha256': upload.sha256 or None,
+    }
@@ -16,7 +16,7 @@ from django.views.generic import TemplateView  # Generic views
 import logging  # For logging
 
 # Import our views 👁️
-from . import views
+from . import async_views, views
 
 # Get a logger for this app 📝
 logger = logging.getLogger('main_app')
@@ -66,6 +66,12 @@ urlpatterns = [
     # Name: 'api_hello'
     path('api/hello/', views.api_hello, name='api_hello'),
     
+    # SEARCH 🔎
+    # URL: /search/?q=django  (HTML) and /api/search/?q=django (JSON)
+    # Views: full-text search over published posts (see main_app/search.py)
+    path('search/', views.search_view, name='search'),
+    path('api/search/', views.api_search, name='api_search'),
+    
     # TESTING AND DEBUGGING 🧪
     # URL: /test-error/
     # View: error_test_view (intentionally causes error)
@@ -105,14 +111,14 @@ urlpatterns = [
 
 # Blog URLs (for future blog functionality)
 blog_patterns = [
-    # Blog home page
-    # path('blog/', views.blog_list, name='blog_list'),
-    
-    # Individual blog post
-    # path('blog/<slug:slug>/', views.blog_detail, name='blog_detail'),
+    # Blog home page (cursor-paginated, see main_app/pagination.py)
+    path('blog/', views.blog_list, name='blog_list'),
     
     # Blog by category
-    # path('blog/category/<slug:category>/', views.blog_by_category, name='blog_category'),
+    path('blog/category/<slug:slug>/', views.category_detail, name='category_detail'),
+    
+    # Individual blog post
+    path('blog/<slug:slug>/', views.blog_post_detail, name='blog_post_detail'),
     
     # Create new blog post (for logged-in users)
     # path('blog/create/', views.blog_create, name='blog_create'),
@@ -132,20 +138,42 @@ profile_patterns = [
 
 # API URLs (for future API development)
 api_patterns = [
-    # List all blog posts as JSON
-    # path('api/posts/', views.api_post_list, name='api_post_list'),
+    # List published blog posts as JSON (cursor-paginated)
+    path('api/posts/', views.api_post_list, name='api_post_list'),
+    
+    # Approved comments of a post (cursor-paginated, oldest first)
+    path('api/posts/<slug:slug>/comments/', views.api_post_comments, name='api_post_comments'),
     
     # Get specific post as JSON
     # path('api/posts/<int:post_id>/', views.api_post_detail, name='api_post_detail'),
     
+    # Bulk exports (staff only), streamed as NDJSON
+    path('api/export/posts/', views.api_export_posts, name='api_export_posts'),
+    path('api/export/comments/', views.api_export_comments, name='api_export_comments'),
+    
+    # Resumable chunked uploads (see main_app/uploads.py)
+    path('api/uploads/', views.api_uploads, name='api_uploads'),
+    path('api/uploads/<uuid:upload_id>/', views.api_upload, name='api_upload'),
+    
     # Create comment via API
     # path('api/posts/<int:post_id>/comments/', views.api_create_comment, name='api_create_comment'),
 ]
 
+# Async twins of the blog and API views (see main_app/async_views.py) ⚡
+# Best served through ASGI; compare them with: python manage.py bench_async
+async_patterns = [
+    path('async/api/hello/', async_views.api_hello, name='async_api_hello'),
+    path('async/blog/', async_views.blog_list, name='async_blog_list'),
+    path('async/blog/<slug:slug>/', async_views.blog_post_detail, name='async_blog_post_detail'),
+    path('async/api/posts/', async_views.api_post_list, name='async_api_post_list'),
+    path('async/api/search/', async_views.api_search, name='async_api_search'),
+]
+
 # Add future patterns to main urlpatterns when ready:
-# urlpatterns += blog_patterns
+urlpatterns += blog_patterns
 # urlpatterns += profile_patterns  
-# urlpatterns += api_patterns
+urlpatterns += api_patterns
+urlpatterns += async_patterns
 
 # URL PATTERNS WITH PARAMETERS 🎯
 # These examples show how to capture parts of URLs as parameters
@@ -12,11 +12,28 @@ Think of views as the BRAIN of your web application - they decide what to show u
 
 # Import necessary Django components 📦
 from django.shortcuts import render, get_object_or_404  # Shortcuts for common tasks
-from django.http import HttpResponse, JsonResponse      # Different types of responses
+from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse  # Different types of responses
 from django.views.generic import TemplateView          # Class-based views
 from django.contrib.auth.decorators import login_required  # Require login for certain views
+from django.db.models import Prefetch  # Control how related objects are loaded
+from django.urls import reverse  # Build URLs from their names
+import json  # Read JSON request bodies
 import logging  # For logging messages to our log files
 
+# Import our models and helpers 🗄️
+from .models import BlogPost, Category, Comment, Upload
+from .forms import ContactForm
+from .contact_spool import contact_spool
+from .pagination import InvalidCursor, keyset_page, parse_page_size
+from .search import search_posts
+from .exports import ExportError, comment_export_rows, post_export_rows, stream_export
+from . import uploads
+from .uploads import UploadError
+from .http_cache import (
+    blog_list_validators, category_detail_validators, conditional_page, post_detail_validators,
+)
+from simple_django_framework.write_queue import write_queue  # Serialized database writes
+
 # Get a logger for this app 📝
 # This will write messages to our log files (remember settings.py?)
 logger = logging.getLogger('main_app')
@@ -264,36 +281,42 @@ def contact_form_view(request):
     This view shows how to handle both GET (show form) and POST (process form) requests.
     It's like having two functions in one!
     
+    Valid messages are handed to the contact spool (main_app/contact_spool.py),
+    which writes them to a file straight away and stores them in the
+    database in batches a moment later - so a rush of submissions never
+    queues up on the database.
+    
     Args:
         request: The HTTP request object
     
     Returns:
-        HttpResponse: Form page or success page
+        HttpResponse: Form page (400 with errors) or success page
     """
     
     if request.method == 'POST':
-        # User submitted the form - process the data 📤
+        # User submitted the form - check the data 📤
+        form = ContactForm(request.POST)
         
-        # Get form data from the request 📦
-        name = request.POST.get('name', '')
-        email = request.POST.get('email', '')
-        message = request.POST.get('message', '')
+        if not form.is_valid():
+            # Show the form again with the errors (and what they typed) ❌
+            context = {
+                'page_title': 'Contact Form',
+                'message': 'Please fix the errors below.',
+                'form': form,
+            }
+            return render(request, 'main_app/contact_form.html', context, status=400)
         
-        # Log the form submission 📝
-        logger.info(f"Contact form submitted by {name} ({email})")
+        data = form.cleaned_data
         
-        # In a real app, you'd save this to database or send email 💾
-        # For now, we just log it and show success message
+        # Spool it (duplicates are dropped, but the visitor needn't know) 💾
+        if contact_spool.submit(data):
+            logger.info(f"Contact form submitted by {data['name']} ({data['email']})")
         
         # Context for success page 📦
         context = {
             'page_title': 'Message Sent!',
-            'message': f'Thank you {name}! We received your message.',
-            'submitted_data': {
-                'name': name,
-                'email': email,
-                'message': message,
-            }
+            'message': f"Thank you {data['name']}! We received your message.",
+            'submitted_data': data,
         }
         
         # Show success page 🎨
@@ -309,7 +332,432 @@ def contact_form_view(request):
         context = {
             'page_title': 'Contact Form',
             'message': 'Send us a message!',
+            'form': ContactForm(),
         }
         
         # Show form page 🎨
         return render(request, 'main_app/contact_form.html', context)
+
+
+# BLOG VIEWS 📰
+
+def published_posts():
+    """
+    Published posts, ready for listing 📚
+
+    Always costs exactly two queries, however many posts are shown:
+    1. The posts plus their authors (one JOIN, the big ``content`` column skipped)
+    2. The categories of all those posts at once
+
+    Returns:
+        QuerySet: Published BlogPost objects
+    """
+    return (
+        BlogPost.objects.filter(status='published')
+        .select_related('author')
+        .defer('content')
+        .prefetch_related(
+            Prefetch('categories', queryset=Category.objects.only('id', 'name', 'slug'))
+        )
+    )
+
+@conditional_page(blog_list_validators)  # 304 for repeat visits, see main_app/http_cache.py
+def blog_list(request):
+    """
+    Blog index: published posts, newest first, one page at a time 📰
+
+    Pages are addressed by an opaque ``?cursor=`` (see main_app/pagination.py)
+    instead of a page number, so page 500 is as fast as page 1.
+
+    Args:
+        request: The HTTP request object
+
+    Returns:
+        HttpResponse: The blog index page (400 for a bad cursor)
+    """
+    try:
+        posts, next_cursor = keyset_page(published_posts(), request.GET.get('cursor'))
+    except InvalidCursor:
+        logger.warning(f"Invalid blog cursor from {request.META.get('REMOTE_ADDR')}")
+        return HttpResponseBadRequest("Invalid cursor")
+
+    context = {
+        'page_title': 'Blog',
+        'posts': posts,
+        'next_cursor': next_cursor,
+    }
+    return render(request, 'main_app/blog_list.html', context)
+
+@conditional_page(post_detail_validators)
+def blog_post_detail(request, slug):
+    """
+    A single published blog post 📄
+
+    A 304 answer skips the view entirely, so revalidations by the same
+    visitor are not counted as new views.
+
+    Args:
+        request: The HTTP request object
+        slug: The post's slug from the URL
+
+    Returns:
+        HttpResponse: The post page (404 if it doesn't exist or isn't published)
+    """
+    post = get_object_or_404(
+        BlogPost.objects.select_related('author').prefetch_related('categories'),
+        slug=slug,
+        status='published',
+    )
+    post.increment_view_count()  # Buffered, see main_app/counters.py
+
+    context = {
+        'page_title': post.title,
+        'post': post,
+    }
+    return render(request, 'main_app/blog_detail.html', context)
+
+@conditional_page(category_detail_validators)
+def category_detail(request, slug):
+    """
+    One category and its published posts, newest first 🏷️
+
+    Args:
+        request: The HTTP request object
+        slug: The category's slug from the URL
+
+    Returns:
+        HttpResponse: The category page (404 if it doesn't exist)
+    """
+    category = get_object_or_404(Category, slug=slug)
+    try:
+        posts, next_cursor = keyset_page(
+            published_posts().filter(categories=category), request.GET.get('cursor')
+        )
+    except InvalidCursor:
+        return HttpResponseBadRequest("Invalid cursor")
+
+    context = {
+        'page_title': category.name,
+        'category': category,
+        'posts': posts,
+        'next_cursor': next_cursor,
+    }
+    return render(request, 'main_app/category_detail.html', context)
+
+def post_to_dict(post, categories=True):
+    """
+    The JSON shape of a blog post in API responses 📦
+
+    Args:
+        post: A BlogPost from published_posts()
+        categories: Include categories (needs them prefetched to stay cheap)
+
+    Returns:
+        dict: JSON-ready data
+    """
+    data = {
+        'id': post.pk,
+        'title': post.title,
+        'slug': post.slug,
+        'excerpt': post.excerpt,
+        'author': post.author.username,
+        'view_count': post.view_count,
+        'comment_count': post.comment_count,
+        'last_comment_at': post.last_comment_at.isoformat() if post.last_comment_at else None,
+        'created_at': post.created_at.isoformat(),
+        'published_at': post.published_at.isoformat() if post.published_at else None,
+        'url': post.get_absolute_url(),
+    }
+    if categories:
+        data['categories'] = [{'name': c.name, 'slug': c.slug} for c in post.categories.all()]
+    return data
+
+@conditional_page(blog_list_validators, per_user=False)  # Same JSON for everyone
+def api_post_list(request):
+    """
+    Published posts as JSON, cursor-paginated 🌐
+
+    Query parameters:
+        cursor: ``next_cursor`` from the previous response (omit for page 1)
+        limit: Posts per page (default 10, maximum 100)
+
+    Args:
+        request: The HTTP request object
+
+    Returns:
+        JsonResponse: {'results': [...], 'next_cursor': '...' or null}
+    """
+    page_size = parse_page_size(request.GET.get('limit'))
+    try:
+        posts, next_cursor = keyset_page(published_posts(), request.GET.get('cursor'), page_size)
+    except InvalidCursor:
+        return JsonResponse({'status': 'error', 'message': 'Invalid cursor'}, status=400)
+
+    return JsonResponse({
+        'results': [post_to_dict(post) for post in posts],
+        'next_cursor': next_cursor,
+    })
+
+# Comments per page in /api/posts/<slug>/comments/ 💬
+COMMENT_PAGE_SIZE = 20
+
+def post_comments(post):
+    """
+    Approved comments of one post, oldest first, with their authors 💬
+
+    Filtered and ordered on the (post, created_at) index, so with
+    keyset_page(..., oldest_first=True) every page is one index seek, even
+    for a post with 50,000 comments. Authors come in the same query (one
+    JOIN, only the username).
+
+    Returns:
+        QuerySet: Comment objects
+    """
+    return (
+        Comment.objects.filter(post=post, is_approved=True)
+        .select_related('author')
+        .only('id', 'post_id', 'content', 'created_at', 'author__username')
+    )
+
+def comment_to_dict(comment):
+    """The JSON shape of a comment in API responses 📦"""
+    return {
+        'id': comment.pk,
+        'author': comment.author.username,
+        'content': comment.content,
+        'created_at': comment.created_at.isoformat(),
+    }
+
+def api_post_comments(request, slug):
+    """
+    Approved comments of a published post as JSON, cursor-paginated 💬
+
+    Query parameters:
+        cursor: ``next_cursor`` from the previous response (omit for page 1)
+        limit: Comments per page (default 20, maximum 100)
+
+    Args:
+        request: The HTTP request object
+        slug: The post's slug from the URL
+
+    Returns:
+        JsonResponse: {'comment_count': ..., 'results': [...], 'next_cursor': '...' or null}
+    """
+    post = get_object_or_404(
+        BlogPost.objects.only('id', 'comment_count'), slug=slug, status='published'
+    )
+    page_size = parse_page_size(request.GET.get('limit'), default=COMMENT_PAGE_SIZE)
+    try:
+        comments, next_cursor = keyset_page(
+            post_comments(post), request.GET.get('cursor'), page_size, oldest_first=True
+        )
+    except InvalidCursor:
+        return JsonResponse({'status': 'error', 'message': 'Invalid cursor'}, status=400)
+
+    return JsonResponse({
+        'comment_count': post.comment_count,  # Stored, no COUNT query
+        'results': [comment_to_dict(comment) for comment in comments],
+        'next_cursor': next_cursor,
+    })
+
+
+# SEARCH VIEWS 🔎
+
+def search_view(request):
+    """
+    Search published blog posts (full-text, best matches first) 🔎
+
+    Query parameters:
+        q: What to search for. The last word is also a prefix ("django tut" finds "tutorial").
+
+    Args:
+        request: The HTTP request object
+
+    Returns:
+        HttpResponse: The search page with ranked results and snippets
+    """
+    query = request.GET.get('q', '').strip()
+    results = search_posts(query) if query else []
+
+    context = {
+        'page_title': 'Search',
+        'query': query,
+        'results': results,
+    }
+    return render(request, 'main_app/search.html', context)
+
+def api_search(request):
+    """
+    Search published blog posts as JSON 🌐
+
+    Query parameters:
+        q: What to search for
+        limit: Maximum results (default 10, maximum 100)
+
+    Args:
+        request: The HTTP request object
+
+    Returns:
+        JsonResponse: {'query': ..., 'results': [...]} - each result also has
+        'rank' (lower is better) and 'snippet' (HTML, matches in <mark>)
+    """
+    query = request.GET.get('q', '').strip()
+    results = search_posts(query, limit=parse_page_size(request.GET.get('limit'))) if query else []
+
+    data = []
+    for post in results:
+        item = post_to_dict(post, categories=False)
+        item['rank'] = post.search_rank
+        item['snippet'] = str(post.search_snippet)
+        data.append(item)
+    return JsonResponse({'query': query, 'results': data})
+
+
+# EXPORT VIEWS 📤
+
+def _export(request, rows_for, name):
+    """Shared checks for the export endpoints (staff only, 400 on bad filters) 🛂"""
+    if not (request.user.is_authenticated and request.user.is_staff):
+        return JsonResponse({'status': 'error', 'message': 'Staff access required'}, status=403)
+    try:
+        response = stream_export(request, rows_for(request.GET), name)
+    except ExportError as error:
+        return JsonResponse({'status': 'error', 'message': str(error)}, status=400)
+    logger.info(f"Export of {name} started by {request.user}")
+    return response
+
+def api_export_posts(request):
+    """
+    Export every blog post as NDJSON, streamed 📤
+
+    Query parameters:
+        status: Only posts with this status
+        updated_after / updated_before: ISO 8601 timestamps
+        format: ndjson (default) or json
+
+    Args:
+        request: The HTTP request object
+
+    Returns:
+        StreamingHttpResponse: One JSON object per line
+    """
+    return _export(request, post_export_rows, 'posts')
+
+def api_export_comments(request):
+    """
+    Export every comment as NDJSON, streamed 📤
+
+    Query parameters:
+        updated_after / updated_before: ISO 8601 timestamps
+        format: ndjson (default) or json
+
+    Args:
+        request: The HTTP request object
+
+    Returns:
+        StreamingHttpResponse: One JSON object per line
+    """
+    return _export(request, comment_export_rows, 'comments')
+
+
+# CHUNKED UPLOAD VIEWS 📤
+# See main_app/uploads.py for the protocol.
+
+def _upload_error(error):
+    """An UploadError as a JSON response 🚫"""
+    response = JsonResponse({'status': 'error', 'message': str(error), **error.details}, status=error.status)
+    if 'offset' in error.details:
+        response['Upload-Offset'] = str(error.details['offset'])  # Where to carry on
+    return response
+
+def _header_int(request, name):
+    """An integer request header (None if missing) 🔢"""
+    value = request.META.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise UploadError(400, f"{name} must be a number")
+
+def api_uploads(request):
+    """
+    Start a chunked upload 🆕
+    
+    POST a JSON body: {"filename": ..., "size": ..., "purpose": ..., "sha256": ...}
+    
+    Args:
+        request: The HTTP request object
+    
+    Returns:
+        JsonResponse: 201 with the upload (its url, offset 0, chunk_size)
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({'status': 'error', 'message': 'Login required'}, status=401)
+    if request.method != 'POST':
+        return JsonResponse({'status': 'error', 'message': 'Use POST'}, status=405)
+    try:
+        data = json.loads(request.body or b'{}')
+        if not isinstance(data, dict):
+            raise UploadError(400, "Send a JSON object")
+        upload = uploads.start_upload(
+            request.user, data.get('filename'), data.get('size'),
+            purpose=data.get('purpose', 'media'), sha256=data.get('sha256', ''),
+        )
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'Invalid JSON'}, status=400)
+    except UploadError as error:
+        return _upload_error(error)
+    response = JsonResponse(uploads.upload_to_dict(request, upload), status=201)
+    response['Location'] = reverse('main_app:api_upload', args=[upload.id])
+    return response
+
+def api_upload(request, upload_id):
+    """
+    One chunked upload: send a chunk, ask how far it got, or cancel it 🧩
+    
+    HEAD   -> Upload-Offset / Upload-Length headers (to resume)
+    GET    -> the upload as JSON
+    PATCH  -> append the request body at Upload-Offset
+    DELETE -> cancel the upload
+    
+    Args:
+        request: The HTTP request object
+        upload_id: The upload's UUID
+    
+    Returns:
+        HttpResponse: JSON (or empty for HEAD/DELETE), with Upload-Offset
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({'status': 'error', 'message': 'Login required'}, status=401)
+    # Other people's uploads don't exist, as far as you can tell 🙈
+    upload = get_object_or_404(Upload, pk=upload_id, user=request.user)
+    
+    if request.method == 'PATCH':
+        try:
+            # Checked from the headers alone: the body is only read once they pass
+            uploads.write_chunk(
+                upload,
+                offset=_header_int(request, 'HTTP_UPLOAD_OFFSET'),
+                length=_header_int(request, 'CONTENT_LENGTH'),
+                stream=request,  # Reads straight from the socket, bit by bit
+                checksum_header=request.META.get('HTTP_UPLOAD_CHECKSUM'),
+            )
+        except UploadError as error:
+            return _upload_error(error)
+        response = JsonResponse(uploads.upload_to_dict(request, upload))
+    elif request.method == 'DELETE':
+        if upload.is_complete:
+            return JsonResponse({'status': 'error', 'message': 'Finished uploads cannot be cancelled'}, status=409)
+        write_queue.run(upload.delete)  # Its file goes too
+        logger.info(f"Upload {upload.id} cancelled by {request.user}")
+        return HttpResponse(status=204)
+    elif request.method in ('GET', 'HEAD'):
+        response = JsonResponse(uploads.upload_to_dict(request, upload))
+    else:
+        return JsonResponse({'status': 'error', 'message': 'Use HEAD, GET, PATCH or DELETE'}, status=405)
+    
+    response['Upload-Offset'] = str(upload.offset)
+    response['Upload-Length'] = str(upload.size)
+    response['Cache-Control'] = 'no-store'  # The offset changes with every chunk
+    return response
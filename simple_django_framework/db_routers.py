@@ -0,0 +1,79 @@
+"""
+Database routers for simple_django_framework
+
+What is this file? 🚦
+Routers decide which database each query goes to. Django asks them in
+order (settings.DATABASE_ROUTERS) until one gives an answer:
+
+1. ReplicaRouter: reads of blog posts, comments, categories and profiles
+   go to a read replica when it is safe (see replicas.py)
+2. ReadConnectionRouter: when settings.DATABASES has a 'readonly' alias (a
+   second, read-only connection to the same SQLite file), other SELECTs
+   go there. In WAL mode the two connections don't block each other, so
+   reads keep flowing while a write transaction is open.
+
+Everything is written to 'default'. Reads inside a transaction (atomic
+block) on 'default' stay on 'default': other connections can't see
+changes that aren't committed yet.
+"""
+
+# Import necessary components 📦
+from django.db import DEFAULT_DB_ALIAS, connections  # Configured connections
+
+from . import replicas
+
+READ_ONLY_ALIAS = 'readonly'
+
+# Models whose reads may be served by a replica 🪞
+REPLICATED_MODELS = {
+    'main_app.blogpost',
+    'main_app.comment',
+    'main_app.category',
+    'main_app.userprofile',
+}
+
+
+class ReplicaRouter:
+    """Send reads of REPLICATED_MODELS to a healthy replica 🪞"""
+
+    def db_for_read(self, model, **hints):
+        if model._meta.label_lower not in REPLICATED_MODELS:
+            return None
+        state = replicas.request_state()
+        if state is None or state.pinned:
+            return None  # Not in a request, or this visitor just wrote something
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return replicas.choose_replica()
+
+    def db_for_write(self, model, **hints):
+        replicas.mark_write()  # Read-your-writes from here on ✍️
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # Replicas hold the same rows as the primary
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replicas.replica_aliases():
+            return False  # Replicas are copies: replicate_db brings the schema along
+        return None
+
+
+class ReadConnectionRouter:
+    """Route reads to the read-only connection, writes to the default one 🔀"""
+
+    def db_for_read(self, model, **hints):
+        if READ_ONLY_ALIAS not in connections.settings:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS  # Read your own uncommitted writes
+        return READ_ONLY_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # Both aliases are the same database
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != READ_ONLY_ALIAS
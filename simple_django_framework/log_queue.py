@@ -0,0 +1,272 @@
+"""
+Non-blocking logging pipeline for simple_django_framework
+
+What is this file? 📮
+Normally every logger.info() call writes to the log files RIGHT NOW, inside
+the request that logged it. If the disk is slow (or a log file is rotating),
+the user's page waits for the disk!
+
+This module puts a MAILBOX in front of the real handlers:
+1. Request threads drop log records into a bounded in-memory queue (fast!)
+2. ONE writer thread per process takes records out of the queue and hands
+   them to the real handlers (console, file_general, file_error)
+3. If the queue is full, records are dropped (or we wait a tiny bit) instead
+   of stalling the request - and the number of dropped records is reported
+
+Each logger keeps its own routing: 'django.request' still only writes to
+file_error, 'main_app' still writes to console and file_general, and every
+handler keeps its own level.
+
+It is wired up through the LOGGING_CONFIG setting, so Django configures the
+handlers from settings.LOGGING as usual and then moves them behind the queue.
+"""
+
+# Import necessary components 📦
+import atexit  # Flush the queue when the process exits
+import logging  # Python's logging framework
+import logging.config  # dictConfig
+import os  # For fork handling
+import queue  # Thread-safe queues
+import threading  # For the drop counter lock
+from logging.handlers import QueueHandler, QueueListener  # Queue-based logging
+
+# Default pipeline options ⚙️
+DEFAULT_MAXSIZE = 10000  # Maximum records waiting to be written
+DEFAULT_POLICY = 'drop'  # 'drop' = never wait, 'block' = wait up to BLOCK_TIMEOUT
+DEFAULT_BLOCK_TIMEOUT = 0.05  # Seconds a request may wait for room in the queue
+
+
+class RoutingQueueHandler(QueueHandler):
+    """
+    QueueHandler that remembers which real handlers a record is meant for 🏷️
+
+    One RoutingQueueHandler replaces the handler list of a logger. Every record
+    it enqueues is tagged with that logger's original handlers, so the single
+    writer thread can deliver it to exactly the same places as before.
+    """
+
+    def __init__(self, log_queue, targets, pipeline):
+        super().__init__(log_queue)
+        self.targets = tuple(targets)  # The real handlers (file, console, ...)
+        self.pipeline = pipeline  # Owning pipeline (holds the drop policy)
+        # Don't even enqueue records that no target handler would accept
+        self.setLevel(min(target.level for target in self.targets))
+
+    def prepare(self, record):
+        """Format the message now and tag the record with its destinations 📝"""
+        record = super().prepare(record)
+        record.queue_targets = self.targets
+        return record
+
+    def enqueue(self, record):
+        """Put the record in the queue without stalling the caller ⚡"""
+        self.pipeline.put(self.queue, record, self.targets)
+
+
+class RoutingQueueListener(QueueListener):
+    """
+    The writer thread: delivers each record to the handlers it was tagged with 🚚
+    """
+
+    def handle(self, record):
+        record = self.prepare(record)
+        for handler in getattr(record, 'queue_targets', self.handlers):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+class QueuedLogging:
+    """
+    A bounded logging queue plus its single writer thread 📮
+
+    Example:
+        pipeline = QueuedLogging(maxsize=10000, policy='drop')
+        pipeline.install([logging.getLogger(), logging.getLogger('main_app')])
+        pipeline.start()
+        ...
+        pipeline.stop()  # Writes everything still queued
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, policy=DEFAULT_POLICY,
+                 block_timeout=DEFAULT_BLOCK_TIMEOUT):
+        if policy not in ('drop', 'block'):
+            raise ValueError(f"Unknown logging queue policy: {policy!r}")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.queue = queue.Queue(maxsize)
+        self.handlers = []  # Our RoutingQueueHandlers
+        self.listener = None  # The writer thread (QueueListener)
+        self.dropped = 0  # Records dropped since the last report
+        self.total_dropped = 0  # Records dropped since start-up
+        self._drop_lock = threading.Lock()
+
+    def install(self, loggers):
+        """
+        Move the handlers of ``loggers`` behind the queue 🔀
+
+        Loggers that share exactly the same handlers share one queue handler.
+
+        Args:
+            loggers: Iterable of logging.Logger objects
+        """
+        by_targets = {}
+        for logger in loggers:
+            targets = tuple(h for h in logger.handlers if not isinstance(h, QueueHandler))
+            if not targets:
+                continue
+            handler = by_targets.get(targets)
+            if handler is None:
+                handler = RoutingQueueHandler(self.queue, targets, self)
+                by_targets[targets] = handler
+                self.handlers.append(handler)
+            logger.handlers = [handler]
+
+    def targets(self):
+        """All real handlers behind the queue (each listed once) 📋"""
+        seen = []
+        for handler in self.handlers:
+            for target in handler.targets:
+                if target not in seen:
+                    seen.append(target)
+        return seen
+
+    def start(self):
+        """Start the writer thread 🚀"""
+        if self.listener is None:
+            self.listener = RoutingQueueListener(self.queue, *self.targets(), respect_handler_level=True)
+            self.listener.start()
+
+    def stop(self):
+        """Stop the writer thread after it has written everything queued 🛑"""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+        if self.total_dropped:
+            # The writer is gone, so report straight to stderr
+            logging.lastResort.handle(logging.makeLogRecord({
+                'levelno': logging.WARNING,
+                'levelname': 'WARNING',
+                'msg': f"Logging queue dropped {self.total_dropped} records (queue full)",
+            }))
+
+    def put(self, log_queue, record, targets):
+        """
+        Enqueue one record according to the drop/backpressure policy 📥
+
+        Errors (and worse) always get a short blocking attempt, because those
+        are the records you really don't want to lose.
+        """
+        try:
+            if self.policy == 'block' or record.levelno >= logging.ERROR:
+                log_queue.put(record, timeout=self.block_timeout)
+            else:
+                log_queue.put_nowait(record)
+        except queue.Full:
+            with self._drop_lock:
+                self.dropped += 1
+                self.total_dropped += 1
+            return
+
+        if self.dropped:
+            self._report_drops(log_queue, targets)
+
+    def _report_drops(self, log_queue, targets):
+        """Tell the log files that some records were dropped ⚠️"""
+        with self._drop_lock:
+            dropped, self.dropped = self.dropped, 0
+        if not dropped:
+            return
+        warning = logging.makeLogRecord({
+            'name': __name__,
+            'levelno': logging.WARNING,
+            'levelname': 'WARNING',
+            'msg': f"Logging queue full: dropped {dropped} log records",
+            'queue_targets': targets,
+        })
+        try:
+            log_queue.put_nowait(warning)
+        except queue.Full:
+            with self._drop_lock:
+                self.dropped += dropped
+
+    def reset_after_fork(self):
+        """
+        Give a freshly forked worker its own queue and writer thread 🍴
+
+        Threads are not copied by fork(), and the parent's queue lock might be
+        held at the moment of the fork, so we start over with a new queue.
+        """
+        self.queue = queue.Queue(self.maxsize)
+        for handler in self.handlers:
+            handler.queue = self.queue
+        self._drop_lock = threading.Lock()
+        self.dropped = 0
+        self.listener = None
+        self.start()
+
+
+# The pipeline used by this process (created by configure_logging) 📮
+pipeline = None
+
+
+def configured_loggers():
+    """Every logger that currently has handlers attached (including root) 🌳"""
+    loggers = [logging.getLogger()]
+    for logger in logging.Logger.manager.loggerDict.values():
+        if isinstance(logger, logging.Logger) and logger.handlers:
+            loggers.append(logger)
+    return loggers
+
+
+def configure_logging(logging_settings):
+    """
+    LOGGING_CONFIG entry point: dictConfig, then move handlers behind the queue 🔧
+
+    Options come from settings.LOGGING_QUEUE:
+        ENABLED: Use the queue at all? (default True)
+        MAXSIZE: Maximum number of queued records
+        POLICY: 'drop' (never wait) or 'block' (wait up to BLOCK_TIMEOUT)
+        BLOCK_TIMEOUT: Seconds to wait for room when blocking
+
+    Args:
+        logging_settings: The settings.LOGGING dictionary
+    """
+    global pipeline
+    from django.conf import settings  # Settings are ready when Django calls us
+
+    logging.config.dictConfig(logging_settings)
+
+    options = getattr(settings, 'LOGGING_QUEUE', {})
+    if not options.get('ENABLED', True):
+        return None
+
+    if pipeline is not None:
+        # Reconfiguring: write out what the old pipeline still holds
+        pipeline.stop()
+
+    pipeline = QueuedLogging(
+        maxsize=options.get('MAXSIZE', DEFAULT_MAXSIZE),
+        policy=options.get('POLICY', DEFAULT_POLICY),
+        block_timeout=options.get('BLOCK_TIMEOUT', DEFAULT_BLOCK_TIMEOUT),
+    )
+    pipeline.install(configured_loggers())
+    pipeline.start()
+    return pipeline
+
+
+def _stop_on_exit():
+    """Write out queued records before the process exits 🚪"""
+    if pipeline is not None:
+        pipeline.stop()
+
+
+def _reset_after_fork():
+    if pipeline is not None:
+        pipeline.reset_after_fork()
+
+
+atexit.register(_stop_on_exit)
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
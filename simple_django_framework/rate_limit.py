@@ -0,0 +1,230 @@
+"""
+Rate limiting for simple_django_framework
+
+What is this file? 🚦
+Some pages are expensive or attractive to bots: the contact form (it
+stores messages), the login page (password guessing, and every login
+writes to the database) and the JSON API. Without a limit ONE client
+sending requests in a loop can keep every worker busy.
+
+RateLimitMiddleware counts requests per client for each POLICY in
+settings.RATE_LIMITS and answers "429 Too Many Requests" (with a
+Retry-After header saying how many seconds to wait) once a client goes
+over its rate.
+
+How counting works (a "sliding window counter") 🪟
+Time is cut into windows (e.g. minutes). Each client gets one counter per
+window in the shared cache, bumped with the cache's atomic incr() - so all
+worker processes share the counts and never lose an increment. To avoid a
+burst of 2x the rate around the turn of a window, the previous window
+still counts, fading out as the current window goes by:
+
+    estimate = previous * (time left in the window / window) + current
+
+That's two cache operations per limited request (one incr, one get), no
+matter how busy the client is. Requests to routes without a policy cost a
+dict lookup. Rejected requests count too, so a client that keeps
+hammering stays blocked until it slows down.
+
+Enable it with RATE_LIMIT_ENABLED = True and the middleware in MIDDLEWARE.
+Measure its overhead with: python manage.py bench_ratelimit
+"""
+
+# Import necessary components 📦
+import logging  # For logging
+import math  # Round Retry-After up
+import time  # Window arithmetic
+
+from django.conf import settings  # settings.RATE_LIMITS etc.
+from django.core.cache import caches  # The shared cache holds the counters
+from django.core.exceptions import ImproperlyConfigured  # Bad rate strings
+from django.http import HttpResponse, JsonResponse  # 429 responses
+from django.utils.deprecation import MiddlewareMixin  # Sync + async middleware
+
+# Get a logger for this project 📝
+logger = logging.getLogger('main_app')
+
+# "5/m" -> 5 requests per 60 seconds ⏱️
+UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """
+    Turn a rate like '5/m' or '100/10m' into (limit, window seconds) 📏
+
+    Raises:
+        ImproperlyConfigured: If the rate can't be understood
+    """
+    try:
+        limit, period = rate.split('/')
+        count, unit = period[:-1] or '1', period[-1]
+        return int(limit), int(count) * UNITS[unit]
+    except (ValueError, KeyError, IndexError) as error:
+        raise ImproperlyConfigured(f"Invalid rate limit {rate!r}, expected e.g. '5/m'") from error
+
+
+def client_ip(request):
+    """
+    The client's IP address 🌐
+
+    Only REMOTE_ADDR: X-Forwarded-For can be set to anything by the client.
+    Behind a reverse proxy, have the proxy set REMOTE_ADDR instead.
+    """
+    return request.META.get('REMOTE_ADDR', '')
+
+
+class RateLimitPolicy:
+    """
+    How often clients may use some views 📜
+
+    Args:
+        name: Short name (part of the cache keys)
+        views: URL names the policy covers, e.g. 'main_app:contact_form'
+        rate: Allowed requests per window, e.g. '5/m'
+        key: 'ip' to count per IP address, 'user' to count per logged-in
+             user (anonymous visitors are counted per IP)
+        methods: Only count these HTTP methods (default: all)
+        json: Answer 429 with a JSON body (for API views)
+    """
+
+    def __init__(self, name, views, rate, key='ip', methods=None, json=False):
+        if key not in ('ip', 'user'):
+            raise ImproperlyConfigured(f"Rate limit {name}: key must be 'ip' or 'user'")
+        self.name = name
+        self.views = list(views)
+        self.rate = rate
+        self.limit, self.window = parse_rate(rate)
+        self.key = key
+        self.methods = {method.upper() for method in methods} if methods else None
+        self.json = json
+
+    def applies_to(self, request):
+        """Does this request count against the policy? 🔍"""
+        return self.methods is None or request.method in self.methods
+
+    def client_key(self, request):
+        """Who is asking: 'user:<pk>' or 'ip:<address>' 🪪"""
+        if self.key == 'user':
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                return f'user:{user.pk}'
+        return f'ip:{client_ip(request)}'
+
+    def __repr__(self):
+        return f'<RateLimitPolicy {self.name} {self.rate}>'
+
+
+class RateLimiter:
+    """
+    Sliding window counters in a Django cache 🪟
+
+    Args:
+        cache_alias: Which cache (settings.CACHES) stores the counters
+        prefix: Start of every cache key
+    """
+
+    def __init__(self, cache_alias='default', prefix='ratelimit'):
+        self.cache = caches[cache_alias]
+        self.prefix = prefix
+
+    def _incr(self, key, window):
+        """Bump a window's counter, creating it if needed (atomic) ➕"""
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            pass  # First request in this window
+        # The counter must outlive the NEXT window too (it's "previous" then)
+        if self.cache.add(key, 1, timeout=2 * window + 1):
+            return 1
+        return self.cache.incr(key)  # Another worker created it just now
+
+    def hit(self, bucket, limit, window, now=None):
+        """
+        Count one request and decide whether it is allowed 🎫
+
+        Args:
+            bucket: Who and what is counted, e.g. 'contact_form:ip:1.2.3.4'
+            limit: Requests allowed per window
+            window: Window length in seconds
+            now: Current time (for tests)
+
+        Returns:
+            tuple: (allowed, seconds to wait before retrying or 0)
+        """
+        now = time.time() if now is None else now
+        index, elapsed = divmod(now, window)
+        current = self._incr(f'{self.prefix}:{bucket}:{int(index)}', window)
+        previous = self.cache.get(f'{self.prefix}:{bucket}:{int(index) - 1}', 0)
+
+        left = 1 - elapsed / window  # Share of the previous window still counted
+        if previous * left + current <= limit:
+            return True, 0
+        return False, self._retry_after(previous, current, limit, window, elapsed)
+
+    @staticmethod
+    def _retry_after(previous, current, limit, window, elapsed):
+        """Seconds until the estimate drops to ``limit`` (if nothing else arrives) ⏳"""
+        if current <= limit:
+            # Only the fading previous window is in the way
+            wait = window * (1 - (limit - current) / previous) - elapsed
+        else:
+            # Wait for the next window, then for this window's count to fade
+            wait = (window - elapsed) + window * (1 - limit / current)
+        return max(1, math.ceil(wait))
+
+
+def load_policies():
+    """Build the policies in settings.RATE_LIMITS 📋"""
+    return [
+        RateLimitPolicy(name, **options)
+        for name, options in getattr(settings, 'RATE_LIMITS', {}).items()
+    ]
+
+
+class RateLimitMiddleware(MiddlewareMixin):
+    """
+    Answer 429 to clients over the rate of a RATE_LIMITS policy 🚦
+
+    Runs in process_view(), after URL resolution, so policies are matched by
+    URL name with a single dict lookup, and after AuthenticationMiddleware,
+    so 'user' policies know who is logged in.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.enabled = getattr(settings, 'RATE_LIMIT_ENABLED', True)
+        self.policies = {}  # {url name: policy}
+        for policy in load_policies():
+            for view in policy.views:
+                self.policies[view] = policy
+        self.limiter = RateLimiter(getattr(settings, 'RATE_LIMIT_CACHE', 'default'))
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not self.enabled:
+            return None
+        match = request.resolver_match
+        policy = self.policies.get(match.view_name) if match else None
+        if policy is None or not policy.applies_to(request):
+            return None
+
+        client = policy.client_key(request)
+        allowed, retry_after = self.limiter.hit(f'{policy.name}:{client}', policy.limit, policy.window)
+        if allowed:
+            return None
+
+        # Log once per client and window, not once per rejected request:
+        # a bot hammering away would otherwise flood the log too 📝
+        if self.limiter.cache.add(f'{self.limiter.prefix}:logged:{policy.name}:{client}', 1, policy.window):
+            logger.warning(f"Rate limit {policy.name} ({policy.rate}) exceeded by {client}")
+        return self.too_many_requests(policy, retry_after)
+
+    @staticmethod
+    def too_many_requests(policy, retry_after):
+        """The 429 response, with Retry-After in seconds 🛑"""
+        message = f"Too many requests, please try again in {retry_after} seconds."
+        if policy.json:
+            response = JsonResponse({'status': 'error', 'message': message}, status=429)
+        else:
+            response = HttpResponse(message, status=429, content_type='text/plain; charset=utf-8')
+        response['Retry-After'] = str(retry_after)
+        return response
@@ -0,0 +1,202 @@
+"""
+Read replicas for simple_django_framework
+
+What is this file? 🪞
+A read replica is a second copy of the database that only answers reads.
+Listing and showing blog posts, comments, categories and profiles is by far
+the most common kind of query, so sending those to a replica leaves the
+primary database free for writes.
+
+Locally the replica is just another SQLite file, refreshed from the primary
+by `python manage.py replicate_db` (see replicate() below). Each refresh
+records WHEN its snapshot was taken, so we always know how far behind
+("lagging") the replica is.
+
+Three rules keep replica reads safe (see ReplicaRouter in db_routers.py):
+1. Only requests use replicas: management commands, the shell and
+   background threads always read from the primary
+2. A replica further behind than REPLICA_MAX_LAG seconds is skipped
+3. Read-your-writes: once a request writes, the rest of that request AND
+   the visitor's next REPLICA_PIN_SECONDS seconds (a "pin" cookie) read
+   from the primary, so people always see their own changes
+
+Enable it by adding ReplicaPinMiddleware at the top of MIDDLEWARE.
+"""
+
+# Import necessary components 📦
+import contextvars  # Per-request state that also works in async views
+import random  # Spread reads over replicas
+import sqlite3  # Online backup from the primary file
+import time  # Lag and pin timestamps
+from pathlib import Path  # Replica file paths
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction  # Sync + async middleware
+from django.conf import settings  # DATABASE_REPLICAS etc.
+from django.core.cache import cache  # Shared between all worker processes
+
+# Name of the cookie that keeps a visitor on the primary after a write 🍪
+PIN_COOKIE_NAME = 'replica_pin'
+
+# How long each process trusts its copy of the replication state ⏱️
+STATE_TTL = 1.0
+
+_state_cache = {}  # {alias: (checked_at, snapshot_at)}
+
+
+class RequestState:
+    """Replica routing state of one request 📋"""
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned  # Read from the primary for the rest of the request
+        self.wrote = False  # This request wrote to the database
+
+
+# None outside requests: then everything reads from the primary
+_request_state = contextvars.ContextVar('replica_request_state', default=None)
+
+
+def request_state():
+    """The current request's RequestState, or None outside a request 🔍"""
+    return _request_state.get()
+
+
+def mark_write():
+    """Called for every write: pin the rest of the request to the primary ✍️"""
+    state = _request_state.get()
+    if state is not None:
+        state.pinned = True
+        state.wrote = True
+
+
+def _cache_key(alias):
+    return f'replica-snapshot:{alias}'
+
+
+def record_replication(alias, snapshot_at):
+    """
+    Remember when the replica's current snapshot was taken 📝
+
+    Stored in the shared cache so every worker process sees it. No timeout:
+    if replication stops, the lag simply keeps growing.
+    """
+    cache.set(_cache_key(alias), snapshot_at, timeout=None)
+    _state_cache.pop(alias, None)
+
+
+def replica_lag(alias):
+    """
+    How many seconds ``alias`` is behind the primary (None if unknown) ⏳
+
+    Looked up in the shared cache at most once per STATE_TTL per process.
+    """
+    now = time.time()
+    checked_at, snapshot_at = _state_cache.get(alias, (0.0, None))
+    if now - checked_at > STATE_TTL:
+        snapshot_at = cache.get(_cache_key(alias))
+        _state_cache[alias] = (now, snapshot_at)
+    if snapshot_at is None:
+        return None  # Never replicated (or the cache was cleared)
+    return max(now - snapshot_at, 0.0)
+
+
+def replica_aliases():
+    """All configured replica aliases (settings.DATABASE_REPLICAS) 📋"""
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def healthy_replicas():
+    """Replica aliases that are close enough to the primary to read from ✅"""
+    max_lag = settings.REPLICA_MAX_LAG
+    healthy = []
+    for alias in replica_aliases():
+        lag = replica_lag(alias)
+        if lag is not None and lag <= max_lag:
+            healthy.append(alias)
+    return healthy
+
+
+def choose_replica():
+    """A healthy replica alias to read from, or None for the primary 🎲"""
+    healthy = healthy_replicas()
+    return random.choice(healthy) if healthy else None
+
+
+def replicate(source, target):
+    """
+    Copy the primary SQLite file ``source`` into the replica file ``target`` 🔁
+
+    Uses SQLite's online backup: the copy is a consistent snapshot, the
+    primary keeps accepting writes meanwhile, and readers of the replica
+    see either the old or the new snapshot, never a mix.
+
+    Returns:
+        float: When the snapshot was taken (Unix time)
+    """
+    Path(target).parent.mkdir(parents=True, exist_ok=True)
+    primary = sqlite3.connect(source)
+    replica = sqlite3.connect(target, timeout=30)
+    try:
+        # Everything committed before this moment is in the snapshot
+        snapshot_at = time.time()
+        primary.execute('BEGIN')
+        primary.execute('SELECT COUNT(*) FROM sqlite_master').fetchone()  # Start reading
+        primary.backup(replica)
+        primary.rollback()
+    finally:
+        replica.close()
+        primary.close()
+    return snapshot_at
+
+
+def _pinned_by_cookie(request):
+    try:
+        return float(request.COOKIES.get(PIN_COOKIE_NAME, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def _set_pin_cookie(response, state):
+    if state.wrote:
+        seconds = settings.REPLICA_PIN_SECONDS
+        response.set_cookie(
+            PIN_COOKIE_NAME, str(int(time.time() + seconds)),
+            max_age=seconds, httponly=True, samesite='Lax',
+        )
+    return response
+
+
+class ReplicaPinMiddleware:
+    """
+    Start replica routing for each request and handle the pin cookie 📌
+
+    Must come first in MIDDLEWARE, before anything touches the database.
+    Works under WSGI and ASGI.
+    """
+
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = RequestState(pinned=_pinned_by_cookie(request))
+        token = _request_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        return _set_pin_cookie(response, state)
+
+    async def __acall__(self, request):
+        state = RequestState(pinned=_pinned_by_cookie(request))
+        token = _request_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        return _set_pin_cookie(response, state)
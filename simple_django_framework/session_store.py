@@ -0,0 +1,98 @@
+"""
+Lazily persisted sessions for simple_django_framework
+
+What is this file? 🍪
+With the plain database session engine and SESSION_SAVE_EVERY_REQUEST,
+EVERY request of EVERY visitor ends with an UPDATE on django_session - even
+when nothing in the session changed. SQLite only lets one writer in at a
+time, so all traffic ends up queueing behind those writes.
+
+This session engine fixes that:
+1. Reads go through the cache first (the shared SQLite cache), and only fall
+   back to the database when the cache doesn't have the session
+2. The session is only written back when its data changed, OR when it is
+   getting close to expiring (less than SESSION_REFRESH_THRESHOLD seconds
+   left) - that write pushes the expiry (and the cookie) forward again
+
+So an active visitor still gets a sliding SESSION_COOKIE_AGE, but a
+read-only request costs zero session writes most of the time.
+
+Use it with:
+    SESSION_ENGINE = 'simple_django_framework.session_store'
+    SESSION_SAVE_EVERY_REQUEST = False
+"""
+
+# Import necessary components 📦
+from datetime import datetime, timezone as dt_timezone  # Timestamps
+import time  # Current time in seconds
+
+from django.conf import settings  # Project settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.utils import timezone  # Current time
+
+from .write_queue import write_queue  # Serialized database writes
+
+# Session key holding the time (Unix seconds) the session was last written 🕒
+PERSISTED_AT_KEY = '_persisted_at'
+
+
+class SessionStore(CachedDBStore):
+    """
+    Cached, database-backed session that is only saved when needed 💾
+
+    Django's SessionMiddleware saves a session when it was modified. On load
+    we check how long the stored session has left; if that is less than
+    SESSION_REFRESH_THRESHOLD we mark it modified, so the middleware saves it
+    (new expiry in the database and cache) and re-sends the cookie.
+
+    Note: the check runs when the session is loaded, which happens whenever
+    something reads it (e.g. request.user for a logged-in visitor).
+    """
+
+    def needs_refresh(self, data):
+        """
+        Is this freshly loaded session close enough to expiring to re-save? ⏳
+
+        Args:
+            data: The session dictionary that was just loaded
+
+        Returns:
+            bool: True if it should be written back
+        """
+        if not data:
+            return False  # Empty or missing session: nothing to keep alive
+        persisted_at = data.get(PERSISTED_AT_KEY)
+        if persisted_at is None:
+            return True  # Saved by another engine: write once to record the time
+        # Default: refresh once less than half the lifetime is left
+        threshold = getattr(settings, 'SESSION_REFRESH_THRESHOLD', settings.SESSION_COOKIE_AGE // 2)
+        expires = self.get_expiry_date(
+            modification=datetime.fromtimestamp(persisted_at, tz=dt_timezone.utc),
+            expiry=data.get('_session_expiry'),
+        )
+        return (expires - timezone.now()).total_seconds() < threshold
+
+    def load(self):
+        data = super().load()
+        if self.needs_refresh(data):
+            self.modified = True
+        return data
+
+    async def aload(self):
+        data = await super().aload()
+        if self.needs_refresh(data):
+            self.modified = True
+        return data
+
+    def _stamp(self, must_create):
+        # Don't load the session just to stamp it (must_create = brand new key)
+        self._get_session(no_load=must_create)[PERSISTED_AT_KEY] = int(time.time())
+
+    def save(self, must_create=False):
+        self._stamp(must_create)
+        write_queue.run(super().save, must_create)  # Queue up with the other writes ✍️
+
+    async def asave(self, must_create=False):
+        await self._aget_session(no_load=must_create)  # Load it the async way first
+        self._stamp(must_create)
+        await write_queue.arun(super().save, must_create)
@@ -17,6 +17,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 # This works on Windows, Mac, and Linux! 🌍
 from pathlib import Path
 import os  # Import os for operating system interface functions
+import sys  # To spot when we are running the test suite
+import tempfile  # Scratch files for the test suite
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 # BASE_DIR is the ROOT folder of your Django project 📁
@@ -28,6 +30,10 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 LOGS_DIR = BASE_DIR / 'logs'
 LOGS_DIR.mkdir(exist_ok=True)  # Create the directory if it doesn't exist
 
+# Are we running the test suite? (python manage.py test) 🧪
+# Used to keep tests away from files real workers share, like the cache.
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
 
@@ -67,6 +73,10 @@ INSTALLED_APPS = [
 # They process requests BEFORE they reach your views, and responses AFTER
 
 MIDDLEWARE = [
+    # Replica routing - decides per request whether reads may use a replica 🪞
+    # (first, so it is in place before anything queries the database)
+    'simple_django_framework.replicas.ReplicaPinMiddleware',
+
     # Security middleware - adds security headers to responses 🛡️
     'django.middleware.security.SecurityMiddleware',
     
@@ -82,6 +92,9 @@ MIDDLEWARE = [
     # Authentication middleware - associates users with requests 🔐
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     
+    # Rate limiting - 429 for clients going over RATE_LIMITS (see below) 🚦
+    'simple_django_framework.rate_limit.RateLimitMiddleware',
+    
     # Messages middleware - enables the messaging framework 💬
     'django.contrib.messages.middleware.MessageMiddleware',
     
@@ -135,16 +148,71 @@ WSGI_APPLICATION = 'simple_django_framework.wsgi.application'
 DATABASES = {
     # The default database connection 🔌
     'default': {
-        # SQLite engine - simple file-based database, perfect for learning! 📁
-        'ENGINE': 'django.db.backends.sqlite3',
+        # Django's SQLite backend plus tuned settings (WAL mode, bigger caches...) 📁
+        # See simple_django_framework/sqlite_backend/base.py
+        'ENGINE': 'simple_django_framework.sqlite_backend',
         # Database file location - it will be created in your project root 📍
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Keep connections open between requests (10 minutes), but check
+        # they still work before reusing them ♻️
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Take the write lock when a transaction starts, so two writers
+            # queue up instead of one failing with "database is locked"
+            'transaction_mode': 'IMMEDIATE',
+            'pragmas': {
+                'journal_mode': 'WAL',  # Readers and the writer don't block each other
+                'synchronous': 'NORMAL',  # Safe with WAL, much fewer fsyncs
+                'busy_timeout': 5000,  # Wait up to 5s for another writer
+                'mmap_size': 256 * 1024 * 1024,  # Read up to 256 MB straight from memory
+                'cache_size': -32000,  # About 32 MB page cache per connection
+                'temp_store': 'MEMORY',  # Sorting and temp tables in RAM
+            },
+        },
     }
     # You can add more databases here if needed:
     # 'users_db': { ... },
     # 'analytics_db': { ... },
 }
 
+# A second, read-only connection for SELECTs 📖
+# Reads go through it (see simple_django_framework/db_routers.py) so they
+# never queue behind a write transaction. The test suite runs on a single
+# in-memory database without it, except for the tests based on
+# ReadConnectionTestCase (main_app/tests.py), which switch it on.
+SQLITE_READ_CONNECTION = not TESTING
+if SQLITE_READ_CONNECTION:
+    DATABASES['readonly'] = {
+        **DATABASES['default'],
+        'OPTIONS': {
+            'read_only': True,
+            'pragmas': DATABASES['default']['OPTIONS']['pragmas'],
+        },
+    }
+
+# Read replicas 🪞
+# Reads of blog posts, comments, categories and profiles can be served by a
+# copy of the database, kept up to date by `python manage.py replicate_db`.
+# See simple_django_framework/replicas.py.
+DATABASE_REPLICAS = [] if TESTING else ['replica']
+for replica_alias in DATABASE_REPLICAS:
+    DATABASES[replica_alias] = {
+        **DATABASES['default'],
+        'NAME': BASE_DIR / 'replica' / f'{replica_alias}.sqlite3',
+        'OPTIONS': {
+            'read_only': True,
+            'pragmas': DATABASES['default']['OPTIONS']['pragmas'],
+        },
+    }
+REPLICA_MAX_LAG = 10  # Seconds: a replica further behind than this isn't used
+REPLICA_PIN_SECONDS = 15  # After a write, read from the primary this long (> REPLICA_MAX_LAG)
+
+DATABASE_ROUTERS = [
+    'simple_django_framework.db_routers.ReplicaRouter',
+    'simple_django_framework.db_routers.ReadConnectionRouter',
+]
+
 # Password validation rules 🔒
 # These rules make sure users create strong passwords
 
@@ -198,6 +266,49 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static',  # Look for static files in project root 'static' folder
 ]
 
+# How static files are stored 🏗️
+# `python manage.py collectstatic` minifies our CSS/JS, names every file
+# after a hash of its contents (base.css -> base.3f2a1b9c8d7e.css) and
+# writes a .gz copy, so browsers can cache them for a year. {% static %}
+# finds the hashed names in STATIC_ROOT/staticfiles.json - run collectstatic
+# before starting with DEBUG = False. Tests use plain names (no manifest).
+# See simple_django_framework/static_files.py.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.StaticFilesStorage' if TESTING
+            else 'simple_django_framework.static_files.MinifiedManifestStaticFilesStorage'
+        ),
+    },
+}
+
+STATIC_BUILD = {
+    'MINIFY': ['main_app/*.css', 'main_app/*.js'],  # Our own files (not the admin's)
+    'GZIP': ['*.css', '*.js', '*.svg'],  # Hashed files that get a .gz copy for the web server
+    'GZIP_MIN_SIZE': 256,  # Bytes; smaller files aren't worth it
+}
+
+# Self-hosted Bootstrap and Font Awesome 📦
+# `python manage.py vendor_assets` puts them in static/vendor/, keeping only
+# the CSS rules and icons our templates use. Until it has run, templates
+# load them from the CDN. See main_app/assets.py.
+VENDOR_ASSETS = {
+    'ROOT': BASE_DIR / 'static',  # In STATICFILES_DIRS
+    'CONTENT': [  # Scanned for class names (relative to BASE_DIR)
+        'main_app/templates/**/*.html',
+        'main_app/static/**/*.js',
+        'main_app/forms.py',  # Forms set classes on their widgets
+        'main_app/templatetags/*.py',
+    ],
+    'SAFELIST': [  # Classes added only by Bootstrap's JavaScript
+        'show', 'showing', 'hiding', 'fade', 'collapse', 'collapsing', 'collapsed', 'active',
+        'disabled', 'dropdown-menu-end', 'dropdown-menu-start', 'was-validated', 'is-valid', 'is-invalid',
+    ],
+}
+
 # Media files configuration (user-uploaded files) 📸
 # URL prefix for media files - appears in URLs like /media/uploads/photo.jpg
 MEDIA_URL = 'media/'
@@ -205,6 +316,32 @@ MEDIA_URL = 'media/'
 # Directory where uploaded files will be stored 📁
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Profile picture thumbnails 🖼️
+# Small square copies of uploaded pictures in MEDIA_ROOT/thumbs/, named after
+# a hash of the picture's contents. Made by a background job after upload
+# (or on first use); `python manage.py make_thumbnails` makes them for
+# existing pictures. See main_app/thumbnails.py.
+THUMBNAILS = {
+    'SIZES': [50, 100, 200],  # Square sizes in pixels (2x and 4x of a 50px avatar)
+    'FORMATS': ['webp', 'jpeg'],  # WebP for browsers that have it, JPEG for the rest
+    'QUALITY': 80,
+    'DIR': 'thumbs',  # Folder under MEDIA_ROOT
+}
+
+# Chunked uploads 📤
+# Big files (and profile pictures) can be sent in pieces through
+# /api/uploads/, resuming after a broken connection. Sizes are checked
+# before the bytes are read. See main_app/uploads.py.
+UPLOADS = {
+    'CHUNK_SIZE': 1024 * 1024,  # Chunk size suggested to clients (1 MB)
+    'MAX_CHUNK_SIZE': 8 * 1024 * 1024,  # Largest chunk accepted in one request
+    'MAX_SIZE': {  # Largest file per purpose, in bytes
+        'profile_picture': 10 * 1024 * 1024,
+        'media': 200 * 1024 * 1024,
+    },
+    'MAX_PENDING': 5,  # Unfinished uploads per user
+}
+
 # Default primary key field type 🔑
 # This sets the default type for auto-generated ID fields
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -301,6 +438,21 @@ if DEBUG:
         'propagate': False,
     }
 
+# Non-blocking logging pipeline 📮
+# Django builds the handlers above from LOGGING as usual, then our
+# configure_logging() moves them behind a bounded in-memory queue with ONE
+# writer thread per process. Request threads only drop records into the queue,
+# so slow disks or log rotation never stall a page.
+# Benchmark it with: python manage.py bench_logging
+LOGGING_CONFIG = 'simple_django_framework.log_queue.configure_logging'
+
+LOGGING_QUEUE = {
+    'ENABLED': True,  # Set to False to write logs synchronously again
+    'MAXSIZE': 10000,  # Maximum number of records waiting to be written
+    'POLICY': 'drop',  # 'drop' = never wait when full, 'block' = wait up to BLOCK_TIMEOUT
+    'BLOCK_TIMEOUT': 0.05,  # Seconds to wait for room (errors always wait this long)
+}
+
 # Email configuration (for error notifications) 📧
 # Configure this to receive email notifications for serious errors
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'  # Print emails to console
@@ -334,19 +486,117 @@ if not DEBUG:
 
 # Cache configuration 🚀
 # Caching makes your website faster by storing frequently used data
+# One SQLite file shared by every worker process on this machine 💾
+# (a per-process LocMemCache would give each worker its own cold cache, and
+# cache.delete() in one worker would not reach the others).
+# See simple_django_framework/sqlite_cache.py for how it works.
+CACHE_DIR = BASE_DIR / 'cache'
 CACHES = {
     'default': {
-        # Use local memory cache for development 💾
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
+        'BACKEND': 'simple_django_framework.sqlite_cache.SQLiteCache',
+        'LOCATION': (
+            Path(tempfile.mkdtemp(prefix='test-cache-')) / 'cache.sqlite3' if TESTING
+            else CACHE_DIR / 'cache.sqlite3'
+        ),
+        'TIMEOUT': 300,  # Default: 5 minutes
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,  # Least recently used entries are removed beyond this
+            'CULL_FREQUENCY': 3,  # Remove 1/3 of the entries when full
+            'TOUCH_INTERVAL': 60,  # Record "last used" at most once a minute per key
+        },
     }
 }
 
 # Session configuration 🍪
 # How Django handles user sessions (login status, shopping cart, etc.)
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'  # Store sessions in database
+# Sessions are read from the cache (database as fallback) and only written
+# when they change or have less than SESSION_REFRESH_THRESHOLD seconds left.
+SESSION_ENGINE = 'simple_django_framework.session_store'
 SESSION_COOKIE_AGE = 86400  # Session expires after 1 day (86400 seconds)
-SESSION_SAVE_EVERY_REQUEST = True  # Update session on every request
+SESSION_SAVE_EVERY_REQUEST = False  # Only save sessions that need it (see above)
+SESSION_REFRESH_THRESHOLD = 43200  # Extend the session once less than 12 hours are left
+
+# View counter configuration 👁️
+# Blog post views are counted in memory and written to the database in batches
+# every VIEW_COUNT_FLUSH_INTERVAL seconds (and when the process exits).
+# Set this to 0 to write every view straight away.
+VIEW_COUNT_FLUSH_INTERVAL = 5
+
+# Write queue ✍️
+# Database writes (sessions, view counts, comments, profiles, admin bulk
+# actions) go through one writer thread per process, which commits them in
+# batches. Worker processes take turns through LOCK_FILE.
+# See simple_django_framework/write_queue.py.
+WRITE_QUEUE = {
+    'ENABLED': not TESTING,  # The test suite writes inline, inside its own transactions
+    'BATCH_SIZE': 100,  # Most writes committed in one transaction
+    'BATCH_WINDOW': 0,  # Don't wait for more writes: batch whatever is already queued
+    'LOCK_FILE': CACHE_DIR / 'db-write.lock',
+}
+
+# Contact form spool 📮
+# Contact form messages are appended to a spool file on disk and stored in
+# the database in batches by a background thread (and when the process
+# exits). Spool files left by a crashed process are stored by the next
+# flush, or by `python manage.py flush_contact_spool`.
+# See main_app/contact_spool.py.
+CONTACT_SPOOL = {
+    'DIR': Path(tempfile.mkdtemp(prefix='test-spool-')) if TESTING else CACHE_DIR / 'contact-spool',
+    'FLUSH_INTERVAL': 0 if TESTING else 2,  # Seconds; 0 stores every message straight away
+    'BATCH_SIZE': 500,  # Rows per INSERT
+    'DEDUPE_WINDOW': 600,  # The same message from the same email within 10 minutes is dropped
+    'FSYNC': True,  # Make sure each spooled message is on the disk before answering
+}
+
+# Background jobs 🧰
+# Slow side effects (emails, notifications) are queued in the Job table and
+# run by `python manage.py runworker`. Failed jobs are retried with growing
+# delays; a job whose worker died is picked up again after
+# VISIBILITY_TIMEOUT seconds. See main_app/jobs.py.
+JOBS = {
+    'THREADS': 4,  # Jobs one worker runs at the same time
+    'POLL_INTERVAL': 1.0,  # Seconds an idle worker waits before looking again
+    'VISIBILITY_TIMEOUT': 300,  # Longest a job may run before another worker takes it over
+    'MAX_ATTEMPTS': 5,  # Attempts before a job is marked failed
+    'BACKOFF': 10,  # Seconds before the first retry, doubled for each one
+    'BACKOFF_MAX': 3600,  # Longest wait between retries
+    'STATS_INTERVAL': 60,  # Seconds between queue stats lines in the worker's log
+}
+
+# Rate limits 🚦
+# Requests per client for the views bots like most. 'ip' counts per IP
+# address, 'user' per logged-in user (anonymous visitors per IP). Counters
+# live in the shared cache. See simple_django_framework/rate_limit.py.
+RATE_LIMIT_ENABLED = not TESTING  # Tests switch it on where they need it
+RATE_LIMIT_CACHE = 'default'
+RATE_LIMITS = {
+    'contact_form': {
+        'views': ['main_app:contact_form'],
+        'methods': ['POST'],  # Showing the form is free
+        'rate': '5/m',
+    },
+    'login': {
+        'views': ['login'],
+        'methods': ['POST'],
+        'rate': '10/m',
+    },
+    'api': {
+        'views': ['main_app:api_hello', 'main_app:async_api_hello'],
+        'rate': '120/m',
+        'key': 'user',
+        'json': True,
+    },
+}
+
+# Data retention 🧹
+# How many days rows are kept before `python manage.py prune_data` deletes
+# them (expired sessions are always deleted). See main_app/retention.py.
+DATA_RETENTION = {
+    'spam_messages': 7,  # Contact messages marked as spam
+    'resolved_messages': 180,  # Contact messages resolved this long ago
+    'finished_jobs': 14,  # Background jobs that are done or failed
+    'stale_uploads': 1,  # Chunked uploads with no new chunk for this long
+}
 
 print("🚀 Django settings loaded successfully!")
 print(f"📁 Project directory: {BASE_DIR}")
@@ -0,0 +1,6 @@
+"""
+Tuned SQLite database backend for simple_django_framework 🗃️
+
+Use it instead of 'django.db.backends.sqlite3' (see base.py):
+    DATABASES = {'default': {'ENGINE': 'simple_django_framework.sqlite_backend', ...}}
+"""
@@ -0,0 +1,121 @@
+"""
+Tuned SQLite database backend for simple_django_framework
+
+What is this file? 🗃️
+Django's built-in SQLite backend opens the database with SQLite's defaults,
+which are made for safety on tiny devices, not for a web server:
+- rollback journal: a writer blocks every reader while it commits
+- synchronous=FULL: an fsync on every commit
+- a 2 MB page cache, temporary tables on disk
+
+This backend is the same as django.db.backends.sqlite3, but every new
+connection first runs a set of PRAGMAs (settings OPTIONS['pragmas']):
+    journal_mode=WAL      readers and the writer no longer block each other
+    synchronous=NORMAL    safe in WAL mode, fsync only at checkpoints
+    busy_timeout          wait (instead of failing) while another writer works
+    mmap_size, cache_size read hot pages from memory
+    temp_store=MEMORY     sorts and temporary tables stay in RAM
+
+It also adds:
+- A real health check for persistent connections (CONN_MAX_AGE +
+  CONN_HEALTH_CHECKS): the connection must answer a query AND still point
+  at the database file on disk (not one that was replaced by a restore)
+- OPTIONS['read_only']: open the file read-only, for a second connection
+  that only runs SELECTs (see simple_django_framework/db_routers.py)
+
+Usage (settings.py):
+    DATABASES = {
+        'default': {
+            'ENGINE': 'simple_django_framework.sqlite_backend',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'CONN_MAX_AGE': 600,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {'pragmas': {'cache_size': -64000}},
+        }
+    }
+"""
+
+# Import necessary components 📦
+import os  # File identity for the health check
+
+from django.core.exceptions import ImproperlyConfigured  # Bad settings
+from django.db.backends.sqlite3 import base as sqlite3_base  # Django's SQLite backend
+
+Database = sqlite3_base.Database
+
+# PRAGMAs applied to every new connection (OPTIONS['pragmas'] overrides) ⚙️
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,  # Milliseconds
+    'mmap_size': 256 * 1024 * 1024,  # Bytes
+    'cache_size': -32000,  # Negative = KiB, so about 32 MB per connection
+    'temp_store': 'MEMORY',
+}
+
+# PRAGMAs that change the database file itself: skipped on read-only connections
+FILE_PRAGMAS = {'journal_mode'}
+
+
+def pragma_statements(pragmas):
+    """
+    Turn {'name': value} into "PRAGMA name = value" statements 📝
+
+    Raises:
+        ImproperlyConfigured: If a name or value isn't a plain word or number
+    """
+    statements = []
+    for name, value in pragmas.items():
+        if not name.isidentifier() or not str(value).lstrip('-').isalnum():
+            raise ImproperlyConfigured(f"Invalid SQLite pragma: {name} = {value!r}")
+        statements.append(f'PRAGMA {name} = {value}')
+    return statements
+
+
+def _file_identity(path):
+    """(device, inode) of the database file, or None if it doesn't exist 🪪"""
+    try:
+        stat = os.stat(path)
+    except (OSError, ValueError):
+        return None
+    return stat.st_dev, stat.st_ino
+
+
+class DatabaseWrapper(sqlite3_base.DatabaseWrapper):
+    """Django's SQLite backend plus tuned PRAGMAs, health checks and read-only mode 🚀"""
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        self.pragmas = {**DEFAULT_PRAGMAS, **kwargs.pop('pragmas', {})}
+        self.read_only = kwargs.pop('read_only', False)
+        if self.read_only:
+            for name in FILE_PRAGMAS:
+                self.pragmas.pop(name, None)
+            if not self.is_in_memory_db():
+                # SQLite URI: the file must exist and is never written to
+                kwargs['database'] = f"file:{os.path.abspath(kwargs['database'])}?mode=ro"
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for statement in pragma_statements(self.pragmas):
+            conn.execute(statement)
+        if self.read_only:
+            conn.execute('PRAGMA query_only = ON')  # Belt and braces 🧷
+        self.file_identity = None if self.is_in_memory_db() else _file_identity(self.settings_dict['NAME'])
+        return conn
+
+    def is_usable(self):
+        """
+        Health check for persistent connections 🩺
+
+        Django calls this before reusing a connection (CONN_HEALTH_CHECKS).
+        """
+        try:
+            self.connection.execute('SELECT 1')
+        except Database.Error:
+            return False
+        if self.file_identity is not None:
+            # The file was deleted or replaced: this connection still reads the old one
+            return _file_identity(self.settings_dict['NAME']) == self.file_identity
+        return True
@@ -0,0 +1,346 @@
+"""
+Shared SQLite cache backend for simple_django_framework
+
+What is this file? 🗄️
+Django's LocMemCache keeps the cache INSIDE each worker process. With 4
+gunicorn/uvicorn workers you get 4 separate caches: each one starts cold,
+each one caches the same things again, and cache.delete() in one worker
+doesn't reach the other three.
+
+This backend keeps the cache in ONE SQLite file on the local disk instead,
+so every worker process on the machine sees the same entries:
+- WAL mode: readers never wait for writers (and vice versa)
+- Memory-mapped reads: a get() is a primary key lookup in the page cache,
+  typically a few microseconds
+- incr()/decr() and add() are single atomic SQL statements, so two workers
+  can't both "win" an add() or lose an increment
+- Entries expire after their timeout, and when there are more than
+  MAX_ENTRIES the least recently used ones are removed
+
+Usage (settings.py):
+    CACHES = {
+        'default': {
+            'BACKEND': 'simple_django_framework.sqlite_cache.SQLiteCache',
+            'LOCATION': BASE_DIR / 'cache' / 'cache.sqlite3',
+            'TIMEOUT': 300,
+            'OPTIONS': {
+                'MAX_ENTRIES': 10000,   # Keep at most this many entries
+                'CULL_FREQUENCY': 3,    # Remove 1/3 of them when full
+                'TOUCH_INTERVAL': 60,   # Update "last used" at most once a minute per key
+            },
+        }
+    }
+"""
+
+# Import necessary components 📦
+import os  # Process id (fork safety) and directories
+import pickle  # Store any Python value
+import sqlite3  # The shared store
+import threading  # One connection per thread
+import time  # Expiry timestamps
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache  # Django's cache API
+
+# Defaults for OPTIONS ⚙️
+DEFAULT_TOUCH_INTERVAL = 60  # Seconds between "last used" updates for one key
+DEFAULT_BUSY_TIMEOUT = 5000  # Milliseconds to wait for another worker's write
+DEFAULT_MMAP_SIZE = 64 * 1024 * 1024  # Bytes of the file to memory-map
+
+# Values stored as plain SQLite integers (so incr() can add in SQL) 🔢
+# Everything else (including True/False, which are ints too) is pickled.
+INTEGER = 0
+PICKLED = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entry (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    kind INTEGER NOT NULL,
+    expires REAL,
+    accessed REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cache_entry_expires ON cache_entry (expires);
+CREATE INDEX IF NOT EXISTS cache_entry_accessed ON cache_entry (accessed);
+"""
+
+
+class SQLiteCache(BaseCache):
+    """
+    Django cache backend storing entries in a shared WAL-mode SQLite file 🗄️
+
+    Each thread of each process gets its own connection; connections are
+    re-opened automatically after fork().
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.path = str(location)
+        self.touch_interval = float(options.get('TOUCH_INTERVAL', DEFAULT_TOUCH_INTERVAL))
+        self.busy_timeout = int(options.get('BUSY_TIMEOUT', DEFAULT_BUSY_TIMEOUT))
+        self.mmap_size = int(options.get('MMAP_SIZE', DEFAULT_MMAP_SIZE))
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    # Connections 🔌
+
+    def _connection(self):
+        """This thread's connection (a fresh one after fork) 🔌"""
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            local.connection = self._connect()
+            local.pid = os.getpid()
+        return local.connection
+
+    def _connect(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # isolation_level=None: autocommit; we BEGIN explicitly when needed
+        connection = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        connection.execute(f'PRAGMA busy_timeout = {self.busy_timeout}')
+        connection.execute('PRAGMA journal_mode = WAL')
+        connection.execute('PRAGMA synchronous = NORMAL')  # Safe in WAL mode, much faster
+        connection.execute(f'PRAGMA mmap_size = {self.mmap_size}')
+        if not self._schema_ready:
+            with self._schema_lock:
+                connection.executescript(SCHEMA)
+                self._schema_ready = True
+        return connection
+
+    def close(self, **kwargs):
+        """Django calls this after each request - we keep connections open 🔌"""
+
+    # Encoding 📦
+
+    @staticmethod
+    def _encode(value):
+        if type(value) is int and -2**63 <= value < 2**63:
+            return value, INTEGER
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL), PICKLED
+
+    @staticmethod
+    def _decode(value, kind):
+        return value if kind == INTEGER else pickle.loads(value)
+
+    def _expiry(self, timeout):
+        """Absolute expiry time for a timeout (None = never expires) ⏰"""
+        return self.get_backend_timeout(timeout)  # Already "now + timeout"
+
+    # Reading 📖
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        row = self._connection().execute(
+            'SELECT value, kind, expires, accessed FROM cache_entry WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return default
+        value, kind, expires, accessed = row
+        now = time.time()
+        if expires is not None and expires <= now:
+            self._delete_expired(key, now)
+            return default
+        self._touch_if_stale(key, accessed, now)
+        return self._decode(value, kind)
+
+    def get_many(self, keys, version=None):
+        key_map = {self.make_and_validate_key(key, version=version): key for key in keys}
+        if not key_map:
+            return {}
+        placeholders = ', '.join('?' * len(key_map))
+        rows = self._connection().execute(
+            f'SELECT key, value, kind, expires, accessed FROM cache_entry WHERE key IN ({placeholders})',
+            list(key_map),
+        ).fetchall()
+        now = time.time()
+        found = {}
+        for key, value, kind, expires, accessed in rows:
+            if expires is not None and expires <= now:
+                continue
+            self._touch_if_stale(key, accessed, now)
+            found[key_map[key]] = self._decode(value, kind)
+        return found
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._connection().execute(
+            'SELECT 1 FROM cache_entry WHERE key = ? AND (expires IS NULL OR expires > ?)',
+            (key, time.time()),
+        ).fetchone() is not None
+
+    def _touch_if_stale(self, key, accessed, now):
+        """
+        Lazy LRU bookkeeping: record a read only if the last record is old 🕰️
+
+        Writing "last used" on EVERY get would turn each read into a write.
+        Being at most TOUCH_INTERVAL seconds out of date is fine for picking
+        which entries to throw away.
+        """
+        if now - accessed >= self.touch_interval:
+            self._connection().execute(
+                'UPDATE cache_entry SET accessed = ? WHERE key = ?', (now, key)
+            )
+
+    def _delete_expired(self, key, now):
+        self._connection().execute(
+            'DELETE FROM cache_entry WHERE key = ? AND expires <= ?', (key, now)
+        )
+
+    # Writing ✏️
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        self._set_many_encoded([(key, value)], timeout)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        items = [(self.make_and_validate_key(key, version=version), value) for key, value in data.items()]
+        self._set_many_encoded(items, timeout)
+        return []
+
+    def _set_many_encoded(self, items, timeout):
+        expires = self._expiry(timeout)
+        now = time.time()
+        rows = [(key, *self._encode(value), expires, now) for key, value in items]
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            if expires is not None and expires <= now:
+                # A timeout of 0 (or less) means "delete it now"
+                connection.executemany('DELETE FROM cache_entry WHERE key = ?', [(row[0],) for row in rows])
+            else:
+                connection.executemany(
+                    'INSERT INTO cache_entry (key, value, kind, expires, accessed) '
+                    'VALUES (?, ?, ?, ?, ?) '
+                    'ON CONFLICT (key) DO UPDATE SET value = excluded.value, kind = excluded.kind, '
+                    'expires = excluded.expires, accessed = excluded.accessed',
+                    rows,
+                )
+                self._cull(connection, now)
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        """
+        Set ``key`` only if it's missing (or expired) - atomically 🔒
+
+        One INSERT ... ON CONFLICT statement, so when two workers add the
+        same key at the same moment exactly one of them gets True.
+        """
+        key = self.make_and_validate_key(key, version=version)
+        expires = self._expiry(timeout)
+        now = time.time()
+        if expires is not None and expires <= now:
+            return False
+        encoded, kind = self._encode(value)
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            added = connection.execute(
+                'INSERT INTO cache_entry (key, value, kind, expires, accessed) '
+                'VALUES (?, ?, ?, ?, ?) '
+                'ON CONFLICT (key) DO UPDATE SET value = excluded.value, kind = excluded.kind, '
+                'expires = excluded.expires, accessed = excluded.accessed '
+                'WHERE cache_entry.expires IS NOT NULL AND cache_entry.expires <= ? '
+                'RETURNING 1',
+                (key, encoded, kind, expires, now, now),
+            ).fetchone() is not None
+            if added:
+                self._cull(connection, now)
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return added
+
+    def incr(self, key, delta=1, version=None):
+        """
+        Add ``delta`` to a stored integer in ONE statement (no lost updates) ➕
+
+        Raises:
+            ValueError: If the key doesn't exist (like every Django backend)
+        """
+        key = self.make_and_validate_key(key, version=version)
+        now = time.time()
+        connection = self._connection()
+        row = connection.execute(
+            'UPDATE cache_entry SET value = value + ?, accessed = ? '
+            'WHERE key = ? AND kind = ? AND (expires IS NULL OR expires > ?) '
+            'RETURNING value',
+            (delta, now, key, INTEGER, now),
+        ).fetchone()
+        if row is not None:
+            return row[0]
+
+        # Missing, expired, or not a plain integer (e.g. a big int) 🐢
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute(
+                'SELECT value, kind FROM cache_entry WHERE key = ? AND (expires IS NULL OR expires > ?)',
+                (key, now),
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"Key '{key}' not found")
+            new_value = self._decode(*row) + delta
+            connection.execute(
+                'UPDATE cache_entry SET value = ?, kind = ?, accessed = ? WHERE key = ?',
+                (*self._encode(new_value), now, key),
+            )
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return new_value
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        now = time.time()
+        cursor = self._connection().execute(
+            'UPDATE cache_entry SET expires = ?, accessed = ? '
+            'WHERE key = ? AND (expires IS NULL OR expires > ?)',
+            (self._expiry(timeout), now, key, now),
+        )
+        return cursor.rowcount > 0
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        cursor = self._connection().execute('DELETE FROM cache_entry WHERE key = ?', (key,))
+        return cursor.rowcount > 0
+
+    def delete_many(self, keys, version=None):
+        keys = [self.make_and_validate_key(key, version=version) for key in keys]
+        if keys:
+            placeholders = ', '.join('?' * len(keys))
+            self._connection().execute(f'DELETE FROM cache_entry WHERE key IN ({placeholders})', keys)
+
+    def clear(self):
+        self._connection().execute('DELETE FROM cache_entry')
+
+    # Size limit 📏
+
+    def _cull(self, connection, now):
+        """
+        Keep the cache under MAX_ENTRIES 🧹
+
+        First drop expired entries; if still too big, drop the least recently
+        used 1/CULL_FREQUENCY of them (CULL_FREQUENCY = 0 empties the cache).
+        Runs inside the caller's write transaction.
+        """
+        count = connection.execute('SELECT COUNT(*) FROM cache_entry').fetchone()[0]
+        if count <= self._max_entries:
+            return
+        connection.execute('DELETE FROM cache_entry WHERE expires <= ?', (now,))
+        count = connection.execute('SELECT COUNT(*) FROM cache_entry').fetchone()[0]
+        if count <= self._max_entries:
+            return
+        if self._cull_frequency == 0:
+            connection.execute('DELETE FROM cache_entry')
+            return
+        connection.execute(
+            'DELETE FROM cache_entry WHERE key IN '
+            '(SELECT key FROM cache_entry ORDER BY accessed LIMIT ?)',
+            (max(count // self._cull_frequency, count - self._max_entries),),
+        )
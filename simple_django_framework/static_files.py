@@ -0,0 +1,259 @@
+"""
+Static file build for simple_django_framework
+
+What is this file? 📁
+Our own CSS and JavaScript live in main_app/static/main_app/ and templates
+link them with {% static %}. `python manage.py collectstatic` copies them
+to STATIC_ROOT, and the storage class below turns every copy into a file
+that can be cached FOREVER:
+
+1. MINIFY: comments and extra whitespace are removed from our .css/.js
+   files (settings.STATIC_BUILD['MINIFY'] says which - files of other apps,
+   like the admin's, are left alone)
+2. HASH: ManifestStaticFilesStorage saves each file a second time with a
+   hash of its (minified) contents in the name, e.g. css/base.3f2a1b9c8d7e.css,
+   and writes staticfiles.json so {% static 'main_app/css/base.css' %}
+   becomes that name. Change the file and its name changes, so a browser
+   never keeps an old copy
+3. GZIP: hashed .css/.js files also get a .gz copy next to them, so the web
+   server can send them compressed without compressing on every request
+
+Because a hashed name never changes its contents, it can be sent with
+    Cache-Control: public, max-age=31536000, immutable
+(cache for a year, don't even ask again). The serve() view below does that
+when Django serves the files; in production let the web server do it, e.g.
+nginx:
+
+    location /static/ {
+        alias /path/to/staticfiles/;
+        gzip_static on;
+        location ~ "\\.[0-9a-f]{12}\\.\\w+$" {
+            add_header Cache-Control "public, max-age=31536000, immutable";
+        }
+    }
+
+With DEBUG = True, {% static %} gives the plain names and runserver serves
+the source files, so editing CSS needs no collectstatic.
+"""
+
+# Import necessary components 📦
+import gzip  # Pre-compressed copies
+import re  # Tokenizing CSS and JavaScript
+
+from django.conf import settings  # settings.STATIC_BUILD
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.contrib.staticfiles.utils import matches_patterns  # Glob patterns like 'main_app/*.css'
+from django.core.files.base import ContentFile  # Writing files to the storage
+from django.utils.cache import patch_cache_control  # Cache-Control headers
+from django.views.static import serve as serve_file  # Django's file view
+
+# Default options (settings.STATIC_BUILD overrides them) ⚙️
+DEFAULT_OPTIONS = {
+    'MINIFY': ['main_app/*.css', 'main_app/*.js'],  # Files to minify (glob patterns)
+    'GZIP': ['*.css', '*.js', '*.svg'],  # Hashed files that get a .gz copy
+    'GZIP_MIN_SIZE': 256,  # Smaller files aren't worth compressing (bytes)
+}
+
+# A year: the longest max-age browsers respect 📅
+FOREVER = 365 * 24 * 60 * 60
+
+# CSS: strings and comments must be recognized so nothing inside them changes
+CSS_TOKENS = re.compile(r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|(/\*.*?\*/)|(\s+)''', re.S)
+
+# Characters around which CSS never needs a space
+CSS_TIGHT = set('{};,>')
+
+# JavaScript: where a "/" starts a regular expression instead of dividing
+JS_REGEX_AFTER = set('(,=:[!&|?{};+-*%<>~^')
+
+# Characters around which JavaScript never needs a space
+JS_TIGHT = set('{}()[];,=:<>+-*/%&|!?.')
+
+
+def options():
+    """DEFAULT_OPTIONS with settings.STATIC_BUILD on top ⚙️"""
+    return {**DEFAULT_OPTIONS, **getattr(settings, 'STATIC_BUILD', {})}
+
+
+def minify_css(source):
+    """
+    Remove comments and unneeded whitespace from CSS 🗜️
+
+    Strings are copied untouched and comments starting with /*! (licenses)
+    are kept. Spaces inside values like calc(100vh - 200px) stay: they matter.
+
+    Returns:
+        str: The minified CSS
+    """
+    output = []  # Pieces of the result
+    space = False  # Whitespace (or a comment) seen since the last piece
+    position = 0
+    for match in CSS_TOKENS.finditer(source + ' '):
+        string, comment, _ = match.groups()
+        kept = string or (comment if comment and comment.startswith('/*!') else '')
+        for piece in (source[position:match.start()], kept):
+            if not piece:
+                continue
+            if space and output and output[-1][-1] not in CSS_TIGHT | {':'} and piece[0] not in CSS_TIGHT:
+                output.append(' ')
+            if piece[0] == '}' and output and output[-1][-1] == ';' and output[-1][0] not in '"\'/':
+                output[-1] = output[-1][:-1]  # The last declaration of a block needs no ";"
+            output.append(piece if piece in (string, comment) else piece.replace(';}', '}'))
+            space = False
+        position = match.end()
+        space = space or not string
+    return ''.join(output).strip()
+
+
+def minify_js(source):
+    """
+    Remove comments and unneeded whitespace from JavaScript 🗜️
+
+    Deliberately careful: line breaks are kept where they could end a
+    statement (JavaScript inserts missing semicolons at line breaks), and
+    strings, template literals and regular expressions are copied untouched.
+    That keeps it safe for hand-written code without a real parser.
+
+    Returns:
+        str: The minified JavaScript
+    """
+    output = []  # Pieces of the result
+    last = ''  # Last character written (not whitespace)
+    pending = ''  # Whitespace seen since then: '', ' ' or '\n'
+    i, length = 0, len(source)
+
+    def emit(piece):
+        nonlocal last, pending
+        if pending and last:
+            first = piece[0]
+            if pending == '\n' and last not in '{;,' and first != '}':
+                output.append('\n')  # Might end a statement: keep it
+            elif first not in JS_TIGHT and last not in JS_TIGHT:
+                output.append(' ')  # Between two words: needed
+            elif first in '+-' and last in '+-':
+                output.append(' ')  # "a - -b" is not "a--b"
+        output.append(piece)
+        last, pending = piece[-1], ''
+
+    while i < length:
+        char = source[i]
+        if char in ' \t\r\n':
+            if char == '\n' or pending != '\n':
+                pending = '\n' if char == '\n' else ' '
+            i += 1
+        elif source.startswith('//', i):
+            end = source.find('\n', i)
+            i = length if end == -1 else end
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            end = length if end == -1 else end + 2
+            if source.startswith('/*!', i):
+                emit(source[i:end])
+            elif pending != '\n':
+                pending = ' '
+            i = end
+        elif char in '\'"`' or (char == '/' and (not last or last in JS_REGEX_AFTER)):
+            end = _literal_end(source, i)
+            emit(source[i:end])
+            i = end
+        else:
+            emit(char)
+            i += 1
+    return ''.join(output)
+
+
+def _literal_end(source, start):
+    """Index just past the string, template or regex starting at ``start`` 🔚"""
+    quote = source[start]
+    in_class = False  # Inside [...] of a regex, "/" doesn't end it
+    i = start + 1
+    while i < len(source):
+        char = source[i]
+        if char == '\\':
+            i += 2
+            continue
+        if quote == '/':
+            if char == '[':
+                in_class = True
+            elif char == ']':
+                in_class = False
+            elif char == '/' and not in_class:
+                # Flags like /abc/gi belong to the regex
+                i += 1
+                while i < len(source) and source[i].isalpha():
+                    i += 1
+                return i
+        elif char == quote:
+            return i + 1
+        i += 1
+    return len(source)
+
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+
+class MinifiedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    ManifestStaticFilesStorage that minifies and gzips our files 🏗️
+
+    Used by collectstatic (settings.STORAGES['staticfiles']). The copies in
+    STATIC_ROOT are minified BEFORE they are hashed, so the hash (and the
+    name) changes exactly when the minified contents do.
+    """
+
+    def post_process(self, paths, dry_run=False, **kwargs):
+        if dry_run:
+            return
+        build = options()
+        paths = dict(paths)
+        for name in paths:
+            minify = MINIFIERS.get(name[name.rfind('.'):])
+            if minify and not name.endswith(('.min.css', '.min.js')) and matches_patterns(name, build['MINIFY']):
+                with self.open(name) as collected:
+                    source = collected.read().decode('utf-8')
+                self.delete(name)
+                self._save(name, ContentFile(minify(source).encode('utf-8')))
+                # Hash the minified copy, not the original in the app folder
+                paths[name] = (self, name)
+
+        yield from super().post_process(paths, dry_run, **kwargs)
+
+        for name in paths:
+            hashed = self.hashed_files.get(self.hash_key(self.clean_name(name)))
+            if hashed and matches_patterns(name, build['GZIP']):
+                self._gzip(hashed, build['GZIP_MIN_SIZE'])
+
+    def _gzip(self, name, min_size):
+        """Write ``name``.gz if the file is big enough and compresses 📦"""
+        with self.open(name) as original:
+            content = original.read()
+        if len(content) < min_size:
+            return
+        # mtime=0: the same file always gives the same .gz
+        compressed = gzip.compress(content, compresslevel=9, mtime=0)
+        if len(compressed) < len(content):
+            if self.exists(f'{name}.gz'):
+                self.delete(f'{name}.gz')
+            self._save(f'{name}.gz', ContentFile(compressed))
+
+
+def is_hashed(path):
+    """Is ``path`` a content-hashed name from the manifest? 🔍"""
+    manifest = getattr(staticfiles_storage, 'hashed_files', None) or {}
+    return path in manifest.values()
+
+
+def serve(request, path, document_root=None, show_indexes=False):
+    """
+    Django's static file view, plus cache headers 📤
+
+    Hashed names are cached for a year (immutable); plain names must be
+    revalidated, since their contents change with every deploy.
+    """
+    response = serve_file(request, path, document_root=document_root, show_indexes=show_indexes)
+    if response.status_code == 200:
+        if is_hashed(path):
+            patch_cache_control(response, public=True, max_age=FOREVER, immutable=True)
+        else:
+            patch_cache_control(response, no_cache=True)
+    return response
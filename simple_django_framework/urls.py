@@ -16,6 +16,7 @@ from django.contrib import admin  # Admin interface
 from django.urls import path, include  # URL routing
 from django.conf import settings  # Project settings
 from django.conf.urls.static import static  # Static file serving
+from . import static_files  # Static files with cache headers
 from django.views.generic import TemplateView  # Generic views
 import logging  # For logging
 
@@ -71,8 +72,11 @@ if settings.DEBUG:
     # STATIC FILES SERVING 📁
     # In development, Django serves static files (CSS, JS, images)
     # In production, your web server (nginx, Apache) handles this
+    # Hashed names (after collectstatic) are cached for a year, like in
+    # production - see simple_django_framework/static_files.py
     urlpatterns += static(
         settings.STATIC_URL,  # URL prefix (/static/)
+        view=static_files.serve,  # Django's view plus Cache-Control
         document_root=settings.STATIC_ROOT  # File location
     )
     
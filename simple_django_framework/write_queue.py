@@ -0,0 +1,282 @@
+"""
+Single-writer queue for database writes
+
+What is this file? ✍️
+SQLite lets only ONE connection write at a time. When many request threads
+write at once (view counts, sessions, profile and comment saves, admin bulk
+actions) they all fight for the lock: each one sleeps and retries, and
+under enough pressure some give up with "database is locked".
+
+Instead of fighting, writes can form a QUEUE:
+1. Callers hand a write (any function) to submit() and get a Future back
+2. ONE writer thread per process takes writes off the queue and runs
+   several of them together in a single transaction (one commit, one
+   fsync, one lock hand-over instead of many)
+3. Each write gets its own savepoint, so one failing write doesn't undo the
+   others in its batch - its Future just gets the exception
+4. Optionally, the writer threads of all worker processes also take turns
+   through a lock file (LOCK_FILE), so they queue up in the kernel instead
+   of sleeping and retrying inside SQLite
+
+Writes run inline (in the caller's thread) when the queue is disabled, when
+the caller is already inside a transaction on the same database (the
+writer thread could never get the lock it holds), or when the caller IS
+the writer thread.
+
+Usage:
+    from simple_django_framework.write_queue import write_queue
+    future = write_queue.submit(post.save)       # Returns at once
+    write_queue.run(profile.save)                # Waits for the result
+    await write_queue.arun(comment.save)         # From async code
+"""
+
+# Import necessary components 📦
+import asyncio  # Await futures from async code
+import atexit  # Stop the writer thread when the process exits
+import contextvars  # Run each write in its caller's context
+import logging  # For logging
+import os  # For fork handling
+import queue  # Thread-safe queue
+import threading  # The writer thread
+import time  # Batch window
+from concurrent.futures import Future  # What callers get back
+from contextlib import contextmanager, nullcontext  # Optional process lock
+
+try:
+    import fcntl  # File locks between processes (not on Windows)
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+from asgiref.sync import sync_to_async  # Inline writes from async code
+from django.db import DEFAULT_DB_ALIAS, connections, transaction  # One transaction per batch
+
+# Get a logger for this project 📝
+logger = logging.getLogger('main_app')
+
+# Default options (settings.WRITE_QUEUE overrides them) ⚙️
+DEFAULT_BATCH_SIZE = 100  # Most writes committed in one transaction
+# Seconds to wait for more writes to join a batch. 0 = don't wait: the writes
+# that arrived while the previous batch was committing form the next one.
+DEFAULT_BATCH_WINDOW = 0
+DEFAULT_TIMEOUT = 30  # Seconds run() waits for a result
+
+_STOP = object()  # Queued by stop(): the writer thread exits when it gets here
+
+
+class WriteOperation:
+    """One queued write: a function, its arguments and the caller's Future 📨"""
+
+    def __init__(self, func, args, kwargs, batch):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.batch = batch  # May share a transaction with other writes
+        self.future = Future()
+        self.context = contextvars.copy_context()  # e.g. the replica pin state
+
+    def __call__(self):
+        return self.context.run(self.func, *self.args, **self.kwargs)
+
+
+class WriteQueue:
+    """
+    Serialize database writes through one writer thread per process 🧵
+
+    Args:
+        using: Database alias the writes go to
+        enabled: False runs every write inline (e.g. for the test suite)
+        batch_size: Most writes committed together
+        batch_window: Seconds to wait for more writes after the first
+        lock_file: Path of a file used to take turns with other processes
+    """
+
+    def __init__(self, using=DEFAULT_DB_ALIAS, enabled=True, batch_size=DEFAULT_BATCH_SIZE,
+                 batch_window=DEFAULT_BATCH_WINDOW, lock_file=None):
+        self.using = using
+        self.enabled = enabled
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.lock_file = str(lock_file) if lock_file and fcntl else None
+        if self.lock_file:
+            os.makedirs(os.path.dirname(self.lock_file), exist_ok=True)
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()  # Protects starting the thread
+        self._thread = None
+        self._carried = None  # Write taken off the queue that starts the next batch
+        self.batches = 0  # Transactions committed (for benchmarks)
+        self.operations = 0  # Writes run through the queue
+
+    def submit(self, func, *args, batch=True, **kwargs):
+        """
+        Queue ``func(*args, **kwargs)`` and return a Future for its result 📥
+
+        Args:
+            func: The write to run (e.g. obj.save)
+            batch: False = run in a transaction of its own (big bulk updates)
+
+        Returns:
+            concurrent.futures.Future: Resolved once the write is committed
+        """
+        operation = WriteOperation(func, args, kwargs, batch)
+        if self._run_inline():
+            self._execute_inline(operation)
+            return operation.future
+        self._ensure_thread()
+        self._queue.put(operation)
+        return operation.future
+
+    def run(self, func, *args, timeout=DEFAULT_TIMEOUT, **kwargs):
+        """submit() and wait for the result (re-raises the write's exception) ⏳"""
+        return self.submit(func, *args, **kwargs).result(timeout)
+
+    async def arun(self, func, *args, **kwargs):
+        """run() for async code: waits without blocking the event loop ⚡"""
+        if not self.enabled:
+            return await sync_to_async(func)(*args, **kwargs)
+        return await asyncio.wrap_future(self.submit(func, *args, **kwargs))
+
+    def _run_inline(self):
+        if not self.enabled:
+            return True
+        if threading.current_thread() is self._thread:
+            return True  # A write queueing another write: just do it
+        # Our caller holds the transaction (and maybe the lock): don't wait for it
+        return connections[self.using].in_atomic_block
+
+    def _execute_inline(self, operation):
+        try:
+            operation.future.set_result(operation())
+        except Exception as exc:
+            operation.future.set_exception(exc)
+
+    def _ensure_thread(self):
+        """Start the writer thread if it is not running yet 🧵"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._loop, name='db-writer', daemon=True)
+            self._thread.start()
+
+    def _next_batch(self):
+        """Wait for one write, then gather what is queued (or arrives within the window) 📦"""
+        if self._carried is not None:
+            first, self._carried = self._carried, None
+        else:
+            first = self._queue.get()
+        if first is _STOP or not first.batch:
+            return [first]
+        batch = [first]
+        deadline = time.perf_counter() + self.batch_window
+        while len(batch) < self.batch_size:
+            try:
+                operation = self._queue.get(timeout=max(deadline - time.perf_counter(), 0))
+            except queue.Empty:
+                break
+            if operation is _STOP or not operation.batch:
+                self._carried = operation  # Runs in a batch of its own, next round
+                break
+            batch.append(operation)
+        return batch
+
+    def _loop(self):
+        """The writer thread 🔁"""
+        while True:
+            batch = self._next_batch()
+            if batch[0] is _STOP:
+                break  # stop() was called
+            try:
+                self._execute(batch)
+            except Exception:
+                logger.exception("Write queue batch failed")
+            connections[self.using].close_if_unusable_or_obsolete()
+        connections[self.using].close()
+
+    @contextmanager
+    def _process_lock(self):
+        """Take turns with the other worker processes (if LOCK_FILE is set) 🔐"""
+        with open(self.lock_file, 'a') as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _execute(self, batch):
+        """Run a batch in one transaction, each write in its own savepoint 💾"""
+        outcomes = []
+        try:
+            with self._process_lock() if self.lock_file else nullcontext():
+                with transaction.atomic(using=self.using):
+                    for operation in batch:
+                        # Own savepoint: a failing write only undoes itself
+                        with transaction.atomic(using=self.using):
+                            outcome = self._call(operation)
+                            if outcome[1] is not None:
+                                transaction.set_rollback(True, using=self.using)
+                        outcomes.append(outcome)
+        except Exception as exc:
+            # The commit itself failed: none of the writes happened
+            for operation in batch:
+                operation.future.set_exception(exc)
+            return
+
+        self.batches += 1
+        self.operations += len(batch)
+        for (result, error), operation in zip(outcomes, batch):
+            if error is None:
+                operation.future.set_result(result)
+            else:
+                operation.future.set_exception(error)
+
+    @staticmethod
+    def _call(operation):
+        try:
+            return operation(), None
+        except Exception as exc:
+            return None, exc
+
+    def stop(self, timeout=5):
+        """Finish queued writes and stop the writer thread 🛑"""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+        self._thread = None
+
+    def reset_after_fork(self):
+        """
+        Give a freshly forked worker its own queue and writer thread 🍴
+
+        The parent's thread doesn't exist in the child, and its queued
+        writes belong to the parent.
+        """
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._carried = None
+
+
+def _build_queue():
+    """Create the process-wide queue from settings.WRITE_QUEUE ⚙️"""
+    from django.conf import settings
+
+    options = getattr(settings, 'WRITE_QUEUE', {})
+    return WriteQueue(
+        enabled=options.get('ENABLED', True),
+        batch_size=options.get('BATCH_SIZE', DEFAULT_BATCH_SIZE),
+        batch_window=options.get('BATCH_WINDOW', DEFAULT_BATCH_WINDOW),
+        lock_file=options.get('LOCK_FILE'),
+    )
+
+
+# The queue used by this process ✍️
+write_queue = _build_queue()
+
+atexit.register(write_queue.stop)
+
+# Pre-fork servers (gunicorn --preload) copy memory into workers - reset it there
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=write_queue.reset_after_fork)